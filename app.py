@@ -2,10 +2,42 @@ import streamlit as st
 import plotly.graph_objects as go
 import pandas as pd
 import time
-import requests
 from typing import Dict, List
 import json
+import os
+import uuid
 import numpy as np
+from utils.alerts import (
+    ALERT_LABELS, CLOSE_ABOVE, CLOSE_BELOW, PERCENT_MOVE, PRICE_ABOVE, PRICE_BELOW
+)
+from utils.backtest import Backtester, results_table, ticks_from_file, ticks_from_history
+from utils.chart_grid import GridRenderer
+from utils.charts import (
+    CHART_TEMPLATE, create_candlestick_chart, create_depth_chart, create_equity_chart,
+    create_heikin_ashi_chart, create_kagi_chart, create_line_break_chart, create_point_figure_chart,
+    create_range_bar_chart, create_renko_chart, create_volume_chart
+)
+from utils.cross_rates import cross_pairs
+from utils.data_fetcher import CryptoDataFetcher
+from utils.exchanges import EXCHANGES
+from utils.figure_cache import FigureCache
+from utils.ingest import IngestLoop
+from utils.replay import ReplaySource, TickFile
+from utils.records import CHART_LABELS
+from utils.response_cache import ResponseCache
+from utils.retention import STORE_LABELS, memory_usage
+from utils.scheduler import PollScheduler, ViewerRegistry
+from utils.shm_store import SharedMarketReader
+from utils.timebase import NS_PER_SECOND, now_ns, to_datetime
+from utils.transforms import TRANSFORMS
+
+# Transformações em fluxo: rótulo do gráfico -> (nome da visão, construtor)
+TRANSFORM_CHARTS = {
+    TRANSFORMS['heikin_ashi'].label: ('heikin_ashi', create_heikin_ashi_chart),
+    TRANSFORMS['line_break'].label: ('line_break', create_line_break_chart),
+    TRANSFORMS['kagi'].label: ('kagi', create_kagi_chart),
+    TRANSFORMS['range'].label: ('range', create_range_bar_chart),
+}
 
 # Configuração da página
 st.set_page_config(
@@ -15,913 +47,105 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-class CryptoDataFetcher:
-    def __init__(self):
-        self.price_data = {}
-        self.historical_data = {}
-        self.ohlc_data = {}
-        self.renko_data = {}
-        self.point_data = {}
-        self.running = False
-        self.symbols = []
-        self.candle_interval = 60  # segundos para cada vela
-        self.brick_size = None  # para Renko
-        self.point_size = None  # para Point and Figure
-        
-    def init_ohlc_data(self, symbol):
-        """Inicializa estrutura de dados OHLC para um símbolo"""
-        if symbol not in self.ohlc_data:
-            self.ohlc_data[symbol] = {
-                'timestamps': [],
-                'open': [],
-                'high': [],
-                'low': [],
-                'close': [],
-                'volume': [],
-                'current_candle': None
-            }
-    
-    def init_renko_data(self, symbol):
-        """Inicializa estrutura de dados Renko para um símbolo"""
-        if symbol not in self.renko_data:
-            self.renko_data[symbol] = {
-                'timestamps': [],
-                'open': [],
-                'close': [],
-                'high': [],
-                'low': [],
-                'color': [],  # 'up' ou 'down'
-                'last_brick_close': None
-            }
-    
-    def init_point_data(self, symbol):
-        """Inicializa estrutura de dados Point and Figure para um símbolo"""
-        if symbol not in self.point_data:
-            self.point_data[symbol] = {
-                'x': [],
-                'y': [],
-                'marker': [],  # 'X' para alta, 'O' para baixa
-                'last_price': None,
-                'last_marker': None,
-                'column': 0
-            }
-    
-    def update_ohlc_candle(self, symbol, price, volume, timestamp):
-        """Atualiza ou cria nova vela OHLC"""
-        self.init_ohlc_data(symbol)
-        
-        current_time = timestamp
-        candle_start_time = pd.Timestamp(
-            current_time.floor(f'{self.candle_interval}s')
-        )
-        
-        ohlc = self.ohlc_data[symbol]
-        
-        # Se é uma nova vela ou primeira vela
-        if (len(ohlc['timestamps']) == 0 or 
-            candle_start_time > ohlc['timestamps'][-1]):
-            
-            # Inicia nova vela
-            ohlc['timestamps'].append(candle_start_time)
-            ohlc['open'].append(price)
-            ohlc['high'].append(price)
-            ohlc['low'].append(price)
-            ohlc['close'].append(price)
-            ohlc['volume'].append(volume if volume > 0 else 1)
-            
-            ohlc['current_candle'] = {
-                'start_time': candle_start_time,
-                'open': price,
-                'high': price,
-                'low': price,
-                'close': price,
-                'volume': volume if volume > 0 else 1
-            }
-            
-        else:
-            # Atualiza vela atual
-            if len(ohlc['timestamps']) > 0:
-                last_idx = -1
-                ohlc['high'][last_idx] = max(ohlc['high'][last_idx], price)
-                ohlc['low'][last_idx] = min(ohlc['low'][last_idx], price)
-                ohlc['close'][last_idx] = price
-                ohlc['volume'][last_idx] = max(ohlc['volume'][last_idx], volume if volume > 0 else 1)
-                
-                # Atualiza vela atual
-                if ohlc['current_candle']:
-                    ohlc['current_candle']['high'] = max(ohlc['current_candle']['high'], price)
-                    ohlc['current_candle']['low'] = min(ohlc['current_candle']['low'], price)
-                    ohlc['current_candle']['close'] = price
-                    ohlc['current_candle']['volume'] = max(ohlc['current_candle']['volume'], volume if volume > 0 else 1)
-        
-        # Limita histórico a 50 velas
-        if len(ohlc['timestamps']) > 50:
-            ohlc['timestamps'].pop(0)
-            ohlc['open'].pop(0)
-            ohlc['high'].pop(0)
-            ohlc['low'].pop(0)
-            ohlc['close'].pop(0)
-            ohlc['volume'].pop(0)
-    
-    def update_renko_data(self, symbol, price, timestamp):
-        """Atualiza dados Renko com novos preços"""
-        self.init_renko_data(symbol)
-        
-        if self.brick_size is None or self.brick_size <= 0:
-            return
-        
-        renko = self.renko_data[symbol]
-        
-        # Primeira vela
-        if renko['last_brick_close'] is None:
-            renko['timestamps'].append(timestamp)
-            renko['open'].append(price)
-            renko['close'].append(price)
-            renko['high'].append(price)
-            renko['low'].append(price)
-            renko['color'].append('neutral')
-            renko['last_brick_close'] = price
-            return
-        
-        current_price = price
-        last_close = renko['last_brick_close']
-        
-        # Calcula quantos bricks se moveram
-        num_bricks = abs(current_price - last_close) / self.brick_size
-        
-        if num_bricks >= 1:
-            # Determina direção
-            if current_price > last_close:
-                direction = 'up'
-            else:
-                direction = 'down'
-            
-            # Cria novos bricks
-            num_bricks_int = int(num_bricks)
-            for i in range(num_bricks_int):
-                if direction == 'up':
-                    brick_open = last_close + (i * self.brick_size)
-                    brick_close = brick_open + self.brick_size
-                    brick_high = brick_close
-                    brick_low = brick_open
-                else:
-                    brick_open = last_close - (i * self.brick_size)
-                    brick_close = brick_open - self.brick_size
-                    brick_high = brick_open
-                    brick_low = brick_close
-                
-                renko['timestamps'].append(timestamp)
-                renko['open'].append(brick_open)
-                renko['close'].append(brick_close)
-                renko['high'].append(brick_high)
-                renko['low'].append(brick_low)
-                renko['color'].append(direction)
-                renko['last_brick_close'] = brick_close
-        
-        # Limita histórico
-        if len(renko['timestamps']) > 50:
-            renko['timestamps'].pop(0)
-            renko['open'].pop(0)
-            renko['close'].pop(0)
-            renko['high'].pop(0)
-            renko['low'].pop(0)
-            renko['color'].pop(0)
-    
-    def update_point_data(self, symbol, price, timestamp):
-        """Atualiza dados Point and Figure"""
-        self.init_point_data(symbol)
-        
-        if self.point_size is None or self.point_size <= 0:
-            return
-        
-        pf = self.point_data[symbol]
-        
-        # Primeira vela
-        if pf['last_price'] is None:
-            pf['last_price'] = price
-            pf['last_marker'] = 'X' if price > 0 else 'O'
-            pf['x'].append(pf['column'])
-            pf['y'].append(price)
-            pf['marker'].append(pf['last_marker'])
-            return
-        
-        current_price = price
-        last_price = pf['last_price']
-        
-        # Calcula mudança em pontos
-        point_change = abs(current_price - last_price) / self.point_size
-        
-        if point_change >= 1:
-            if current_price > last_price:
-                # Movimento para cima
-                new_marker = 'X'
-                if pf['last_marker'] != 'X':
-                    # Muda de coluna
-                    pf['column'] += 1
-                    pf['last_marker'] = 'X'
-            else:
-                # Movimento para baixo
-                new_marker = 'O'
-                if pf['last_marker'] != 'O':
-                    # Muda de coluna
-                    pf['column'] += 1
-                    pf['last_marker'] = 'O'
-            
-            # Adiciona pontos
-            num_points = int(point_change)
-            for i in range(num_points):
-                if current_price > last_price:
-                    point_value = last_price + ((i + 1) * self.point_size)
-                else:
-                    point_value = last_price - ((i + 1) * self.point_size)
-                
-                pf['x'].append(pf['column'])
-                pf['y'].append(point_value)
-                pf['marker'].append(new_marker)
-            
-            pf['last_price'] = current_price
-        
-        # Limita histórico
-        if len(pf['x']) > 100:
-            pf['x'].pop(0)
-            pf['y'].pop(0)
-            pf['marker'].pop(0)
-    
-    def fetch_coingecko_data(self, symbols):
-        """Busca dados do CoinGecko (API gratuita e global)"""
-        try:
-            # Mapeia símbolos para IDs CoinGecko
-            symbol_map = {
-                'BTCUSDT': 'bitcoin',
-                'ETHUSDT': 'ethereum',
-                'BNBUSDT': 'binancecoin',
-                'ADAUSDT': 'cardano',
-                'XRPUSDT': 'ripple',
-                'SOLUSDT': 'solana',
-                'DOTUSDT': 'polkadot',
-                'DOGEUSDT': 'dogecoin',
-                'AVAXUSDT': 'avalanche-2',
-                'LINKUSDT': 'chainlink',
-                'MATICUSDT': 'matic-network',
-                'LTCUSDT': 'litecoin',
-                'UNIUSDT': 'uniswap',
-                'ATOMUSDT': 'cosmos',
-                'FILUSDT': 'filecoin'
-            }
-            
-            available_symbols = [s for s in symbols if s in symbol_map]
-            if not available_symbols:
-                return False
-            
-            ids = ','.join([symbol_map[s] for s in available_symbols])
-            
-            url = "https://api.coingecko.com/api/v3/simple/price"
-            params = {
-                'ids': ids,
-                'vs_currencies': 'usd',
-                'include_24hr_change': 'true',
-                'include_24hr_vol': 'true',
-                'include_last_updated_at': 'true'
-            }
-            
-            response = requests.get(url, params=params, timeout=15)
-            
-            if response.status_code == 200:
-                data = response.json()
-                current_time = pd.Timestamp.now()
-                
-                for symbol in available_symbols:
-                    coin_id = symbol_map[symbol]
-                    if coin_id in data:
-                        coin_data = data[coin_id]
-                        price = float(coin_data['usd'])
-                        change = float(coin_data.get('usd_24h_change', 0))
-                        volume = float(coin_data.get('usd_24h_vol', 0))
-                        
-                        self.price_data[symbol] = {
-                            'price': price,
-                            'change': change,
-                            'volume': volume,
-                            'timestamp': current_time
-                        }
-                        
-                        # Atualiza dados OHLC
-                        self.update_ohlc_candle(symbol, price, volume, current_time)
-                        
-                        # Atualiza dados Renko
-                        self.update_renko_data(symbol, price, current_time)
-                        
-                        # Atualiza dados Point and Figure
-                        self.update_point_data(symbol, price, current_time)
-                        
-                        # Atualiza histórico de linha (para comparação)
-                        if symbol not in self.historical_data:
-                            self.historical_data[symbol] = {'timestamps': [], 'prices': []}
-                        
-                        self.historical_data[symbol]['timestamps'].append(current_time)
-                        self.historical_data[symbol]['prices'].append(price)
-                        
-                        # Limita histórico de linha
-                        if len(self.historical_data[symbol]['timestamps']) > 100:
-                            self.historical_data[symbol]['timestamps'].pop(0)
-                            self.historical_data[symbol]['prices'].pop(0)
-                
-                return True
-            else:
-                print(f"CoinGecko API Error: {response.status_code}")
-                return False
-                
-        except Exception as e:
-            print(f"Erro CoinGecko: {str(e)}")
-            return False
-    
-    def fetch_cryptocompare_data(self, symbols):
-        """Busca dados do CryptoCompare (backup)"""
-        try:
-            symbol_map = {
-                'BTCUSDT': 'BTC',
-                'ETHUSDT': 'ETH',
-                'BNBUSDT': 'BNB',
-                'ADAUSDT': 'ADA',
-                'XRPUSDT': 'XRP',
-                'SOLUSDT': 'SOL',
-                'DOTUSDT': 'DOT',
-                'DOGEUSDT': 'DOGE',
-                'AVAXUSDT': 'AVAX',
-                'LINKUSDT': 'LINK',
-                'MATICUSDT': 'MATIC',
-                'LTCUSDT': 'LTC',
-                'UNIUSDT': 'UNI',
-                'ATOMUSDT': 'ATOM',
-                'FILUSDT': 'FIL'
-            }
-            
-            available_symbols = [s for s in symbols if s in symbol_map]
-            if not available_symbols:
-                return False
-            
-            crypto_symbols = ','.join([symbol_map[s] for s in available_symbols])
-            
-            url = "https://min-api.cryptocompare.com/data/pricemultifull"
-            params = {
-                'fsyms': crypto_symbols,
-                'tsyms': 'USD'
-            }
-            
-            response = requests.get(url, params=params, timeout=15)
-            
-            if response.status_code == 200:
-                data = response.json()
-                current_time = pd.Timestamp.now()
-                
-                if 'RAW' in data:
-                    for symbol in available_symbols:
-                        crypto_symbol = symbol_map[symbol]
-                        if crypto_symbol in data['RAW'] and 'USD' in data['RAW'][crypto_symbol]:
-                            coin_data = data['RAW'][crypto_symbol]['USD']
-                            price = float(coin_data['PRICE'])
-                            change = float(coin_data.get('CHANGEPCT24HOUR', 0))
-                            volume = float(coin_data.get('VOLUME24HOUR', 0))
-                            
-                            self.price_data[symbol] = {
-                                'price': price,
-                                'change': change,
-                                'volume': volume,
-                                'timestamp': current_time
-                            }
-                            
-                            # Atualiza dados OHLC
-                            self.update_ohlc_candle(symbol, price, volume, current_time)
-                            
-                            # Atualiza dados Renko
-                            self.update_renko_data(symbol, price, current_time)
-                            
-                            # Atualiza dados Point and Figure
-                            self.update_point_data(symbol, price, current_time)
-                            
-                            # Atualiza histórico de linha
-                            if symbol not in self.historical_data:
-                                self.historical_data[symbol] = {'timestamps': [], 'prices': []}
-                            
-                            self.historical_data[symbol]['timestamps'].append(current_time)
-                            self.historical_data[symbol]['prices'].append(price)
-                            
-                            # Limita histórico de linha
-                            if len(self.historical_data[symbol]['timestamps']) > 100:
-                                self.historical_data[symbol]['timestamps'].pop(0)
-                                self.historical_data[symbol]['prices'].pop(0)
-                
-                return True
-            else:
-                return False
-                
-        except Exception as e:
-            print(f"Erro CryptoCompare: {str(e)}")
-            return False
-    
-    def fetch_coinapi_data(self, symbols):
-        """Busca dados do CoinAPI (outro backup)"""
-        try:
-            symbol_map = {
-                'BTCUSDT': 'BTC',
-                'ETHUSDT': 'ETH',
-                'BNBUSDT': 'BNB',
-                'ADAUSDT': 'ADA',
-                'XRPUSDT': 'XRP',
-                'SOLUSDT': 'SOL',
-                'DOTUSDT': 'DOT',
-                'DOGEUSDT': 'DOGE',
-                'AVAXUSDT': 'AVAX',
-                'LINKUSDT': 'LINK',
-                'MATICUSDT': 'MATIC',
-                'LTCUSDT': 'LTC',
-                'UNIUSDT': 'UNI',
-                'ATOMUSDT': 'ATOM',
-                'FILUSDT': 'FIL'
-            }
-            
-            current_time = pd.Timestamp.now()
-            success_count = 0
-            
-            for symbol in symbols:
-                if symbol in symbol_map:
-                    crypto_symbol = symbol_map[symbol]
-                    
-                    # URL da API pública do CoinAPI (rate limit baixo mas funciona)
-                    url = f"https://rest.coinapi.io/v1/exchangerate/{crypto_symbol}/USD"
-                    
-                    try:
-                        response = requests.get(url, timeout=10)
-                        if response.status_code == 200:
-                            data = response.json()
-                            price = float(data['rate'])
-                            
-                            # Como não temos dados de mudança 24h, calculamos baseado no histórico
-                            change = 0
-                            if symbol in self.historical_data and self.historical_data[symbol]['prices']:
-                                old_price = self.historical_data[symbol]['prices'][0]
-                                change = ((price - old_price) / old_price) * 100
-                            
-                            self.price_data[symbol] = {
-                                'price': price,
-                                'change': change,
-                                'volume': 0,  # Não disponível na API gratuita
-                                'timestamp': current_time
-                            }
-                            
-                            # Atualiza dados OHLC
-                            self.update_ohlc_candle(symbol, price, 0, current_time)
-                            
-                            # Atualiza dados Renko
-                            self.update_renko_data(symbol, price, current_time)
-                            
-                            # Atualiza dados Point and Figure
-                            self.update_point_data(symbol, price, current_time)
-                            
-                            # Atualiza histórico de linha
-                            if symbol not in self.historical_data:
-                                self.historical_data[symbol] = {'timestamps': [], 'prices': []}
-                            
-                            self.historical_data[symbol]['timestamps'].append(current_time)
-                            self.historical_data[symbol]['prices'].append(price)
-                            
-                            # Limita histórico de linha
-                            if len(self.historical_data[symbol]['timestamps']) > 100:
-                                self.historical_data[symbol]['timestamps'].pop(0)
-                                self.historical_data[symbol]['prices'].pop(0)
-                            
-                            success_count += 1
-                            time.sleep(0.1)  # Rate limiting
-                            
-                    except Exception as e:
-                        print(f"Erro para {symbol}: {e}")
-                        continue
-            
-            return success_count > 0
-            
-        except Exception as e:
-            print(f"Erro CoinAPI: {str(e)}")
-            return False
-    
-    def start_fetching(self, symbols, candle_interval=60, brick_size=None, point_size=None):
-        """Inicia busca de dados com fallbacks"""
-        self.symbols = symbols
-        self.candle_interval = candle_interval
-        self.brick_size = brick_size
-        self.point_size = point_size
-        self.running = True
-        
-        # Tenta múltiplas APIs em ordem de preferência
-        success = self.fetch_coingecko_data(symbols)
-        
-        if not success:
-            st.warning("CoinGecko indisponível, tentando CryptoCompare...")
-            success = self.fetch_cryptocompare_data(symbols)
-        
-        if not success:
-            st.warning("CryptoCompare indisponível, tentando CoinAPI...")
-            success = self.fetch_coinapi_data(symbols)
-        
-        return success
-    
-    def stop_fetching(self):
-        """Para a busca de dados"""
-        self.running = False
-        self.price_data.clear()
-        self.historical_data.clear()
-        self.ohlc_data.clear()
-        self.renko_data.clear()
-        self.point_data.clear()
-    
-    def update_data(self):
-        """Atualiza dados"""
-        if self.running and self.symbols:
-            # Tenta as APIs na mesma ordem
-            success = self.fetch_coingecko_data(self.symbols)
-            if not success:
-                success = self.fetch_cryptocompare_data(self.symbols)
-            if not success:
-                success = self.fetch_coinapi_data(self.symbols)
-            return success
-        return False
-    
-    def get_data(self):
-        """Retorna dados atuais"""
-        return self.price_data, self.historical_data
-    
-    def get_ohlc_data(self):
-        """Retorna dados OHLC"""
-        return self.ohlc_data
-    
-    def get_renko_data(self):
-        """Retorna dados Renko"""
-        return self.renko_data
-    
-    def get_point_data(self):
-        """Retorna dados Point and Figure"""
-        return self.point_data
-    
-    def is_running(self):
-        """Verifica se está ativo"""
-        return self.running
+@st.cache_resource
+def get_response_cache():
+    """Cache de respostas REST compartilhado por todas as sessões"""
+    return ResponseCache(ttl=1.0, max_stale=15.0)
 
-# Inicialização do estado da sessão
-if 'data_fetcher' not in st.session_state:
-    st.session_state.data_fetcher = CryptoDataFetcher()
-    st.session_state.last_update = time.time()
+@st.cache_resource
+def get_rate_limits():
+    """Estado de rate limit por provedor, compartilhado por todas as sessões"""
+    return {}
 
-def create_candlestick_chart(symbol, ohlc_data):
-    """Cria gráfico de velas (candlestick) para um símbolo"""
-    fig = go.Figure()
-    
-    if symbol not in ohlc_data or len(ohlc_data[symbol]['timestamps']) == 0:
-        fig.add_annotation(
-            text="Carregando velas...", 
-            xref="paper", yref="paper",
-            x=0.5, y=0.5, showarrow=False,
-            font=dict(size=16, color="gray")
-        )
-        fig.update_layout(
-            template='plotly_dark',
-            height=400,
-            title=f'🕯️ {symbol.replace("USDT", "/USD")} - Carregando...',
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)',
-            xaxis_rangeslider_visible=False
-        )
-        return fig
-    
-    data = ohlc_data[symbol]
-    
-    # Validação de dados
-    if (len(data['timestamps']) == 0 or 
-        len(data['open']) == 0 or 
-        len(data['high']) == 0 or 
-        len(data['low']) == 0 or 
-        len(data['close']) == 0):
-        
-        fig.add_annotation(
-            text="Aguardando dados...", 
-            xref="paper", yref="paper",
-            x=0.5, y=0.5, showarrow=False,
-            font=dict(size=16, color="gray")
-        )
-        fig.update_layout(
-            template='plotly_dark',
-            height=400,
-            title=f'🕯️ {symbol.replace("USDT", "/USD")}',
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)',
-            xaxis_rangeslider_visible=False
-        )
-        return fig
-    
-    # Adiciona candlestick
-    fig.add_trace(go.Candlestick(
-        x=data['timestamps'],
-        open=data['open'],
-        high=data['high'],
-        low=data['low'],
-        close=data['close'],
-        name=symbol.replace('USDT', ''),
-        increasing_line_color='#00D4AA',  # Verde para alta
-        decreasing_line_color='#FF6B6B',  # Vermelho para baixa
-        increasing_fillcolor='#00D4AA',
-        decreasing_fillcolor='#FF6B6B',
-        line=dict(width=1),
-        hovertemplate='<b>%{fullData.name}</b><br>' +
-                     'Tempo: %{x|%H:%M:%S}<br>' +
-                     'Abertura: $%{open:,.4f}<br>' +
-                     'Máxima: $%{high:,.4f}<br>' +
-                     'Mínima: $%{low:,.4f}<br>' +
-                     'Fechamento: $%{close:,.4f}<br>' +
-                     '<extra></extra>'
-    ))
-    
-    # Adiciona linha de média móvel simples (SMA)
-    if len(data['close']) >= 5:
-        sma_periods = min(5, len(data['close']))
-        sma = []
-        for i in range(len(data['close'])):
-            if i >= sma_periods - 1:
-                sma_value = sum(data['close'][i-sma_periods+1:i+1]) / sma_periods
-                sma.append(sma_value)
-            else:
-                sma.append(None)
-        
-        fig.add_trace(go.Scatter(
-            x=data['timestamps'],
-            y=sma,
-            mode='lines',
-            name=f'SMA(5)',
-            line=dict(color='#FFA500', width=2, dash='dash'),
-            opacity=0.7,
-            hovertemplate='<b>SMA(5)</b><br>' +
-                         'Valor: $%{y:,.4f}<br>' +
-                         '<extra></extra>'
-        ))
-    
-    fig.update_layout(
-        title=f'🕯️ {symbol.replace("USDT", "/USD")} - Gráfico de Velas',
-        xaxis_title='Tempo',
-        yaxis_title='Preço (USD)',
-        template='plotly_dark',
-        height=400,
-        showlegend=True,
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        margin=dict(l=0, r=0, t=40, b=0),
-        legend=dict(
-            orientation="h",
-            yanchor="bottom",
-            y=1.02,
-            xanchor="left",
-            x=0
-        )
-    )
-    
-    # Remove range slider do candlestick
-    fig.update_layout(xaxis_rangeslider_visible=False)
-    
-    # Formatar eixo Y baseado nos preços
-    if len(data['close']) > 0:
-        max_price = max(data['high']) if data['high'] else max(data['close'])
-        
-        if max_price < 1:
-            fig.update_yaxes(tickformat='.6f')
-        elif max_price < 10:
-            fig.update_yaxes(tickformat='.4f')
-        else:
-            fig.update_yaxes(tickformat=',.2f')
-    
-    return fig
+@st.cache_resource
+def get_viewer_registry():
+    """Registro de quais símbolos cada sessão está observando"""
+    return ViewerRegistry()
 
-def create_renko_chart(symbol, renko_data):
-    """Cria gráfico Renko para um símbolo"""
-    fig = go.Figure()
-    
-    if symbol not in renko_data or len(renko_data[symbol]['timestamps']) == 0:
-        fig.add_annotation(
-            text="Carregando Renko...", 
-            xref="paper", yref="paper",
-            x=0.5, y=0.5, showarrow=False,
-            font=dict(size=16, color="gray")
-        )
-        fig.update_layout(
-            template='plotly_dark',
-            height=400,
-            title=f'🧱 {symbol.replace("USDT", "/USD")} - Gráfico Renko - Carregando...',
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)'
-        )
-        return fig
-    
-    data = renko_data[symbol]
-    
-    if len(data['timestamps']) == 0:
-        fig.add_annotation(
-            text="Aguardando dados...", 
-            xref="paper", yref="paper",
-            x=0.5, y=0.5, showarrow=False,
-            font=dict(size=16, color="gray")
-        )
-        fig.update_layout(
-            template='plotly_dark',
-            height=400,
-            title=f'🧱 {symbol.replace("USDT", "/USD")} - Gráfico Renko',
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)'
-        )
-        return fig
-    
-    # Cria candlesticks Renko
-    fig.add_trace(go.Candlestick(
-        x=list(range(len(data['timestamps']))),
-        open=data['open'],
-        high=data['high'],
-        low=data['low'],
-        close=data['close'],
-        name=symbol.replace('USDT', ''),
-        increasing_line_color='#00D4AA',
-        decreasing_line_color='#FF6B6B',
-        increasing_fillcolor='#00D4AA',
-        decreasing_fillcolor='#FF6B6B',
-        line=dict(width=2),
-        hovertemplate='<b>Renko Brick</b><br>' +
-                     'Abertura: $%{open:,.4f}<br>' +
-                     'Máxima: $%{high:,.4f}<br>' +
-                     'Mínima: $%{low:,.4f}<br>' +
-                     'Fechamento: $%{close:,.4f}<br>' +
-                     '<extra></extra>'
-    ))
-    
-    fig.update_layout(
-        title=f'🧱 {symbol.replace("USDT", "/USD")} - Gráfico Renko',
-        xaxis_title='Brick #',
-        yaxis_title='Preço (USD)',
-        template='plotly_dark',
-        height=400,
-        showlegend=False,
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        margin=dict(l=0, r=0, t=40, b=0),
-        xaxis_rangeslider_visible=False
-    )
-    
-    return fig
+@st.cache_resource
+def get_ingest_loop():
+    """Loop asyncio de ingestão (streams e polls REST) compartilhado por todas as sessões"""
+    return IngestLoop()
 
-def create_point_figure_chart(symbol, point_data):
-    """Cria gráfico Point and Figure para um símbolo"""
-    fig = go.Figure()
-    
-    if symbol not in point_data or len(point_data[symbol]['x']) == 0:
-        fig.add_annotation(
-            text="Carregando Point & Figure...", 
-            xref="paper", yref="paper",
-            x=0.5, y=0.5, showarrow=False,
-            font=dict(size=16, color="gray")
-        )
-        fig.update_layout(
-            template='plotly_dark',
-            height=400,
-            title=f'📊 {symbol.replace("USDT", "/USD")} - Point & Figure - Carregando...',
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)'
-        )
-        return fig
-    
-    data = point_data[symbol]
-    
-    if len(data['x']) == 0:
-        fig.add_annotation(
-            text="Aguardando dados...", 
-            xref="paper", yref="paper",
-            x=0.5, y=0.5, showarrow=False,
-            font=dict(size=16, color="gray")
-        )
-        fig.update_layout(
-            template='plotly_dark',
-            height=400,
-            title=f'📊 {symbol.replace("USDT", "/USD")} - Point & Figure',
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)'
-        )
-        return fig
-    
-    # Separa X's e O's
-    x_points = {'x': [], 'y': [], 'text': []}
-    o_points = {'x': [], 'y': [], 'text': []}
-    
-    for i, marker in enumerate(data['marker']):
-        if marker == 'X':
-            x_points['x'].append(data['x'][i])
-            x_points['y'].append(data['y'][i])
-            x_points['text'].append('X')
-        else:
-            o_points['x'].append(data['x'][i])
-            o_points['y'].append(data['y'][i])
-            o_points['text'].append('O')
-    
-    # Adiciona X's
-    if x_points['x']:
-        fig.add_trace(go.Scatter(
-            x=x_points['x'],
-            y=x_points['y'],
-            mode='markers+text',
-            name='Alta (X)',
-            marker=dict(size=15, color='#00D4AA', symbol='circle'),
-            text=x_points['text'],
-            textposition='middle center',
-            textfont=dict(size=12, color='black', family='Arial Black'),
-            hovertemplate='<b>Alta (X)</b><br>' +
-                         'Coluna: %{x}<br>' +
-                         'Preço: $%{y:,.4f}<br>' +
-                         '<extra></extra>'
-        ))
-    
-    # Adiciona O's
-    if o_points['x']:
-        fig.add_trace(go.Scatter(
-            x=o_points['x'],
-            y=o_points['y'],
-            mode='markers+text',
-            name='Baixa (O)',
-            marker=dict(size=15, color='#FF6B6B', symbol='circle'),
-            text=o_points['text'],
-            textposition='middle center',
-            textfont=dict(size=12, color='white', family='Arial Black'),
-            hovertemplate='<b>Baixa (O)</b><br>' +
-                         'Coluna: %{x}<br>' +
-                         'Preço: $%{y:,.4f}<br>' +
-                         '<extra></extra>'
-        ))
-    
-    fig.update_layout(
-        title=f'📊 {symbol.replace("USDT", "/USD")} - Point & Figure',
-        xaxis_title='Coluna',
-        yaxis_title='Preço (USD)',
-        template='plotly_dark',
-        height=400,
-        showlegend=True,
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        margin=dict(l=0, r=0, t=40, b=0),
-        legend=dict(
-            orientation="h",
-            yanchor="bottom",
-            y=1.02,
-            xanchor="left",
-            x=0
+@st.cache_resource
+def get_grid_renderer():
+    """Pool de processos que prepara as figuras das grades de gráficos"""
+    return GridRenderer()
+
+@st.cache_resource
+def get_backtester():
+    """Pool de processos do backtest de Renko e P&F"""
+    return Backtester()
+
+@st.cache_resource
+def get_tick_file(path, mtime):
+    """Arquivo de ticks indexado para replay (reindexado se o arquivo mudar)"""
+    return TickFile(path)
+
+@st.cache_resource
+def get_figure_cache():
+    """Payloads de figuras por (símbolo, visão, parâmetros, versão), compartilhados entre sessões"""
+    return FigureCache(maxsize=256)
+
+# Com CRYPTO_SHM_NAME definido, os dados vêm do daemon de ingestão
+# (ingest_daemon.py) via memória compartilhada em vez de buscas próprias
+SHM_NAME = os.environ.get('CRYPTO_SHM_NAME')
+
+# Inicialização do estado da sessão
+if 'data_fetcher' not in st.session_state and SHM_NAME:
+    try:
+        st.session_state.data_fetcher = SharedMarketReader(SHM_NAME)
+    except FileNotFoundError:
+        st.error(f"❌ Daemon de ingestão não encontrado (segmento '{SHM_NAME}')")
+        st.stop()
+    st.session_state.session_id = uuid.uuid4().hex
+    st.session_state.last_update = time.time()
+
+if 'data_fetcher' not in st.session_state:
+    st.session_state.data_fetcher = CryptoDataFetcher(
+        response_cache=get_response_cache(),
+        notify=st.warning,
+        ingest=get_ingest_loop(),
+        scheduler=PollScheduler(
+            rate_limits=get_rate_limits(),
+            viewers=get_viewer_registry()
         )
     )
-    
-    return fig
+    st.session_state.session_id = uuid.uuid4().hex
+    st.session_state.last_update = time.time()
 
-def create_volume_chart(symbol, ohlc_data):
-    """Cria gráfico de volume para um símbolo"""
-    if symbol not in ohlc_data or len(ohlc_data[symbol]['timestamps']) == 0:
-        return None
-    
-    data = ohlc_data[symbol]
-    
-    if not data['volume'] or all(v == 0 for v in data['volume']):
-        return None
-    
-    fig = go.Figure()
-    
-    # Cores baseadas na direção da vela
-    colors = []
-    for i in range(len(data['close'])):
-        if i < len(data['open']) and data['close'][i] >= data['open'][i]:
-            colors.append('#00D4AA')  # Verde para alta
-        else:
-            colors.append('#FF6B6B')  # Vermelho para baixa
-    
-    fig.add_trace(go.Bar(
-        x=data['timestamps'],
-        y=data['volume'],
-        name='Volume',
-        marker_color=colors,
-        opacity=0.7,
-        hovertemplate='<b>Volume</b><br>' +
-                     'Tempo: %{x|%H:%M:%S}<br>' +
-                     'Volume: %{y:,.0f}<br>' +
-                     '<extra></extra>'
-    ))
-    
-    fig.update_layout(
-        title=f'📊 {symbol.replace("USDT", "/USD")} - Volume',
-        xaxis_title='Tempo',
-        yaxis_title='Volume',
-        template='plotly_dark',
-        height=200,
-        showlegend=False,
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        margin=dict(l=0, r=0, t=40, b=0)
-    )
-    
-    return fig
+def render_chart_grid(view, symbols, store, build, params=()):
+    """Exibe os gráficos dos símbolos em grade, na ordem dada.
+    
+    Um símbolo ocupa a largura toda; mais de um são dispostos em duas
+    colunas. Figuras com versão inalterada vêm do cache e as demais são
+    preparadas em paralelo pelo GridRenderer.
+    """
+    cache = get_figure_cache()
+    keys = []
+    for symbol in symbols:
+        series = store.get(symbol)
+        keys.append((symbol, view, params, series.version if series is not None else None))
+    
+    payloads = [cache.lookup(key) for key in keys]
+    missing = [i for i, payload in enumerate(payloads) if payload is None]
+    if missing:
+        jobs = [(build, symbols[i], store.get(symbols[i])) for i in missing]
+        for i, payload in zip(missing, get_grid_renderer().prepare(jobs)):
+            payloads[i] = payload
+            if payload is not None:
+                cache.put(keys[i], payload)
+    
+    if len(symbols) == 1:
+        if payloads[0] is not None:
+            st.plotly_chart(payloads[0], use_container_width=True)
+        return
+    
+    for row in range(0, len(symbols), 2):
+        for column, payload in zip(st.columns(2), payloads[row:row + 2]):
+            if payload is not None:
+                with column:
+                    st.plotly_chart(payload, use_container_width=True)
 
 def create_comparison_chart(symbols, historical_data):
     """Cria gráfico comparativo normalizado"""
@@ -931,7 +155,7 @@ def create_comparison_chart(symbols, historical_data):
     
     for i, symbol in enumerate(symbols):
         if symbol in historical_data and len(historical_data[symbol]['timestamps']) > 0:
-            timestamps = historical_data[symbol]['timestamps']
+            timestamps = to_datetime(historical_data[symbol]['timestamps'])
             prices = historical_data[symbol]['prices']
             
             if len(prices) > 1:
@@ -955,11 +179,9 @@ def create_comparison_chart(symbols, historical_data):
         title='📊 Comparação de Performance - Variação %',
         xaxis_title='Tempo',
         yaxis_title='Variação (%)',
-        template='plotly_dark',
+        template=CHART_TEMPLATE,
         height=400,
         showlegend=True,
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
         legend=dict(
             orientation="h",
             yanchor="bottom",
@@ -974,6 +196,55 @@ def create_comparison_chart(symbols, historical_data):
     
     return fig
 
+def create_correlation_heatmap(symbols, correlation):
+    """Cria mapa de calor da correlação móvel entre os símbolos"""
+    fig = go.Figure()
+    
+    symbols = [s for s in symbols if s in correlation.symbols]
+    if len(symbols) < 2 or correlation.count < 3:
+        fig.add_annotation(
+            text="Aguardando retornos suficientes para a correlação...", 
+            xref="paper", yref="paper",
+            x=0.5, y=0.5, showarrow=False,
+            font=dict(size=16, color="gray")
+        )
+        fig.update_layout(
+            template=CHART_TEMPLATE,
+            height=400,
+            title='🔗 Correlação Móvel',
+        )
+        return fig
+    
+    index = [correlation.symbols.index(s) for s in symbols]
+    corr = correlation.correlation()[np.ix_(index, index)]
+    volatility = correlation.volatility()[index] * 100
+    labels = [f"{s.replace('USDT', '')} (σ {v:.3f}%)" for s, v in zip(symbols, volatility)]
+    
+    fig.add_trace(go.Heatmap(
+        z=corr,
+        x=labels,
+        y=labels,
+        zmin=-1,
+        zmax=1,
+        colorscale='RdBu',
+        reversescale=True,
+        text=np.round(corr, 2),
+        texttemplate='%{text}',
+        hovertemplate='<b>%{y} × %{x}</b><br>' +
+                     'Correlação: %{z:.3f}<br>' +
+                     '<extra></extra>'
+    ))
+    
+    fig.update_layout(
+        title=f'🔗 Correlação Móvel - {correlation.count} retornos',
+        template=CHART_TEMPLATE,
+        height=400,
+        margin=dict(l=0, r=0, t=40, b=0),
+        yaxis=dict(autorange='reversed')
+    )
+    
+    return fig
+
 # Interface principal
 st.title("🕯️ Dashboard de Criptomoedas - Múltiplos Gráficos")
 st.markdown("*Análise técnica com Candlesticks, Renko e Point & Figure*")
@@ -983,27 +254,61 @@ st.markdown("---")
 with st.sidebar:
     st.header("⚙️ Configurações")
     
+    # Fonte dos dados: APIs ao vivo ou replay de um arquivo de ticks gravado
+    tick_file = None
+    data_source = 'Ao vivo'
+    if hasattr(st.session_state.data_fetcher, 'start_replay'):
+        data_source = st.radio("Fonte dos dados:", ['Ao vivo', 'Replay'], horizontal=True)
+        if data_source == 'Replay':
+            replay_path = st.text_input(
+                "Arquivo de ticks:",
+                help="CSV ou Parquet com as colunas timestamp (ns ou ISO 8601), symbol e price; change e volume são opcionais"
+            )
+            if replay_path:
+                try:
+                    tick_file = get_tick_file(replay_path, os.path.getmtime(replay_path))
+                except (OSError, ValueError, ImportError) as e:
+                    st.error(f"❌ Arquivo inválido: {e}")
+    
     # Seleção de criptomoedas
     available_symbols = [
         'BTCUSDT', 'ETHUSDT', 'BNBUSDT', 'ADAUSDT', 'XRPUSDT', 
         'SOLUSDT', 'DOTUSDT', 'DOGEUSDT', 'AVAXUSDT', 'LINKUSDT',
         'MATICUSDT', 'LTCUSDT', 'UNIUSDT', 'ATOMUSDT', 'FILUSDT'
     ]
+    default_symbols = ['BTCUSDT', 'ETHUSDT', 'BNBUSDT']
+    if tick_file is not None:
+        available_symbols = tick_file.symbols
+        default_symbols = tick_file.symbols[:3]
     
     selected_symbols = st.multiselect(
         "Selecione as criptomoedas:",
         available_symbols,
-        default=['BTCUSDT', 'ETHUSDT', 'BNBUSDT'],
+        default=default_symbols,
         max_selections=6
     )
     
+    # Pares cruzados derivados localmente das cotações em USD
+    selected_pairs = []
+    if hasattr(st.session_state.data_fetcher, 'set_cross_pairs') and len(selected_symbols) > 1:
+        selected_pairs = st.multiselect(
+            "Pares cruzados:",
+            list(cross_pairs(selected_symbols)),
+            default=[],
+            max_selections=6,
+            help="Calculados a partir das cotações em USD das moedas selecionadas, sem requisições extras"
+        )
+        if st.session_state.data_fetcher.is_running():
+            st.session_state.data_fetcher.set_cross_pairs(selected_pairs)
+    chart_symbols = selected_symbols + selected_pairs
+    
     st.markdown("---")
     
     # Seleção do tipo de gráfico
     st.markdown("**📊 Tipo de Gráfico:**")
     chart_type = st.radio(
         "Escolha o tipo de gráfico:",
-        options=['Candlestick (OHLC)', 'Renko', 'Point & Figure'],
+        options=['Candlestick (OHLC)', 'Renko', 'Point & Figure', *TRANSFORM_CHARTS],
         index=0
     )
     
@@ -1018,6 +323,28 @@ with st.sidebar:
             index=1,
             format_func=lambda x: f"{x}s" if x < 60 else f"{x//60}min"
         )
+        trade_volume = st.checkbox(
+            "Volume real (trades)",
+            value=False,
+            help="Assina o stream de trades da corretora para velas com volume negociado real e divisão compra/venda"
+        )
+        if trade_volume and hasattr(st.session_state.data_fetcher, 'trade_exchange'):
+            st.session_state.data_fetcher.trade_exchange = st.selectbox(
+                "Corretora dos trades:",
+                options=list(EXCHANGES),
+                format_func=lambda name: EXCHANGES[name].label,
+                help="Coinbase e Kraken usam os pares em USD"
+            )
+        order_book = st.checkbox(
+            "Profundidade do book (Binance)",
+            value=False,
+            help="Assina o stream de profundidade da Binance e mostra o gráfico de profundidade acumulada"
+        )
+        backfill = st.checkbox(
+            "Histórico inicial (klines Binance)",
+            value=True,
+            help="Ao iniciar, carrega as velas de 1 min das últimas horas para o gráfico já começar completo"
+        )
         brick_size = None
         point_size = None
     
@@ -1032,9 +359,12 @@ with st.sidebar:
             help="Define o tamanho de cada brick em USD"
         )
         candle_interval = 60
+        trade_volume = False
+        order_book = False
+        backfill = False
         point_size = None
     
-    else:  # Point & Figure
+    elif chart_type == 'Point & Figure':
         st.markdown("**📊 Configuração Point & Figure:**")
         point_size = st.number_input(
             "Tamanho do Ponto (USD):",
@@ -1045,20 +375,90 @@ with st.sidebar:
             help="Define o tamanho de cada ponto em USD"
         )
         candle_interval = 60
+        trade_volume = False
+        order_book = False
+        backfill = False
+        brick_size = None
+    
+    else:  # Transformações em fluxo
+        st.markdown(f"**🔀 Configuração {chart_type}:**")
+        if chart_type == 'Heikin-Ashi':
+            ha_interval = st.selectbox(
+                "Intervalo das velas:",
+                options=[30, 60, 120, 300, 600],
+                index=1,
+                format_func=lambda x: f"{x}s" if x < 60 else f"{x//60}min"
+            )
+            transform_params = {'interval_ns': ha_interval * NS_PER_SECOND}
+            transform_info = f"🔀 Heikin-Ashi de {ha_interval}s"
+        elif chart_type == 'Line Break':
+            lines = st.slider(
+                "Linhas para reversão:",
+                min_value=2,
+                max_value=5,
+                value=3,
+                help="Número de linhas cujo extremo precisa ser rompido para reverter"
+            )
+            transform_params = {'lines': lines}
+            transform_info = f"🔀 Rompimento de {lines} linhas"
+        elif chart_type == 'Kagi':
+            reversal = st.number_input(
+                "Reversão (USD):",
+                min_value=0.01,
+                max_value=1000.0,
+                value=100.0,
+                step=10.0,
+                help="Retorno mínimo do preço para a linha mudar de lado"
+            )
+            transform_params = {'reversal': reversal}
+            transform_info = f"🔀 Reversão de ${reversal:.2f}"
+        else:  # Range Bars
+            range_size = st.number_input(
+                "Amplitude da barra (USD):",
+                min_value=0.01,
+                max_value=1000.0,
+                value=100.0,
+                step=10.0,
+                help="A barra fecha quando máxima - mínima atinge este valor"
+            )
+            transform_params = {'range_size': range_size}
+            transform_info = f"🔀 Barras de ${range_size:.2f}"
+        candle_interval = 60
+        trade_volume = False
+        order_book = False
+        backfill = False
         brick_size = None
+        point_size = None
     
     st.markdown("---")
     
-    # Intervalo de atualização (1 a 15 segundos)
+    # Intervalo mínimo de atualização (1 a 15 segundos); o agendador
+    # espaça os símbolos menos voláteis e respeita o limite de cada API
     st.markdown("**⏱️ Intervalo de Atualização:**")
     refresh_interval = st.slider(
-        "Segundos entre atualizações:",
+        "Intervalo mínimo (moeda mais ativa):",
         min_value=1,
         max_value=15,
         value=5,
         step=1,
-        help="Escolha entre 1 e 15 segundos"
+        help="Moedas mais voláteis e mais observadas usam este intervalo; as demais são consultadas com menos frequência, dentro do limite de requisições de cada API"
     )
+    if st.session_state.data_fetcher.scheduler is not None:
+        st.session_state.data_fetcher.scheduler.min_interval = refresh_interval
+    get_viewer_registry().heartbeat(st.session_state.session_id, selected_symbols)
+    
+    # Orçamento de memória do histórico em camadas (aplicado ao iniciar)
+    retention = getattr(st.session_state.data_fetcher, 'retention', None)
+    if retention is not None:
+        memory_budget_mb = st.number_input(
+            "Memória do histórico (MB):",
+            min_value=8,
+            max_value=4096,
+            value=256,
+            step=8,
+            help="Ticks recentes ficam na resolução original e os antigos em velas de 1 min e 1 h; se o orçamento não comportar todas as moedas, as camadas são reduzidas"
+        )
+        retention.memory_budget = memory_budget_mb * 1024 * 1024
     
     st.markdown("---")
     
@@ -1067,13 +467,29 @@ with st.sidebar:
     
     with col1:
         if st.button("🚀 Iniciar", type="primary", use_container_width=True):
-            if selected_symbols:
+            if selected_symbols and data_source == 'Replay':
+                if tick_file is None:
+                    st.warning("⚠️ Informe um arquivo de ticks válido")
+                    st.stop()
+                st.session_state.data_fetcher.start_replay(
+                    ReplaySource(tick_file, speed=1.0, symbols=selected_symbols),
+                    candle_interval=candle_interval,
+                    brick_size=brick_size,
+                    point_size=point_size
+                )
+                st.session_state.data_fetcher.set_cross_pairs(selected_pairs)
+                st.rerun()
+            elif selected_symbols:
                 with st.spinner("🔄 Buscando dados..."):
                     success = st.session_state.data_fetcher.start_fetching(
                         selected_symbols, 
                         candle_interval=candle_interval,
                         brick_size=brick_size,
-                        point_size=point_size
+                        point_size=point_size,
+                        trade_volume=trade_volume,
+                        order_book=order_book,
+                        cross_pairs=selected_pairs,
+                        backfill=backfill
                     )
                     if success:
                         st.success("✅ Dados carregados!")
@@ -1099,284 +515,473 @@ with st.sidebar:
             st.info(f"🕯️ Velas de {candle_interval}s")
         elif chart_type == 'Renko':
             st.info(f"🧱 Brick de ${brick_size:.2f}")
-        else:
+        elif chart_type == 'Point & Figure':
             st.info(f"📊 Ponto de ${point_size:.2f}")
+        else:
+            st.info(transform_info)
     else:
         st.error("🔴 Dashboard Inativo")
     
+    # Controles do replay: velocidade, pausa e busca pelo índice de tempo do arquivo
+    replay = getattr(st.session_state.data_fetcher, 'replay', None)
+    if replay is not None:
+        st.markdown("**⏯️ Replay:**")
+        speed = st.select_slider(
+            "Velocidade:",
+            options=[1, 2, 5, 10, 30, 60, 300, 3600, 'Máxima'],
+            value=1,
+            format_func=lambda x: x if x == 'Máxima' else f"{x}x"
+        )
+        speed = None if speed == 'Máxima' else float(speed)
+        if speed != replay.speed:
+            replay.set_speed(speed)
+        
+        if st.button("▶️ Continuar" if replay.paused else "⏸️ Pausar", use_container_width=True):
+            if replay.paused:
+                replay.resume()
+            else:
+                replay.pause()
+            st.rerun()
+        
+        total_minutes = max((replay.file.end - replay.file.start) // (60 * NS_PER_SECOND), 1)
+        seek_minutes = st.slider("Posição (min desde o início):", 0, int(total_minutes), 0)
+        if st.button("⏩ Ir para a posição", use_container_width=True):
+            st.session_state.data_fetcher.seek_replay(replay.file.start + seek_minutes * 60 * NS_PER_SECOND)
+            st.rerun()
+        
+        progress = (replay.now() - replay.file.start) / max(replay.file.end - replay.file.start, 1)
+        st.progress(min(max(progress, 0.0), 1.0),
+                    text=f"{to_datetime(replay.now()):%d/%m %H:%M:%S}" + (" · fim" if replay.finished else ""))
+    
     st.markdown("---")
     
     # Opções de visualização
     st.markdown("**📊 Opções de Visualização:**")
     show_volume = st.checkbox("Mostrar Volume", value=True)
     show_comparison = st.checkbox("Mostrar Comparação", value=True)
+    show_correlation = st.checkbox("Mostrar Correlação", value=True)
+    
+    # Alertas de preço e de padrão
+    st.markdown("---")
+    st.markdown("**🔔 Alertas:**")
+    alert_engine = st.session_state.data_fetcher.alerts
+    
+    with st.expander("➕ Novo alerta"):
+        alert_symbol = st.selectbox("Moeda:", selected_symbols or available_symbols, key='alert_symbol')
+        alert_kind = st.selectbox(
+            "Tipo:",
+            options=list(ALERT_LABELS),
+            format_func=ALERT_LABELS.get,
+            key='alert_kind'
+        )
+        alert_quote = st.session_state.data_fetcher.get_data()[0].get(alert_symbol)
+        alert_value = None
+        if alert_kind in (PRICE_ABOVE, PRICE_BELOW, CLOSE_ABOVE, CLOSE_BELOW):
+            alert_value = st.number_input(
+                "Preço (USD):",
+                min_value=0.0,
+                value=float(alert_quote.price) if alert_quote else 0.0,
+                format="%.4f",
+                key='alert_price'
+            )
+        elif alert_kind == PERCENT_MOVE:
+            alert_value = st.number_input("Variação (%):", value=5.0, step=0.5, key='alert_percent')
+        
+        if st.button("Adicionar alerta", use_container_width=True):
+            try:
+                alert_engine.add_alert(
+                    alert_symbol,
+                    alert_kind,
+                    value=alert_value,
+                    reference_price=alert_quote.price if alert_quote else None
+                )
+            except ValueError:
+                st.warning("⚠️ Aguarde o primeiro preço da moeda para criar alertas percentuais")
+    
+    for alert in alert_engine.alerts():
+        alert_col, remove_col = st.columns([4, 1])
+        alert_col.caption(alert.describe())
+        if remove_col.button("✖", key=f"remove_alert_{alert.id}"):
+            alert_engine.remove_alert(alert.id)
+            st.rerun()
     
     # Informações sobre APIs
     st.markdown("---")
     st.markdown("**📡 Fontes de Dados:**")
+    if SHM_NAME:
+        st.markdown(f"• Daemon de ingestão (`{SHM_NAME}`)")
     st.markdown("• CoinGecko API")
     st.markdown("• CryptoCompare API")  
     st.markdown("• CoinAPI")
+    
+    if st.session_state.data_fetcher.scheduler is not None:
+        cache_stats = get_response_cache().stats()
+        st.caption(
+            f"🗄️ Cache: {cache_stats['hits']} hits · {cache_stats['stale_hits']} stale · "
+            f"{cache_stats['misses']} misses · {cache_stats['coalesced']} coalescidas"
+        )
+
+        if hasattr(st.session_state.data_fetcher, 'sequencer_stats'):
+            quote_stats = st.session_state.data_fetcher.sequencer_stats()
+            st.caption(
+                f"🧹 Cotações: {quote_stats['applied']} aplicadas · {quote_stats['duplicates']} repetidas · "
+                f"{quote_stats['late']} atrasadas · {quote_stats['reordered']} reordenadas · "
+                f"{quote_stats['late_candles']} fora da vela"
+            )
+
+        poll_intervals = st.session_state.data_fetcher.scheduler.intervals()
+        if poll_intervals:
+            st.caption("⏱️ Polling: " + " · ".join(
+                f"{s.replace('USDT', '')} {poll_intervals[s]:.0f}s"
+                for s in selected_symbols if s in poll_intervals
+            ))
 
 # Área principal
+for notification in st.session_state.data_fetcher.alerts.drain():
+    st.toast(notification.message)
+
 current_data, historical_data = st.session_state.data_fetcher.get_data()
-ohlc_data = st.session_state.data_fetcher.get_ohlc_data()
-renko_data = st.session_state.data_fetcher.get_renko_data()
-point_data = st.session_state.data_fetcher.get_point_data()
+# Só a visão exibida é consultada; as demais deixam de ser mantidas
+ohlc_data = st.session_state.data_fetcher.get_ohlc_data() if chart_type == 'Candlestick (OHLC)' else {}
+renko_data = st.session_state.data_fetcher.get_renko_data() if chart_type == 'Renko' else {}
+point_data = st.session_state.data_fetcher.get_point_data() if chart_type == 'Point & Figure' else {}
+transform_data = {}
+if chart_type in TRANSFORM_CHARTS and hasattr(st.session_state.data_fetcher, 'get_transform_data'):
+    transform_data = st.session_state.data_fetcher.get_transform_data(
+        TRANSFORM_CHARTS[chart_type][0], **transform_params
+    )
 
-if selected_symbols and current_data:
-    
-    # Métricas em tempo real
-    st.subheader("💰 Preços Atuais")
-    
-    num_cols = min(len(selected_symbols), 4)
-    cols = st.columns(num_cols)
-    
-    for i, symbol in enumerate(selected_symbols):
-        if symbol in current_data:
-            data = current_data[symbol]
-            
-            with cols[i % num_cols]:
-                # Formatação do preço
-                if data['price'] < 0.01:
-                    price_str = f"${data['price']:.8f}"
-                elif data['price'] < 1:
-                    price_str = f"${data['price']:.6f}"
-                elif data['price'] < 10:
-                    price_str = f"${data['price']:.4f}"
-                else:
-                    price_str = f"${data['price']:,.2f}"
-                
-                change_symbol = "+" if data['change'] >= 0 else ""
-                
-                st.metric(
-                    label=f"💎 {symbol.replace('USDT', '/USD')}",
-                    value=price_str,
-                    delta=f"{change_symbol}{data['change']:.2f}%"
-                )
-    
-    st.markdown("---")
-    
-    # Gráficos baseados no tipo selecionado
-    if chart_type == 'Candlestick (OHLC)':
-        st.subheader("🕯️ Gráficos de Velas (Candlestick)")
+live_tab, backtest_tab = st.tabs(["📈 Tempo real", "🧪 Backtest"])
+
+with live_tab:
+    if selected_symbols and current_data:
         
-        num_selected = len(selected_symbols)
+        # Métricas em tempo real
+        st.subheader("💰 Preços Atuais")
         
-        if num_selected == 1:
-            symbol = selected_symbols[0]
-            candlestick_fig = create_candlestick_chart(symbol, ohlc_data)
-            st.plotly_chart(candlestick_fig, use_container_width=True)
-            
-            if show_volume:
-                volume_fig = create_volume_chart(symbol, ohlc_data)
-                if volume_fig:
-                    st.plotly_chart(volume_fig, use_container_width=True)
+        num_cols = min(len(chart_symbols), 4)
+        cols = st.columns(num_cols)
         
-        elif num_selected == 2:
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                symbol = selected_symbols[0]
-                candlestick_fig = create_candlestick_chart(symbol, ohlc_data)
-                st.plotly_chart(candlestick_fig, use_container_width=True)
-            
-            with col2:
-                symbol = selected_symbols[1]
-                candlestick_fig = create_candlestick_chart(symbol, ohlc_data)
-                st.plotly_chart(candlestick_fig, use_container_width=True)
-        
-        else:
-            for i in range(0, num_selected, 2):
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    if i < num_selected:
-                        symbol = selected_symbols[i]
-                        candlestick_fig = create_candlestick_chart(symbol, ohlc_data)
-                        st.plotly_chart(candlestick_fig, use_container_width=True)
+        for i, symbol in enumerate(chart_symbols):
+            if symbol in current_data:
+                data = current_data[symbol]
                 
-                with col2:
-                    if i + 1 < num_selected:
-                        symbol = selected_symbols[i + 1]
-                        candlestick_fig = create_candlestick_chart(symbol, ohlc_data)
-                        st.plotly_chart(candlestick_fig, use_container_width=True)
-    
-    elif chart_type == 'Renko':
-        st.subheader("🧱 Gráficos Renko")
-        
-        num_selected = len(selected_symbols)
-        
-        if num_selected == 1:
-            symbol = selected_symbols[0]
-            renko_fig = create_renko_chart(symbol, renko_data)
-            st.plotly_chart(renko_fig, use_container_width=True)
-        
-        elif num_selected == 2:
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                symbol = selected_symbols[0]
-                renko_fig = create_renko_chart(symbol, renko_data)
-                st.plotly_chart(renko_fig, use_container_width=True)
-            
-            with col2:
-                symbol = selected_symbols[1]
-                renko_fig = create_renko_chart(symbol, renko_data)
-                st.plotly_chart(renko_fig, use_container_width=True)
+                with cols[i % num_cols]:
+                    # Formatação do preço (pares cruzados são cotados na outra moeda, sem $)
+                    currency = "" if symbol in selected_pairs else "$"
+                    if data.price < 0.01:
+                        price_str = f"{currency}{data.price:.8f}"
+                    elif data.price < 1:
+                        price_str = f"{currency}{data.price:.6f}"
+                    elif data.price < 10:
+                        price_str = f"{currency}{data.price:.4f}"
+                    else:
+                        price_str = f"{currency}{data.price:,.2f}"
+                    
+                    change_symbol = "+" if data.change >= 0 else ""
+                    
+                    st.metric(
+                        label=f"💎 {symbol.replace('USDT', '/USD')}",
+                        value=price_str,
+                        delta=f"{change_symbol}{data.change:.2f}%"
+                    )
         
-        else:
-            for i in range(0, num_selected, 2):
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    if i < num_selected:
-                        symbol = selected_symbols[i]
-                        renko_fig = create_renko_chart(symbol, renko_data)
-                        st.plotly_chart(renko_fig, use_container_width=True)
-                
-                with col2:
-                    if i + 1 < num_selected:
-                        symbol = selected_symbols[i + 1]
-                        renko_fig = create_renko_chart(symbol, renko_data)
-                        st.plotly_chart(renko_fig, use_container_width=True)
-    
-    else:  # Point & Figure
-        st.subheader("📊 Gráficos Point & Figure")
+        st.markdown("---")
         
-        num_selected = len(selected_symbols)
+        # Gráficos baseados no tipo selecionado
+        if chart_type == 'Candlestick (OHLC)':
+            st.subheader("🕯️ Gráficos de Velas (Candlestick)")
+            render_chart_grid('ohlc', chart_symbols, ohlc_data, create_candlestick_chart,
+                              (candle_interval,))
+            if len(chart_symbols) == 1 and show_volume:
+                render_chart_grid('volume', chart_symbols, ohlc_data, create_volume_chart,
+                                  (candle_interval,))
         
-        if num_selected == 1:
-            symbol = selected_symbols[0]
-            pf_fig = create_point_figure_chart(symbol, point_data)
-            st.plotly_chart(pf_fig, use_container_width=True)
+        elif chart_type == 'Renko':
+            st.subheader("🧱 Gráficos Renko")
+            render_chart_grid('renko', chart_symbols, renko_data, create_renko_chart,
+                              (brick_size,))
         
-        elif num_selected == 2:
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                symbol = selected_symbols[0]
-                pf_fig = create_point_figure_chart(symbol, point_data)
-                st.plotly_chart(pf_fig, use_container_width=True)
-            
-            with col2:
-                symbol = selected_symbols[1]
-                pf_fig = create_point_figure_chart(symbol, point_data)
-                st.plotly_chart(pf_fig, use_container_width=True)
+        elif chart_type == 'Point & Figure':
+            st.subheader("📊 Gráficos Point & Figure")
+            render_chart_grid('point', chart_symbols, point_data, create_point_figure_chart,
+                              (point_size,))
         
         else:
-            for i in range(0, num_selected, 2):
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    if i < num_selected:
-                        symbol = selected_symbols[i]
-                        pf_fig = create_point_figure_chart(symbol, point_data)
-                        st.plotly_chart(pf_fig, use_container_width=True)
-                
-                with col2:
-                    if i + 1 < num_selected:
-                        symbol = selected_symbols[i + 1]
-                        pf_fig = create_point_figure_chart(symbol, point_data)
-                        st.plotly_chart(pf_fig, use_container_width=True)
-    
-    # Gráfico de comparação
-    if len(selected_symbols) > 1 and show_comparison:
+            st.subheader(f"🔀 Gráficos {chart_type}")
+            view, build = TRANSFORM_CHARTS[chart_type]
+            render_chart_grid(view, chart_symbols, transform_data, build,
+                              tuple(sorted(transform_params.items())))
+        
+        # Profundidade do order book
+        order_books = st.session_state.data_fetcher.get_order_books()
+        if chart_type == 'Candlestick (OHLC)' and order_books:
+            st.markdown("---")
+            st.subheader("📚 Profundidade do Order Book")
+            depth_cols = st.columns(2)
+            for i, symbol in enumerate(s for s in selected_symbols if s in order_books):
+                depth_fig = create_depth_chart(symbol, order_books)
+                with depth_cols[i % 2]:
+                    if depth_fig:
+                        st.plotly_chart(depth_fig, use_container_width=True)
+                    else:
+                        st.info(f"📚 {symbol.replace('USDT', '/USD')}: sincronizando order book...")
+        
+        # Gráfico de comparação
+        if len(selected_symbols) > 1 and show_comparison:
+            st.markdown("---")
+            comparison_fig = create_comparison_chart(selected_symbols, historical_data)
+            st.plotly_chart(comparison_fig, use_container_width=True)
+        
+        # Correlação móvel
+        if len(selected_symbols) > 1 and show_correlation:
+            correlation_fig = create_correlation_heatmap(
+                selected_symbols, st.session_state.data_fetcher.correlation
+            )
+            st.plotly_chart(correlation_fig, use_container_width=True)
+        
+        # Histórico de alertas disparados
+        fired_alerts = list(st.session_state.data_fetcher.alerts.history)
+        if fired_alerts:
+            st.markdown("---")
+            with st.expander(f"🔔 Alertas disparados ({len(fired_alerts)})"):
+                for notification in reversed(fired_alerts[-20:]):
+                    st.markdown(f"`{to_datetime(notification.timestamp):%H:%M:%S}` {notification.message}")
+        
+        # Estatísticas
         st.markdown("---")
-        comparison_fig = create_comparison_chart(selected_symbols, historical_data)
-        st.plotly_chart(comparison_fig, use_container_width=True)
-    
-    # Estatísticas
-    st.markdown("---")
-    col1, col2, col3, col4 = st.columns(4)
-    
-    with col1:
-        st.metric("🎯 Moedas Ativas", len([s for s in selected_symbols if s in current_data]))
-    
-    with col2:
-        if current_data:
-            last_update = max([data['timestamp'] for data in current_data.values()])
-            seconds_ago = int((pd.Timestamp.now() - last_update).total_seconds())
-            st.metric("🕒 Última Atualização", f"{seconds_ago}s atrás")
-    
-    with col3:
-        if chart_type == 'Candlestick (OHLC)':
-            total_items = sum([len(ohlc_data.get(s, {}).get('timestamps', [])) for s in selected_symbols])
-            st.metric("🕯️ Total de Velas", total_items)
-        elif chart_type == 'Renko':
-            total_items = sum([len(renko_data.get(s, {}).get('timestamps', [])) for s in selected_symbols])
-            st.metric("🧱 Total de Bricks", total_items)
-        else:
-            total_items = sum([len(point_data.get(s, {}).get('x', [])) for s in selected_symbols])
-            st.metric("📊 Total de Pontos", total_items)
-    
-    with col4:
-        if current_data:
-            avg_change = sum([data['change'] for data in current_data.values()]) / len(current_data)
-            st.metric("📈 Média de Variação", f"{avg_change:+.2f}%")
+        col1, col2, col3, col4 = st.columns(4)
+        
+        with col1:
+            st.metric("🎯 Moedas Ativas", len([s for s in chart_symbols if s in current_data]))
+        
+        with col2:
+            if current_data:
+                last_update = max([data.timestamp for data in current_data.values()])
+                seconds_ago = (now_ns() - last_update) // NS_PER_SECOND
+                st.metric("🕒 Última Atualização", f"{seconds_ago}s atrás")
+        
+        with col3:
+            if chart_type == 'Candlestick (OHLC)':
+                total_items = sum([len(ohlc_data[s]) for s in chart_symbols if s in ohlc_data])
+                st.metric("🕯️ Total de Velas", total_items)
+            elif chart_type == 'Renko':
+                total_items = sum([len(renko_data[s]) for s in chart_symbols if s in renko_data])
+                st.metric("🧱 Total de Bricks", total_items)
+            elif chart_type == 'Point & Figure':
+                total_items = sum([len(point_data[s]) for s in chart_symbols if s in point_data])
+                st.metric("📊 Total de Pontos", total_items)
+            else:
+                total_items = sum([len(transform_data[s]) for s in chart_symbols if s in transform_data])
+                st.metric("🔀 Total de Elementos", total_items)
+        
+        with col4:
+            if current_data:
+                avg_change = sum([data.change for data in current_data.values()]) / len(current_data)
+                st.metric("📈 Média de Variação", f"{avg_change:+.2f}%")
+        
+        # Diagnóstico de memória por símbolo e por série
+        usage = memory_usage(st.session_state.data_fetcher)
+        if usage:
+            memory_table = pd.DataFrame.from_dict(usage, orient='index').fillna(0) / 1024
+            memory_table = memory_table[[s for s in STORE_LABELS if s in memory_table.columns]]
+            memory_table = memory_table.rename(columns=STORE_LABELS)
+            memory_table['Total'] = memory_table.sum(axis=1)
+            with st.expander(f"🧮 Memória: {memory_table['Total'].sum() / 1024:,.1f} MB"):
+                st.dataframe(memory_table.style.format('{:,.0f} KB'), use_container_width=True)
 
-elif selected_symbols and st.session_state.data_fetcher.is_running():
-    st.info("🔄 Dashboard ativo! Aguardando próxima atualização de dados...")
-    
-    with st.spinner("Carregando dados das APIs..."):
-        time.sleep(3)
-        st.rerun()
+    elif selected_symbols and st.session_state.data_fetcher.is_running():
+        st.info("🔄 Dashboard ativo! Aguardando próxima atualização de dados...")
+        
+        with st.spinner("Carregando dados das APIs..."):
+            time.sleep(3)
+            st.rerun()
 
-else:
-    st.info("👈 **Selecione as criptomoedas** na barra lateral e clique em **'Iniciar'** para começar!")
-    
-    st.subheader("🌟 Recursos do Dashboard:")
-    
-    col1, col2, col3 = st.columns(3)
-    
-    with col1:
-        st.markdown("""
-        **🕯️ Candlestick (OHLC)**
-        - Gráficos de velas tradicionais
-        - Média móvel simples
-        - Análise de volume
-        - Timeframes configuráveis
-        """)
-    
-    with col2:
-        st.markdown("""
-        **🧱 Renko**
-        - Ignora tempo e volume
-        - Foca em preço
-        - Bricks de tamanho configurável
-        - Identifica tendências
-        """)
-    
-    with col3:
-        st.markdown("""
-        **📊 Point & Figure**
-        - X para alta, O para baixa
-        - Ponto configurável
-        - Análise de suporte/resistência
-        - Identifica padrões
-        """)
-    
-    st.markdown("---")
-    st.subheader("📋 Comparação dos Gráficos:")
+    else:
+        st.info("👈 **Selecione as criptomoedas** na barra lateral e clique em **'Iniciar'** para começar!")
+        
+        st.subheader("🌟 Recursos do Dashboard:")
+        
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            st.markdown("""
+            **🕯️ Candlestick (OHLC)**
+            - Gráficos de velas tradicionais
+            - Média móvel simples
+            - Análise de volume
+            - Timeframes configuráveis
+            """)
+        
+        with col2:
+            st.markdown("""
+            **🧱 Renko**
+            - Ignora tempo e volume
+            - Foca em preço
+            - Bricks de tamanho configurável
+            - Identifica tendências
+            """)
+        
+        with col3:
+            st.markdown("""
+            **📊 Point & Figure**
+            - X para alta, O para baixa
+            - Ponto configurável
+            - Análise de suporte/resistência
+            - Identifica padrões
+            """)
+        
+        st.markdown("---")
+        st.subheader("📋 Comparação dos Gráficos:")
+        
+        comparison_data = {
+            "Tipo": ["Candlestick", "Renko", "Point & Figure", "Heikin-Ashi", "Line Break", "Kagi", "Range Bars"],
+            "Melhor Para": ["Análise geral", "Tendências fortes", "Suporte/Resistência", "Tendência suavizada",
+                            "Reversões confirmadas", "Oferta e demanda", "Volatilidade constante"],
+            "Considera Tempo": ["Sim", "Não", "Não", "Sim", "Não", "Não", "Não"],
+            "Considera Volume": ["Sim", "Não", "Não", "Não", "Não", "Não", "Não"],
+            "Complexidade": ["Média", "Baixa", "Média", "Baixa", "Média", "Alta", "Baixa"]
+        }
+        
+        st.table(comparison_data)
+
+with backtest_tab:
+    st.subheader("🧪 Backtest de Reversões Renko e Point & Figure")
+    st.caption(
+        "Constrói os bricks e pontos a partir dos ticks gravados e simula a estratégia de reversão: "
+        "compra após N caixas seguidas de alta e vende (ou zera) após N de baixa."
+    )
     
-    comparison_data = {
-        "Tipo": ["Candlestick", "Renko", "Point & Figure"],
-        "Melhor Para": ["Análise geral", "Tendências fortes", "Suporte/Resistência"],
-        "Considera Tempo": ["Sim", "Não", "Não"],
-        "Considera Volume": ["Sim", "Não", "Não"],
-        "Complexidade": ["Média", "Baixa", "Média"]
-    }
+    # Ticks da sessão (log do fetcher) ou de um arquivo gravado
+    session_ticks = getattr(st.session_state.data_fetcher, 'tiers', {})
+    bt_sources = (['Ticks da sessão'] if session_ticks else []) + ['Arquivo de ticks']
+    bt_source = st.radio("Ticks:", bt_sources, horizontal=True)
+    bt_file = None
+    if bt_source == 'Arquivo de ticks':
+        bt_path = st.text_input(
+            "Arquivo de ticks (CSV ou Parquet):",
+            help="Mesmo formato do replay: timestamp, symbol e price"
+        )
+        if bt_path:
+            try:
+                bt_file = get_tick_file(bt_path, os.path.getmtime(bt_path))
+            except (OSError, ValueError, ImportError) as e:
+                st.error(f"❌ Arquivo inválido: {e}")
+        bt_options = bt_file.symbols if bt_file is not None else []
+    else:
+        bt_options = [s for s in session_ticks if len(session_ticks[s].ticks)]
+    
+    bt_col1, bt_col2 = st.columns(2)
+    with bt_col1:
+        bt_symbols = st.multiselect(
+            "Moedas:",
+            bt_options,
+            default=[s for s in chart_symbols if s in bt_options] or bt_options[:3]
+        )
+        bt_charts = st.multiselect(
+            "Gráficos:",
+            list(CHART_LABELS),
+            default=list(CHART_LABELS),
+            format_func=CHART_LABELS.get
+        )
+        bt_percent = st.checkbox(
+            "Caixa em % do preço",
+            value=True,
+            help="A mesma grade serve para moedas de preços diferentes; desmarcado, os valores são em USD"
+        )
+        bt_boxes_text = st.text_input(
+            "Tamanhos de caixa (separados por vírgula):",
+            value="0.1, 0.25, 0.5, 1" if bt_percent else "10, 50, 100, 250"
+        )
+    with bt_col2:
+        bt_reversals = st.multiselect(
+            "Caixas para reverter a posição:",
+            [1, 2, 3, 4, 5],
+            default=[1, 2, 3]
+        )
+        bt_fee = st.number_input("Custo por operação (%):", min_value=0.0, max_value=1.0,
+                                 value=0.1, step=0.05, format="%.2f")
+        bt_long_only = st.checkbox("Só comprado", value=False,
+                                   help="Sinais de baixa zeram a posição em vez de vender a descoberto")
+    
+    try:
+        bt_boxes = [float(value) for value in bt_boxes_text.replace(';', ',').split(',') if value.strip()]
+    except ValueError:
+        bt_boxes = []
+        st.warning("⚠️ Tamanhos de caixa inválidos")
+    
+    if st.button("▶️ Rodar backtest", type="primary", disabled=not (bt_symbols and bt_charts and bt_boxes)):
+        with st.spinner(f"🧪 Simulando {len(bt_symbols) * len(bt_charts) * len(bt_boxes) * len(bt_reversals)} combinações..."):
+            if bt_file is not None:
+                bt_ticks = ticks_from_file(bt_file, bt_symbols)
+            else:
+                bt_ticks = ticks_from_history(session_ticks, bt_symbols)
+            started = time.perf_counter()
+            st.session_state.backtest = {
+                'results': get_backtester().run(
+                    bt_ticks,
+                    charts=bt_charts,
+                    boxes=bt_boxes,
+                    reversals=bt_reversals or [1],
+                    percent=bt_percent,
+                    long_only=bt_long_only,
+                    fee=bt_fee / 100
+                ),
+                'percent': bt_percent,
+                'ticks': sum(len(prices) for _, prices in bt_ticks.values()),
+                'seconds': time.perf_counter() - started,
+            }
     
-    st.table(comparison_data)
+    backtest = st.session_state.get('backtest')
+    if backtest and backtest['results']:
+        st.caption(
+            f"⏱️ {len(backtest['results'])} combinações sobre {backtest['ticks']:,} ticks "
+            f"em {backtest['seconds']:.2f}s"
+        )
+        table = pd.DataFrame(results_table(backtest['results']))
+        table = pd.DataFrame({
+            'Moeda': table['symbol'].str.replace('USDT', '/USD'),
+            'Gráfico': table['chart'].map(CHART_LABELS),
+            'Caixa': table['param'].map((lambda x: f"{x:g}%") if backtest['percent'] else (lambda x: f"${x:,.2f}")),
+            'Reversão': table['reversal'],
+            'Retorno (%)': table['return'] * 100,
+            'Buy & hold (%)': table['buy_hold'] * 100,
+            'Trades': table['trades'],
+            'Acerto (%)': table['win_rate'] * 100,
+            'Drawdown máx. (%)': table['max_drawdown'] * 100,
+            'Caixas': table['events'],
+        })
+        st.dataframe(
+            table.style.format({
+                'Retorno (%)': '{:+.2f}', 'Buy & hold (%)': '{:+.2f}', 'Acerto (%)': '{:.1f}',
+                'Drawdown máx. (%)': '{:.2f}'
+            }, na_rep='-'),
+            use_container_width=True,
+            hide_index=True
+        )
+        
+        # Curvas de patrimônio das melhores combinações de um símbolo
+        eq_col1, eq_col2 = st.columns([3, 1])
+        bt_result_symbols = sorted({result['symbol'] for result in backtest['results']})
+        equity_symbol = eq_col1.selectbox("Curva de patrimônio:", bt_result_symbols)
+        top_n = eq_col2.number_input("Melhores:", min_value=1, max_value=10, value=3)
+        best = sorted((r for r in backtest['results'] if r['symbol'] == equity_symbol),
+                      key=lambda r: r['return'], reverse=True)[:top_n]
+        equity_fig = create_equity_chart(equity_symbol, best, backtest['percent'])
+        if equity_fig:
+            st.plotly_chart(equity_fig, use_container_width=True)
+    elif backtest:
+        st.info("Nenhum símbolo com ticks suficientes para o backtest")
 
 # Auto-refresh
 if st.session_state.data_fetcher.is_running():
-    with st.spinner(f"🔄 Atualizando dados... (próxima atualização em {refresh_interval}s)"):
-        st.session_state.data_fetcher.update_data()
-        time.sleep(refresh_interval)
+    st.session_state.data_fetcher.update_data()
+    next_update = min(max(st.session_state.data_fetcher.next_update_delay(), 0.5), 60)
+    with st.spinner(f"🔄 Atualizando dados... (próxima atualização em {next_update:.0f}s)"):
+        time.sleep(next_update)
         st.rerun()
 
 # Footer
 st.markdown("---")
-st.markdown("💡 **Dashboard Avançado de Criptomoedas** - Múltiplos tipos de gráficos | Atualização configurável de 1-15s | Dados de CoinGecko, CryptoCompare e CoinAPI")
+st.markdown("💡 **Dashboard Avançado de Criptomoedas** - Múltiplos tipos de gráficos | Polling adaptativo por volatilidade e limite de API | Dados de CoinGecko, CryptoCompare e CoinAPI")
  
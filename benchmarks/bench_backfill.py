@@ -0,0 +1,115 @@
+"""Benchmark do backfill de klines contra um servidor local.
+
+Sobe, em outro processo, um servidor HTTP que imita `/api/v3/klines` da
+Binance (velas sintéticas, latência configurável, cabeçalho
+X-MBX-USED-WEIGHT-1M e 429 com Retry-After acima do limite) e mede o
+tempo até o gráfico OHLC de todos os símbolos ficar completo.
+
+Uso:
+    python benchmarks/bench_backfill.py --symbols 15 --candle-interval 300 --latency 0.15
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.data_fetcher import CryptoDataFetcher  # noqa: E402
+from utils.klines import KlineBackfill  # noqa: E402
+from utils.providers import SYMBOL_BASES  # noqa: E402
+
+
+def serve(port, latency, weight_limit):
+    """Servidor local de klines de 1 min; conta o peso consumido por minuto"""
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.parse import parse_qs, urlparse
+
+    lock = threading.Lock()
+    used = {'minute': 0, 'weight': 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            query = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+            with lock:
+                minute = int(time.time() // 60)
+                if minute != used['minute']:
+                    used['minute'], used['weight'] = minute, 0
+                used['weight'] += 2
+                weight = used['weight']
+            time.sleep(latency)
+            if weight > weight_limit:
+                self.send_response(429)
+                self.send_header('Retry-After', str(60 - int(time.time() % 60)))
+                self.end_headers()
+                return
+            start = int(query['startTime']) // 60_000 * 60_000
+            end = min(int(query['endTime']), int(time.time() * 1000))
+            limit = int(query.get('limit', 500))
+            base = 100 + sum(map(ord, query['symbol'])) % 900
+            rows = []
+            for ms in range(start, end + 1, 60_000)[:limit]:
+                price = base * (1 + 0.01 * ((ms // 60_000) % 37) / 37)
+                rows.append([ms, f"{price:.4f}", f"{price * 1.002:.4f}", f"{price * 0.998:.4f}",
+                             f"{price * 1.001:.4f}", "12.5", ms + 59_999, "1250.0", 40, "7.5",
+                             "750.0", "0"])
+            body = json.dumps(rows).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('X-MBX-USED-WEIGHT-1M', str(weight))
+            self.end_headers()
+            self.wfile.write(body)
+
+    ThreadingHTTPServer(('127.0.0.1', port), Handler).serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do backfill de klines")
+    parser.add_argument('--symbols', type=int, default=15)
+    parser.add_argument('--candle-interval', type=int, default=60)
+    parser.add_argument('--latency', type=float, default=0.15,
+                        help="Latência simulada por requisição (s)")
+    parser.add_argument('--weight-limit', type=int, default=1200)
+    parser.add_argument('--page-size', type=int, default=1000,
+                        help="Velas por página (menor força mais páginas em paralelo)")
+    parser.add_argument('--port', type=int, default=8799)
+    args = parser.parse_args()
+
+    server = multiprocessing.Process(target=serve, args=(args.port, args.latency, args.weight_limit),
+                                     daemon=True)
+    server.start()
+    time.sleep(0.5)
+
+    symbols = list(SYMBOL_BASES)[:args.symbols]
+    klines = KlineBackfill(url=f"http://127.0.0.1:{args.port}/api/v3/klines", limit=args.page_size)
+    fetcher = CryptoDataFetcher(providers=[], pinned_views=('ohlc',), klines=klines)
+    try:
+        fetcher.symbols = symbols
+        fetcher.candle_interval = args.candle_interval
+        fetcher.candle_interval_ns = args.candle_interval * 1_000_000_000
+
+        start = time.perf_counter()
+        loaded = fetcher.backfill_klines(symbols)
+        elapsed = time.perf_counter() - start
+
+        pages = len(klines.pages(0, fetcher.retention.capacity('ohlc') * fetcher.candle_interval_ns - 1,
+                                 60_000_000_000))
+        candles = [len(fetcher.ohlc_data.get(s, ())) for s in symbols]
+        print(f"{len(loaded)}/{len(symbols)} símbolos, ~{pages} página(s) cada, em {elapsed:.2f}s")
+        print(f"velas OHLC por símbolo: mín {min(candles)}, máx {max(candles)} "
+              f"(capacidade {fetcher.retention.capacity('ohlc')})")
+        print(f"velas de 1 min no histórico: {len(fetcher.tiers[symbols[0]].minutes)}")
+    finally:
+        fetcher.stop_fetching()
+        fetcher.ingest.stop()
+        server.terminate()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""Benchmark do backtest de reversões Renko e P&F.
+
+Gera passeios aleatórios de ticks para vários símbolos, confere a
+construção vetorizada dos bricks e pontos contra a regra tick a tick das
+visões ao vivo e mede a grade símbolos × gráficos × caixas × reversões
+com 1 processo e com o pool inteiro.
+
+Uso:
+    python benchmarks/bench_backtest.py --symbols 8 --ticks 500000 --workers 4
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.backtest import Backtester, point_events, renko_events  # noqa: E402
+
+
+def renko_loop(prices, box):
+    """Regra de `CryptoDataFetcher.update_renko_data`, tick a tick"""
+    last = prices[0]
+    index, moves = [], []
+    for i, price in enumerate(prices.tolist()):
+        bricks = int(abs(price - last) / box)
+        if i and bricks >= 1:
+            index.append(i)
+            moves.append(bricks if price > last else -bricks)
+            last += bricks * (box if price > last else -box)
+    return np.array(index, dtype=np.int64), np.array(moves, dtype=np.int64)
+
+
+def point_loop(prices, box):
+    """Regra de `CryptoDataFetcher.update_point_data`, tick a tick"""
+    last = prices[0]
+    index, moves = [], []
+    for i, price in enumerate(prices.tolist()):
+        points = int(abs(price - last) / box)
+        if i and points >= 1:
+            index.append(i)
+            moves.append(points if price > last else -points)
+            last = price
+    return np.array(index, dtype=np.int64), np.array(moves, dtype=np.int64)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do backtest Renko/P&F")
+    parser.add_argument('--symbols', type=int, default=8)
+    parser.add_argument('--ticks', type=int, default=500_000, help="Ticks por símbolo")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--boxes', type=float, nargs='+', default=[0.05, 0.1, 0.25, 0.5, 1.0],
+                        help="Caixas em % do primeiro preço")
+    parser.add_argument('--reversals', type=int, nargs='+', default=[1, 2, 3])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+    ticks = {}
+    for i in range(args.symbols):
+        prices = 100 * (i + 1) * np.exp(np.cumsum(rng.normal(0, 4e-4, args.ticks)))
+        timestamps = 1_700_000_000_000_000_000 + np.arange(args.ticks, dtype=np.int64) * 1_000_000_000
+        ticks[f"SYM{i}USDT"] = (timestamps, prices)
+
+    # Construção vetorizada contra o laço tick a tick das visões ao vivo
+    prices = ticks['SYM0USDT'][1]
+    box = prices[0] * 0.1 / 100
+    for name, vectorized, loop in (('Renko', renko_events, renko_loop), ('P&F', point_events, point_loop)):
+        (index, moves), fast = timed(vectorized, prices, box)
+        (ref_index, ref_moves), slow = timed(loop, prices, box)
+        same = np.array_equal(index, ref_index) and np.array_equal(moves, ref_moves)
+        print(f"{name:6s} {len(index):>8,} eventos: vetorizado {fast * 1000:7.1f} ms · "
+              f"laço {slow * 1000:7.1f} ms · iguais: {same}")
+
+    combinations = args.symbols * 2 * len(args.boxes) * len(args.reversals)
+    for workers in sorted({1, args.workers}):
+        backtester = Backtester(max_workers=workers)
+        try:
+            results, elapsed = timed(backtester.run, ticks, ('renko', 'point'), args.boxes,
+                                     args.reversals, True, False, 0.001)
+        finally:
+            backtester.shutdown()
+        print(f"{workers} processo(s): {len(results)}/{combinations} combinações "
+              f"em {elapsed:.2f}s ({args.symbols * args.ticks / elapsed / 1e6:.1f} M ticks/s por passada)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""Benchmark da preparação da grade de gráficos.
+
+Mede o tempo de parede para montar as figuras de N símbolos em série e
+com o GridRenderer usando 1, 2, 4, ... processos (ou threads).
+
+Uso:
+    python benchmarks/bench_chart_grid.py --symbols 48 --candles 500
+    python benchmarks/bench_chart_grid.py --view renko --threads
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.chart_grid import GridRenderer, figure_payload, series_columns  # noqa: E402
+from utils.charts import (  # noqa: E402
+    create_candlestick_chart, create_point_figure_chart, create_renko_chart
+)
+from utils.records import (  # noqa: E402
+    DOWN, MARKER_O, MARKER_X, UP, OHLCSeries, PointSeries, RenkoSeries
+)
+from utils.timebase import now_ns, seconds_to_ns  # noqa: E402
+
+
+def make_store(view, n_symbols, length, seed=7):
+    """Séries sintéticas (passeio aleatório) para cada símbolo"""
+    rng = np.random.default_rng(seed)
+    store = {}
+    start = now_ns() - seconds_to_ns(60 * length)
+    for k in range(n_symbols):
+        prices = 100 + np.cumsum(rng.normal(0, 1, length))
+        symbol = f'SYM{k:03d}USDT'
+        if view == 'ohlc':
+            series = OHLCSeries(capacity=length)
+            for i, price in enumerate(prices):
+                series.open_candle(start + seconds_to_ns(60 * i), price)
+                series.update_candle(price + rng.random())
+                series.update_candle(price - rng.random())
+        elif view == 'renko':
+            series = RenkoSeries(capacity=length)
+            for i, price in enumerate(prices):
+                direction = UP if i % 3 else DOWN
+                series.add_brick(start + i, price, price + direction, direction)
+        else:
+            series = PointSeries(capacity=length)
+            for i, price in enumerate(prices):
+                series.column = i // 5
+                series.add_point(price, MARKER_X if (i // 5) % 2 else MARKER_O)
+        store[symbol] = series
+    return store
+
+
+BUILDERS = {
+    'ohlc': create_candlestick_chart,
+    'renko': create_renko_chart,
+    'point': create_point_figure_chart,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do GridRenderer")
+    parser.add_argument('--symbols', type=int, default=24)
+    parser.add_argument('--candles', type=int, default=300)
+    parser.add_argument('--view', choices=sorted(BUILDERS), default='ohlc')
+    parser.add_argument('--threads', action='store_true',
+                        help="Usa threads em vez de processos")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    build = BUILDERS[args.view]
+    store = make_store(args.view, args.symbols, args.candles)
+    jobs = [(build, symbol, series) for symbol, series in store.items()]
+
+    def best_of(run):
+        times = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            run()
+            times.append(time.perf_counter() - started)
+        return min(times)
+
+    serial = best_of(lambda: [figure_payload(b, s, series_columns(x)) for b, s, x in jobs])
+    print(f"{args.symbols} símbolos × {args.candles} linhas ({args.view}), "
+          f"{os.cpu_count()} CPUs")
+    print(f"  serial            {serial * 1000:8.1f} ms")
+
+    workers = 1
+    while workers <= (os.cpu_count() or 1):
+        renderer = GridRenderer(max_workers=workers, use_processes=not args.threads,
+                                min_parallel=1)
+        renderer.prepare(jobs[:workers])  # aquece o pool
+        elapsed = best_of(lambda: renderer.prepare(jobs))
+        renderer.shutdown()
+        kind = 'threads' if args.threads else 'processos'
+        print(f"  {workers:2d} {kind:<13}  {elapsed * 1000:8.1f} ms  "
+              f"({serial / elapsed:4.2f}x)")
+        workers *= 2
+
+
+if __name__ == '__main__':
+    main()
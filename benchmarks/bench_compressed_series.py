@@ -0,0 +1,78 @@
+"""Benchmark do histórico de linha comprimido (utils/compressed.py).
+
+Mede taxa de compressão, vazão de append e de decodificação de intervalos
+para séries sintéticas no formato das cotações de polling e dos trades.
+
+Uso:
+    python benchmarks/bench_compressed_series.py --points 500000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.compressed import CompressedLineSeries  # noqa: E402
+from utils.records import LineSeries  # noqa: E402
+from utils.timebase import NS_PER_SECOND, now_ns  # noqa: E402
+
+
+def make_series(kind, points, seed=11):
+    """Timestamps (ns) e preços sintéticos"""
+    rng = np.random.default_rng(seed)
+    start = now_ns()
+    if kind == 'polling':
+        # Cotação a cada ~5s com jitter de rede, preço com 2 casas
+        steps = 5 * NS_PER_SECOND + rng.integers(-200, 200, points) * 1_000_000
+        prices = np.round(60000 + np.cumsum(rng.normal(0, 5, points)), 2)
+    elif kind == 'trades':
+        # Trades em ms (Binance), intervalos irregulares, tick de 0.01
+        steps = rng.exponential(80, points).astype(np.int64) * 1_000_000
+        prices = np.round(60000 + np.cumsum(rng.choice([-0.01, 0, 0.01], points)), 2)
+    else:
+        # Preço derivado sem casas fixas (pior caso: modo XOR)
+        steps = np.full(points, NS_PER_SECOND)
+        prices = 60000 * np.exp(np.cumsum(rng.normal(0, 1e-4, points)))
+    return start + np.cumsum(steps), prices
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do CompressedLineSeries")
+    parser.add_argument('--points', type=int, default=200000)
+    parser.add_argument('--block-size', type=int, default=1024)
+    args = parser.parse_args()
+
+    print(f"{args.points} pontos, blocos de {args.block_size}")
+    print(f"{'série':<10} {'razão':>7} {'KB':>9} {'append/s':>12} "
+          f"{'decode pts/s':>14} {'LineSeries/s':>13}")
+    for kind in ('polling', 'trades', 'float'):
+        timestamps, prices = make_series(kind, args.points)
+        pairs = list(zip(timestamps.tolist(), prices.tolist()))
+
+        series = CompressedLineSeries(capacity=100, block_size=args.block_size)
+        started = time.perf_counter()
+        for timestamp, price in pairs:
+            series.append(timestamp, price)
+        append_rate = len(pairs) / (time.perf_counter() - started)
+
+        baseline = LineSeries(capacity=args.points)
+        started = time.perf_counter()
+        for timestamp, price in pairs:
+            baseline.append(timestamp, price)
+        baseline_rate = len(pairs) / (time.perf_counter() - started)
+
+        started = time.perf_counter()
+        decoded_ts, decoded_prices = series.range()
+        decode_rate = len(decoded_ts) / (time.perf_counter() - started)
+
+        assert np.array_equal(decoded_ts, timestamps)
+        assert np.array_equal(decoded_prices, prices)
+        print(f"{kind:<10} {series.compression_ratio():>6.2f}x {series.nbytes / 1024:>9,.0f} "
+              f"{append_rate:>12,.0f} {decode_rate:>14,.0f} {baseline_rate:>13,.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+"""Benchmark do loop de ingestão asyncio contra servidores locais.
+
+Sobe, em outro processo, um servidor WebSocket que imita os feeds de
+trades da Binance, Coinbase e Kraken (caminhos /binance, /coinbase e
+/kraken), assina milhares de streams pelo IngestLoop e mede conexões,
+tempo de assinatura e trades processados por segundo no thread do loop.
+
+Uso:
+    python benchmarks/bench_ingest.py --streams 3000 --seconds 10
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.exchanges import BinanceAdapter, CoinbaseAdapter, KrakenAdapter  # noqa: E402
+from utils.ingest import IngestLoop, TradeStream  # noqa: E402
+from utils.trades import TradeBatcher  # noqa: E402
+
+
+def _trade_message(venue, stream, ms):
+    """Mensagem de um trade no formato da corretora"""
+    price = round(random.uniform(10, 60000), 2)
+    qty = round(random.random(), 4)
+    iso = time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(ms / 1000)) + f".{ms % 1000:03d}000Z"
+    if venue == 'binance':
+        symbol = stream.split('@')[0].upper()
+        return {'stream': stream, 'data': {'e': 'aggTrade', 's': symbol, 'T': ms, 'p': str(price),
+                                           'q': str(qty), 'm': random.random() < 0.5}}
+    if venue == 'coinbase':
+        return {'type': 'match', 'product_id': stream.split(':', 1)[1], 'time': iso,
+                'price': str(price), 'size': str(qty), 'side': random.choice(('buy', 'sell'))}
+    return {'channel': 'trade', 'type': 'update',
+            'data': [{'symbol': stream.split(':', 1)[1], 'side': random.choice(('buy', 'sell')),
+                      'price': price, 'qty': qty, 'timestamp': iso}]}
+
+
+def _stream_names(venue, message):
+    """Streams citados em uma mensagem de assinatura"""
+    if venue == 'binance':
+        return message['params']
+    if venue == 'coinbase':
+        return [f"matches:{p}" for p in message['product_ids']]
+    return [f"trade:{s}" for s in message['params']['symbol']]
+
+
+def serve(port, rate):
+    """Servidor local: envia `rate` trades por segundo por conexão, dos streams assinados"""
+    import websockets
+
+    async def handler(ws):
+        venue = ws.request.path.strip('/')
+        streams = []
+
+        async def reader():
+            async for raw in ws:
+                message = json.loads(raw)
+                names = _stream_names(venue, message)
+                method = str(message.get('method') or message.get('type')).lower()
+                if method == 'subscribe':
+                    streams.extend(names)
+                else:
+                    for name in names:
+                        streams.remove(name)
+
+        task = asyncio.create_task(reader())
+        try:
+            while True:
+                await asyncio.sleep(0.05)
+                if streams:
+                    ms = int(time.time() * 1000)
+                    for _ in range(max(int(rate * 0.05), 1)):
+                        await ws.send(json.dumps(_trade_message(venue, random.choice(streams), ms)))
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            task.cancel()
+
+    async def main():
+        async with websockets.serve(handler, '127.0.0.1', port):
+            await asyncio.Future()
+
+    asyncio.run(main())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do IngestLoop")
+    parser.add_argument('--streams', type=int, default=3000,
+                        help="Total de streams, divididos entre as três corretoras")
+    parser.add_argument('--rate', type=int, default=2000,
+                        help="Trades por segundo enviados por conexão")
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--port', type=int, default=18765)
+    args = parser.parse_args()
+
+    server = multiprocessing.Process(target=serve, args=(args.port, args.rate), daemon=True)
+    server.start()
+    time.sleep(1.0)
+
+    per_venue = args.streams // 3
+    symbols = [f"S{i:05d}USDT" for i in range(per_venue)]
+    base = f"ws://127.0.0.1:{args.port}"
+    adapters = [BinanceAdapter(f"{base}/binance"), CoinbaseAdapter(f"{base}/coinbase"),
+                KrakenAdapter(f"{base}/kraken")]
+    # Os símbolos sintéticos não estão no mapa de bases: os streams são montados aqui
+    names = {
+        'binance': lambda s: f"{s.lower()}@aggTrade",
+        'coinbase': lambda s: f"matches:{s[:-4]}-USD",
+        'kraken': lambda s: f"trade:{s[:-4]}/USD",
+    }
+
+    ingest = IngestLoop()
+    batcher = TradeBatcher()
+    started = time.perf_counter()
+    feeds = []
+    for adapter in adapters:
+        stream = TradeStream(adapter, batcher, ingest, max_streams=200)
+        stream.symbols = {names[adapter.name](s): s for s in symbols}
+        stream.feed.set_streams(stream.symbols)
+        feeds.append(stream)
+    subscribe_time = time.perf_counter() - started
+
+    cpu_started = time.process_time()
+    time.sleep(args.seconds)
+    cpu = time.process_time() - cpu_started
+    drained = sum(len(columns[0]) for columns in batcher.drain().values())
+
+    print(f"{per_venue * 3} streams em 3 corretoras, loop único ({os.cpu_count()} CPUs)")
+    print(f"  assinatura          {subscribe_time * 1000:8.1f} ms")
+    for stream in feeds:
+        stats = stream.stats()
+        print(f"  {stream.adapter.label:<10} {stats['connections']:3d} conexões "
+              f"{stats['streams']:6d} streams {stats['messages'] / args.seconds:10,.0f} msg/s")
+    print(f"  trades no batcher   {drained / args.seconds:10,.0f} /s")
+    print(f"  CPU do processo     {cpu / args.seconds * 100:8.1f} %")
+
+    for stream in feeds:
+        stream.stop_stream()
+    ingest.stop()
+    server.terminate()
+
+
+if __name__ == '__main__':
+    main()
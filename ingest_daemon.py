@@ -0,0 +1,163 @@
+"""Daemon de ingestão: busca e agrega os dados uma única vez e os publica em
+memória compartilhada para vários processos do Streamlit e, opcionalmente,
+em uma API HTTP headless (snapshots JSON/Arrow e stream SSE).
+
+Uso:
+    python ingest_daemon.py --symbols BTCUSDT ETHUSDT --brick-size 100 --point-size 50
+    python ingest_daemon.py --trades kraken
+    python ingest_daemon.py --symbols BTCUSDT ETHUSDT --cross-pairs ETH/BTC
+    python ingest_daemon.py --replay ontem.parquet --speed 60
+    CRYPTO_SHM_NAME=crypto_dashboard streamlit run app.py
+
+    # Modo headless, sem dashboard
+    python ingest_daemon.py --no-shm --http-port 8765
+    curl localhost:8765/snapshot/ohlc/BTCUSDT?format=arrow
+    curl -N "localhost:8765/stream?symbols=BTCUSDT&views=ohlc,renko"
+    curl localhost:8765/snapshot/renko/ETH-BTC
+"""
+import argparse
+import signal
+import threading
+import time
+
+from utils.api_server import MarketDataServer
+from utils.cross_rates import cross_pairs
+from utils.data_fetcher import VIEW_STORES, CryptoDataFetcher
+from utils.exchanges import EXCHANGES
+from utils.klines import KLINES_URL, KlineBackfill
+from utils.replay import ReplaySource, TickFile
+from utils.retention import RetentionManager
+from utils.shm_store import SharedMarketWriter
+from utils.timebase import now_ns
+
+DEFAULT_SYMBOLS = [
+    'BTCUSDT', 'ETHUSDT', 'BNBUSDT', 'ADAUSDT', 'XRPUSDT',
+    'SOLUSDT', 'DOTUSDT', 'DOGEUSDT', 'AVAXUSDT', 'LINKUSDT',
+    'MATICUSDT', 'LTCUSDT', 'UNIUSDT', 'ATOMUSDT', 'FILUSDT'
+]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Daemon de ingestão do Crypto Dashboard")
+    parser.add_argument('--name', default='crypto_dashboard',
+                        help="Nome do segmento de memória compartilhada")
+    parser.add_argument('--symbols', nargs='+', default=DEFAULT_SYMBOLS)
+    parser.add_argument('--cross-pairs', nargs='*', default=[],
+                        help="Pares cruzados derivados entre os símbolos (ex.: ETH/BTC)")
+    parser.add_argument('--candle-interval', type=int, default=60,
+                        help="Duração de cada vela em segundos")
+    parser.add_argument('--brick-size', type=float, default=100.0)
+    parser.add_argument('--point-size', type=float, default=50.0)
+    parser.add_argument('--min-interval', type=float, default=5.0,
+                        help="Intervalo mínimo de polling em segundos")
+    parser.add_argument('--trades', choices=sorted(EXCHANGES), default=None,
+                        help="Assina os trades desta corretora para volume real nas velas")
+    parser.add_argument('--no-backfill', action='store_true',
+                        help="Não carrega as velas históricas (klines) ao iniciar")
+    parser.add_argument('--klines-url', default=KLINES_URL,
+                        help="Endpoint de klines do backfill (ex.: servidor local de testes)")
+    parser.add_argument('--replay', default=None,
+                        help="Reproduz um arquivo de ticks (CSV ou Parquet) em vez de buscar nas APIs")
+    parser.add_argument('--speed', type=float, default=1.0,
+                        help="Velocidade do replay (0 = o mais rápido possível)")
+    parser.add_argument('--memory-budget-mb', type=float, default=None,
+                        help="Orçamento de memória do histórico em camadas (MB)")
+    parser.add_argument('--no-shm', action='store_true',
+                        help="Não publica em memória compartilhada")
+    parser.add_argument('--http-host', default='0.0.0.0')
+    parser.add_argument('--http-port', type=int, default=None,
+                        help="Porta da API HTTP headless (desativada se omitida)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    # Os leitores podem exibir qualquer visão: todas ficam materializadas
+    retention = RetentionManager(
+        memory_budget=args.memory_budget_mb * 1024 * 1024 if args.memory_budget_mb else None
+    )
+    fetcher = CryptoDataFetcher(pinned_views=VIEW_STORES, retention=retention,
+                                trade_exchange=args.trades or 'binance',
+                                klines=KlineBackfill(url=args.klines_url))
+    fetcher.scheduler.min_interval = args.min_interval
+    lock = threading.Lock()
+
+    replay = None
+    if args.replay:
+        tick_file = TickFile(args.replay)
+        symbols = [s for s in args.symbols if s in tick_file.symbols]
+        if args.symbols == DEFAULT_SYMBOLS or not symbols:
+            symbols = tick_file.symbols
+        args.symbols = symbols
+        replay = ReplaySource(tick_file, speed=args.speed or None, symbols=symbols)
+
+    available = cross_pairs(args.symbols)
+    pairs = []
+    for pair in (p.upper() for p in args.cross_pairs):
+        if pair in available:
+            pairs.append(pair)
+        else:
+            print(f"Par cruzado ignorado (pernas fora de --symbols): {pair}")
+
+    writer = None
+    if not args.no_shm:
+        published = args.symbols + pairs
+        writer = SharedMarketWriter(args.name, published, retention.view_capacities())
+        print(f"Publicando {len(published)} símbolos em '{args.name}'")
+
+    server = None
+    if args.http_port is not None:
+        server = MarketDataServer(fetcher, lock, host=args.http_host, port=args.http_port)
+        server.start()
+        print(f"API HTTP em http://{args.http_host}:{server.port}")
+
+    def publish():
+        if writer:
+            with lock:
+                writer.publish(fetcher, now_ns())
+        if server:
+            server.publish_updates()
+
+    stopping = []
+    signal.signal(signal.SIGTERM, lambda *_: stopping.append(True))
+
+    try:
+        with lock:
+            if replay is not None:
+                fetcher.start_replay(replay, candle_interval=args.candle_interval,
+                                     brick_size=args.brick_size, point_size=args.point_size)
+                fetcher.set_cross_pairs(pairs)
+            else:
+                fetcher.start_fetching(
+                    args.symbols,
+                    candle_interval=args.candle_interval,
+                    brick_size=args.brick_size,
+                    point_size=args.point_size,
+                    trade_volume=args.trades is not None,
+                    cross_pairs=pairs,
+                    backfill=not args.no_backfill
+                )
+        publish()
+
+        while not stopping:
+            with lock:
+                updated = fetcher.update_data()
+            if updated:
+                publish()
+            time.sleep(min(max(fetcher.next_update_delay(), 0.2), 60))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        with lock:
+            fetcher.stop_fetching()
+        fetcher.ingest.stop()
+        if server:
+            server.stop()
+        if writer:
+            writer.close()
+        print("Daemon de ingestão encerrado")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Permite `pytest` a partir de qualquer diretório, como os scripts de benchmarks/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,65 @@
+import pytest
+
+from utils.alerts import PERCENT_MOVE, PRICE_ABOVE, PRICE_BELOW, AlertEngine
+
+
+def fired(engine, symbol, prices):
+    """Ids dos alertas disparados por tick ao passar pelos preços"""
+    ticks = []
+    for timestamp, price in enumerate(prices):
+        engine.on_price(symbol, price, timestamp)
+        ticks.append(sorted(n.alert_id for n in engine.drain()))
+    return ticks
+
+
+def test_upward_crossing_fires_levels_in_the_interval():
+    engine = AlertEngine()
+    ids = [engine.add_alert('BTCUSDT', PRICE_ABOVE, level) for level in (105.0, 100.0, 110.0, 120.0)]
+    # Subida de 99 a 110 cruza 100, 105 e 110 (o nível alcançado conta); 120 fica
+    assert fired(engine, 'BTCUSDT', [99.0, 110.0, 115.0]) == [[], sorted(ids[:3]), []]
+    assert [a.id for a in engine.alerts()] == [ids[3]]
+
+
+def test_downward_crossing_fires_only_below_levels():
+    engine = AlertEngine()
+    above = engine.add_alert('BTCUSDT', PRICE_ABOVE, 90.0)
+    below = engine.add_alert('BTCUSDT', PRICE_BELOW, 95.0)
+    # Queda atravessa os dois níveis, mas só o de baixa reage à queda
+    assert fired(engine, 'BTCUSDT', [100.0, 80.0]) == [[], [below]]
+    assert fired(engine, 'BTCUSDT', [89.0, 91.0]) == [[], [above]]
+
+
+def test_level_reached_exactly_fires_once():
+    engine = AlertEngine()
+    alert = engine.add_alert('BTCUSDT', PRICE_ABOVE, 100.0, repeat=True)
+    assert fired(engine, 'BTCUSDT', [99.0, 100.0, 101.0, 100.0]) == [[], [alert], [], []]
+
+
+def test_repeating_alert_rearms_after_price_returns():
+    engine = AlertEngine()
+    up = engine.add_alert('BTCUSDT', PRICE_ABOVE, 100.0, repeat=True)
+    down = engine.add_alert('BTCUSDT', PRICE_BELOW, 100.0, repeat=True)
+    once = engine.add_alert('BTCUSDT', PRICE_ABOVE, 100.0)
+    ticks = fired(engine, 'BTCUSDT', [95.0, 105.0, 96.0, 104.0, 97.0])
+    assert ticks == [[], sorted([up, once]), [down], [up], [down]]
+    assert sorted(a.id for a in engine.alerts()) == [up, down]
+
+
+def test_removed_alert_leaves_the_level_book():
+    engine = AlertEngine()
+    first = engine.add_alert('BTCUSDT', PRICE_ABOVE, 100.0, repeat=True)
+    second = engine.add_alert('BTCUSDT', PRICE_ABOVE, 100.0, repeat=True)
+    engine.remove_alert(first)
+    assert fired(engine, 'BTCUSDT', [99.0, 101.0]) == [[], [second]]
+
+
+def test_percent_alert_becomes_price_level():
+    engine = AlertEngine()
+    engine.on_price('ETHUSDT', 200.0, 0)
+    rise = engine.add_alert('ETHUSDT', PERCENT_MOVE, 5.0)
+    fall = engine.add_alert('ETHUSDT', PERCENT_MOVE, -5.0, reference_price=100.0)
+    assert [a.level for a in engine.alerts()] == [pytest.approx(210.0), pytest.approx(95.0)]
+    assert fired(engine, 'ETHUSDT', [209.0, 210.0, 94.0]) == [[], [rise], [fall]]
+
+    with pytest.raises(ValueError):
+        engine.add_alert('SOLUSDT', PERCENT_MOVE, 5.0)
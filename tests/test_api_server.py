@@ -0,0 +1,67 @@
+import socket
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from utils.api_server import MarketDataServer
+from utils.records import LineSeries
+
+
+@pytest.fixture
+def market():
+    fetcher = SimpleNamespace(symbols=[], ohlc_data={}, renko_data={}, point_data={},
+                              historical_data={})
+    server = MarketDataServer(fetcher, threading.Lock(), host='127.0.0.1', port=0,
+                              client_queue_size=2)
+    server.start()
+    yield server
+    server.stop()
+
+
+def open_stream(market):
+    sock = socket.create_connection(('127.0.0.1', market.port), timeout=5)
+    sock.sendall(b'GET /stream HTTP/1.1\r\nHost: localhost\r\n\r\n')
+    deadline = time.monotonic() + 5
+    while not market._clients and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert market._clients
+    return sock
+
+
+def read_until_closed(sock):
+    chunks = []
+    while True:
+        chunk = sock.recv(65536)
+        if not chunk:
+            return b''.join(chunks)
+        chunks.append(chunk)
+
+
+def test_slow_client_is_dropped_and_its_stream_ends(market):
+    # Eventos grandes: o handler não esvazia a fila de 2 no ritmo da publicação
+    for i in range(20):
+        series = market.fetcher.historical_data[f'S{i}'] = LineSeries(capacity=5000)
+        for row in range(5000):
+            series.append(row, float(row))
+    sock = open_stream(market)
+
+    market.publish_updates()
+
+    assert not market._clients
+    body = read_until_closed(sock)  # o servidor fecha a conexão
+    assert body.startswith(b'HTTP/1.1 200')
+    assert body.count(b'event: tick') < 20
+    sock.close()
+
+
+def test_stop_ends_streams_of_connected_clients():
+    fetcher = SimpleNamespace(symbols=[], ohlc_data={}, renko_data={}, point_data={},
+                              historical_data={})
+    market = MarketDataServer(fetcher, threading.Lock(), host='127.0.0.1', port=0)
+    market.start()
+    sock = open_stream(market)
+    market.stop()
+    assert read_until_closed(sock).startswith(b'HTTP/1.1 200')
+    sock.close()
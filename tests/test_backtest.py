@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+from utils.backtest import Backtester, event_positions, point_events, renko_events, simulate
+
+
+def renko_loop(prices, box):
+    """Regra de `CryptoDataFetcher.update_renko_data`, tick a tick"""
+    last = prices[0]
+    index, moves = [], []
+    for i, price in enumerate(prices.tolist()):
+        bricks = int(abs(price - last) / box)
+        if i and bricks >= 1:
+            index.append(i)
+            moves.append(bricks if price > last else -bricks)
+            last += bricks * (box if price > last else -box)
+    return index, moves
+
+
+def point_loop(prices, box):
+    """Regra de `CryptoDataFetcher.update_point_data`, tick a tick"""
+    last = prices[0]
+    index, moves = [], []
+    for i, price in enumerate(prices.tolist()):
+        points = int(abs(price - last) / box)
+        if i and points >= 1:
+            index.append(i)
+            moves.append(points if price > last else -points)
+            last = price
+    return index, moves
+
+
+def equity_loop(prices, index, positions, fee):
+    """Patrimônio tick a tick da estratégia que assume `positions` nos ticks `index`"""
+    targets = dict(zip(index.tolist(), positions.tolist()))
+    equity, position, curve = 1.0, 0, []
+    for i, price in enumerate(prices.tolist()):
+        if i:
+            equity *= (price / prices[i - 1]) ** position
+        target = targets.get(i, position)
+        if target != position:
+            equity *= (1 - fee * abs(position)) * (1 - fee * abs(target))
+            position = target
+        curve.append(equity)
+    return np.array(curve)
+
+
+@pytest.fixture
+def prices():
+    return 100 * np.exp(np.cumsum(np.random.default_rng(6).normal(0, 2e-3, 20_000)))
+
+
+@pytest.mark.parametrize('box', [0.05, 0.3, 2.0])
+def test_vectorized_events_match_loops(prices, box):
+    for vectorized, loop in ((renko_events, renko_loop), (point_events, point_loop)):
+        index, moves = vectorized(prices, box)
+        ref_index, ref_moves = loop(prices, box)
+        assert index.tolist() == ref_index
+        assert moves.tolist() == ref_moves
+
+
+def test_event_positions_follow_runs():
+    moves = np.array([1, 1, -1, -2, 1, 3, -1])
+    assert event_positions(moves, 2).tolist() == [0, 1, 1, -1, -1, 1, 1]
+    assert event_positions(moves, 2, long_only=True).tolist() == [0, 1, 1, 0, 0, 1, 1]
+
+
+@pytest.mark.parametrize('long_only', [False, True])
+def test_simulate_matches_tick_loop(prices, long_only):
+    index, moves = renko_events(prices, 0.5)
+    positions = event_positions(moves, 2, long_only)
+    timestamps = np.arange(len(prices), dtype=np.int64)
+    result = simulate(timestamps, prices, index, positions, fee=0.001, curve_points=len(prices))
+    curve = equity_loop(prices, index, positions, 0.001)
+
+    np.testing.assert_allclose(result['equity'], curve, rtol=1e-9)
+    assert result['return'] == pytest.approx(curve[-1] - 1, rel=1e-9)
+    assert result['max_drawdown'] == pytest.approx(
+        np.min(curve / np.maximum.accumulate(curve)) - 1, rel=1e-9, abs=1e-12)
+    assert result['buy_hold'] == pytest.approx(prices[-1] / prices[0] - 1)
+
+
+def test_backtester_runs_every_combination_inline(prices):
+    timestamps = np.arange(len(prices), dtype=np.int64)
+    results = Backtester(max_workers=1).run(
+        {'AUSDT': (timestamps, prices), 'BUSDT': (timestamps, prices * 2)},
+        boxes=[0.5, 1.0], reversals=[1, 2], percent=True
+    )
+    assert len(results) == 2 * 2 * 2 * 2
+    assert {result['param'] for result in results} == {0.5, 1.0}
+    # Caixa em % do preço: o mesmo passeio em outra escala dá o mesmo resultado
+    by_key = {(r['symbol'], r['chart'], r['param'], r['reversal']): r['return'] for r in results}
+    for (symbol, chart, param, reversal), value in by_key.items():
+        if symbol == 'AUSDT':
+            assert by_key[('BUSDT', chart, param, reversal)] == pytest.approx(value)
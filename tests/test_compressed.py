@@ -0,0 +1,72 @@
+import numpy as np
+
+from utils.compressed import (
+    DECIMAL_MODE, XOR_MODE, CompressedBlock, CompressedLineSeries,
+    decode_timestamps, decode_values, encode_timestamps, encode_values
+)
+
+
+def test_timestamps_round_trip_with_irregular_deltas():
+    rng = np.random.default_rng(1)
+    timestamps = 1_700_000_000_000_000_000 + np.cumsum(rng.integers(1, 5_000_000_000, 1000))
+    decoded = decode_timestamps(len(timestamps), *encode_timestamps(timestamps))
+    assert decoded.dtype == np.int64
+    assert np.array_equal(decoded, timestamps)
+
+
+def test_short_timestamp_blocks_round_trip():
+    for timestamps in (np.array([5]), np.array([5, 9])):
+        assert np.array_equal(decode_timestamps(len(timestamps), *encode_timestamps(timestamps)),
+                              timestamps)
+
+
+def test_decimal_prices_round_trip_exactly():
+    prices = np.round(30_000 + np.cumsum(np.random.default_rng(2).normal(0, 5, 500)), 2)
+    encoded = encode_values(prices)
+    assert encoded[0] == DECIMAL_MODE
+    decoded = decode_values(len(prices), *encoded)
+    assert np.array_equal(decoded.view(np.uint64), prices.view(np.uint64))
+
+
+def test_arbitrary_floats_round_trip_bit_exact():
+    prices = np.random.default_rng(3).random(500) * 1e4
+    encoded = encode_values(prices)
+    assert encoded[0] == XOR_MODE
+    decoded = decode_values(len(prices), *encoded)
+    assert np.array_equal(decoded.view(np.uint64), prices.view(np.uint64))
+
+
+def test_block_decode_matches_input():
+    timestamps = np.arange(0, 64_000, 1000, dtype=np.int64)
+    prices = np.linspace(1.0, 2.0, len(timestamps))
+    block = CompressedBlock(timestamps, prices)
+    decoded_ts, decoded_prices = block.decode()
+    assert (block.start, block.end) == (0, 63_000)
+    assert np.array_equal(decoded_ts, timestamps) and np.array_equal(decoded_prices, prices)
+
+
+def test_line_series_window_and_range():
+    series = CompressedLineSeries(capacity=100, block_size=64)
+    timestamps = np.arange(1000, dtype=np.int64) * 1_000_000_000
+    prices = np.round(100 + np.sin(np.arange(1000) / 10), 4)
+    for timestamp, price in zip(timestamps.tolist(), prices.tolist()):
+        series.append(timestamp, price)
+
+    assert len(series) == 100 and series.total_rows == 1000
+    assert np.array_equal(series['timestamps'], timestamps[-100:])
+    assert np.array_equal(series['prices'], prices[-100:])
+    all_ts, all_prices = series.range()
+    assert np.array_equal(all_ts, timestamps) and np.array_equal(all_prices, prices)
+    part_ts, part_prices = series.range(timestamps[200], timestamps[300])
+    assert np.array_equal(part_ts, timestamps[200:301])
+    assert np.array_equal(part_prices, prices[200:301])
+    assert series.compression_ratio() > 1
+
+
+def test_line_series_drops_old_blocks_past_max_rows():
+    series = CompressedLineSeries(capacity=10, block_size=16, max_rows=40)
+    for i in range(100):
+        series.append(i, float(i))
+    timestamps, _ = series.range()
+    assert series.rows == len(timestamps) >= 40
+    assert timestamps[-1] == 99 and np.all(np.diff(timestamps) == 1)
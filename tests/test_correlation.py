@@ -0,0 +1,74 @@
+import numpy as np
+
+from utils.correlation import RollingCorrelation
+from utils.records import LineSeries
+
+SECOND = 1_000_000_000
+SYMBOLS = ['BTCUSDT', 'ETHUSDT', 'SOLUSDT']
+
+
+def random_walk(samples, seed=7):
+    """Preços correlacionados (ETH segue o BTC, SOL é independente)"""
+    rng = np.random.default_rng(seed)
+    shocks = rng.normal(0, 0.01, (samples, 3))
+    shocks[:, 1] = 0.8 * shocks[:, 0] + 0.2 * shocks[:, 1]
+    return 100.0 * np.exp(np.cumsum(shocks, axis=0))
+
+
+def test_sliding_window_matches_corrcoef():
+    window = 20
+    prices = random_walk(120)
+    # Sem recálculo periódico: só as atualizações de Welford
+    rolling = RollingCorrelation(window=window, sample_interval=5, recompute_every=10**9)
+    rolling.reset(SYMBOLS)
+    returns = np.log(prices[1:] / prices[:-1])
+
+    for i, row in enumerate(prices):
+        assert rolling.sample(i * 5 * SECOND, dict(zip(SYMBOLS, row)))
+        if i < 2:
+            continue
+        recent = returns[max(0, i - window):i]
+        assert rolling.count == len(recent)
+        np.testing.assert_allclose(rolling.correlation(), np.corrcoef(recent.T), atol=1e-9)
+        np.testing.assert_allclose(rolling.covariance(), np.cov(recent.T), atol=1e-12)
+    assert rolling.correlation()[0, 1] > 0.8
+
+
+def test_samples_follow_the_interval_grid():
+    rolling = RollingCorrelation(window=10, sample_interval=5)
+    rolling.reset(SYMBOLS[:2])
+    prices = {'BTCUSDT': 100.0, 'ETHUSDT': 10.0}
+    assert rolling.sample(0, prices)
+    assert not rolling.sample(4 * SECOND, prices)
+    assert rolling.sample(5 * SECOND, prices)
+    # Preço ausente ou não positivo não entra na janela
+    assert not rolling.sample(10 * SECOND, {'BTCUSDT': 100.0})
+    assert not rolling.sample(10 * SECOND, {'BTCUSDT': 100.0, 'ETHUSDT': 0.0})
+    assert rolling.count == 1
+
+
+def test_backfill_matches_incremental_sampling():
+    window = 15
+    prices = random_walk(40, seed=3)
+    history = {}
+    for j, symbol in enumerate(SYMBOLS):
+        series = history[symbol] = LineSeries(capacity=100)
+        for i, price in enumerate(prices[:, j]):
+            series.append(i * 5 * SECOND, price)
+
+    incremental = RollingCorrelation(window=window, sample_interval=5)
+    incremental.reset(SYMBOLS)
+    for i, row in enumerate(prices):
+        incremental.sample(i * 5 * SECOND, dict(zip(SYMBOLS, row)))
+
+    rebuilt = RollingCorrelation(window=window, sample_interval=5)
+    rebuilt.backfill(history, SYMBOLS)
+    assert rebuilt.count == incremental.count == window
+    np.testing.assert_allclose(rebuilt.correlation(), incremental.correlation(), atol=1e-9)
+    np.testing.assert_allclose(rebuilt.volatility(), incremental.volatility(), atol=1e-12)
+
+    # A janela reconstruída continua sendo atualizada de forma incremental
+    row = prices[-1] * [1.01, 1.005, 0.99]
+    for rolling in (rebuilt, incremental):
+        assert rolling.sample(40 * 5 * SECOND, dict(zip(SYMBOLS, row)))
+    np.testing.assert_allclose(rebuilt.correlation(), incremental.correlation(), atol=1e-9)
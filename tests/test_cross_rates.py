@@ -0,0 +1,130 @@
+import numpy as np
+import pytest
+
+from utils.cross_rates import CrossRateEngine, cross_pairs, cross_symbol
+from utils.data_fetcher import CryptoDataFetcher
+from utils.providers import TickBatch
+
+SECOND = 1_000_000_000
+
+
+def batch(rows, change=np.nan):
+    return TickBatch.from_rows([(symbol, ts, price, change, 0.0) for symbol, ts, price in rows])
+
+
+def rows(batch):
+    return list(zip(batch.symbols, batch.timestamps.tolist(), batch.prices.tolist()))
+
+
+def engine():
+    rates = CrossRateEngine()
+    rates.set_pairs({'ETH/BTC': ('ETHUSDT', 'BTCUSDT')})
+    return rates
+
+
+def test_pair_names_follow_the_symbol_bases():
+    assert cross_symbol('ETHUSDT', 'BTCUSDT') == 'ETH/BTC'
+    assert cross_pairs(['BTCUSDT', 'ETHUSDT']) == {
+        'BTC/ETH': ('BTCUSDT', 'ETHUSDT'),
+        'ETH/BTC': ('ETHUSDT', 'BTCUSDT'),
+    }
+
+
+def test_pair_ticks_start_once_both_legs_are_quoted():
+    rates = engine()
+    first = rates.extend(batch([('ETHUSDT', SECOND, 3000.0)]))
+    assert rows(first) == [('ETHUSDT', SECOND, 3000.0)]
+
+    second = rates.extend(batch([('BTCUSDT', 2 * SECOND, 60000.0)]))
+    assert rows(second) == [('BTCUSDT', 2 * SECOND, 60000.0), ('ETH/BTC', 2 * SECOND, 0.05)]
+
+
+def test_each_leg_tick_updates_the_pair_with_the_other_leg_last_price():
+    rates = engine()
+    rates.extend(batch([('BTCUSDT', SECOND, 50000.0), ('ETHUSDT', SECOND, 2500.0)]))
+
+    updated = rates.extend(batch([
+        ('ETHUSDT', 2 * SECOND, 3000.0),
+        ('SOLUSDT', 2 * SECOND, 150.0),
+        ('BTCUSDT', 3 * SECOND, 60000.0),
+        ('ETHUSDT', 4 * SECOND, 3600.0),
+    ]))
+    # O tick derivado vem logo após o tick da perna, com o mesmo instante
+    assert rows(updated) == [
+        ('ETHUSDT', 2 * SECOND, 3000.0), ('ETH/BTC', 2 * SECOND, 0.06),
+        ('SOLUSDT', 2 * SECOND, 150.0),
+        ('BTCUSDT', 3 * SECOND, 60000.0), ('ETH/BTC', 3 * SECOND, 0.05),
+        ('ETHUSDT', 4 * SECOND, 3600.0), ('ETH/BTC', 4 * SECOND, 0.06),
+    ]
+    # A escala do par fica fixa no primeiro tick (cotação de 50000)
+    assert rates.scale['ETH/BTC'] == pytest.approx(1 / 50000)
+
+
+def test_pair_change_combines_the_leg_changes():
+    rates = engine()
+    derived = rates.extend(batch([('ETHUSDT', SECOND, 3300.0), ('BTCUSDT', SECOND, 55000.0)], change=10.0))
+    assert derived.symbols == ['ETHUSDT', 'BTCUSDT', 'ETH/BTC']
+    assert derived.changes[-1] == pytest.approx(0.0)
+
+    derived = rates.extend(TickBatch(['BTCUSDT'], [2 * SECOND], [60000.0], [20.0], [0.0]))
+    assert derived.changes[-1] == pytest.approx((1.1 / 1.2 - 1) * 100)
+    # Variação ausente no tick mantém a última conhecida da perna
+    derived = rates.extend(batch([('ETHUSDT', 3 * SECOND, 3000.0)]))
+    assert derived.changes[-1] == pytest.approx((1.1 / 1.2 - 1) * 100)
+
+
+def test_batches_without_legs_pass_through_untouched():
+    rates = engine()
+    original = batch([('SOLUSDT', SECOND, 150.0)])
+    assert rates.extend(original) is original
+
+    rates.set_pairs({})
+    original = batch([('ETHUSDT', SECOND, 3000.0), ('BTCUSDT', SECOND, 60000.0)])
+    assert rates.extend(original) is original
+    assert 'ETH/BTC' not in rates.scale
+
+
+def test_backfill_joins_the_legs_as_of_each_tick():
+    rates = engine()
+    eth = (np.array([1, 3, 5]) * SECOND, np.array([2000.0, 2200.0, 2400.0]))
+    btc = (np.array([2, 5, 6]) * SECOND, np.array([40000.0, 44000.0, 48000.0]))
+    timestamps, prices = rates.backfill('ETH/BTC', eth, btc)
+    # Antes de 2 s não há cotação do BTC; em 5 s as duas pernas mudam juntas
+    assert (timestamps // SECOND).tolist() == [2, 3, 5, 6]
+    np.testing.assert_allclose(prices, [0.05, 0.055, 2400 / 44000, 0.05])
+    assert rates.scale['ETH/BTC'] == pytest.approx(1 / 40000)
+    assert rates.backfill('ETH/BTC', eth, (np.empty(0, np.int64), np.empty(0))) is None
+
+
+def make_fetcher():
+    fetcher = CryptoDataFetcher(pinned_views=('ohlc',))
+    fetcher.symbols = ['BTCUSDT', 'ETHUSDT']
+    fetcher.brick_size = 100.0
+    return fetcher
+
+
+def test_fetcher_backfills_and_updates_the_pair_price():
+    fetcher = make_fetcher()
+    fetcher.apply_batch(batch([('BTCUSDT', SECOND, 50000.0), ('ETHUSDT', 2 * SECOND, 2500.0),
+                               ('BTCUSDT', 3 * SECOND, 62500.0)]))
+
+    fetcher.set_cross_pairs(['ETH/BTC', 'XRP/BTC'])
+    assert list(fetcher.cross_rates.pairs) == ['ETH/BTC']
+    # Histórico do par reconstruído a partir dos ticks gravados das pernas
+    np.testing.assert_allclose(fetcher.historical_data['ETH/BTC']['prices'], [0.05, 0.04])
+    assert fetcher.price_data['ETH/BTC'].price == pytest.approx(0.04)
+    assert fetcher.box_size('ETH/BTC', 100.0) == pytest.approx(100.0 / 50000)
+
+    # Ticks ao vivo de qualquer perna atualizam o par
+    fetcher.apply_batch(batch([('ETHUSDT', 4 * SECOND, 3125.0)]))
+    assert fetcher.price_data['ETH/BTC'].price == pytest.approx(0.05)
+    assert fetcher.price_data['ETH/BTC'].timestamp == 4 * SECOND
+    fetcher.apply_batch(batch([('BTCUSDT', 5 * SECOND, 50000.0)]))
+    assert fetcher.price_data['ETH/BTC'].price == pytest.approx(0.0625)
+    np.testing.assert_allclose(fetcher.historical_data['ETH/BTC']['prices'], [0.05, 0.04, 0.05, 0.0625])
+    assert fetcher.ohlc_data['ETH/BTC']['high'][-1] == pytest.approx(0.0625)
+
+    # Par removido sai de todas as visões e deixa de ser derivado
+    fetcher.set_cross_pairs([])
+    fetcher.apply_batch(batch([('ETHUSDT', 6 * SECOND, 3000.0)]))
+    assert 'ETH/BTC' not in fetcher.price_data and 'ETH/BTC' not in fetcher.ohlc_data
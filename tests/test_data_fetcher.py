@@ -0,0 +1,148 @@
+import numpy as np
+import pytest
+
+from utils.data_fetcher import CryptoDataFetcher
+from utils.providers import TickBatch
+from utils.timing_wheel import TimingWheel
+
+SECOND = 1_000_000_000
+
+
+class RecordingAlerts:
+    """Registra os eventos que o fetcher entrega ao motor de alertas"""
+
+    def __init__(self):
+        self.events = []
+
+    def has_event_alerts(self, kind):
+        return False
+
+    def on_price(self, symbol, price, timestamp):
+        self.events.append(('price', symbol, price))
+
+    def on_renko_reversal(self, symbol, direction, price, timestamp):
+        self.events.append(('renko', symbol, direction, price))
+
+    def on_pf_new_column(self, symbol, marker, price, timestamp):
+        self.events.append(('point', symbol, marker, price))
+
+    def on_candle_closed(self, event):
+        pass
+
+
+def make_fetcher():
+    fetcher = CryptoDataFetcher(alerts=RecordingAlerts(), pinned_views=('ohlc', 'renko', 'point'))
+    fetcher.symbols = ['BTCUSDT', 'ETHUSDT']
+    fetcher.brick_size = 1.0
+    fetcher.point_size = 1.0
+    return fetcher
+
+
+def ticks_batch(rows):
+    return TickBatch.from_rows([(symbol, ts, price, 0.0, 0.0) for symbol, ts, price in rows])
+
+
+def columns(series):
+    return {name: series[name].tolist() for name, _ in series.fields}
+
+
+def state(fetcher):
+    return (
+        {s: columns(series) for s, series in fetcher.renko_data.items()},
+        {s: columns(series) for s, series in fetcher.point_data.items()},
+        {s: series['close'].tolist() for s, series in fetcher.ohlc_data.items()},
+        fetcher.alerts.events,
+    )
+
+
+def test_multi_tick_batch_keeps_reversals():
+    fetcher = make_fetcher()
+    fetcher.apply_batch(ticks_batch([('BTCUSDT', SECOND, 100.0)]))
+    fetcher.apply_batch(ticks_batch([('BTCUSDT', 2 * SECOND, 102.0), ('BTCUSDT', 3 * SECOND, 100.5)]))
+    assert fetcher.renko_data['BTCUSDT']['close'].tolist() == [100.0, 101.0, 102.0, 101.0]
+    assert ('renko', 'BTCUSDT', -1, 100.5) in fetcher.alerts.events
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_batch_apply_equals_sequential_apply(seed):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for i in range(400):
+        symbol = 'BTCUSDT' if rng.random() < 0.6 else 'ETHUSDT'
+        rows.append((symbol, (i + 1) * SECOND, float(100 + rng.normal(0, 3))))
+
+    sequential = make_fetcher()
+    for row in rows:
+        sequential.apply_batch(ticks_batch([row]))
+    batched = make_fetcher()
+    for start in range(0, len(rows), 37):
+        batched.apply_batch(ticks_batch(rows[start:start + 37]))
+
+    assert len(sequential.renko_data['BTCUSDT']) > 10
+    assert state(batched) == state(sequential)
+
+
+def test_apply_trades_reports_drained_trades():
+    fetcher = make_fetcher()
+    fetcher.trade_batcher.add('BTCUSDT', SECOND, 100.0, 0.5, False)
+    assert fetcher.apply_trades()
+    assert fetcher.ohlc_data['BTCUSDT']['close'].tolist() == [100.0]
+    assert not fetcher.apply_trades()
+
+
+def test_cross_backfill_matches_live_without_alerts():
+    rng = np.random.default_rng(3)
+    rows = []
+    for i in range(200):
+        symbol = 'BTCUSDT' if i % 2 else 'ETHUSDT'
+        base = 100.0 if symbol == 'BTCUSDT' else 50.0
+        rows.append((symbol, (i + 1) * SECOND, float(base + rng.normal(0, 2))))
+
+    live = make_fetcher()
+    live.set_cross_pairs(['ETH/BTC'])
+    backfilled = make_fetcher()
+    for row in rows:
+        live.apply_batch(ticks_batch([row]))
+        backfilled.apply_batch(ticks_batch([row]))
+    events = list(backfilled.alerts.events)
+    backfilled.set_cross_pairs(['ETH/BTC'])
+
+    assert backfilled.alerts.events == events
+    assert len(backfilled.renko_data['ETH/BTC']) > 1
+    assert columns(backfilled.renko_data['ETH/BTC']) == columns(live.renko_data['ETH/BTC'])
+    assert columns(backfilled.point_data['ETH/BTC']) == columns(live.point_data['ETH/BTC'])
+
+
+def test_late_tick_does_not_touch_closed_candles():
+    fetcher = make_fetcher()
+    fetcher.clock = lambda: 61 * SECOND
+    fetcher.candle_clock = TimingWheel(start_ns=0)
+    fetcher.update_ohlc_candle('BTCUSDT', 100.0, 0, 61 * SECOND)
+    # Minutos seguintes sem ticks: a roda fecha a vela e preenche um intervalo plano
+    fetcher.close_candles(now=185 * SECOND)
+    ohlc = fetcher.ohlc_data['BTCUSDT']
+    before = {name: ohlc[name].tolist() for name, _ in ohlc.fields}
+    assert before['timestamps'] == [60 * SECOND, 120 * SECOND]
+    assert before['close'] == [100.0, 100.0]
+
+    # Nem a vela do tick nem a vela plana mais recente, ambas encerradas, mudam
+    fetcher.update_ohlc_candle('BTCUSDT', 250.0, 3.0, 70 * SECOND)
+    fetcher.update_ohlc_candle('BTCUSDT', 1.0, 3.0, 130 * SECOND)
+    assert {name: ohlc[name].tolist() for name, _ in ohlc.fields} == before
+    assert fetcher.late_candle_ticks == 2
+
+    fetcher.update_ohlc_candle('BTCUSDT', 101.0, 0, 190 * SECOND)
+    assert ohlc['close'].tolist() == [100.0, 100.0, 101.0]
+
+
+def test_tick_from_older_bucket_leaves_open_candle_unchanged():
+    """Com instantes da fonte, um poll REST pode chegar atrás da vela aberta pelo stream"""
+    fetcher = make_fetcher()
+    fetcher.apply_batch(ticks_batch([('BTCUSDT', 125 * SECOND, 100.0)]))
+    ohlc = fetcher.ohlc_data['BTCUSDT']
+    before = {name: ohlc[name].tolist() for name, _ in ohlc.fields}
+
+    fetcher.apply_batch(ticks_batch([('BTCUSDT', 70 * SECOND, 250.0)]))
+
+    assert {name: ohlc[name].tolist() for name, _ in ohlc.fields} == before
+    assert fetcher.sequencer_stats()['late_candles'] == 1
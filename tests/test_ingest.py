@@ -0,0 +1,200 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+from websockets.asyncio.server import ServerConnection, serve
+from websockets.frames import Opcode
+
+from utils import ingest as ingest_module
+from utils.exchanges import BinanceAdapter
+from utils.ingest import IngestLoop
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("condição não atingida a tempo")
+        time.sleep(0.01)
+
+
+class StandInServer:
+    """Servidor WebSocket local no formato de streams combinados da Binance.
+
+    Registra as mensagens de controle e os pings recebidos por conexão;
+    `drop` derruba as conexões e `mute` faz o servidor parar de ler (sem pong).
+    """
+
+    def __init__(self):
+        self.connections = []   # na ordem de abertura
+        self.messages = {}      # conexão -> mensagens de controle
+        self.pings = {}         # conexão -> pings recebidos
+        self.opened_at = []
+        self.loop = asyncio.new_event_loop()
+        ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(ready,), daemon=True)
+        self._thread.start()
+        ready.wait()
+
+    def _run(self, ready):
+        asyncio.set_event_loop(self.loop)
+        server = self
+
+        class Connection(ServerConnection):
+            def process_event(self, event):
+                if getattr(event, 'opcode', None) == Opcode.PING:
+                    server.pings[self] = server.pings.get(self, 0) + 1
+                super().process_event(event)
+
+        async def handler(ws):
+            self.connections.append(ws)
+            self.messages[ws] = []
+            self.opened_at.append(time.monotonic())
+            async for message in ws:
+                self.messages[ws].append(json.loads(message))
+
+        async def start():
+            self.server = await serve(handler, '127.0.0.1', 0, create_connection=Connection,
+                                      ping_interval=None)
+            self.url = f"ws://127.0.0.1:{self.server.sockets[0].getsockname()[1]}/stream"
+            ready.set()
+
+        self.loop.run_until_complete(start())
+        self.loop.run_forever()
+
+    def _call(self, fn):
+        done = threading.Event()
+
+        def run():
+            fn()
+            done.set()
+        self.loop.call_soon_threadsafe(run)
+        done.wait()
+
+    def drop(self):
+        self._call(lambda: [ws.transport.abort() for ws in self.connections])
+
+    def mute(self):
+        self._call(lambda: [ws.transport.pause_reading() for ws in self.connections])
+
+    def subscribed(self, ws):
+        streams = set()
+        for message in self.messages[ws]:
+            if message['method'] == 'SUBSCRIBE':
+                streams.update(message['params'])
+            else:
+                streams.difference_update(message['params'])
+        return streams
+
+    def close(self):
+        async def shutdown():
+            for ws in self.connections:
+                ws.transport.abort()
+            self.server.close()
+            await self.server.wait_closed()
+        asyncio.run_coroutine_threadsafe(shutdown(), self.loop).result(5)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+
+
+@pytest.fixture
+def server():
+    stand_in = StandInServer()
+    yield stand_in
+    stand_in.close()
+
+
+@pytest.fixture
+def loop():
+    ingest = IngestLoop()
+    yield ingest
+    ingest.stop()
+
+
+def open_feed(server, loop, **options):
+    options.setdefault('base_backoff', 0.01)
+    options.setdefault('max_backoff', 0.05)
+    return loop.feed(BinanceAdapter(server.url), lambda stream, data: None, **options)
+
+
+def test_streams_are_sharded_at_max_streams(server, loop):
+    feed = open_feed(server, loop, max_streams=2)
+    streams = [f"s{i}@aggTrade" for i in range(5)]
+    feed.subscribe(streams)
+
+    wait_until(lambda: len(server.connections) == 3 and
+               sum(len(server.subscribed(ws)) for ws in server.connections) == 5)
+    shards = [server.subscribed(ws) for ws in server.connections]
+    assert sorted(len(shard) for shard in shards) == [1, 2, 2]
+    assert set().union(*shards) == set(streams)
+    assert feed.stats()['connections'] == 3
+    feed.stop()
+
+
+def test_subscriptions_change_live_with_control_messages(server, loop):
+    feed = open_feed(server, loop, max_streams=10)
+    feed.set_streams(['a@aggTrade', 'b@aggTrade'])
+    wait_until(lambda: server.connections and server.subscribed(server.connections[0]))
+
+    feed.set_streams(['b@aggTrade', 'c@aggTrade'])
+    ws = server.connections[0]
+    wait_until(lambda: server.subscribed(ws) == {'b@aggTrade', 'c@aggTrade'})
+
+    methods = [(m['method'], m['params']) for m in server.messages[ws]]
+    assert methods == [('SUBSCRIBE', ['a@aggTrade', 'b@aggTrade']),
+                       ('UNSUBSCRIBE', ['a@aggTrade']),
+                       ('SUBSCRIBE', ['c@aggTrade'])]
+    # Nenhuma conexão nova: as assinaturas mudam na mesma conexão
+    assert len(server.connections) == 1
+    feed.stop()
+
+
+def test_reconnects_with_backoff_and_resubscribes(server, loop, monkeypatch):
+    bounds = []
+
+    def uniform(low, high):
+        bounds.append(high)
+        return high
+    monkeypatch.setattr(ingest_module.random, 'uniform', uniform)
+
+    feed = open_feed(server, loop, base_backoff=0.1, max_backoff=0.3)
+    feed.subscribe(['a@aggTrade', 'b@aggTrade'])
+    wait_until(lambda: server.connections and server.subscribed(server.connections[0]))
+
+    for drops in (1, 2, 3):
+        server.drop()
+        wait_until(lambda: len(server.connections) == drops + 1 and
+                   server.subscribed(server.connections[-1]))
+
+    # Backoff exponencial (0,2 s, 0,4 s) limitado a max_backoff, esperado antes de reconectar
+    assert bounds == [0.2, 0.3, 0.3]
+    gaps = [b - a for a, b in zip(server.opened_at, server.opened_at[1:])]
+    assert all(gap >= bound for gap, bound in zip(gaps, bounds))
+    assert server.subscribed(server.connections[-1]) == {'a@aggTrade', 'b@aggTrade'}
+    assert feed.stats()['reconnects'] == 3
+    feed.stop()
+
+
+def test_silent_connection_is_pinged_and_kept_alive(server, loop):
+    feed = open_feed(server, loop, stale_after=0.1, ping_timeout=1.0)
+    feed.subscribe(['a@aggTrade'])
+    wait_until(lambda: server.connections)
+
+    wait_until(lambda: server.pings.get(server.connections[0], 0) >= 2)
+    assert feed.stats()['reconnects'] == 0
+    assert len(server.connections) == 1
+    feed.stop()
+
+
+def test_connection_without_pong_is_dropped_and_reopened(server, loop):
+    feed = open_feed(server, loop, stale_after=0.1, ping_timeout=0.2)
+    feed.subscribe(['a@aggTrade'])
+    wait_until(lambda: server.connections and server.subscribed(server.connections[0]))
+
+    server.mute()
+    wait_until(lambda: len(server.connections) == 2 and server.subscribed(server.connections[1]))
+    assert feed.stats()['reconnects'] >= 1
+    feed.stop()
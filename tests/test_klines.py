@@ -0,0 +1,166 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from utils.data_fetcher import CryptoDataFetcher
+from utils.ingest import IngestLoop
+from utils.klines import KlineBackfill
+from utils.scheduler import PollScheduler, RateLimitState
+
+MINUTE_MS = 60_000
+MINUTE_NS = MINUTE_MS * 1_000_000
+START_MS = 1_700_000_040_000  # múltiplo de 1 min
+
+
+class KlinesStub:
+    """Servidor HTTP local no formato do endpoint de klines da Binance.
+
+    A vela do minuto m (desde START_MS) tem preço 100 + m, volume 10 e
+    volume comprador 4. Registra (instante, parâmetros, status) de cada
+    pedido; `rejections` recusa os próximos pedidos com 429 e Retry-After.
+    """
+
+    def __init__(self):
+        self.requests = []
+        self.rejections = []  # Retry-After (s) dos próximos pedidos recusados
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                params = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+                with stub._lock:
+                    retry_after = stub.rejections.pop(0) if stub.rejections else None
+                    stub.requests.append((time.monotonic(), params, 429 if retry_after else 200))
+                if retry_after is not None:
+                    body = json.dumps({'code': -1003, 'msg': 'Too many requests'}).encode()
+                    self.send_response(429)
+                    self.send_header('Retry-After', str(retry_after))
+                else:
+                    body = json.dumps(stub.klines(params)).encode()
+                    self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/api/v3/klines"
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+
+    @staticmethod
+    def klines(params):
+        start, end, limit = int(params['startTime']), int(params['endTime']), int(params['limit'])
+        first = -(-(start - START_MS) // MINUTE_MS)
+        rows = []
+        for minute in range(first, first + limit):
+            opened = START_MS + minute * MINUTE_MS
+            if opened > end:
+                break
+            price = str(100.0 + minute)
+            rows.append([opened, price, price, price, price, '10.0', opened + MINUTE_MS - 1,
+                         '0', 1, '4.0', '0', '0'])
+        return rows
+
+    def served(self):
+        return [(params, status) for _, params, status in self.requests]
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self._thread.join()
+
+
+@pytest.fixture
+def stub():
+    server = KlinesStub()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def loop():
+    ingest = IngestLoop()
+    yield ingest
+    ingest.stop()
+
+
+def make_fetcher(loop, rate_limit):
+    scheduler = PollScheduler(rate_limits={'binance': rate_limit})
+    return CryptoDataFetcher(scheduler=scheduler, ingest=loop)
+
+
+def backfill(stub, fetcher, symbols, minutes, limit, timeout=10.0):
+    klines = KlineBackfill(url=stub.url, limit=limit)
+    end = START_MS * 1_000_000 + minutes * MINUTE_NS - 1
+    return klines.fetch(symbols, START_MS * 1_000_000, end, fetcher.cached_get,
+                        fetcher.scheduler.rate_limit('binance'), fetcher.ingest.run_blocking,
+                        timeout=timeout)
+
+
+def test_backfill_pages_cover_the_window(stub, loop):
+    fetcher = make_fetcher(loop, RateLimitState(1200, 60))
+    candles = backfill(stub, fetcher, ['BTCUSDT', 'ETHUSDT'], minutes=25, limit=10)
+
+    # 25 velas em páginas de até 10: três pedidos por símbolo, sem sobreposição
+    windows = sorted((p['symbol'], int(p['startTime']), int(p['endTime'])) for p, _ in stub.served())
+    expected = [(START_MS, START_MS + 10 * MINUTE_MS - 1),
+                (START_MS + 10 * MINUTE_MS, START_MS + 20 * MINUTE_MS - 1),
+                (START_MS + 20 * MINUTE_MS, START_MS + 25 * MINUTE_MS - 1)]
+    assert windows == [(s, a, b) for s in ('BTCUSDT', 'ETHUSDT') for a, b in expected]
+    assert all(p['interval'] == '1m' and p['limit'] == '10' for p, _ in stub.served())
+
+    for symbol in ('BTCUSDT', 'ETHUSDT'):
+        timestamps, opens, highs, lows, closes, volumes, buys, sells = candles[symbol]
+        assert timestamps.tolist() == [(START_MS + m * MINUTE_MS) * 1_000_000 for m in range(25)]
+        assert closes.tolist() == [100.0 + m for m in range(25)]
+        assert set(buys.tolist()) == {4.0} and set(sells.tolist()) == {6.0}
+
+
+def test_backfill_pages_are_throttled_by_the_token_bucket(stub, loop):
+    # Rajada de 10 / 2 = 5 páginas, depois uma a cada 2 / 10 = 0,2 s
+    fetcher = make_fetcher(loop, RateLimitState(10, 1, safety=1.0))
+    started = time.monotonic()
+    candles = backfill(stub, fetcher, ['BTCUSDT'], minutes=10, limit=1)
+
+    arrivals = sorted(at - started for at, _, _ in stub.requests)
+    assert len(arrivals) == 10
+    assert sum(at < 0.15 for at in arrivals) == 5
+    for page, at in enumerate(arrivals[5:], start=5):
+        assert at >= 0.2 * (page - 4) - 0.02
+    assert len(candles['BTCUSDT'][0]) == 10
+
+
+def test_backfill_retries_rate_limited_page_after_retry_after(stub, loop):
+    stub.rejections = [0.5]
+    fetcher = make_fetcher(loop, RateLimitState(1200, 60))
+    candles = backfill(stub, fetcher, ['BTCUSDT'], minutes=3, limit=1)
+
+    # A página recusada volta depois do Retry-After e nenhuma vela falta
+    rejected_at, rejected, _ = next(r for r in stub.requests if r[2] == 429)
+    retried_at = next(at for at, params, status in stub.requests
+                      if status == 200 and params == rejected)
+    assert retried_at - rejected_at >= 0.5
+    assert len(stub.requests) == 4
+    assert candles['BTCUSDT'][4].tolist() == [100.0, 101.0, 102.0]
+    assert fetcher.scheduler.rate_limit('binance').blocked_for() == 0
+
+
+def test_backfill_gives_up_when_retry_after_outlasts_the_timeout(stub, loop):
+    stub.rejections = [30]
+    fetcher = make_fetcher(loop, RateLimitState(1200, 60))
+    started = time.monotonic()
+    candles = backfill(stub, fetcher, ['BTCUSDT'], minutes=1, limit=1, timeout=1.0)
+
+    assert candles == {}
+    assert time.monotonic() - started < 1.0
+    assert [status for _, status in stub.served()] == [429]
@@ -0,0 +1,138 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from utils.binance_websocket import BinanceDepthStream
+from utils.ingest import IngestLoop
+from utils.order_book import OrderBook
+
+
+def levels(prices, quantities):
+    return list(zip(prices.tolist(), quantities.tolist()))
+
+
+def book_state(book):
+    return levels(book.bid_prices, book.bid_quantities), levels(book.ask_prices, book.ask_quantities)
+
+
+def synced_book():
+    book = OrderBook('BTCUSDT')
+    book.load_snapshot(100, [['99.0', '1.0'], ['98.0', '2.0']], [['101.0', '1.5'], ['102.0', '3.0']])
+    return book
+
+
+def test_snapshot_replays_buffered_diffs_after_last_update_id():
+    book = OrderBook('BTCUSDT')
+    # Antes do snapshot tudo fica em buffer
+    assert book.on_diff(95, 99, [['97.0', '9.0']], [])
+    assert book.on_diff(100, 102, [['99.0', '0.5']], [['101.0', '0']])
+    assert book.on_diff(103, 103, [['99.5', '4.0']], [])
+    assert not book.synced
+
+    assert book.load_snapshot(100, [['99.0', '1.0'], ['98.0', '2.0']],
+                              [['101.0', '1.5'], ['102.0', '3.0']])
+    # 95-99 é anterior ao snapshot; 100-102 cobre 101 e entra; 103 segue
+    assert book_state(book) == ([(98.0, 2.0), (99.0, 0.5), (99.5, 4.0)], [(102.0, 3.0)])
+    assert book.last_update_id == 103
+    assert (book.best_bid(), book.best_ask()) == (99.5, 102.0)
+
+
+def test_diffs_update_insert_and_remove_levels_in_sequence():
+    book = synced_book()
+    assert book.on_diff(101, 101, [['98.0', '0'], ['97.5', '1.0']], [['101.0', '2.5']])
+    assert book.on_diff(102, 104, [], [['100.5', '0.1'], ['102.0', '0']])
+    assert book_state(book) == ([(97.5, 1.0), (99.0, 1.0)], [(100.5, 0.1), (101.0, 2.5)])
+    # Evento repetido (u <= lastUpdateId) é ignorado
+    assert book.on_diff(103, 104, [['99.0', '0']], [])
+    assert book.best_bid() == 99.0
+    assert book.updates_applied == 2
+
+
+def test_sequence_gap_forces_resync():
+    book = synced_book()
+    assert not book.on_diff(105, 106, [['99.0', '5.0']], [])
+    assert not book.synced
+    assert book.on_diff(107, 108, [['98.0', '0']], [])  # em buffer até o snapshot
+
+    assert book.load_snapshot(104, [['99.0', '1.0'], ['98.0', '2.0']], [['101.0', '1.5']])
+    assert book_state(book) == ([(99.0, 5.0)], [(101.0, 1.5)])
+    assert book.last_update_id == 108
+
+
+def test_snapshot_older_than_buffer_keeps_every_buffered_diff():
+    book = synced_book()
+    assert not book.on_diff(110, 110, [['99.0', '5.0']], [])
+    assert book.on_diff(111, 111, [['98.0', '0']], [])
+
+    # Snapshot ainda anterior à lacuna: nada se perde, falta outro snapshot
+    assert not book.load_snapshot(105, [['99.0', '1.0'], ['98.0', '2.0']], [])
+    assert not book.synced
+    assert book.load_snapshot(109, [['99.0', '1.0'], ['98.0', '2.0']], [])
+    assert book_state(book) == ([(99.0, 5.0)], [])
+    assert book.last_update_id == 111
+
+
+class DepthStub:
+    """Endpoint REST de profundidade local que serve os snapshots na ordem dada"""
+
+    def __init__(self, snapshots):
+        self.snapshots = list(snapshots)
+        self.served = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                snapshot = stub.snapshots[min(stub.served, len(stub.snapshots) - 1)]
+                stub.served += 1
+                body = json.dumps(snapshot).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/api/v3/depth"
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self._thread.join()
+
+
+@pytest.fixture
+def loop():
+    ingest = IngestLoop()
+    yield ingest
+    ingest.stop()
+
+
+def test_depth_stream_refetches_until_snapshot_covers_the_gap(loop):
+    stub = DepthStub([
+        {'lastUpdateId': 100, 'bids': [['99.0', '1.0']], 'asks': [['101.0', '1.0']]},
+        {'lastUpdateId': 120, 'bids': [['99.0', '2.0']], 'asks': [['101.0', '1.0']]},
+    ])
+    stream = BinanceDepthStream(rest_url=stub.url, ingest=loop)
+    book = stream.order_books['BTCUSDT'] = OrderBook('BTCUSDT')
+    book.load_snapshot(90, [], [])
+    try:
+        # Lacuna: o primeiro snapshot (100) ainda é anterior ao evento 115
+        stream.on_message('btcusdt@depth@100ms',
+                          {'s': 'BTCUSDT', 'U': 115, 'u': 121, 'b': [['99.0', '3.0']], 'a': []})
+        deadline = time.monotonic() + 5
+        while not book.synced and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert book.synced
+        assert stub.served == 2
+        assert book_state(book) == ([(99.0, 3.0)], [(101.0, 1.0)])
+        assert book.last_update_id == 121
+    finally:
+        stub.close()
@@ -0,0 +1,58 @@
+import numpy as np
+
+from utils.records import LineSeries, OHLCSeries
+
+MINUTE = 60_000_000_000
+
+
+def test_column_buffer_keeps_last_rows_contiguous():
+    """Depois de várias voltas do buffer as colunas são as últimas `capacity` linhas"""
+    series = LineSeries(capacity=5)
+    for i in range(23):
+        series.append(i, float(i))
+    assert len(series) == 5
+    assert series.total_rows == 23
+    assert series['timestamps'].tolist() == [18, 19, 20, 21, 22]
+    assert series['prices'].tolist() == [18.0, 19.0, 20.0, 21.0, 22.0]
+
+
+def test_column_buffer_version_changes_on_every_write():
+    series = OHLCSeries(capacity=3)
+    versions = [series.version]
+    series.open_candle(0, 10.0)
+    versions.append(series.version)
+    series.update_candle(11.0)
+    versions.append(series.version)
+    series.clear()
+    versions.append(series.version)
+    assert len(set(versions)) == len(versions)
+    # Séries distintas nunca compartilham versão (chave do cache de figuras)
+    assert OHLCSeries(capacity=3).version not in versions
+
+
+def test_fill_gap_creates_flat_candles_across_wraparound():
+    series = OHLCSeries(capacity=4)
+    series.open_candle(0, 100.0)
+    series.update_candle(105.0)
+    assert series.fill_gap(10 * MINUTE, MINUTE) == 4  # lacuna de 9 maior que a capacidade
+    assert series['timestamps'].tolist() == [6 * MINUTE, 7 * MINUTE, 8 * MINUTE, 9 * MINUTE]
+    assert np.all(series['open'] == 105.0) and np.all(series['volume'] == 0.0)
+    assert series.total_rows == 5
+
+
+def test_merge_candles_merges_open_bucket_and_skips_older():
+    series = OHLCSeries(capacity=10)
+    series.open_candle(MINUTE, 10.0, 1.0)
+    ones = np.ones(3)
+    series.merge_candles(
+        np.array([0, MINUTE, 3 * MINUTE]),
+        np.array([9.0, 10.5, 12.0]), np.array([9.0, 13.0, 12.5]),
+        np.array([9.0, 8.0, 11.5]), np.array([9.0, 11.0, 12.2]),
+        ones, ones * 0.5, ones * 0.5, interval_ns=MINUTE
+    )
+    assert series['timestamps'].tolist() == [MINUTE, 2 * MINUTE, 3 * MINUTE]
+    assert series['high'][0] == 13.0 and series['low'][0] == 8.0 and series['close'][0] == 11.0
+    assert series['volume'][0] == 2.0
+    # Bucket vazio preenchido com o fechamento anterior
+    assert series['open'][1] == 11.0 and series['volume'][1] == 0.0
+    assert series['close'][2] == 12.2
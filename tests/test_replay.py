@@ -0,0 +1,112 @@
+import time
+
+import numpy as np
+import pytest
+
+from utils.replay import ReplaySource, TickFile
+
+SECOND = 1_000_000_000
+T0 = 1_700_000_000 * SECOND
+ROWS = 50
+BLOCK_ROWS = 7
+
+
+@pytest.fixture(params=['ticks.csv', 'ticks.parquet'])
+def ticks(request, tmp_path):
+    """Arquivo de ticks (CSV e Parquet) em blocos de 7 linhas e as colunas gravadas"""
+    symbols = np.array(['BTCUSDT', 'ETHUSDT'] * (ROWS // 2), dtype=object)
+    timestamps = T0 + np.arange(ROWS, dtype=np.int64) * SECOND
+    prices = 100.0 + np.arange(ROWS)
+    changes = np.arange(ROWS) / 4 - 5.0
+    volumes = np.arange(ROWS) * 10.0
+    path = str(tmp_path / request.param)
+    TickFile.write(path, symbols, timestamps, prices, changes, volumes, block_rows=BLOCK_ROWS)
+    return TickFile(path, block_rows=BLOCK_ROWS), (symbols, timestamps, prices, changes, volumes)
+
+
+def concat(batches):
+    return tuple(np.concatenate(column) for column in zip(*batches))
+
+
+def test_index_holds_first_timestamp_of_each_block(ticks):
+    tick_file, (symbols, timestamps, *_) = ticks
+    assert tick_file.rows == ROWS
+    assert len(tick_file.blocks) == -(-ROWS // BLOCK_ROWS)
+    assert tick_file.block_times.tolist() == timestamps[::BLOCK_ROWS].tolist()
+    assert (tick_file.start, tick_file.end) == (timestamps[0], timestamps[-1])
+    assert tick_file.symbols == ['BTCUSDT', 'ETHUSDT']
+
+
+@pytest.mark.parametrize('offset', [-5 * SECOND, 0, 14 * SECOND, 30 * SECOND, 30 * SECOND + 1,
+                                    49 * SECOND, 60 * SECOND])
+def test_read_from_round_trips_ticks_at_or_after_timestamp(ticks, offset):
+    tick_file, columns = ticks
+    keep = columns[1] >= T0 + offset
+    read = list(tick_file.read_from(T0 + offset))
+    if not keep.any():
+        assert not sum(len(block[1]) for block in read)
+        return
+    for got, wrote in zip(concat(read), columns):
+        assert got.tolist() == wrote[keep].tolist()
+
+
+def test_read_from_starts_at_the_indexed_block(ticks, monkeypatch):
+    tick_file, _ = ticks
+    read_blocks = []
+    read_block = tick_file._read_block
+    monkeypatch.setattr(tick_file, '_read_block',
+                        lambda block: read_blocks.append(block) or read_block(block))
+
+    first = next(tick_file.read_from(T0 + 30 * SECOND))
+    # Tick 30 está no bloco 4 (linhas 28-34): os anteriores não são lidos
+    assert read_blocks == [tick_file.blocks[4]]
+    assert first[1][0] == T0 + 30 * SECOND
+
+
+def test_csv_index_parses_iso_timestamps(tmp_path):
+    path = tmp_path / 'iso.csv'
+    path.write_text('timestamp,symbol,price\n'
+                    '2024-01-01T00:00:00Z,BTCUSDT,1.0\n'
+                    '2024-01-01T00:00:01.5Z,BTCUSDT,2.0\n'
+                    '2024-01-01T00:00:03Z,BTCUSDT,3.0\n')
+    tick_file = TickFile(str(path), block_rows=2)
+    start = 1_704_067_200 * SECOND
+    assert tick_file.block_times.tolist() == [start, start + 3 * SECOND]
+    assert tick_file.end == start + 3 * SECOND
+    assert concat(tick_file.read_from(start + SECOND))[1].tolist() == [start + 1_500_000_000,
+                                                                       start + 3 * SECOND]
+
+
+def test_replay_at_full_speed_delivers_every_tick_in_order(ticks):
+    tick_file, columns = ticks
+    replay = ReplaySource(tick_file, speed=None, max_rows=5)
+    batches = []
+    while (batch := replay.next_batch()) is not None:
+        assert len(batch) <= 5
+        batches.append((batch.symbols, batch.timestamps, batch.prices, batch.changes, batch.volumes))
+    assert replay.finished
+    for got, wrote in zip(concat(batches), columns):
+        assert got.tolist() == wrote.tolist()
+    assert replay.now() == tick_file.end
+
+
+def test_replay_seek_with_warmup_and_symbol_filter(ticks):
+    tick_file, (symbols, timestamps, *_) = ticks
+    replay = ReplaySource(tick_file, speed=None, symbols=['ETHUSDT'], max_rows=ROWS)
+    replay.seek(T0 + 20 * SECOND, warmup_ns=4 * SECOND)
+    batch = replay.next_batch()
+
+    keep = (timestamps >= T0 + 16 * SECOND) & (symbols == 'ETHUSDT')
+    assert batch.timestamps.tolist() == timestamps[keep].tolist()
+    assert set(batch.symbols) == {'ETHUSDT'}
+
+
+def test_paused_replay_holds_its_clock(ticks):
+    tick_file, _ = ticks
+    replay = ReplaySource(tick_file, speed=1000.0)
+    replay.pause()
+    held = replay.now()
+    time.sleep(0.05)  # 50 s de replay se não estivesse pausado
+    batch = replay.next_batch()
+    assert replay.now() == held
+    assert batch.timestamps.tolist() == [t for t in range(T0, held + 1, SECOND)]
@@ -0,0 +1,111 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from utils import response_cache as response_cache_module
+from utils.response_cache import ResponseCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Relógio monotônico controlado pelo teste (só no módulo do cache)"""
+    now = SimpleNamespace(value=100.0)
+    monkeypatch.setattr(response_cache_module, 'time', SimpleNamespace(monotonic=lambda: now.value))
+    return now
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("condição não atingida a tempo")
+        time.sleep(0.001)
+
+
+class Upstream:
+    """Função de busca que conta as chamadas e pode ficar presa até `release`"""
+
+    def __init__(self, blocked=False, name='resposta'):
+        self.name = name
+        self.calls = 0
+        self.started = threading.Event()
+        self.release = threading.Event()
+        if not blocked:
+            self.release.set()
+
+    def __call__(self):
+        self.calls += 1
+        self.started.set()
+        self.release.wait(5)
+        return f"{self.name} {self.calls}"
+
+
+def test_entries_expire_after_ttl_plus_max_stale(clock):
+    cache = ResponseCache(ttl=1.0, max_stale=5.0)
+    fetch = Upstream()
+    assert cache.get('k', fetch) == 'resposta 1'
+
+    clock.value += 0.9
+    assert cache.get('k', fetch) == 'resposta 1'
+    assert fetch.calls == 1
+
+    # Passou de ttl + max_stale: miss, busca de forma síncrona
+    clock.value += 6.0
+    assert cache.get('k', fetch) == 'resposta 2'
+    assert cache.stats()['misses'] == 2 and cache.stats()['hits'] == 1
+
+
+def test_stale_entry_is_served_while_one_revalidation_runs(clock):
+    cache = ResponseCache(ttl=1.0, max_stale=5.0)
+    cache.get('k', Upstream())
+
+    clock.value += 2.0
+    fetch = Upstream(blocked=True, name='nova')
+    # Entrega o valor antigo sem esperar a revalidação em segundo plano
+    assert cache.get('k', fetch) == 'resposta 1'
+    assert fetch.started.wait(5)
+    assert cache.get('k', fetch) == 'resposta 1'
+    assert fetch.calls == 1
+
+    # Concluída a revalidação, a resposta nova é servida como fresca
+    fetch.release.set()
+    wait_until(lambda: not cache._inflight)
+    assert cache.get('k', fetch) == 'nova 1'
+    assert fetch.calls == 1
+    stats = cache.stats()
+    assert (stats['stale_hits'], stats['revalidations'], stats['hits']) == (2, 1, 1)
+
+
+def test_concurrent_misses_share_one_upstream_call(clock):
+    cache = ResponseCache(ttl=1.0, max_stale=5.0)
+    fetch = Upstream(blocked=True)
+    results = []
+
+    def call():
+        results.append(cache.get('k', fetch))
+    threads = [threading.Thread(target=call) for _ in range(8)]
+    threads[0].start()
+    assert fetch.started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    wait_until(lambda: cache.stats()['coalesced'] == 7)
+
+    fetch.release.set()
+    for thread in threads:
+        thread.join(5)
+    assert results == ['resposta 1'] * 8
+    assert fetch.calls == 1
+    assert cache.stats()['coalesced'] == 7
+
+
+def test_errors_reach_every_waiter_and_are_not_cached(clock):
+    cache = ResponseCache(ttl=1.0, max_stale=5.0)
+
+    def failing():
+        raise ConnectionError("upstream fora")
+    with pytest.raises(ConnectionError):
+        cache.get('k', failing)
+    assert cache.stats()['errors'] == 1 and cache.stats()['entries'] == 0
+    assert cache.get('k', Upstream()) == 'resposta 1'
@@ -0,0 +1,108 @@
+import numpy as np
+
+from utils.compressed import CompressedLineSeries
+from utils.records import OHLCSeries
+from utils.retention import (HOUR_NS, MINUTE_NS, RetentionManager, RetentionPolicy,
+                             TieredHistory, resample_candles, row_bytes)
+
+SECOND = 1_000_000_000
+
+
+def test_quotes_are_downsampled_into_minute_and_hour_tiers():
+    history = TieredHistory(raw_capacity=50, minute_capacity=200, hour_capacity=10)
+    # Uma cotação a cada 30 s durante 2 h: preço sobe 1 por cotação
+    for i in range(240):
+        history.add_quote(i * 30 * SECOND, 100.0 + i)
+
+    # Os ticks antigos saíram da camada bruta, mas as agregadas cobrem o período
+    assert len(history.ticks) == 50
+    assert history.ticks['prices'][0] == 100.0 + 190
+    minutes, hours = history.minutes, history.hours
+    assert len(minutes) == 120 and len(hours) == 2
+    np.testing.assert_array_equal(minutes['timestamps'], np.arange(120) * MINUTE_NS)
+    np.testing.assert_array_equal(minutes['open'], 100.0 + 2 * np.arange(120))
+    np.testing.assert_array_equal(minutes['close'], 101.0 + 2 * np.arange(120))
+    np.testing.assert_array_equal(hours['open'], [100.0, 220.0])
+    np.testing.assert_array_equal(hours['high'], [219.0, 339.0])
+    np.testing.assert_array_equal(hours['low'], [100.0, 220.0])
+
+
+def test_resampled_minutes_match_the_hour_tier():
+    history = TieredHistory(raw_capacity=10, minute_capacity=500, hour_capacity=10)
+    rng = np.random.default_rng(5)
+    prices = 100.0 + np.cumsum(rng.normal(0, 0.5, 3 * 60 * 4))
+    for i, price in enumerate(prices):
+        history.add_quote(i * 15 * SECOND, price)
+
+    hours = OHLCSeries(10)
+    hours.merge_candles(*resample_candles(history.minutes, HOUR_NS))
+    for name in ('timestamps', 'open', 'high', 'low', 'close'):
+        np.testing.assert_array_equal(hours[name], history.hours[name])
+
+    # `before` deixa de fora as velas a partir do corte
+    starts = resample_candles(history.minutes, 5 * MINUTE_NS, before=30 * MINUTE_NS)[0]
+    np.testing.assert_array_equal(starts, np.arange(6) * 5 * MINUTE_NS)
+    assert resample_candles(history.minutes, HOUR_NS, before=0) is None
+
+
+def test_budget_scales_only_the_history_tiers():
+    policy = RetentionPolicy()
+    manager = RetentionManager(policy, memory_budget=None)
+    assert manager.fit(10) == policy.capacities
+
+    per_symbol = sum(policy.capacities[s] * row_bytes(s) for s in policy.capacities)
+    manager = RetentionManager(policy, memory_budget=per_symbol * 4)
+    assert manager.fit(4) == policy.capacities
+
+    capacities = manager.fit(8)
+    for store in ('ohlc', 'renko', 'point', 'line'):
+        assert capacities[store] == policy.capacities[store]
+    for store in ('raw', 'minute', 'hour', 'line_history'):
+        assert capacities[store] < policy.capacities[store]
+    used = sum(capacities[s] * row_bytes(s) for s in capacities)
+    assert used <= per_symbol / 2
+
+    # Orçamento que não cobre nem as visões: camadas no mínimo de 16 linhas
+    tiny = RetentionManager(policy, memory_budget=1000).fit(8)
+    assert [tiny[s] for s in ('raw', 'minute', 'hour', 'line_history')] == [16] * 4
+
+
+def test_fit_shrinks_existing_histories_keeping_recent_rows():
+    policy = RetentionPolicy(raw=400, minute=400, hour=400, line_history=4000)
+    per_symbol = sum(policy.capacities[s] * row_bytes(s) for s in policy.capacities)
+    manager = RetentionManager(policy, memory_budget=per_symbol)
+    manager.fit(1)
+
+    history = manager.new_history()
+    line = CompressedLineSeries(capacity=policy.capacities['line'], block_size=64,
+                                max_rows=manager.capacity('line_history'))
+    for i in range(400):
+        history.add_quote(i * 60 * SECOND, float(i))
+    for i in range(4000):
+        line.append(i, float(i))
+    version = line.version
+
+    # Mais símbolos no mesmo orçamento: as camadas existentes encolhem
+    capacities = manager.fit(4, {'BTCUSDT': history}, {'BTCUSDT': line})
+    for series, store in ((history.ticks, 'raw'), (history.minutes, 'minute')):
+        assert series.capacity == capacities[store] < 400
+        assert len(series) == capacities[store]
+        assert series['timestamps'][-1] == 399 * 60 * SECOND
+    assert history.ticks['prices'][0] == 400 - capacities['raw']
+    assert history.nbytes()['raw'] == capacities['raw'] * row_bytes('raw')
+
+    assert line.max_rows == capacities['line_history']
+    assert line.rows < 4000 and line.version != version
+    timestamps, prices = line.range()
+    assert timestamps[-1] == 3999 and len(timestamps) == line.rows
+    np.testing.assert_array_equal(line['prices'], np.arange(4000 - policy.capacities['line'], 4000))
+
+    # As séries redimensionadas continuam recebendo dados normalmente
+    history.add_quote(400 * 60 * SECOND, 400.0)
+    assert history.minutes['close'][-1] == 400.0
+    assert len(history.minutes) == capacities['minute']
+
+    # Orçamento de volta ao original: capacidade cresce, linhas retidas permanecem
+    manager.fit(1, {'BTCUSDT': history})
+    assert history.ticks.capacity == 400
+    assert history.ticks['prices'][-1] == 400.0
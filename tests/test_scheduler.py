@@ -0,0 +1,48 @@
+from utils.scheduler import PollScheduler, ViewerRegistry
+
+
+def test_failed_symbols_back_off_until_polled():
+    scheduler = PollScheduler(min_interval=5.0, max_backoff=30.0)
+    delays = []
+    for _ in range(5):
+        scheduler.mark_failed(['BTCUSDT'], now=0.0)
+        delays.append(scheduler.seconds_until_next(['BTCUSDT'], now=0.0))
+    assert delays == [5.0, 10.0, 20.0, 30.0, 30.0]
+
+    # Retry-After maior que o backoff prevalece
+    scheduler.mark_failed(['ETHUSDT'], retry_after=45.0, now=0.0)
+    assert scheduler.seconds_until_next(['ETHUSDT'], now=0.0) == 45.0
+
+    # Uma consulta atendida zera a sequência de falhas
+    scheduler.mark_polled(['BTCUSDT'], now=0.0)
+    scheduler.mark_failed(['BTCUSDT'], now=0.0)
+    assert scheduler.seconds_until_next(['BTCUSDT'], now=0.0) == 5.0
+
+
+def test_symbols_without_viewers_poll_at_the_idle_interval():
+    viewers = ViewerRegistry()
+    scheduler = PollScheduler(viewers=viewers, min_interval=5.0, idle_interval=60.0)
+    symbols = ['BTCUSDT', 'ETHUSDT', 'SOLUSDT']
+
+    # Nenhuma sessão aberta (modo headless): tudo no intervalo ocioso
+    assert scheduler.plan('binance', symbols) == {s: 60.0 for s in symbols}
+
+    viewers.heartbeat('a', ['BTCUSDT', 'ETHUSDT'])
+    viewers.heartbeat('b', ['BTCUSDT'])
+    intervals = scheduler.plan('binance', symbols)
+    assert intervals['BTCUSDT'] == 5.0
+    assert 5.0 < intervals['ETHUSDT'] < 60.0
+    assert intervals['SOLUSDT'] == 60.0
+
+    scheduler.mark_polled(symbols, now=0.0)
+    assert scheduler.due_symbols('binance', symbols, now=6.0) == ['BTCUSDT']
+
+    # Sessão que sai deixa os símbolos dela ociosos
+    viewers.leave('a')
+    viewers.leave('b')
+    assert scheduler.plan('binance', ['BTCUSDT'])['BTCUSDT'] == 60.0
+
+
+def test_without_a_viewer_registry_every_symbol_is_watched():
+    scheduler = PollScheduler(min_interval=5.0, idle_interval=60.0)
+    assert scheduler.plan('binance', ['BTCUSDT', 'ETHUSDT']) == {'BTCUSDT': 5.0, 'ETHUSDT': 5.0}
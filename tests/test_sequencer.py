@@ -0,0 +1,45 @@
+from utils.providers import TickBatch
+from utils.sequencer import QuoteSequencer
+
+SECOND = 1_000_000_000
+
+
+def batch(*rows):
+    return TickBatch.from_rows([(symbol, ts, price, 0.0, 0.0) for symbol, ts, price in rows])
+
+
+def test_repeated_quotes_are_dropped():
+    sequencer = QuoteSequencer(window_seconds=0)
+    sequencer.push(batch(('BTCUSDT', 10, 1.0), ('BTCUSDT', 10, 1.0)))
+    released = sequencer.release(flush=True)
+    # Mesmo instante de novo depois de liberado: resposta repetida do provedor
+    sequencer.push(batch(('BTCUSDT', 10, 1.0)))
+    assert sequencer.release(flush=True) is None
+    assert len(released) == 1
+    assert sequencer.stats()['duplicates'] == 2
+    assert sequencer.duplicates['BTCUSDT'] == 2
+
+
+def test_release_orders_by_source_timestamp():
+    sequencer = QuoteSequencer(window_seconds=0)
+    sequencer.push(batch(('BTCUSDT', 30, 3.0), ('ETHUSDT', 20, 2.0)))
+    sequencer.push(batch(('BTCUSDT', 10, 1.0)))
+    released = sequencer.release(flush=True)
+    assert released.timestamps.tolist() == [10, 20, 30]
+    assert released.symbols == ['BTCUSDT', 'ETHUSDT', 'BTCUSDT']
+    assert sequencer.stats()['reordered'] == 1
+
+
+def test_window_holds_recent_quotes_and_drops_late_ones():
+    sequencer = QuoteSequencer(window_seconds=2)
+    sequencer.push(batch(('BTCUSDT', 1 * SECOND, 1.0), ('BTCUSDT', 5 * SECOND, 2.0)))
+    released = sequencer.release(now=4 * SECOND)
+    assert released.timestamps.tolist() == [1 * SECOND]
+    # Chega atrasada, mas ainda dentro da janela: entra na ordem
+    sequencer.push(batch(('BTCUSDT', 4 * SECOND, 1.5)))
+    # Mais antiga que a última liberada: descartada
+    sequencer.push(batch(('BTCUSDT', SECOND // 2, 0.5)))
+    released = sequencer.release(now=10 * SECOND)
+    assert released.timestamps.tolist() == [4 * SECOND, 5 * SECOND]
+    stats = sequencer.stats()
+    assert stats['late'] == 1 and stats['pending'] == 0 and stats['applied'] == 3
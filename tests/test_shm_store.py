@@ -0,0 +1,151 @@
+import uuid
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from utils.alerts import CLOSE_ABOVE, PF_NEW_COLUMN, RENKO_REVERSAL
+from utils.records import (DOWN, MARKER_O, MARKER_X, UP, LineSeries, OHLCSeries, PointSeries,
+                           Quote, RenkoSeries)
+from utils.shm_store import HEADER_FIELDS, SharedMarketReader, SharedMarketWriter
+from utils.transforms import RangeBars
+
+CAPACITIES = {'ohlc': 4, 'renko': 4, 'point': 4, 'line': 4}
+
+
+@pytest.fixture
+def segment():
+    fetcher = SimpleNamespace(price_data={}, ohlc_data={}, renko_data={}, point_data={},
+                              historical_data={}, closed_until={})
+    fetcher.price_data['BTCUSDT'] = Quote(101.0, 1.5, 10.0, 123)
+    ohlc = fetcher.ohlc_data['BTCUSDT'] = OHLCSeries(capacity=4)
+    for i in range(6):
+        ohlc.open_candle(i, 100.0 + i)
+    renko = fetcher.renko_data['BTCUSDT'] = RenkoSeries(capacity=4)
+    renko.add_brick(1, 100.0, 101.0, UP)
+    line = fetcher.historical_data['BTCUSDT'] = LineSeries(capacity=4)
+    line.append(123, 101.0)
+
+    name = f"test_{uuid.uuid4().hex[:12]}"
+    writer = SharedMarketWriter(name, ['BTCUSDT', 'ETHUSDT'], CAPACITIES)
+    reader = SharedMarketReader(name, max_retries=3)
+    yield fetcher, writer, reader
+    reader.close()
+    writer.close()
+
+
+def test_reader_sees_published_series(segment):
+    fetcher, writer, reader = segment
+    writer.publish(fetcher, 999)
+    assert reader.start_fetching(['BTCUSDT', 'ETHUSDT'])
+    assert reader.published_ns == 999
+    assert reader.price_data['BTCUSDT'].price == 101.0
+    # Símbolo sem cotação publicada fica de fora
+    assert 'ETHUSDT' not in reader.price_data
+    ohlc = reader.ohlc_data['BTCUSDT']
+    assert np.array_equal(ohlc['timestamps'], fetcher.ohlc_data['BTCUSDT']['timestamps'])
+    assert ohlc.version == fetcher.ohlc_data['BTCUSDT'].version
+    assert reader.renko_data['BTCUSDT']['close'].tolist() == [101.0]
+    assert len(reader.point_data['BTCUSDT']) == 0
+
+
+def test_reader_refuses_torn_snapshot(segment):
+    """Com a escrita em andamento (seq ímpar) o leitor não aplica o snapshot"""
+    fetcher, writer, reader = segment
+    writer.publish(fetcher, 1)
+    assert reader.start_fetching(['BTCUSDT'])
+    seq = HEADER_FIELDS.index('seq')
+    writer.header[seq] += 1
+    fetcher.price_data['BTCUSDT'].update(200.0, 0.0, 0.0, 456)
+    assert not reader.refresh()
+    assert reader.price_data['BTCUSDT'].price == 101.0
+    writer.header[seq] += 1
+    writer.publish(fetcher, 2)
+    assert reader.refresh()
+    assert reader.price_data['BTCUSDT'].price == 200.0
+
+
+def test_reader_selects_published_cross_pairs():
+    fetcher = SimpleNamespace(price_data={'ETH/BTC': Quote(0.05, 0.0, 0.0, 7)}, ohlc_data={},
+                              renko_data={}, point_data={}, historical_data={}, closed_until={})
+    name = f"test_{uuid.uuid4().hex[:12]}"
+    writer = SharedMarketWriter(name, ['BTCUSDT', 'ETHUSDT', 'ETH/BTC'], CAPACITIES)
+    reader = SharedMarketReader(name, max_retries=3)
+    try:
+        writer.publish(fetcher, 1)
+        assert reader.start_fetching(['BTCUSDT', 'ETHUSDT'], cross_pairs=['ETH/BTC', 'BTC/ETH'])
+        assert reader.pairs == ['ETH/BTC']
+        assert reader.price_data['ETH/BTC'].price == 0.05
+    finally:
+        reader.close()
+        writer.close()
+
+
+def test_unchanged_series_are_not_copied_again(segment):
+    fetcher, writer, reader = segment
+    writer.publish(fetcher, 1)
+    assert reader.start_fetching(['BTCUSDT'])
+    ohlc, renko = reader.ohlc_data['BTCUSDT'], reader.renko_data['BTCUSDT']
+    # Cópias somente leitura, fora do segmento compartilhado
+    assert not ohlc['close'].flags.writeable
+    assert not np.shares_memory(ohlc['close'], writer.blocks)
+
+    assert reader.refresh()
+    assert reader.ohlc_data['BTCUSDT'] is ohlc
+
+    fetcher.renko_data['BTCUSDT'].add_brick(2, 101.0, 102.0, UP)
+    writer.publish(fetcher, 2)
+    assert reader.refresh()
+    assert reader.ohlc_data['BTCUSDT'] is ohlc
+    assert reader.renko_data['BTCUSDT'] is not renko
+    assert reader.renko_data['BTCUSDT']['close'].tolist() == [101.0, 102.0]
+
+
+def test_reader_fires_event_alerts_from_new_rows(segment):
+    fetcher, writer, reader = segment
+    fetcher.point_data['BTCUSDT'] = points = PointSeries(capacity=4)
+    points.add_point(100.0, MARKER_X)
+    fetcher.closed_until['BTCUSDT'] = 5
+    writer.publish(fetcher, 1)
+    assert reader.start_fetching(['BTCUSDT'])
+    for kind in (RENKO_REVERSAL, PF_NEW_COLUMN, CLOSE_ABOVE):
+        reader.alerts.add_alert('BTCUSDT', kind, value=100.0 if kind == CLOSE_ABOVE else None)
+
+    fetcher.renko_data['BTCUSDT'].add_brick(2, 101.0, 100.0, DOWN)
+    points.column += 1
+    points.add_point(99.0, MARKER_O)
+    fetcher.ohlc_data['BTCUSDT'].update_candle(110.0, 1.0)
+    fetcher.closed_until['BTCUSDT'] = 6  # a vela aberta (5) terminou
+    writer.publish(fetcher, 2)
+    assert reader.refresh()
+
+    messages = [n.message for n in reader.alerts.drain()]
+    assert len(messages) == 3
+    assert 'reversão Renko para baixa' in messages[0]
+    assert 'nova coluna O' in messages[1]
+    assert 'vela fechou em $110' in messages[2]
+
+    # Sem linhas novas, nada dispara de novo
+    writer.publish(fetcher, 3)
+    assert reader.refresh() and not reader.alerts.drain()
+
+
+def test_reader_builds_transforms_from_published_ticks(segment):
+    fetcher, writer, reader = segment
+    line = fetcher.historical_data['BTCUSDT']
+    writer.publish(fetcher, 1)
+    assert reader.start_fetching(['BTCUSDT'])
+    series = reader.get_transform_data('range', range_size=2.0)['BTCUSDT']
+
+    expected = RangeBars(capacity=CAPACITIES['ohlc'], range_size=2.0)
+    expected.update(123, 101.0)
+    for timestamp, price in ((200, 102.5), (300, 104.0), (400, 99.0)):
+        line.append(timestamp, price)
+        expected.update(timestamp, price)
+        writer.publish(fetcher, timestamp)
+        assert reader.refresh()
+
+    series = reader.get_transform_data('range', range_size=2.0)['BTCUSDT']
+    for name, _ in expected.series.fields:
+        assert series[name].tolist() == expected.series[name].tolist()
+    assert len(series) > 1
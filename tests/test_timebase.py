@@ -0,0 +1,48 @@
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from utils import timebase
+from utils.timebase import (NS_PER_SECOND, bucket_start_ns, now_ns, parse_iso_ns,
+                            seconds_to_ns, to_datetime)
+
+
+def test_now_ns_is_anchored_to_wall_clock():
+    assert abs(now_ns() - time.time_ns()) < NS_PER_SECOND
+
+
+def test_now_ns_never_goes_back_when_wall_clock_does(monkeypatch):
+    """Ajustes do relógio de parede (NTP) não afetam o relógio já ancorado"""
+    before = now_ns()
+    monkeypatch.setattr(timebase.time, 'time_ns', lambda: 0)
+    readings = [now_ns() for _ in range(1000)]
+    assert readings[0] >= before
+    assert all(b >= a for a, b in zip(readings, readings[1:]))
+
+
+def test_now_ns_follows_monotonic_clock(monkeypatch):
+    anchor = timebase._MONOTONIC_ANCHOR_NS
+    monkeypatch.setattr(timebase.time, 'monotonic_ns', lambda: anchor + 5 * NS_PER_SECOND)
+    assert now_ns() == timebase._EPOCH_ANCHOR_NS + 5 * NS_PER_SECOND
+
+
+def test_integer_conversions():
+    assert seconds_to_ns(1.5) == 1_500_000_000
+    assert bucket_start_ns(125 * NS_PER_SECOND + 7, 60 * NS_PER_SECOND) == 120 * NS_PER_SECOND
+    assert parse_iso_ns('1970-01-01T00:00:01.000000123Z') == NS_PER_SECOND + 123
+
+
+def test_to_datetime_applies_local_offset(monkeypatch):
+    monkeypatch.setattr(timebase, '_local_offset_ns', lambda: 3 * 3600 * NS_PER_SECOND)
+    timestamp = parse_iso_ns('2024-01-01T00:00:00.5Z')
+    assert to_datetime(timestamp) == pd.Timestamp('2024-01-01 03:00:00.5')
+    converted = to_datetime(np.array([timestamp, timestamp + NS_PER_SECOND]))
+    assert list(converted) == [pd.Timestamp('2024-01-01 03:00:00.5'),
+                               pd.Timestamp('2024-01-01 03:00:01.5')]
+
+
+def test_to_datetime_uses_system_timezone():
+    offset = datetime.now().astimezone().utcoffset()
+    assert to_datetime(0) - pd.Timestamp(0, unit='ns') == pd.Timedelta(offset)
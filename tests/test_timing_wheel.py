@@ -0,0 +1,49 @@
+import numpy as np
+
+from utils.timing_wheel import TimingWheel
+
+TICK = 1_000
+
+
+def test_timers_expire_once_in_deadline_order():
+    """Prazos em todos os níveis saem uma única vez, em ordem e nunca antes do prazo"""
+    rng = np.random.default_rng(4)
+    wheel = TimingWheel(tick_ns=TICK, sizes=(8, 4, 4))
+    deadlines = {f"k{i}": int(d) for i, d in enumerate(rng.integers(1, 500 * TICK, 300))}
+    for key, deadline in deadlines.items():
+        wheel.schedule(key, deadline)
+
+    fired = []
+    now = 0
+    while now < 600 * TICK:
+        now += int(rng.integers(1, 40 * TICK))
+        expired = wheel.advance(now)
+        assert [d for d, _ in expired] == sorted(d for d, _ in expired)
+        assert all(deadline <= now for deadline, _ in expired)
+        fired.extend(expired)
+    assert sorted(fired) == sorted((d, k) for k, d in deadlines.items())
+    assert len(wheel) == 0
+
+
+def test_reschedule_replaces_and_cancel_removes():
+    wheel = TimingWheel(tick_ns=TICK, sizes=(8, 4))
+    wheel.schedule('a', 5 * TICK)
+    wheel.schedule('a', 50 * TICK)
+    wheel.schedule('b', 6 * TICK)
+    wheel.cancel('b')
+    assert 'b' not in wheel
+    assert wheel.advance(10 * TICK) == []
+    assert wheel.advance(50 * TICK) == [(50 * TICK, 'a')]
+
+
+def test_past_deadline_expires_on_next_advance():
+    wheel = TimingWheel(tick_ns=TICK, start_ns=100 * TICK)
+    wheel.schedule('late', 90 * TICK)
+    assert wheel.advance(100 * TICK) == [(90 * TICK, 'late')]
+
+
+def test_deadline_is_not_rounded_down():
+    wheel = TimingWheel(tick_ns=TICK)
+    wheel.schedule('x', 10 * TICK + 1)
+    assert wheel.advance(10 * TICK) == []
+    assert wheel.advance(11 * TICK) == [(10 * TICK + 1, 'x')]
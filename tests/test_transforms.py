@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from utils.transforms import HeikinAshi, Kagi, LineBreak, RangeBars
+
+SECOND = 1_000_000_000
+
+
+@pytest.fixture
+def ticks():
+    rng = np.random.default_rng(5)
+    prices = 100 + np.cumsum(rng.normal(0, 0.3, 5000))
+    timestamps = np.cumsum(rng.integers(1, 20, 5000)) * SECOND
+    return timestamps, prices
+
+
+@pytest.mark.parametrize('cls, params', [
+    (HeikinAshi, {'interval_ns': 60 * SECOND}),
+    (LineBreak, {'lines': 3}),
+    (Kagi, {'reversal': 1.5}),
+    (RangeBars, {'range_size': 2.0}),
+])
+def test_batch_matches_tick_by_tick(ticks, cls, params):
+    """`batch` (busca vetorizada) produz a mesma série que `update` tick a tick"""
+    timestamps, prices = ticks
+    streamed = cls(capacity=10_000, **params)
+    for timestamp, price in zip(timestamps.tolist(), prices.tolist()):
+        streamed.update(timestamp, price)
+    batched = cls(capacity=10_000, **params)
+    # Em duas partes: o estado entre lotes também precisa ser o mesmo
+    batched.batch(timestamps[:1234], prices[:1234])
+    batched.batch(timestamps[1234:], prices[1234:])
+
+    assert len(streamed.series) > 10
+    for name, _ in type(streamed.series).fields:
+        np.testing.assert_allclose(batched.series[name], streamed.series[name], rtol=0, atol=1e-9)
@@ -0,0 +1,236 @@
+import bisect
+import itertools
+from collections import deque
+from typing import Dict, List
+
+# Tipos de alerta
+PRICE_ABOVE = 'price_above'
+PRICE_BELOW = 'price_below'
+PERCENT_MOVE = 'percent_move'
+RENKO_REVERSAL = 'renko_reversal'
+PF_NEW_COLUMN = 'pf_new_column'
+CLOSE_ABOVE = 'close_above'
+CLOSE_BELOW = 'close_below'
+
+ALERT_LABELS = {
+    PRICE_ABOVE: 'Preço cruza para cima',
+    PRICE_BELOW: 'Preço cruza para baixo',
+    PERCENT_MOVE: 'Variação % desde a criação',
+    RENKO_REVERSAL: 'Reversão Renko',
+    PF_NEW_COLUMN: 'Nova coluna Point & Figure',
+    CLOSE_ABOVE: 'Vela fecha acima de',
+    CLOSE_BELOW: 'Vela fecha abaixo de',
+}
+
+
+class Alert:
+    """Alerta configurado pelo usuário"""
+    __slots__ = ('id', 'symbol', 'kind', 'value', 'level', 'repeat')
+
+    def __init__(self, id, symbol, kind, value, level=None, repeat=False):
+        self.id = id
+        self.symbol = symbol
+        self.kind = kind
+        self.value = value  # valor informado (preço ou %)
+        self.level = level  # preço que dispara o alerta (alertas de preço)
+        self.repeat = repeat
+
+    def describe(self):
+        symbol = self.symbol.replace('USDT', '/USD')
+        if self.kind == PERCENT_MOVE:
+            return f"{symbol} {self.value:+.2f}% (${self.level:,.4f})"
+        if self.kind in (PRICE_ABOVE, PRICE_BELOW):
+            arrow = '↑' if self.kind == PRICE_ABOVE else '↓'
+            return f"{symbol} {arrow} ${self.level:,.4f}"
+        if self.kind in (CLOSE_ABOVE, CLOSE_BELOW):
+            arrow = '↑' if self.kind == CLOSE_ABOVE else '↓'
+            return f"{symbol} fechamento {arrow} ${self.level:,.4f}"
+        return f"{symbol} · {ALERT_LABELS[self.kind]}"
+
+
+class Notification:
+    """Alerta disparado, aguardando exibição na interface"""
+    __slots__ = ('timestamp', 'symbol', 'message', 'alert_id')
+
+    def __init__(self, timestamp, symbol, message, alert_id):
+        self.timestamp = timestamp
+        self.symbol = symbol
+        self.message = message
+        self.alert_id = alert_id
+
+
+class _LevelBook:
+    """Níveis de preço ordenados com os alertas correspondentes"""
+    __slots__ = ('levels', 'alerts')
+
+    def __init__(self):
+        self.levels: List[float] = []
+        self.alerts: List[Alert] = []
+
+    def add(self, alert):
+        index = bisect.bisect_right(self.levels, alert.level)
+        self.levels.insert(index, alert.level)
+        self.alerts.insert(index, alert)
+
+    def remove(self, alert):
+        index = bisect.bisect_left(self.levels, alert.level)
+        while index < len(self.alerts) and self.alerts[index] is not alert:
+            index += 1
+        if index < len(self.alerts):
+            del self.levels[index]
+            del self.alerts[index]
+
+    def crossed(self, low, high, include_low, include_high):
+        """Alertas com nível no intervalo entre low e high"""
+        find_low = bisect.bisect_left if include_low else bisect.bisect_right
+        find_high = bisect.bisect_right if include_high else bisect.bisect_left
+        return self.alerts[find_low(self.levels, low):find_high(self.levels, high)]
+
+    def __len__(self):
+        return len(self.levels)
+
+
+class _SymbolAlerts:
+    """Alertas de um símbolo: níveis de alta e de baixa e alertas de evento"""
+    __slots__ = ('up', 'down', 'events', 'last_price')
+
+    def __init__(self):
+        self.up = _LevelBook()    # disparam quando o preço sobe até o nível
+        self.down = _LevelBook()  # disparam quando o preço cai até o nível
+        self.events: Dict[str, List[Alert]] = {
+            RENKO_REVERSAL: [], PF_NEW_COLUMN: [], CLOSE_ABOVE: [], CLOSE_BELOW: []
+        }
+        self.last_price = None
+
+
+class AlertEngine:
+    """Avalia alertas a cada tick.
+
+    Os níveis ficam em listas ordenadas; entre o preço anterior e o atual
+    só os alertas do intervalo cruzado são localizados por busca binária,
+    então o custo por tick é O(log n) mais os alertas efetivamente
+    disparados. Alertas percentuais são convertidos em níveis de preço na
+    criação.
+    """
+
+    def __init__(self, max_notifications=200):
+        self._symbols: Dict[str, _SymbolAlerts] = {}
+        self._alerts: Dict[int, Alert] = {}
+        self._ids = itertools.count(1)
+        self.notifications = deque(maxlen=max_notifications)
+        self.history = deque(maxlen=max_notifications)
+
+    def _book(self, symbol):
+        book = self._symbols.get(symbol)
+        if book is None:
+            book = self._symbols[symbol] = _SymbolAlerts()
+        return book
+
+    def add_alert(self, symbol, kind, value=None, reference_price=None, repeat=False):
+        """Cria um alerta e retorna seu id"""
+        book = self._book(symbol)
+        alert = Alert(next(self._ids), symbol, kind, value, repeat=repeat)
+
+        if kind == PERCENT_MOVE:
+            reference = reference_price if reference_price is not None else book.last_price
+            if reference is None:
+                raise ValueError("Alerta percentual precisa de um preço de referência")
+            alert.level = reference * (1 + value / 100)
+            (book.up if value >= 0 else book.down).add(alert)
+        elif kind in (PRICE_ABOVE, PRICE_BELOW):
+            alert.level = float(value)
+            (book.up if kind == PRICE_ABOVE else book.down).add(alert)
+        elif kind in (CLOSE_ABOVE, CLOSE_BELOW):
+            alert.level = float(value)
+            book.events[kind].append(alert)
+        elif kind in book.events:
+            book.events[kind].append(alert)
+        else:
+            raise ValueError(f"Tipo de alerta desconhecido: {kind}")
+
+        self._alerts[alert.id] = alert
+        return alert.id
+
+    def remove_alert(self, alert_id):
+        alert = self._alerts.pop(alert_id, None)
+        if alert is None:
+            return
+        book = self._book(alert.symbol)
+        if alert.kind in book.events:
+            book.events[alert.kind].remove(alert)
+        elif alert.kind == PRICE_ABOVE or (alert.kind == PERCENT_MOVE and alert.value >= 0):
+            book.up.remove(alert)
+        else:
+            book.down.remove(alert)
+
+    def alerts(self):
+        return list(self._alerts.values())
+
+    def has_event_alerts(self, kind):
+        """Indica se há alertas de evento (Renko/P&F/fechamento) ativos do tipo dado"""
+        return any(book.events[kind] for book in self._symbols.values())
+
+    def _fire(self, alert, timestamp, message):
+        notification = Notification(timestamp, alert.symbol, message, alert.id)
+        self.notifications.append(notification)
+        self.history.append(notification)
+        if not alert.repeat:
+            self.remove_alert(alert.id)
+
+    def on_price(self, symbol, price, timestamp):
+        """Verifica os alertas de preço cruzados desde o tick anterior"""
+        book = self._symbols.get(symbol)
+        if book is None:
+            self._book(symbol).last_price = price
+            return
+        previous = book.last_price
+        book.last_price = price
+        if previous is None or price == previous:
+            return
+
+        if price > previous and len(book.up):
+            fired = book.up.crossed(previous, price, include_low=False, include_high=True)
+        elif price < previous and len(book.down):
+            fired = book.down.crossed(price, previous, include_low=True, include_high=False)
+        else:
+            return
+
+        for alert in list(fired):
+            self._fire(alert, timestamp, f"🔔 {alert.describe()} — preço ${price:,.4f}")
+
+    def on_renko_reversal(self, symbol, direction, price, timestamp):
+        book = self._symbols.get(symbol)
+        if book is None:
+            return
+        label = 'alta' if direction > 0 else 'baixa'
+        for alert in list(book.events[RENKO_REVERSAL]):
+            self._fire(alert, timestamp,
+                       f"🧱 {symbol.replace('USDT', '/USD')}: reversão Renko para {label} em ${price:,.4f}")
+
+    def on_pf_new_column(self, symbol, marker, price, timestamp):
+        book = self._symbols.get(symbol)
+        if book is None:
+            return
+        label = 'X (alta)' if marker > 0 else 'O (baixa)'
+        for alert in list(book.events[PF_NEW_COLUMN]):
+            self._fire(alert, timestamp,
+                       f"📊 {symbol.replace('USDT', '/USD')}: nova coluna {label} em ${price:,.4f}")
+
+    def on_candle_closed(self, event):
+        """Verifica os alertas de fechamento com a vela encerrada (`CandleClosed`)"""
+        book = self._symbols.get(event.symbol)
+        if book is None:
+            return
+        symbol = event.symbol.replace('USDT', '/USD')
+        for kind, crossed in ((CLOSE_ABOVE, lambda level: event.close > level),
+                              (CLOSE_BELOW, lambda level: event.close < level)):
+            for alert in list(book.events[kind]):
+                if crossed(alert.level):
+                    self._fire(alert, event.end,
+                               f"🕯️ {symbol}: vela fechou em ${event.close:,.4f} ({alert.describe()})")
+
+    def drain(self):
+        """Retira as notificações pendentes da fila"""
+        pending = list(self.notifications)
+        self.notifications.clear()
+        return pending
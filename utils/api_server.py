@@ -0,0 +1,262 @@
+import json
+import queue
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+try:
+    import pyarrow as pa
+except ImportError:  # Arrow é opcional; sem ele apenas JSON é servido
+    pa = None
+
+# Visão exposta pela API -> atributo do fetcher
+VIEWS = {
+    'ohlc': 'ohlc_data',
+    'renko': 'renko_data',
+    'point': 'point_data',
+    'line': 'historical_data',
+}
+
+# Nome do evento SSE emitido para cada visão
+EVENT_NAMES = {
+    'ohlc': 'candle',
+    'renko': 'brick',
+    'point': 'point',
+    'line': 'tick',
+}
+
+
+def _compact_json(payload):
+    return json.dumps(payload, separators=(',', ':')).encode()
+
+
+def url_symbol(text):
+    """Símbolo a partir da chave de URL: pares cruzados usam '-' (ETH-BTC -> ETH/BTC)"""
+    return unquote(text).upper().replace('-', '/')
+
+
+class MarketDataServer:
+    """API HTTP headless com os agregados do motor de ingestão.
+
+    Rotas:
+        GET /symbols
+        GET /snapshot/<view>/<symbol>?format=json|arrow
+        GET /stream?symbols=BTCUSDT,ETH-BTC&views=ohlc,renko   (Server-Sent Events)
+
+    Pares cruzados ('ETH/BTC') aparecem em /symbols com o nome real e são
+    endereçados na URL com '-' no lugar da barra (ETH-BTC).
+
+    `lock` deve ser o mesmo lock mantido pelo laço de ingestão enquanto
+    atualiza o fetcher.
+    """
+
+    def __init__(self, fetcher, lock, host='0.0.0.0', port=8765, client_queue_size=1000):
+        self.fetcher = fetcher
+        self.lock = lock
+        self.client_queue_size = client_queue_size
+        self._clients = []
+        self._clients_lock = threading.Lock()
+        self._sent = {}  # (view, symbol) -> (total_rows, última linha enviada)
+        self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.market = self
+        self._thread = None
+
+    @property
+    def port(self):
+        return self.httpd.server_address[1]
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        with self._clients_lock:
+            clients = list(self._clients)
+        for client in clients:
+            self.drop(client)
+        if self._thread:
+            self._thread.join()
+
+    def symbols(self):
+        with self.lock:
+            return list(self.fetcher.symbols) + list(self.fetcher.cross_rates.pairs)
+
+    def snapshot(self, view, symbol):
+        """Cópia consistente das colunas de uma série"""
+        with self.lock:
+            series = getattr(self.fetcher, VIEWS[view]).get(symbol)
+            if series is None:
+                return None
+            return {name: series[name].copy() for name, _ in type(series).fields}
+
+    # Server-Sent Events
+
+    def subscribe(self):
+        client = queue.Queue(maxsize=self.client_queue_size)
+        with self._clients_lock:
+            self._clients.append(client)
+        return client
+
+    def unsubscribe(self, client):
+        with self._clients_lock:
+            if client in self._clients:
+                self._clients.remove(client)
+
+    def drop(self, client):
+        """Remove o cliente e encerra o stream dele: a fila vira só a sentinela None"""
+        self.unsubscribe(client)
+        while True:
+            try:
+                client.put_nowait(None)
+                return
+            except queue.Full:
+                # Eventos pendentes são descartados para caber a sentinela
+                try:
+                    client.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def publish_updates(self):
+        """Envia aos clientes SSE as velas, bricks e pontos novos ou alterados.
+
+        Deve ser chamado pelo laço de ingestão após cada atualização, com o
+        lock já liberado.
+        """
+        events = []
+        with self.lock:
+            for view, attribute in VIEWS.items():
+                for symbol, series in getattr(self.fetcher, attribute).items():
+                    events.extend(self._series_events(view, symbol, series))
+
+        if not events:
+            return
+        with self._clients_lock:
+            clients = list(self._clients)
+        for client in clients:
+            for event in events:
+                try:
+                    client.put_nowait(event)
+                except queue.Full:
+                    # Cliente lento: descarta e encerra o stream dele
+                    self.drop(client)
+                    break
+
+    def _series_events(self, view, symbol, series):
+        length = len(series)
+        if length == 0:
+            return []
+        key = (view, symbol)
+        sent_total, sent_last = self._sent.get(key, (0, None))
+        new_rows = min(series.total_rows - sent_total, length)
+
+        # A vela aberta é atualizada no lugar: reenvia a última linha se mudou
+        first = length - new_rows
+        fields = [name for name, _ in type(series).fields]
+        last_row = tuple(series[name][-1].item() for name in fields)
+        if new_rows == 0:
+            if view != 'ohlc' or last_row == sent_last:
+                return []
+            first = length - 1
+
+        self._sent[key] = (series.total_rows, last_row)
+        rows = {name: series[name][first:].tolist() for name in fields}
+        payload = {'symbol': symbol, 'view': view, 'columns': rows}
+        return [(EVENT_NAMES[view], payload)]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body, content_type='application/json'):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status, message):
+        self._send(status, _compact_json({'error': message}))
+
+    def do_GET(self):
+        market = self.server.market
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        parts = [p for p in url.path.split('/') if p]
+
+        if parts == ['symbols']:
+            self._send(200, _compact_json(market.symbols()))
+        elif len(parts) in (3, 4) and parts[0] == 'snapshot':
+            # /snapshot/renko/ETH/BTC também vale, além de ETH-BTC
+            self._snapshot(market, parts[1], url_symbol('/'.join(parts[2:])),
+                           query.get('format', ['json'])[0])
+        elif parts == ['stream']:
+            self._stream(market, query)
+        else:
+            self._error(404, 'rota não encontrada')
+
+    def _snapshot(self, market, view, symbol, fmt):
+        if view not in VIEWS:
+            return self._error(404, f'visão desconhecida: {view}')
+        columns = market.snapshot(view, symbol)
+        if columns is None:
+            return self._error(404, f'sem dados para {symbol}')
+
+        if fmt == 'arrow':
+            if pa is None:
+                return self._error(406, 'pyarrow não está instalado')
+            # Arrays NumPy viram buffers Arrow sem cópia
+            batch = pa.RecordBatch.from_arrays(
+                [pa.array(values) for values in columns.values()],
+                names=list(columns.keys())
+            )
+            sink = pa.BufferOutputStream()
+            with pa.ipc.new_stream(sink, batch.schema) as writer:
+                writer.write_batch(batch)
+            return self._send(200, sink.getvalue().to_pybytes(),
+                              'application/vnd.apache.arrow.stream')
+
+        payload = {'symbol': symbol, 'view': view,
+                   'columns': {name: values.tolist() for name, values in columns.items()}}
+        self._send(200, _compact_json(payload))
+
+    def _stream(self, market, query):
+        symbols = {url_symbol(s) for s in ','.join(query.get('symbols', [])).split(',') if s}
+        views = set(','.join(query.get('views', [])).split(',')) - {''}
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        self.close_connection = True
+
+        client = market.subscribe()
+        try:
+            while True:
+                try:
+                    event = client.get(timeout=15)
+                except queue.Empty:
+                    self.wfile.write(b': keep-alive\n\n')
+                    self.wfile.flush()
+                    continue
+                if event is None:
+                    break
+                name, payload = event
+                if symbols and payload['symbol'] not in symbols:
+                    continue
+                if views and payload['view'] not in views:
+                    continue
+                self.wfile.write(b'event: ' + name.encode() + b'\ndata: ' +
+                                 _compact_json(payload) + b'\n\n')
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            market.unsubscribe(client)
@@ -0,0 +1,280 @@
+"""Backtest vetorizado de sinais de reversão Renko e Point & Figure.
+
+Os bricks e pontos saem dos ticks com as mesmas regras das visões ao
+vivo (`CryptoDataFetcher.update_renko_data` e `update_point_data`), sem
+laço por tick:
+
+- Renko: o nível do último brick, em caixas a partir do primeiro preço,
+  só muda quando o preço anda uma caixa inteira; é o operador
+  clip(nível, piso(x), teto(x)) aplicado tick a tick. A composição de
+  clips é outro clip, então o nível de todos os ticks sai de uma
+  varredura associativa em log2(n) passadas de numpy.
+- P&F: a referência passa a ser o preço do tick que formou os pontos;
+  cada evento é achado por busca vetorizada em blocos crescentes, como
+  nas transformações. Com caixas tão pequenas que quase todo tick forma
+  pontos, uma varredura simples da lista sai mais barata.
+
+A estratégia de reversão fica comprada depois de `reversal` caixas
+seguidas de alta e vendida (ou fora, com `long_only`) depois de
+`reversal` caixas de baixa. Símbolos × grade de parâmetros são
+distribuídos em um pool de processos.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List
+
+import numpy as np
+
+from utils.records import POINT, RENKO
+from utils.transforms import _blocks
+
+# Com mais de um evento a cada N ticks o P&F passa para a varredura simples
+DENSE_EVENTS = 64
+
+
+def renko_levels(prices, box):
+    """Nível (inteiro, em caixas desde o primeiro preço) do último brick em cada tick"""
+    x = (prices - prices[0]) / box
+    low = np.floor(x)
+    high = np.ceil(x)
+    # Prefixos da composição dos clips por dobramento: após a passada s,
+    # (low[t], high[t]) representa os ticks (t - 2s, t]
+    step = 1
+    while step < len(x):
+        low_prev, high_prev = low[:-step], high[:-step]
+        low_now, high_now = low[step:], high[step:]
+        low = np.concatenate((low[:step], np.clip(low_prev, low_now, high_now)))
+        high = np.concatenate((high[:step], np.clip(high_prev, low_now, high_now)))
+        step *= 2
+    # Nível inicial 0: o primeiro brick (neutro) fecha no primeiro preço
+    return np.clip(0, low, high).astype(np.int64)
+
+
+def renko_events(prices, box):
+    """(índices dos ticks que formaram bricks, bricks com sinal em cada um)"""
+    moves = np.diff(renko_levels(prices, box), prepend=0)
+    index = np.flatnonzero(moves)
+    return index, moves[index]
+
+
+def _point_scan(prices, box, start, reference, index, moves):
+    """Varredura simples a partir de `start`, acrescentando os eventos a `index`/`moves`"""
+    for i, price in enumerate(prices[start:].tolist(), start):
+        move = price - reference
+        if abs(move) >= box:
+            index.append(i)
+            moves.append(int(abs(move) / box) * (1 if move > 0 else -1))
+            reference = price
+
+
+def point_events(prices, box):
+    """(índices dos ticks que formaram pontos, pontos com sinal em cada um)"""
+    n = len(prices)
+    index, moves = [], []
+    reference = float(prices[0])
+    i = 1
+    while i < n:
+        # Eventos densos: a busca em blocos não compensa mais
+        if len(index) >= DENSE_EVENTS and len(index) * DENSE_EVENTS > i:
+            _point_scan(prices, box, i, reference, index, moves)
+            break
+        hit = None
+        for start, end in _blocks(i, n):
+            mask = np.abs(prices[start:end] - reference) >= box
+            if mask.any():
+                hit = start + int(np.argmax(mask))
+                break
+        if hit is None:
+            break
+        move = float(prices[hit]) - reference
+        index.append(hit)
+        moves.append(int(abs(move) / box) * (1 if move > 0 else -1))
+        reference = float(prices[hit])
+        i = hit + 1
+    return np.array(index, dtype=np.int64), np.array(moves, dtype=np.int64)
+
+
+def event_positions(moves, reversal, long_only=False):
+    """Posição (1, -1 ou 0) após cada evento.
+
+    Eventos seguidos na mesma direção formam uma sequência (coluna no
+    P&F); a posição vira para a direção da sequência quando ela acumula
+    `reversal` caixas e é mantida até a próxima virada.
+    """
+    if not len(moves):
+        return np.zeros(0, dtype=np.int64)
+    directions = np.sign(moves)
+    sizes = np.abs(moves)
+    is_start = np.diff(directions, prepend=0) != 0
+    starts = np.flatnonzero(is_start)
+    run = np.cumsum(is_start) - 1
+    totals = np.cumsum(sizes)
+    run_boxes = totals - (totals[starts] - sizes[starts])[run]
+    signals = np.where(run_boxes >= reversal, directions, 0)
+    # Sinal mais recente até cada evento (0 antes do primeiro)
+    fired = np.flatnonzero(signals)
+    last = np.searchsorted(fired, np.arange(len(moves)), side='right') - 1
+    positions = np.where(last >= 0, signals[fired[np.maximum(last, 0)]], 0)
+    return np.maximum(positions, 0) if long_only else positions
+
+
+def simulate(timestamps, prices, index, positions, fee=0.0, curve_points=400, log_prices=None):
+    """Resultado da estratégia que assume `positions` nos ticks `index`.
+
+    A posição assumida no tick t rende o log-retorno de t em diante. Cada
+    troca paga `fee` (fração) por unidade negociada: a saída é debitada do
+    trade que fecha e a entrada do que abre. As contas são feitas por
+    trecho de posição constante; só o drawdown percorre os ticks. Retorna
+    as métricas e a curva de patrimônio reduzida a `curve_points` pontos.
+    """
+    n = len(prices)
+    log_prices = np.log(prices) if log_prices is None else log_prices
+    changes = np.flatnonzero(np.diff(positions, prepend=0))
+    starts = index[changes]             # tick de cada troca de posição
+    held = positions[changes].astype(np.float64)
+    before = np.concatenate(([0.0], held[:-1]))
+    costs = np.log1p(-fee * np.abs(before)) + np.log1p(-fee * np.abs(held))
+
+    # Log-retorno de cada trecho até a troca seguinte (o último vai até o fim)
+    ends = np.append(starts[1:], n - 1)
+    growth = held * (log_prices[ends] - log_prices[starts])
+    # Log do patrimônio logo após cada troca, já com os custos dela
+    opened = np.cumsum(costs) + np.concatenate(([0.0], np.cumsum(growth)[:-1]))
+
+    # Trades: trechos com posição; a saída é paga na troca seguinte
+    exits = np.append(np.log1p(-fee * np.abs(held[:-1])), 0.0) if len(held) else held
+    trades = (growth + np.log1p(-fee * np.abs(held)) + exits)[held != 0]
+
+    # Log do patrimônio em cada tick: aberto + posição × (log p - log p na troca)
+    lengths = np.diff(np.concatenate(([0], starts, [n])))
+    offsets = np.repeat(np.concatenate(([0.0], opened - held * log_prices[starts])), lengths)
+    slopes = np.repeat(np.concatenate(([0.0], held)), lengths)
+    log_equity = offsets + slopes * log_prices
+
+    sample = np.unique(np.linspace(0, n - 1, min(n, curve_points)).astype(np.int64))
+    return {
+        'return': float(np.expm1(log_equity[-1])),
+        'buy_hold': float(prices[-1] / prices[0] - 1),
+        'trades': int(len(trades)),
+        'win_rate': float(np.mean(trades > 0)) if len(trades) else np.nan,
+        'max_drawdown': float(np.expm1(np.min(log_equity - np.maximum.accumulate(log_equity)))),
+        'timestamps': timestamps[sample],
+        'equity': np.exp(log_equity[sample]),
+        'hold': prices[sample] / prices[0],
+    }
+
+
+def backtest_symbol(symbol, timestamps, prices, chart, boxes, reversals, long_only=False,
+                    fee=0.0, curve_points=400):
+    """Todas as combinações (caixa, reversão) de um gráfico para um símbolo.
+
+    Os eventos de cada caixa são construídos uma única vez e reaproveitados
+    por todas as reversões. Executada nos processos de trabalho.
+    """
+    results = []
+    events = renko_events if chart == RENKO else point_events
+    log_prices = np.log(prices)
+    for box in boxes:
+        index, moves = events(prices, box)
+        for reversal in reversals:
+            positions = event_positions(moves, reversal, long_only)
+            result = simulate(timestamps, prices, index, positions, fee, curve_points, log_prices)
+            result.update(symbol=symbol, chart=chart, box=float(box), reversal=int(reversal),
+                          events=int(np.abs(moves).sum()))
+            results.append(result)
+    return results
+
+
+class Backtester:
+    """Distribui símbolos × gráficos × caixas em um pool de processos.
+
+    Cada job é um símbolo, um gráfico e uma fatia das caixas (com todas as
+    reversões): os ticks do símbolo vão ao processo uma vez por job. Com
+    poucos jobs, ou um único núcleo, tudo roda no próprio processo.
+    """
+
+    def __init__(self, max_workers=None, min_parallel=2):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.min_parallel = min_parallel
+        self._executor = None
+
+    def _pool(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    def run(self, ticks: Dict[str, tuple], charts=(RENKO, POINT), boxes=(), reversals=(1,),
+            percent=False, long_only=False, fee=0.0, curve_points=400) -> List[dict]:
+        """Resultados de todas as combinações.
+
+        `ticks` é {símbolo: (timestamps, preços)} em ordem de tempo. Com
+        `percent`, as caixas são % do primeiro preço de cada símbolo (a
+        mesma grade serve para BTC e DOGE); senão, valores em USD.
+        """
+        boxes = [box for box in boxes if box > 0]
+        # Fatias da grade de caixas para ocupar todos os processos
+        slices = max(1, min(len(boxes), -(-2 * self.max_workers // max(len(ticks) * len(charts), 1))))
+        jobs = []
+        scales = {}
+        for symbol, (timestamps, prices) in ticks.items():
+            prices = np.asarray(prices, dtype=np.float64)
+            if len(prices) < 2:
+                continue
+            scales[symbol] = prices[0] / 100 if percent else 1.0
+            for chart in charts:
+                for part in np.array_split(np.array(boxes) * scales[symbol], slices):
+                    if len(part):
+                        jobs.append((symbol, np.asarray(timestamps), prices, chart, part.tolist(),
+                                     list(reversals), long_only, fee, curve_points))
+        if len(jobs) < self.min_parallel or self.max_workers < 2:
+            batches = [backtest_symbol(*job) for job in jobs]
+        else:
+            batches = self._pool().map(backtest_symbol, *zip(*jobs))
+
+        results = []
+        for batch in batches:
+            for result in batch:
+                # Caixa como informada na grade (% ou USD)
+                result['param'] = float(result['box'] / scales[result['symbol']])
+                results.append(result)
+        return results
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+def results_table(results):
+    """Linhas da tabela de resultados (sem as curvas), da melhor para a pior"""
+    rows = [{key: value for key, value in result.items()
+             if key not in ('timestamps', 'equity', 'hold')} for result in results]
+    return sorted(rows, key=lambda row: row['return'], reverse=True)
+
+
+def ticks_from_history(tiers, symbols):
+    """Cotações gravadas no log de ticks do fetcher: {símbolo: (timestamps, preços)}"""
+    ticks = {}
+    for symbol in symbols:
+        history = tiers.get(symbol)
+        if history is None or not len(history.ticks):
+            continue
+        quotes = ~history.ticks['trade']
+        ticks[symbol] = (history.ticks['timestamps'][quotes], history.ticks['prices'][quotes])
+    return ticks
+
+
+def ticks_from_file(tick_file, symbols):
+    """Ticks de um arquivo de replay (utils/replay.TickFile): {símbolo: (timestamps, preços)}"""
+    parts = list(tick_file.read_from(tick_file.start))
+    if not parts:
+        return {}
+    names = np.concatenate([part[0] for part in parts])
+    timestamps = np.concatenate([part[1] for part in parts])
+    prices = np.concatenate([part[2] for part in parts])
+    ticks = {}
+    for symbol in symbols:
+        mask = names == symbol
+        if mask.any():
+            ticks[symbol] = (timestamps[mask], prices[mask])
+    return ticks
@@ -1,99 +1,154 @@
-import websocket
-import json
-import threading
-import time
+import requests
 from typing import Dict, Callable, List
-import pandas as pd
+from utils.exchanges import BinanceAdapter
+from utils.ingest import IngestLoop
+from utils.order_book import OrderBook
+from utils.timebase import now_ns
+
 
 class BinanceWebSocket:
-    def __init__(self):
-        self.ws = None
+    """Stream de tickers (@ticker) da Binance sobre um feed do loop de ingestão"""
+
+    def __init__(self, url: str = None, ingest: IngestLoop = None):
+        self.adapter = BinanceAdapter(url)
+        self.ingest = ingest or IngestLoop()
+        self.pool = None
         self.data_callback = None
         self.price_data = {}
         self.historical_data = {}
         self.running = False
         
-    def on_message(self, ws, message):
-        """Processa mensagens recebidas do WebSocket"""
+    def on_message(self, stream, stream_data):
+        """Processa um evento de ticker recebido do feed"""
         try:
-            data = json.loads(message)
+            symbol = stream_data['s']
+            price = float(stream_data['c'])
+            timestamp = now_ns()
             
-            if 'stream' in data:
-                stream_data = data['data']
-                symbol = stream_data['s']
-                price = float(stream_data['c'])
-                timestamp = pd.Timestamp.now()
-                
-                # Atualiza dados de preço atual
-                self.price_data[symbol] = {
-                    'price': price,
-                    'change': float(stream_data['P']),
-                    'volume': float(stream_data['v']),
-                    'timestamp': timestamp
-                }
-                
-                # Mantém histórico para gráficos
-                if symbol not in self.historical_data:
-                    self.historical_data[symbol] = {'timestamps': [], 'prices': []}
-                
-                self.historical_data[symbol]['timestamps'].append(timestamp)
-                self.historical_data[symbol]['prices'].append(price)
-                
-                # Limita o histórico para os últimos 100 pontos
-                if len(self.historical_data[symbol]['timestamps']) > 100:
-                    self.historical_data[symbol]['timestamps'].pop(0)
-                    self.historical_data[symbol]['prices'].pop(0)
+            # Atualiza dados de preço atual
+            self.price_data[symbol] = {
+                'price': price,
+                'change': float(stream_data['P']),
+                'volume': float(stream_data['v']),
+                'timestamp': timestamp
+            }
+            
+            # Mantém histórico para gráficos
+            if symbol not in self.historical_data:
+                self.historical_data[symbol] = {'timestamps': [], 'prices': []}
+            
+            self.historical_data[symbol]['timestamps'].append(timestamp)
+            self.historical_data[symbol]['prices'].append(price)
+            
+            # Limita o histórico para os últimos 100 pontos
+            if len(self.historical_data[symbol]['timestamps']) > 100:
+                self.historical_data[symbol]['timestamps'].pop(0)
+                self.historical_data[symbol]['prices'].pop(0)
+            
+            # Chama callback se definido
+            if self.data_callback:
+                self.data_callback(self.price_data, self.historical_data)
                 
-                # Chama callback se definido
-                if self.data_callback:
-                    self.data_callback(self.price_data, self.historical_data)
-                    
         except Exception as e:
             print(f"Erro ao processar mensagem: {e}")
     
-    def on_error(self, ws, error):
-        """Trata erros da conexão WebSocket"""
-        print(f"Erro WebSocket: {error}")
-    
-    def on_close(self, ws, close_status_code, close_msg):
-        """Trata fechamento da conexão"""
-        print("Conexão WebSocket fechada")
-        self.running = False
-    
-    def on_open(self, ws):
-        """Trata abertura da conexão"""
-        print("Conexão WebSocket estabelecida")
-        self.running = True
-    
     def start_stream(self, symbols: List[str], callback: Callable = None):
         """Inicia stream para símbolos específicos"""
         self.data_callback = callback
-        
+        if self.pool is None:
+            self.pool = self.ingest.feed(self.adapter, self.on_message)
+        self.set_symbols(symbols)
+        self.running = True
+    
+    def set_symbols(self, symbols: List[str]):
+        """Troca os símbolos assinados ao vivo, sem derrubar as conexões"""
         # Converte símbolos para lowercase (padrão Binance)
-        streams = [f"{symbol.lower()}@ticker" for symbol in symbols]
-        stream_names = "/".join(streams)
-        
-        url = f"wss://stream.binance.com:9443/stream?streams={stream_names}"
-        
-        self.ws = websocket.WebSocketApp(
-            url,
-            on_open=self.on_open,
-            on_message=self.on_message,
-            on_error=self.on_error,
-            on_close=self.on_close
-        )
-        
-        # Inicia em thread separada para não bloquear
-        ws_thread = threading.Thread(target=self.ws.run_forever)
-        ws_thread.daemon = True
-        ws_thread.start()
+        self.pool.set_streams(f"{symbol.lower()}@ticker" for symbol in symbols)
     
     def stop_stream(self):
-        """Para o stream WebSocket"""
-        if self.ws:
-            self.ws.close()
+        """Para o stream WebSocket (o loop de ingestão continua)"""
+        if self.pool:
+            self.pool.stop()
+        self.pool = None
         self.running = False
     
     def get_current_data(self):
         """Retorna dados atuais"""
         return self.price_data, self.historical_data
+
+
+class BinanceDepthStream:
+    """Stream de profundidade (@depth@100ms) sincronizado com snapshot REST"""
+    
+    def __init__(self, snapshot_limit: int = 1000, url: str = None,
+                 rest_url: str = "https://api.binance.com/api/v3/depth", ingest: IngestLoop = None):
+        self.adapter = BinanceAdapter(url)
+        self.ingest = ingest or IngestLoop()
+        self.rest_url = rest_url
+        self.pool = None
+        self.snapshot_limit = snapshot_limit
+        self.order_books: Dict[str, OrderBook] = {}
+        self.running = False
+    
+    def on_message(self, stream, event):
+        """Aplica eventos de diferença ao order book do símbolo"""
+        try:
+            book = self.order_books.get(event['s'])
+            if book is None:
+                return
+            
+            if not book.on_diff(event['U'], event['u'], event['b'], event['a']):
+                # Perda de sequência: busca novo snapshot
+                self._request_snapshot(book)
+                
+        except Exception as e:
+            print(f"Erro ao processar profundidade: {e}")
+    
+    def on_open(self, streams):
+        """A cada (re)conexão os books da conexão voltam a acumular eventos até o snapshot"""
+        for stream in streams:
+            book = self.order_books.get(stream.split('@')[0].upper())
+            if book is not None:
+                book.reset()
+                self._request_snapshot(book)
+    
+    def _request_snapshot(self, book: OrderBook):
+        """Busca o snapshot REST no executor do loop para não bloquear o WebSocket"""
+        def fetch():
+            try:
+                response = requests.get(
+                    self.rest_url,
+                    params={'symbol': book.symbol, 'limit': self.snapshot_limit},
+                    timeout=10
+                )
+                response.raise_for_status()
+                snapshot = response.json()
+                if not book.load_snapshot(snapshot['lastUpdateId'], snapshot['bids'], snapshot['asks']):
+                    # Snapshot mais antigo que os eventos recebidos: busca outro
+                    self._request_snapshot(book)
+            except Exception as e:
+                print(f"Erro no snapshot de {book.symbol}: {e}")
+        
+        self.ingest.run_blocking(fetch)
+    
+    def start_stream(self, symbols: List[str]):
+        """Inicia stream de profundidade para os símbolos"""
+        if self.pool is None:
+            self.pool = self.ingest.feed(self.adapter, self.on_message, on_open=self.on_open)
+        self.set_symbols(symbols)
+        self.running = True
+    
+    def set_symbols(self, symbols: List[str]):
+        """Troca os símbolos ao vivo; books novos são sincronizados ao chegar a assinatura"""
+        added = [s for s in symbols if s not in self.order_books]
+        self.order_books = {s: self.order_books.get(s) or OrderBook(s) for s in symbols}
+        self.pool.set_streams(f"{symbol.lower()}@depth@100ms" for symbol in symbols)
+        for symbol in added:
+            self._request_snapshot(self.order_books[symbol])
+    
+    def stop_stream(self):
+        """Para o stream de profundidade (o loop de ingestão continua)"""
+        if self.pool:
+            self.pool.stop()
+        self.pool = None
+        self.running = False
@@ -0,0 +1,57 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+
+def series_columns(series):
+    """Colunas ativas de uma série; ao enviar a outro processo só essas linhas são copiadas"""
+    return {name: series[name] for name, _ in series.fields}
+
+
+def figure_payload(build, symbol, columns):
+    """Monta a figura do símbolo e a devolve como dicionário Plotly.
+
+    Executada nos processos de trabalho: `build` é uma das funções de
+    utils/charts.py e `columns` as colunas da série (ou None se vazia).
+    """
+    store = {symbol: columns} if columns is not None else {}
+    figure = build(symbol, store)
+    return figure.to_plotly_json() if figure is not None else None
+
+
+class GridRenderer:
+    """Prepara as figuras de uma grade de gráficos em paralelo.
+
+    Cada job é (função de construção, símbolo, série). Com poucos jobs a
+    montagem é feita no próprio thread; acima de `min_parallel` os jobs vão
+    para um pool de processos (ou threads) e os resultados voltam na ordem
+    de exibição.
+    """
+
+    def __init__(self, max_workers=None, use_processes=True, min_parallel=4):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.use_processes = use_processes
+        self.min_parallel = min_parallel
+        self._executor = None
+
+    def _pool(self):
+        if self._executor is None:
+            executor_cls = ProcessPoolExecutor if self.use_processes else ThreadPoolExecutor
+            self._executor = executor_cls(max_workers=self.max_workers)
+        return self._executor
+
+    def prepare(self, jobs):
+        """Retorna os payloads das figuras na mesma ordem dos jobs"""
+        arguments = [
+            (build, symbol, series_columns(series) if series is not None and len(series) else None)
+            for build, symbol, series in jobs
+        ]
+        if len(arguments) < self.min_parallel or self.max_workers < 2:
+            return [figure_payload(*args) for args in arguments]
+
+        builds, symbols, columns = zip(*arguments)
+        return list(self._pool().map(figure_payload, builds, symbols, columns))
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
@@ -0,0 +1,616 @@
+"""Gráficos por símbolo do dashboard.
+
+Ficam fora de app.py para poderem ser montados em processos de trabalho
+(ver utils/chart_grid.py): cada função recebe o símbolo e um dicionário
+{símbolo: série} com a interface de leitura dos registros.
+"""
+import numpy as np
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from utils.records import CHART_LABELS, MARKER_X
+from utils.timebase import to_datetime
+
+# Layout comum a todos os gráficos, montado uma única vez
+CHART_TEMPLATE = go.layout.Template(pio.templates['plotly_dark'])
+CHART_TEMPLATE.layout.paper_bgcolor = 'rgba(0,0,0,0)'
+CHART_TEMPLATE.layout.plot_bgcolor = 'rgba(0,0,0,0)'
+
+
+def create_candlestick_chart(symbol, ohlc_data):
+    """Cria gráfico de velas (candlestick) para um símbolo"""
+    fig = go.Figure()
+    
+    if symbol not in ohlc_data or len(ohlc_data[symbol]['timestamps']) == 0:
+        fig.add_annotation(
+            text="Carregando velas...", 
+            xref="paper", yref="paper",
+            x=0.5, y=0.5, showarrow=False,
+            font=dict(size=16, color="gray")
+        )
+        fig.update_layout(
+            template=CHART_TEMPLATE,
+            height=400,
+            title=f'🕯️ {symbol.replace("USDT", "/USD")} - Carregando...',
+            xaxis_rangeslider_visible=False
+        )
+        return fig
+    
+    data = ohlc_data[symbol]
+    
+    # Validação de dados
+    if (len(data['timestamps']) == 0 or 
+        len(data['open']) == 0 or 
+        len(data['high']) == 0 or 
+        len(data['low']) == 0 or 
+        len(data['close']) == 0):
+        
+        fig.add_annotation(
+            text="Aguardando dados...", 
+            xref="paper", yref="paper",
+            x=0.5, y=0.5, showarrow=False,
+            font=dict(size=16, color="gray")
+        )
+        fig.update_layout(
+            template=CHART_TEMPLATE,
+            height=400,
+            title=f'🕯️ {symbol.replace("USDT", "/USD")}',
+            xaxis_rangeslider_visible=False
+        )
+        return fig
+    
+    # Adiciona candlestick
+    timestamps = to_datetime(data['timestamps'])
+    
+    fig.add_trace(go.Candlestick(
+        x=timestamps,
+        open=data['open'],
+        high=data['high'],
+        low=data['low'],
+        close=data['close'],
+        name=symbol.replace('USDT', ''),
+        increasing_line_color='#00D4AA',  # Verde para alta
+        decreasing_line_color='#FF6B6B',  # Vermelho para baixa
+        increasing_fillcolor='#00D4AA',
+        decreasing_fillcolor='#FF6B6B',
+        line=dict(width=1),
+        hovertemplate='<b>%{fullData.name}</b><br>' +
+                     'Tempo: %{x|%H:%M:%S}<br>' +
+                     'Abertura: $%{open:,.4f}<br>' +
+                     'Máxima: $%{high:,.4f}<br>' +
+                     'Mínima: $%{low:,.4f}<br>' +
+                     'Fechamento: $%{close:,.4f}<br>' +
+                     '<extra></extra>'
+    ))
+    
+    # Adiciona linha de média móvel simples (SMA)
+    if len(data['close']) >= 5:
+        sma_periods = min(5, len(data['close']))
+        sums = np.cumsum(np.concatenate(([0.0], data['close'])))
+        sma = np.full(len(data['close']), np.nan)
+        sma[sma_periods - 1:] = (sums[sma_periods:] - sums[:-sma_periods]) / sma_periods
+        
+        fig.add_trace(go.Scatter(
+            x=timestamps,
+            y=sma,
+            mode='lines',
+            name=f'SMA(5)',
+            line=dict(color='#FFA500', width=2, dash='dash'),
+            opacity=0.7,
+            hovertemplate='<b>SMA(5)</b><br>' +
+                         'Valor: $%{y:,.4f}<br>' +
+                         '<extra></extra>'
+        ))
+    
+    fig.update_layout(
+        title=f'🕯️ {symbol.replace("USDT", "/USD")} - Gráfico de Velas',
+        xaxis_title='Tempo',
+        yaxis_title='Preço (USD)',
+        template=CHART_TEMPLATE,
+        height=400,
+        showlegend=True,
+        margin=dict(l=0, r=0, t=40, b=0),
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="left",
+            x=0
+        )
+    )
+    
+    # Remove range slider do candlestick
+    fig.update_layout(xaxis_rangeslider_visible=False)
+    
+    # Formatar eixo Y baseado nos preços
+    if len(data['close']) > 0:
+        max_price = data['high'].max()
+        
+        if max_price < 1:
+            fig.update_yaxes(tickformat='.6f')
+        elif max_price < 10:
+            fig.update_yaxes(tickformat='.4f')
+        else:
+            fig.update_yaxes(tickformat=',.2f')
+    
+    return fig
+
+
+def create_renko_chart(symbol, renko_data):
+    """Cria gráfico Renko para um símbolo"""
+    fig = go.Figure()
+    
+    if symbol not in renko_data or len(renko_data[symbol]['timestamps']) == 0:
+        fig.add_annotation(
+            text="Carregando Renko...", 
+            xref="paper", yref="paper",
+            x=0.5, y=0.5, showarrow=False,
+            font=dict(size=16, color="gray")
+        )
+        fig.update_layout(
+            template=CHART_TEMPLATE,
+            height=400,
+            title=f'🧱 {symbol.replace("USDT", "/USD")} - Gráfico Renko - Carregando...',
+        )
+        return fig
+    
+    data = renko_data[symbol]
+    
+    if len(data['timestamps']) == 0:
+        fig.add_annotation(
+            text="Aguardando dados...", 
+            xref="paper", yref="paper",
+            x=0.5, y=0.5, showarrow=False,
+            font=dict(size=16, color="gray")
+        )
+        fig.update_layout(
+            template=CHART_TEMPLATE,
+            height=400,
+            title=f'🧱 {symbol.replace("USDT", "/USD")} - Gráfico Renko',
+        )
+        return fig
+    
+    # Cria candlesticks Renko
+    fig.add_trace(go.Candlestick(
+        x=list(range(len(data['timestamps']))),
+        open=data['open'],
+        high=data['high'],
+        low=data['low'],
+        close=data['close'],
+        name=symbol.replace('USDT', ''),
+        increasing_line_color='#00D4AA',
+        decreasing_line_color='#FF6B6B',
+        increasing_fillcolor='#00D4AA',
+        decreasing_fillcolor='#FF6B6B',
+        line=dict(width=2),
+        hovertemplate='<b>Renko Brick</b><br>' +
+                     'Abertura: $%{open:,.4f}<br>' +
+                     'Máxima: $%{high:,.4f}<br>' +
+                     'Mínima: $%{low:,.4f}<br>' +
+                     'Fechamento: $%{close:,.4f}<br>' +
+                     '<extra></extra>'
+    ))
+    
+    fig.update_layout(
+        title=f'🧱 {symbol.replace("USDT", "/USD")} - Gráfico Renko',
+        xaxis_title='Brick #',
+        yaxis_title='Preço (USD)',
+        template=CHART_TEMPLATE,
+        height=400,
+        showlegend=False,
+        margin=dict(l=0, r=0, t=40, b=0),
+        xaxis_rangeslider_visible=False
+    )
+    
+    return fig
+
+
+def create_point_figure_chart(symbol, point_data):
+    """Cria gráfico Point and Figure para um símbolo"""
+    fig = go.Figure()
+    
+    if symbol not in point_data or len(point_data[symbol]['x']) == 0:
+        fig.add_annotation(
+            text="Carregando Point & Figure...", 
+            xref="paper", yref="paper",
+            x=0.5, y=0.5, showarrow=False,
+            font=dict(size=16, color="gray")
+        )
+        fig.update_layout(
+            template=CHART_TEMPLATE,
+            height=400,
+            title=f'📊 {symbol.replace("USDT", "/USD")} - Point & Figure - Carregando...',
+        )
+        return fig
+    
+    data = point_data[symbol]
+    
+    if len(data['x']) == 0:
+        fig.add_annotation(
+            text="Aguardando dados...", 
+            xref="paper", yref="paper",
+            x=0.5, y=0.5, showarrow=False,
+            font=dict(size=16, color="gray")
+        )
+        fig.update_layout(
+            template=CHART_TEMPLATE,
+            height=400,
+            title=f'📊 {symbol.replace("USDT", "/USD")} - Point & Figure',
+        )
+        return fig
+    
+    # Separa X's e O's
+    is_x = data['marker'] == MARKER_X
+    x_points = {'x': data['x'][is_x], 'y': data['y'][is_x]}
+    o_points = {'x': data['x'][~is_x], 'y': data['y'][~is_x]}
+    x_points['text'] = ['X'] * len(x_points['x'])
+    o_points['text'] = ['O'] * len(o_points['x'])
+    
+    # Adiciona X's
+    if len(x_points['x']):
+        fig.add_trace(go.Scatter(
+            x=x_points['x'],
+            y=x_points['y'],
+            mode='markers+text',
+            name='Alta (X)',
+            marker=dict(size=15, color='#00D4AA', symbol='circle'),
+            text=x_points['text'],
+            textposition='middle center',
+            textfont=dict(size=12, color='black', family='Arial Black'),
+            hovertemplate='<b>Alta (X)</b><br>' +
+                         'Coluna: %{x}<br>' +
+                         'Preço: $%{y:,.4f}<br>' +
+                         '<extra></extra>'
+        ))
+    
+    # Adiciona O's
+    if len(o_points['x']):
+        fig.add_trace(go.Scatter(
+            x=o_points['x'],
+            y=o_points['y'],
+            mode='markers+text',
+            name='Baixa (O)',
+            marker=dict(size=15, color='#FF6B6B', symbol='circle'),
+            text=o_points['text'],
+            textposition='middle center',
+            textfont=dict(size=12, color='white', family='Arial Black'),
+            hovertemplate='<b>Baixa (O)</b><br>' +
+                         'Coluna: %{x}<br>' +
+                         'Preço: $%{y:,.4f}<br>' +
+                         '<extra></extra>'
+        ))
+    
+    fig.update_layout(
+        title=f'📊 {symbol.replace("USDT", "/USD")} - Point & Figure',
+        xaxis_title='Coluna',
+        yaxis_title='Preço (USD)',
+        template=CHART_TEMPLATE,
+        height=400,
+        showlegend=True,
+        margin=dict(l=0, r=0, t=40, b=0),
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="left",
+            x=0
+        )
+    )
+    
+    return fig
+
+
+def create_volume_chart(symbol, ohlc_data):
+    """Cria gráfico de volume para um símbolo"""
+    if symbol not in ohlc_data or len(ohlc_data[symbol]['timestamps']) == 0:
+        return None
+    
+    data = ohlc_data[symbol]
+    
+    if not np.any(data['volume']):
+        return None
+    
+    fig = go.Figure()
+    timestamps = to_datetime(data['timestamps'])
+    
+    if np.any(data['buy_volume']) or np.any(data['sell_volume']):
+        # Volume dividido pelo lado agressor (trades)
+        fig.add_trace(go.Bar(
+            x=timestamps,
+            y=data['buy_volume'],
+            name='Compra',
+            marker_color='#00D4AA',
+            opacity=0.7,
+            hovertemplate='<b>Compra</b><br>' +
+                         'Tempo: %{x|%H:%M:%S}<br>' +
+                         'Volume: %{y:,.4f}<br>' +
+                         '<extra></extra>'
+        ))
+        fig.add_trace(go.Bar(
+            x=timestamps,
+            y=data['sell_volume'],
+            name='Venda',
+            marker_color='#FF6B6B',
+            opacity=0.7,
+            hovertemplate='<b>Venda</b><br>' +
+                         'Tempo: %{x|%H:%M:%S}<br>' +
+                         'Volume: %{y:,.4f}<br>' +
+                         '<extra></extra>'
+        ))
+        fig.update_layout(barmode='stack')
+    else:
+        # Cores baseadas na direção da vela: verde para alta, vermelho para baixa
+        colors = np.where(data['close'] >= data['open'], '#00D4AA', '#FF6B6B')
+        
+        fig.add_trace(go.Bar(
+            x=timestamps,
+            y=data['volume'],
+            name='Volume',
+            marker_color=colors,
+            opacity=0.7,
+            hovertemplate='<b>Volume</b><br>' +
+                         'Tempo: %{x|%H:%M:%S}<br>' +
+                         'Volume: %{y:,.4f}<br>' +
+                         '<extra></extra>'
+        ))
+    
+    fig.update_layout(
+        title=f'📊 {symbol.replace("USDT", "/USD")} - Volume',
+        xaxis_title='Tempo',
+        yaxis_title='Volume',
+        template=CHART_TEMPLATE,
+        height=200,
+        showlegend=False,
+        margin=dict(l=0, r=0, t=40, b=0)
+    )
+    
+    return fig
+
+
+def create_depth_chart(symbol, order_books, range_pct=2.0):
+    """Cria gráfico de profundidade acumulada do order book"""
+    book = order_books.get(symbol)
+    depth = book.cumulative_depth(range_pct) if book is not None else None
+    if depth is None:
+        return None
+    
+    bids, bid_depth, asks, ask_depth = depth
+    fig = go.Figure()
+    
+    fig.add_trace(go.Scatter(
+        x=bids,
+        y=bid_depth,
+        mode='lines',
+        name='Bids',
+        line=dict(color='#00D4AA', width=2, shape='hv'),
+        fill='tozeroy',
+        fillcolor='rgba(0, 212, 170, 0.25)',
+        hovertemplate='<b>Bids</b><br>' +
+                     'Preço: $%{x:,.4f}<br>' +
+                     'Acumulado: %{y:,.4f}<br>' +
+                     '<extra></extra>'
+    ))
+    
+    fig.add_trace(go.Scatter(
+        x=asks,
+        y=ask_depth,
+        mode='lines',
+        name='Asks',
+        line=dict(color='#FF6B6B', width=2, shape='hv'),
+        fill='tozeroy',
+        fillcolor='rgba(255, 107, 107, 0.25)',
+        hovertemplate='<b>Asks</b><br>' +
+                     'Preço: $%{x:,.4f}<br>' +
+                     'Acumulado: %{y:,.4f}<br>' +
+                     '<extra></extra>'
+    ))
+    
+    fig.update_layout(
+        title=f'📚 {symbol.replace("USDT", "/USD")} - Profundidade (±{range_pct:g}%)',
+        xaxis_title='Preço (USD)',
+        yaxis_title='Quantidade Acumulada',
+        template=CHART_TEMPLATE,
+        height=300,
+        showlegend=False,
+        margin=dict(l=0, r=0, t=40, b=0)
+    )
+    
+    return fig
+
+
+def _loading_chart(symbol, title):
+    """Figura de espera enquanto a série do símbolo ainda não tem dados"""
+    fig = go.Figure()
+    fig.add_annotation(
+        text="Carregando...",
+        xref="paper", yref="paper",
+        x=0.5, y=0.5, showarrow=False,
+        font=dict(size=16, color="gray")
+    )
+    fig.update_layout(
+        template=CHART_TEMPLATE,
+        height=400,
+        title=f'{symbol.replace("USDT", "/USD")} - {title} - Carregando...',
+        xaxis_rangeslider_visible=False
+    )
+    return fig
+
+
+def _bar_chart(symbol, data, x, title, xaxis_title, hover_title):
+    """Candlestick das transformações em barras (Heikin-Ashi, Line Break, Range)"""
+    fig = go.Figure()
+    fig.add_trace(go.Candlestick(
+        x=x,
+        open=data['open'],
+        high=data['high'],
+        low=data['low'],
+        close=data['close'],
+        name=symbol.replace('USDT', ''),
+        increasing_line_color='#00D4AA',
+        decreasing_line_color='#FF6B6B',
+        increasing_fillcolor='#00D4AA',
+        decreasing_fillcolor='#FF6B6B',
+        line=dict(width=1),
+        hovertemplate=f'<b>{hover_title}</b><br>' +
+                     'Abertura: $%{open:,.4f}<br>' +
+                     'Máxima: $%{high:,.4f}<br>' +
+                     'Mínima: $%{low:,.4f}<br>' +
+                     'Fechamento: $%{close:,.4f}<br>' +
+                     '<extra></extra>'
+    ))
+    fig.update_layout(
+        title=f'{symbol.replace("USDT", "/USD")} - {title}',
+        xaxis_title=xaxis_title,
+        yaxis_title='Preço (USD)',
+        template=CHART_TEMPLATE,
+        height=400,
+        showlegend=False,
+        margin=dict(l=0, r=0, t=40, b=0),
+        xaxis_rangeslider_visible=False
+    )
+    return fig
+
+
+def create_heikin_ashi_chart(symbol, ha_data):
+    """Cria gráfico Heikin-Ashi para um símbolo"""
+    if symbol not in ha_data or len(ha_data[symbol]['timestamps']) == 0:
+        return _loading_chart(symbol, 'Heikin-Ashi')
+    data = ha_data[symbol]
+    return _bar_chart(symbol, data, to_datetime(data['timestamps']), 'Heikin-Ashi', 'Tempo', 'Heikin-Ashi')
+
+
+def create_line_break_chart(symbol, line_data):
+    """Cria gráfico Line Break para um símbolo"""
+    if symbol not in line_data or len(line_data[symbol]['timestamps']) == 0:
+        return _loading_chart(symbol, 'Line Break')
+    data = line_data[symbol]
+    return _bar_chart(symbol, data, np.arange(len(data['timestamps'])), 'Line Break', 'Linha #', 'Linha')
+
+
+def create_range_bar_chart(symbol, range_data):
+    """Cria gráfico de Range Bars para um símbolo"""
+    if symbol not in range_data or len(range_data[symbol]['timestamps']) == 0:
+        return _loading_chart(symbol, 'Range Bars')
+    data = range_data[symbol]
+    return _bar_chart(symbol, data, np.arange(len(data['timestamps'])), 'Range Bars', 'Barra #', 'Range Bar')
+
+
+def create_kagi_chart(symbol, kagi_data):
+    """Cria gráfico Kagi para um símbolo.
+    
+    A linha i (a partir do vértice inicial) é vertical na coluna i - 1 e se
+    liga à anterior por um ombro/cintura horizontal. Ao cruzar o ombro ou
+    a cintura anterior (vértice i - 2) a espessura muda naquele preço.
+    """
+    if symbol not in kagi_data or len(kagi_data[symbol]['timestamps']) < 2:
+        return _loading_chart(symbol, 'Kagi')
+    data = kagi_data[symbol]
+    prices = data['price'].tolist()
+    yang = data['yang'].tolist()
+    
+    # Segmentos de cada espessura, separados por None
+    segments = {True: ([], []), False: ([], [])}
+    
+    def add(style, x0, y0, x1, y1):
+        xs, ys = segments[style]
+        xs.extend((x0, x1, None))
+        ys.extend((y0, y1, None))
+    
+    for i in range(1, len(prices)):
+        column = i - 1
+        if i > 1:
+            add(yang[i - 1], column - 1, prices[i - 1], column, prices[i - 1])
+        if i > 2 and yang[i] != yang[i - 1]:
+            add(yang[i - 1], column, prices[i - 1], column, prices[i - 2])
+            add(yang[i], column, prices[i - 2], column, prices[i])
+        else:
+            add(yang[i], column, prices[i - 1], column, prices[i])
+    
+    fig = go.Figure()
+    for style, name, color, width in ((True, 'Yang', '#00D4AA', 4), (False, 'Yin', '#FF6B6B', 1.5)):
+        xs, ys = segments[style]
+        if xs:
+            fig.add_trace(go.Scatter(
+                x=xs,
+                y=ys,
+                mode='lines',
+                name=name,
+                line=dict(color=color, width=width),
+                hovertemplate=f'<b>{name}</b><br>' +
+                             'Preço: $%{y:,.4f}<br>' +
+                             '<extra></extra>'
+            ))
+    
+    fig.update_layout(
+        title=f'{symbol.replace("USDT", "/USD")} - Kagi',
+        xaxis_title='Linha #',
+        yaxis_title='Preço (USD)',
+        template=CHART_TEMPLATE,
+        height=400,
+        showlegend=True,
+        margin=dict(l=0, r=0, t=40, b=0),
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="left",
+            x=0
+        )
+    )
+    return fig
+
+
+def create_equity_chart(symbol, results, percent=True):
+    """Curvas de patrimônio de resultados do backtest (utils/backtest.py) de um símbolo.
+    
+    A primeira curva de buy & hold serve de referência; todas partem de 0%.
+    """
+    results = [result for result in results if result['symbol'] == symbol]
+    if not results:
+        return None
+    
+    fig = go.Figure()
+    hold = results[0]
+    fig.add_trace(go.Scatter(
+        x=to_datetime(hold['timestamps']),
+        y=(hold['hold'] - 1) * 100,
+        mode='lines',
+        name='Buy & hold',
+        line=dict(color='gray', width=1.5, dash='dash'),
+        hovertemplate='<b>Buy & hold</b><br>' +
+                     'Tempo: %{x|%d/%m %H:%M}<br>' +
+                     'Retorno: %{y:+.2f}%<br>' +
+                     '<extra></extra>'
+    ))
+    for result in results:
+        box = f"{result['param']:g}%" if percent else f"${result['param']:,.2f}"
+        name = f"{CHART_LABELS[result['chart']]} {box} · {result['reversal']} cx"
+        fig.add_trace(go.Scatter(
+            x=to_datetime(result['timestamps']),
+            y=(result['equity'] - 1) * 100,
+            mode='lines',
+            name=name,
+            line=dict(width=2),
+            hovertemplate=f'<b>{name}</b><br>' +
+                         'Tempo: %{x|%d/%m %H:%M}<br>' +
+                         'Retorno: %{y:+.2f}%<br>' +
+                         '<extra></extra>'
+        ))
+    
+    fig.update_layout(
+        title=f'🧪 {symbol.replace("USDT", "/USD")} - Curva de patrimônio',
+        xaxis_title='Tempo',
+        yaxis_title='Retorno (%)',
+        template=CHART_TEMPLATE,
+        height=450,
+        showlegend=True,
+        margin=dict(l=0, r=0, t=40, b=0),
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="left",
+            x=0
+        )
+    )
+    return fig
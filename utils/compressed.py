@@ -0,0 +1,255 @@
+import numpy as np
+
+from utils.records import LineSeries, _versions
+
+_SHIFTS = np.arange(64, dtype=np.uint64)
+
+
+def _bit_width(values):
+    """Número de bits necessário para o maior valor (uint64)"""
+    if len(values) == 0:
+        return 0
+    return int(np.bitwise_or.reduce(values)).bit_length()
+
+
+def pack_bits(values, width):
+    """Empacota inteiros sem sinal com `width` bits cada, de forma vetorizada"""
+    if width == 0 or len(values) == 0:
+        return np.empty(0, dtype=np.uint8)
+    bits = ((values[:, None] >> _SHIFTS[:width]) & 1).astype(np.uint8)
+    return np.packbits(bits.ravel(), bitorder='little')
+
+
+def unpack_bits(packed, count, width):
+    """Inverso de `pack_bits`"""
+    if width == 0:
+        return np.zeros(count, dtype=np.uint64)
+    bits = np.unpackbits(packed, count=count * width, bitorder='little')
+    bits = bits.reshape(count, width).astype(np.uint64)
+    return (bits << _SHIFTS[:width]).sum(axis=1, dtype=np.uint64)
+
+
+def encode_timestamps(timestamps):
+    """Delta-of-delta com zigzag: (primeiro ts, primeiro delta, largura, bits)"""
+    first = int(timestamps[0])
+    deltas = np.diff(timestamps)
+    first_delta = int(deltas[0]) if len(deltas) else 0
+    dod = np.diff(deltas)
+    zigzag = ((dod << 1) ^ (dod >> 63)).view(np.uint64)
+    width = _bit_width(zigzag)
+    return first, first_delta, width, pack_bits(zigzag, width)
+
+
+def decode_timestamps(count, first, first_delta, width, packed):
+    zigzag = unpack_bits(packed, max(count - 2, 0), width)
+    dod = (zigzag >> np.uint64(1)).view(np.int64) ^ -(zigzag & np.uint64(1)).view(np.int64)
+    deltas = first_delta + np.concatenate(([0], np.cumsum(dod)))[:max(count - 1, 0)]
+    return first + np.concatenate(([0], np.cumsum(deltas))).astype(np.int64)
+
+
+XOR_MODE = 0
+DECIMAL_MODE = 1
+MAX_DECIMALS = 8
+
+
+def _decimal_digits(values):
+    """Menor número de casas decimais que representa exatamente todos os valores, ou None"""
+    if not np.all(np.isfinite(values)):
+        return None
+    for digits in range(MAX_DECIMALS + 1):
+        scale = 10.0 ** digits
+        scaled = np.round(values * scale)
+        if np.abs(scaled).max() >= 2 ** 53:
+            return None
+        if np.array_equal((scaled / scale).view(np.uint64), values.view(np.uint64)):
+            return digits
+    return None
+
+
+def encode_values(values):
+    """Codifica os preços de um bloco: (modo, primeiro valor, parâmetro, largura, bits).
+
+    Modo XOR: XOR com o valor anterior, sem os zeros finais comuns do
+    bloco. Preços com poucas casas decimais (o caso comum) usam o modo
+    decimal: diferenças inteiras em unidades de 10^-casas, em zigzag.
+    """
+    digits = _decimal_digits(values)
+    if digits is not None:
+        scaled = np.round(values * 10.0 ** digits).astype(np.int64)
+        deltas = np.diff(scaled)
+        zigzag = ((deltas << 1) ^ (deltas >> 63)).view(np.uint64)
+        width = _bit_width(zigzag)
+        return DECIMAL_MODE, int(scaled[0]), digits, width, pack_bits(zigzag, width)
+
+    bits = values.view(np.uint64)
+    xor = bits[1:] ^ bits[:-1]
+    combined = int(np.bitwise_or.reduce(xor)) if len(xor) else 0
+    shift = (combined & -combined).bit_length() - 1 if combined else 0
+    residual = xor >> np.uint64(shift)
+    width = _bit_width(residual)
+    return XOR_MODE, int(bits[0]), shift, width, pack_bits(residual, width)
+
+
+def decode_values(count, mode, first, parameter, width, packed):
+    if mode == DECIMAL_MODE:
+        zigzag = unpack_bits(packed, count - 1, width)
+        deltas = (zigzag >> np.uint64(1)).view(np.int64) ^ -(zigzag & np.uint64(1)).view(np.int64)
+        scaled = first + np.concatenate(([0], np.cumsum(deltas)))
+        return scaled / 10.0 ** parameter
+
+    residual = unpack_bits(packed, count - 1, width) << np.uint64(parameter)
+    xor = np.concatenate((np.zeros(1, dtype=np.uint64), residual))
+    return (np.bitwise_xor.accumulate(xor) ^ np.uint64(first)).view(np.float64)
+
+
+class CompressedBlock:
+    """Bloco selado de timestamps e preços comprimidos"""
+    __slots__ = ('count', 'start', 'end', 'timestamps', 'values')
+
+    def __init__(self, timestamps, values):
+        self.count = len(timestamps)
+        self.start = int(timestamps.min())
+        self.end = int(timestamps.max())
+        self.timestamps = encode_timestamps(timestamps)
+        self.values = encode_values(values)
+
+    def decode(self):
+        return (decode_timestamps(self.count, *self.timestamps),
+                decode_values(self.count, *self.values))
+
+    @property
+    def nbytes(self):
+        return self.timestamps[-1].nbytes + self.values[-1].nbytes + 64
+
+
+class CompressedLineSeries:
+    """Histórico de linha longo em blocos comprimidos.
+
+    Os pontos entram em um bloco aberto não comprimido; ao completar
+    `block_size` pontos o bloco é selado com timestamps em delta-of-delta
+    e preços em XOR (ou diferenças decimais), empacotados em largura fixa
+    por bloco, e a decodificação é vetorizada. `series['coluna']` continua devolvendo só
+    os últimos `capacity` pontos (mesma interface de LineSeries); o
+    histórico inteiro é lido com `range`.
+    """
+    __slots__ = ('capacity', 'block_size', 'max_rows', '_blocks', '_timestamps',
+                 '_prices', '_size', '_rows', 'total_rows', 'version', '_tail', '_window')
+
+    fields = LineSeries.fields
+
+    def __init__(self, capacity=100, block_size=1024, max_rows=None):
+        self.capacity = capacity
+        self.block_size = block_size
+        self.max_rows = max_rows  # pontos retidos no total (None = sem limite)
+        self._blocks = []
+        self._timestamps = np.empty(block_size, dtype=np.int64)
+        self._prices = np.empty(block_size, dtype=np.float64)
+        self._size = 0
+        self._rows = 0
+        self.total_rows = 0
+        self.version = next(_versions)
+        self._tail = None    # último bloco selado já decodificado
+        self._window = None  # (versão, timestamps, preços) da janela atual
+
+    def append(self, timestamp, price):
+        """Adiciona um ponto ao histórico"""
+        i = self._size
+        self._timestamps[i] = timestamp
+        self._prices[i] = price
+        self._size = i + 1
+        self._rows += 1
+        self.total_rows += 1
+        self.version = next(_versions)
+        if self._size == self.block_size:
+            self._seal()
+
+    def _seal(self):
+        self._blocks.append(CompressedBlock(self._timestamps[:self._size],
+                                            self._prices[:self._size]))
+        self._tail = (self._timestamps[:self._size].copy(), self._prices[:self._size].copy())
+        self._size = 0
+        self._drop_old_blocks()
+
+    def _drop_old_blocks(self):
+        """Descarta blocos antigos além do limite de retenção; indica se algum saiu"""
+        dropped = False
+        while self.max_rows and self._blocks and self._rows - self._blocks[0].count >= self.max_rows:
+            self._rows -= self._blocks.pop(0).count
+            dropped = True
+        return dropped
+
+    def trim(self, max_rows):
+        """Muda o limite de retenção, descartando já os blocos além dele"""
+        self.max_rows = max_rows
+        if self._drop_old_blocks():
+            self.version = next(_versions)
+
+    def __len__(self):
+        return min(self._rows, self.capacity)
+
+    def __contains__(self, name):
+        return name in ('timestamps', 'prices')
+
+    def __getitem__(self, name):
+        if self._window is None or self._window[0] != self.version:
+            self._window = (self.version,) + self._window_columns()
+        return self._window[1] if name == 'timestamps' else self._window[2]
+
+    def _window_columns(self):
+        """Últimos `capacity` pontos (bloco aberto + fim dos blocos selados)"""
+        first = max(self._size - self.capacity, 0)
+        parts = [(self._timestamps[first:self._size], self._prices[first:self._size])]
+        needed = self.capacity - self._size
+        for index in range(len(self._blocks) - 1, -1, -1):
+            if needed <= 0:
+                break
+            if index == len(self._blocks) - 1 and self._tail is not None:
+                timestamps, prices = self._tail
+            else:
+                timestamps, prices = self._blocks[index].decode()
+            parts.append((timestamps[-needed:], prices[-needed:]))
+            needed -= len(timestamps)
+        parts.reverse()
+        return (np.concatenate([p[0] for p in parts]),
+                np.concatenate([p[1] for p in parts]))
+
+    def range(self, start=None, end=None):
+        """Timestamps e preços com start <= ts <= end (nanossegundos), decodificando só os blocos necessários"""
+        parts = []
+        for block in self._blocks:
+            if (start is not None and block.end < start) or (end is not None and block.start > end):
+                continue
+            parts.append(block.decode())
+        parts.append((self._timestamps[:self._size], self._prices[:self._size]))
+        timestamps = np.concatenate([p[0] for p in parts])
+        prices = np.concatenate([p[1] for p in parts])
+        mask = np.ones(len(timestamps), dtype=bool)
+        if start is not None:
+            mask &= timestamps >= start
+        if end is not None:
+            mask &= timestamps <= end
+        return timestamps[mask], prices[mask]
+
+    @property
+    def rows(self):
+        """Pontos retidos no histórico inteiro"""
+        return self._rows
+
+    @property
+    def nbytes(self):
+        return (sum(block.nbytes for block in self._blocks)
+                + self._timestamps.nbytes + self._prices.nbytes)
+
+    def compression_ratio(self):
+        """Bytes brutos (int64 + float64) dos blocos selados / bytes comprimidos"""
+        sealed = sum(block.count for block in self._blocks)
+        if not sealed:
+            return 1.0
+        return sealed * 16 / sum(block.nbytes for block in self._blocks)
+
+    def clear(self):
+        self._blocks = []
+        self._size = 0
+        self._rows = 0
+        self._tail = None
+        self.version = next(_versions)
@@ -0,0 +1,144 @@
+from typing import Dict, List
+
+import numpy as np
+
+from utils.timebase import NS_PER_SECOND
+
+
+class RollingCorrelation:
+    """Correlação, covariância e volatilidade móveis entre vários símbolos.
+
+    Os log-retornos alinhados ficam em uma janela circular. A média e a
+    matriz de co-momentos são atualizadas no estilo Welford ao entrar um
+    retorno e ao sair o mais antigo, custando O(1) por par (uma operação
+    vetorizada n x n por amostra). `backfill` recalcula tudo de forma
+    vetorizada a partir do histórico de linha.
+    """
+
+    def __init__(self, window: int = 60, sample_interval: float = 5.0,
+                 recompute_every: int = 500):
+        self.window = window
+        self.sample_interval_ns = int(sample_interval * NS_PER_SECOND)
+        self.recompute_every = recompute_every
+        self.reset([])
+
+    def reset(self, symbols: List[str]):
+        """Reinicia o estado para um novo conjunto de símbolos"""
+        self.symbols = list(symbols)
+        n = len(self.symbols)
+        self._returns = np.zeros((self.window, n))
+        self._head = 0
+        self.count = 0
+        self._mean = np.zeros(n)
+        self._comoment = np.zeros((n, n))
+        self._last_prices = None
+        self._last_sample_ns = None
+        self._updates = 0
+
+    # Atualização incremental
+
+    def _push(self, returns):
+        """Inclui um vetor de retornos alinhados (e remove o mais antigo)"""
+        if self.count == self.window:
+            old = self._returns[self._head].copy()
+            new_mean = self._mean - (old - self._mean) / (self.count - 1)
+            self._comoment -= np.outer(old - new_mean, old - self._mean)
+            self._mean = new_mean
+            self.count -= 1
+
+        self.count += 1
+        delta = returns - self._mean
+        self._mean += delta / self.count
+        self._comoment += np.outer(delta, returns - self._mean)
+
+        self._returns[self._head] = returns
+        self._head = (self._head + 1) % self.window
+
+        # Recalcula periodicamente para evitar acúmulo de erro de arredondamento
+        self._updates += 1
+        if self._updates % self.recompute_every == 0:
+            self._recompute()
+
+    def sample(self, timestamp: int, prices: Dict[str, float]):
+        """Amostra os últimos preços de todos os símbolos (grade de `sample_interval`)"""
+        if not self.symbols:
+            return False
+        if (self._last_sample_ns is not None and
+                timestamp - self._last_sample_ns < self.sample_interval_ns):
+            return False
+        if any(prices.get(s, 0) <= 0 for s in self.symbols):
+            return False
+
+        current = np.array([prices[s] for s in self.symbols], dtype=np.float64)
+        if self._last_prices is not None:
+            self._push(np.log(current / self._last_prices))
+        self._last_prices = current
+        self._last_sample_ns = timestamp
+        return True
+
+    # Recalculo vetorizado
+
+    def _window_returns(self):
+        """Retornos da janela em ordem cronológica"""
+        if self.count < self.window:
+            return self._returns[:self.count]
+        return np.roll(self._returns, -self._head, axis=0)
+
+    def _recompute(self):
+        returns = self._window_returns()
+        self._mean = returns.mean(axis=0) if len(returns) else np.zeros(len(self.symbols))
+        centered = returns - self._mean
+        self._comoment = centered.T @ centered
+
+    def backfill(self, historical_data, symbols: List[str] = None):
+        """Reconstrói a janela a partir do histórico de linha dos símbolos.
+
+        Os preços são alinhados em uma grade comum de `sample_interval`
+        usando o último preço conhecido em cada instante (as-of join).
+        """
+        symbols = symbols if symbols is not None else list(historical_data)
+        symbols = [s for s in symbols if s in historical_data and len(historical_data[s]) > 0]
+        self.reset(symbols)
+        if len(symbols) < 2:
+            return
+
+        start = max(int(historical_data[s]['timestamps'][0]) for s in symbols)
+        end = min(int(historical_data[s]['timestamps'][-1]) for s in symbols)
+        if end <= start:
+            return
+        grid = np.arange(start, end + 1, self.sample_interval_ns)
+        if len(grid) < 2:
+            return
+
+        aligned = np.empty((len(grid), len(symbols)))
+        for j, symbol in enumerate(symbols):
+            timestamps = historical_data[symbol]['timestamps']
+            prices = historical_data[symbol]['prices']
+            aligned[:, j] = prices[np.searchsorted(timestamps, grid, side='right') - 1]
+
+        returns = np.log(aligned[1:] / aligned[:-1])[-self.window:]
+        self.count = len(returns)
+        self._returns[:self.count] = returns
+        self._head = self.count % self.window
+        self._last_prices = aligned[-1]
+        self._last_sample_ns = int(grid[-1])
+        self._recompute()
+
+    # Resultados
+
+    def covariance(self) -> np.ndarray:
+        if self.count < 2:
+            return np.full((len(self.symbols),) * 2, np.nan)
+        return self._comoment / (self.count - 1)
+
+    def volatility(self) -> np.ndarray:
+        """Desvio padrão dos log-retornos por amostra"""
+        return np.sqrt(np.clip(np.diag(self.covariance()), 0, None))
+
+    def correlation(self) -> np.ndarray:
+        cov = self.covariance()
+        std = np.sqrt(np.clip(np.diag(cov), 0, None))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            corr = cov / np.outer(std, std)
+        np.fill_diagonal(corr, 1.0)
+        return np.clip(corr, -1.0, 1.0)
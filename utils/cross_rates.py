@@ -0,0 +1,108 @@
+"""Pares cruzados (ex.: ETH/BTC) derivados das cotações em USD.
+
+Um par base/cotação vale preço_base_usd / preço_cotação_usd. Cada tick de
+uma das pernas gera, no mesmo instante, um tick do par com o último preço
+da outra perna: os pares entram nos agregadores como símbolos comuns
+(OHLC, Renko, P&F, transformações) sem nenhuma requisição extra.
+"""
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from utils.providers import SYMBOL_BASES, TickBatch
+
+
+def cross_symbol(base: str, quote: str) -> str:
+    """Nome do par cruzado de dois símbolos USDT (ETHUSDT, BTCUSDT -> ETH/BTC)"""
+    return f"{SYMBOL_BASES.get(base, base)}/{SYMBOL_BASES.get(quote, quote)}"
+
+
+def cross_pairs(symbols) -> Dict[str, Tuple[str, str]]:
+    """Todos os pares cruzados ordenados entre os símbolos: {par: (base, cotação)}"""
+    return {cross_symbol(base, quote): (base, quote)
+            for base in symbols for quote in symbols if base != quote}
+
+
+class CrossRateEngine:
+    """Deriva, de forma incremental, os ticks dos pares cruzados configurados.
+
+    `scale[par]` converte um tamanho em USD para a moeda de cotação do par
+    (1 / preço da cotação no primeiro tick do par): assim um brick de
+    US$ 100 vira, em ETH/BTC, o equivalente em BTC, fixo enquanto o par existir.
+    """
+
+    def __init__(self):
+        self.pairs: Dict[str, Tuple[str, str]] = {}
+        self.legs: Dict[str, List[Tuple[str, bool]]] = {}  # perna -> [(par, é a base)]
+        self.last: Dict[str, float] = {}    # último preço USD de cada perna
+        self.changes: Dict[str, float] = {}  # última variação de 24h de cada perna
+        self.scale: Dict[str, float] = {}
+
+    def set_pairs(self, pairs, prices=None):
+        """Troca os pares derivados; `pairs` é {par: (base, cotação)} e `prices` os últimos preços USD"""
+        self.pairs = dict(pairs)
+        self.legs = {}
+        for pair, (base, quote) in self.pairs.items():
+            self.legs.setdefault(base, []).append((pair, True))
+            self.legs.setdefault(quote, []).append((pair, False))
+        self.scale = {pair: scale for pair, scale in self.scale.items() if pair in self.pairs}
+        for symbol, price in (prices or {}).items():
+            if symbol in self.legs:
+                self.last[symbol] = price
+
+    def _derive(self, pair, timestamp):
+        base, quote = self.pairs[pair]
+        base_price = self.last.get(base)
+        quote_price = self.last.get(quote)
+        if base_price is None or not quote_price:
+            return None
+        if pair not in self.scale:
+            self.scale[pair] = 1.0 / quote_price
+        # Variação de 24h do par a partir das pernas (NaN se alguma faltar)
+        change = ((1 + self.changes.get(base, np.nan) / 100) /
+                  (1 + self.changes.get(quote, np.nan) / 100) - 1) * 100
+        return pair, timestamp, base_price / quote_price, change, 0.0
+
+    def extend(self, batch: TickBatch) -> TickBatch:
+        """Lote com os ticks derivados intercalados logo após cada tick de perna"""
+        if not self.legs or batch is None or not any(s in self.legs for s in batch.symbols):
+            return batch
+        rows = []
+        columns = zip(batch.symbols, batch.timestamps.tolist(), batch.prices.tolist(),
+                      batch.changes.tolist(), batch.volumes.tolist())
+        for row in columns:
+            rows.append(row)
+            pairs = self.legs.get(row[0])
+            if pairs is None:
+                continue
+            self.last[row[0]] = row[2]
+            if not np.isnan(row[3]):
+                self.changes[row[0]] = row[3]
+            for pair, _ in pairs:
+                derived = self._derive(pair, row[1])
+                if derived is not None:
+                    rows.append(derived)
+        return TickBatch.from_rows(rows)
+
+    def backfill(self, pair, base_ticks, quote_ticks):
+        """Ticks históricos do par a partir dos logs das pernas (junção as-of vetorizada).
+
+        Recebe (timestamps, preços) de cada perna em ordem de tempo e
+        retorna (timestamps, preços) do par em cada tick de perna com as
+        duas já cotadas.
+        """
+        base_ts, base_prices = base_ticks
+        quote_ts, quote_prices = quote_ticks
+        if not len(base_ts) or not len(quote_ts):
+            return None
+        timestamps = np.union1d(base_ts, quote_ts)
+        base_at = np.searchsorted(base_ts, timestamps, side='right') - 1
+        quote_at = np.searchsorted(quote_ts, timestamps, side='right') - 1
+        valid = (base_at >= 0) & (quote_at >= 0)
+        timestamps = timestamps[valid]
+        if not len(timestamps):
+            return None
+        quotes = quote_prices[quote_at[valid]]
+        if pair not in self.scale and quotes[0]:
+            self.scale[pair] = 1.0 / float(quotes[0])
+        return timestamps, base_prices[base_at[valid]] / quotes
@@ -0,0 +1,916 @@
+import numpy as np
+import requests
+from utils.alerts import CLOSE_ABOVE, CLOSE_BELOW, PF_NEW_COLUMN, RENKO_REVERSAL, AlertEngine
+from utils.binance_websocket import BinanceDepthStream
+from utils.compressed import CompressedLineSeries
+from utils.correlation import RollingCorrelation
+from utils.cross_rates import CrossRateEngine, cross_pairs
+from utils.exchanges import EXCHANGES
+from utils.ingest import IngestLoop, TradeStream
+from utils.klines import KlineBackfill
+from utils.records import (
+    DOWN, MARKER_O, MARKER_X, NEUTRAL, UP,
+    CandleClosed, OHLCSeries, PointSeries, Quote, RenkoSeries
+)
+from utils.providers import DEFAULT_PROVIDERS, TickBatch
+from utils.response_cache import ResponseCache
+from utils.retention import HOUR_NS, MINUTE_NS, RetentionManager, resample_candles
+from utils.scheduler import PollScheduler
+from utils.sequencer import QuoteSequencer
+from utils.timebase import now_ns, seconds_to_ns
+from utils.timing_wheel import TimingWheel
+from utils.trades import TradeBatcher, aggregate_trades
+from utils.transforms import TRANSFORMS
+
+# Visões derivadas materializadas sob demanda e o atributo de cada uma
+VIEW_STORES = {
+    'ohlc': 'ohlc_data',
+    'renko': 'renko_data',
+    'point': 'point_data',
+}
+# As transformações de `utils.transforms` também são visões, guardadas em `transform_data`
+
+
+class CryptoDataFetcher:
+    def __init__(self, response_cache=None, scheduler=None, notify=None, alerts=None,
+                 providers=None, pinned_views=(), view_idle_seconds=120, retention=None,
+                 ingest=None, trade_exchange='binance', klines=None):
+        self.response_cache = response_cache or ResponseCache()
+        self.notify = notify or print  # avisos exibidos ao usuário
+        self.scheduler = scheduler or PollScheduler()
+        self.alerts = alerts or AlertEngine()
+        self.provider_chain = list(providers or (cls() for cls in DEFAULT_PROVIDERS))
+        self.retention = retention or RetentionManager()
+        self.correlation = RollingCorrelation(window=60)
+        # Streams e polls REST rodam no loop asyncio de ingestão (thread de fundo)
+        self.ingest = ingest or IngestLoop()
+        self.poll = None  # Future do poll REST em andamento
+        # Velas históricas buscadas ao iniciar, antes das cotações ao vivo
+        self.klines = klines or KlineBackfill()
+        # Cotações deduplicadas e ordenadas pelo instante da fonte
+        self.sequencer = QuoteSequencer()
+        # Pares cruzados (ex.: ETH/BTC) derivados das cotações em USD
+        self.cross_rates = CrossRateEngine()
+        self.trade_exchange = trade_exchange
+        self.trade_batcher = TradeBatcher()
+        self.trade_stream = None
+        self.trade_symbols = set()  # símbolos com volume real via aggTrade
+        self.depth_stream = None
+        self.price_data = {}
+        self.tiers = {}  # ticks brutos + velas de 1 min e 1 h: fonte de verdade das visões
+        self.historical_data = {}
+        self.ohlc_data = {}
+        self.renko_data = {}
+        self.point_data = {}
+        self.transform_data = {}    # nome -> {símbolo: operador}
+        self.transform_params = {}  # nome -> parâmetros dos operadores
+        self.running = False
+        self.symbols = []
+        self.candle_interval = 60  # segundos para cada vela
+        self.candle_interval_ns = seconds_to_ns(60)
+        self.brick_size = None  # para Renko
+        self.point_size = None  # para Point and Figure
+        # Visões sempre mantidas (ex.: daemon) e último acesso das demais
+        self.pinned_views = set(pinned_views)
+        self.view_access = {}
+        self.view_idle_ns = seconds_to_ns(view_idle_seconds)
+        # Fechamento das velas de todos os símbolos no fim de cada bucket
+        self.candle_clock = TimingWheel(start_ns=now_ns())
+        self.closed_until = {}      # símbolo -> início do primeiro bucket ainda aberto
+        self.late_candle_ticks = 0  # ticks de velas já encerradas (descartados)
+        # Relógio dos dados: o de parede ao vivo, o do arquivo durante um replay
+        self.clock = now_ns
+        self.replay = None  # ReplaySource em reprodução
+        self.candle_listeners = []  # callbacks(CandleClosed), ex.: indicadores
+        
+    def init_ohlc_data(self, symbol):
+        """Inicializa estrutura de dados OHLC para um símbolo"""
+        if symbol not in self.ohlc_data:
+            self.ohlc_data[symbol] = OHLCSeries(capacity=self.retention.capacity('ohlc'))
+            if symbol not in self.candle_clock:
+                self._schedule_close(symbol)
+    
+    def _schedule_close(self, symbol):
+        """Agenda o fechamento da vela do símbolo no fim do bucket atual"""
+        now = self.clock()
+        self.candle_clock.schedule(symbol, now - now % self.candle_interval_ns + self.candle_interval_ns)
+    
+    def init_renko_data(self, symbol):
+        """Inicializa estrutura de dados Renko para um símbolo"""
+        if symbol not in self.renko_data:
+            self.renko_data[symbol] = RenkoSeries(capacity=self.retention.capacity('renko'))
+    
+    def init_point_data(self, symbol):
+        """Inicializa estrutura de dados Point and Figure para um símbolo"""
+        if symbol not in self.point_data:
+            self.point_data[symbol] = PointSeries(capacity=self.retention.capacity('point'))
+    
+    def box_size(self, symbol, size):
+        """Caixa (brick/ponto) do símbolo: nos pares cruzados o valor em USD vira moeda de cotação"""
+        scale = self.cross_rates.scale.get(symbol)
+        return size * scale if scale and size is not None else size
+    
+    def _box_sizes(self, symbols, size):
+        """Caixa de cada linha do lote (escalar sem pares cruzados), ou None se desativada"""
+        if size is None or size <= 0:
+            return None
+        if not self.cross_rates.scale:
+            return size
+        return np.array([self.box_size(symbol, size) for symbol in symbols])
+    
+    def set_cross_pairs(self, pairs):
+        """Configura os pares cruzados derivados ('ETH/BTC') entre os símbolos ativos.
+        
+        Pares novos são preenchidos com o histórico a partir dos ticks já
+        gravados das pernas; os removidos saem de todas as visões.
+        """
+        available = cross_pairs(self.symbols)
+        wanted = {pair: available[pair] for pair in pairs if pair in available}
+        for pair in set(self.cross_rates.pairs) - set(wanted):
+            self._drop_symbol(pair)
+        added = [pair for pair in wanted if pair not in self.cross_rates.pairs]
+        self.cross_rates.set_pairs(wanted, {s: q.price for s, q in self.price_data.items()})
+        for pair in added:
+            self._backfill_cross(pair)
+    
+    def _leg_quotes(self, symbol):
+        """(timestamps, preços) das cotações gravadas de uma perna, em ordem de tempo"""
+        history = self.tiers.get(symbol)
+        if history is None or not len(history.ticks):
+            return np.empty(0, np.int64), np.empty(0)
+        ticks = history.ticks
+        quotes = ~ticks['trade']
+        timestamps = ticks['timestamps'][quotes]
+        order = np.argsort(timestamps, kind='stable')
+        return timestamps[order], ticks['prices'][quotes][order]
+    
+    def _backfill_cross(self, pair):
+        base, quote = self.cross_rates.pairs[pair]
+        derived = self.cross_rates.backfill(pair, self._leg_quotes(base), self._leg_quotes(quote))
+        if derived is None:
+            return
+        timestamps, prices = derived
+        n = len(timestamps)
+        # Histórico reconstruído não dispara alertas
+        self.apply_batch(TickBatch([pair] * n, timestamps, prices, np.full(n, np.nan), np.zeros(n)),
+                         fire_alerts=False)
+    
+    def _drop_symbol(self, symbol):
+        """Remove o símbolo de todas as séries"""
+        for store in (self.price_data, self.tiers, self.historical_data,
+                      self.ohlc_data, self.renko_data, self.point_data):
+            store.pop(symbol, None)
+        for operators in self.transform_data.values():
+            operators.pop(symbol, None)
+        self.closed_until.pop(symbol, None)
+        self.candle_clock.cancel(symbol)
+    
+    def transform_operator(self, name, symbol):
+        """Operador da transformação `name` do símbolo (criado sob demanda)"""
+        operators = self.transform_data.setdefault(name, {})
+        operator = operators.get(symbol)
+        if operator is None:
+            # Kagi guarda vértices, mais numerosos que velas: usa a capacidade do P&F
+            capacity = self.retention.capacity('point' if name == 'kagi' else 'ohlc')
+            operator = operators[symbol] = TRANSFORMS[name](capacity=capacity,
+                                                            **self.transform_params.get(name, {}))
+        return operator
+    
+    def update_quote(self, symbol, price, change, volume, timestamp, fire_alerts=True):
+        """Atualiza a cotação atual do símbolo no lugar"""
+        quote = self.price_data.get(symbol)
+        if quote is None:
+            self.price_data[symbol] = Quote(price, change, volume, timestamp)
+        else:
+            quote.update(price, change, volume, timestamp)
+        
+        if fire_alerts:
+            self.alerts.on_price(symbol, price, timestamp)
+    
+    def history(self, symbol):
+        """Histórico em camadas do símbolo (criado sob demanda)"""
+        history = self.tiers.get(symbol)
+        if history is None:
+            history = self.tiers[symbol] = self.retention.new_history()
+        return history
+    
+    def record_tick(self, symbol, price, timestamp):
+        """Grava a cotação no histórico em camadas.
+        
+        Para símbolos com stream de trades as camadas agregadas vêm dos
+        trades; a cotação fica só entre os ticks brutos.
+        """
+        self.history(symbol).add_quote(timestamp, price, aggregate=symbol not in self.trade_symbols)
+    
+    def view_active(self, view):
+        """Indica se a visão está sendo mantida incrementalmente.
+        
+        Alertas de reversão Renko, de nova coluna P&F e de fechamento de
+        vela também mantêm a visão correspondente ativa, pois dependem dela
+        para disparar.
+        """
+        if view in self.pinned_views or view in self.view_access:
+            return True
+        if view == 'renko':
+            return self.alerts.has_event_alerts(RENKO_REVERSAL)
+        if view == 'point':
+            return self.alerts.has_event_alerts(PF_NEW_COLUMN)
+        if view == 'ohlc':
+            return self.alerts.has_event_alerts(CLOSE_ABOVE) or self.alerts.has_event_alerts(CLOSE_BELOW)
+        return False
+    
+    def watch(self, view):
+        """Registra acesso à visão, materializando-a a partir dos ticks se inativa"""
+        if not self.view_active(view):
+            self.materialize(view)
+        self.view_access[view] = now_ns()
+    
+    def _view_store(self, view):
+        if view in VIEW_STORES:
+            return getattr(self, VIEW_STORES[view])
+        return self.transform_data.setdefault(view, {})
+    
+    def materialize(self, view):
+        """Reconstrói a visão para todos os símbolos a partir do log de ticks"""
+        store = self._view_store(view)
+        store.clear()
+        for symbol, history in self.tiers.items():
+            ticks = history.ticks
+            if not len(ticks):
+                continue
+            if view == 'ohlc':
+                self._rebuild_ohlc(symbol, history)
+                continue
+            # Renko, P&F e transformações seguem só as cotações, como na atualização ao vivo
+            quotes = ~ticks['trade']
+            if view in TRANSFORMS:
+                self.transform_operator(view, symbol).batch(ticks['timestamps'][quotes],
+                                                            ticks['prices'][quotes])
+                continue
+            timestamps = ticks['timestamps'][quotes].tolist()
+            prices = ticks['prices'][quotes].tolist()
+            update = self.update_renko_data if view == 'renko' else self.update_point_data
+            for timestamp, price in zip(timestamps, prices):
+                update(symbol, price, timestamp, fire_alerts=False)
+    
+    def _rebuild_ohlc(self, symbol, history):
+        self.init_ohlc_data(symbol)
+        ohlc = self.ohlc_data[symbol]
+        ticks = history.ticks
+        
+        # Símbolos com stream de trades usam só os trades (volume real)
+        if symbol in self.trade_symbols:
+            mask = ticks['trade']
+        else:
+            mask = ~ticks['trade']
+        
+        # Período até o primeiro minuto dos ticks brutos retidos (inclusive)
+        # vem da camada de 1 min, que cobre também os ticks já descartados
+        if self.candle_interval_ns % MINUTE_NS == 0:
+            first_tick = int(ticks['timestamps'].min())
+            cutoff = first_tick - first_tick % MINUTE_NS + MINUTE_NS
+            older = resample_candles(history.minutes, self.candle_interval_ns, before=cutoff)
+            if older is not None:
+                ohlc.merge_candles(*older, interval_ns=self.candle_interval_ns)
+                mask = mask & (ticks['timestamps'] >= cutoff)
+        volumes = ticks['volumes'][mask]
+        candles = aggregate_trades(ticks['timestamps'][mask], ticks['prices'][mask], volumes,
+                                   ticks['buy_volumes'][mask] < volumes, self.candle_interval_ns)
+        if candles is not None:
+            ohlc.merge_candles(*candles, interval_ns=self.candle_interval_ns)
+    
+    def evict_idle_views(self):
+        """Descarta visões sem acesso há mais de `view_idle_seconds`"""
+        cutoff = now_ns() - self.view_idle_ns
+        for view, accessed in list(self.view_access.items()):
+            if accessed < cutoff:
+                del self.view_access[view]
+                if not self.view_active(view):
+                    self._view_store(view).clear()
+    
+    def update_line_history(self, symbol, price, timestamp):
+        """Atualiza histórico de linha (para comparação)"""
+        line = self.historical_data.get(symbol)
+        if line is None:
+            line = self.historical_data[symbol] = CompressedLineSeries(
+                capacity=self.retention.capacity('line'),
+                max_rows=self.retention.capacity('line_history')
+            )
+        line.append(timestamp, price)
+    
+    def update_ohlc_candle(self, symbol, price, volume, timestamp):
+        """Atualiza ou cria nova vela OHLC (timestamp em nanossegundos desde a época).
+        
+        `volume` é o volume negociado desde o tick anterior (0 para cotações
+        de polling). Símbolos com stream de trades são atualizados por
+        `apply_trades`.
+        """
+        # Bucket da vela por aritmética inteira
+        self._update_candle(symbol, price, volume, timestamp - timestamp % self.candle_interval_ns)
+    
+    def _update_candle(self, symbol, price, volume, candle_start_time):
+        if symbol in self.trade_symbols:
+            return
+        
+        self.init_ohlc_data(symbol)
+        ohlc = self.ohlc_data[symbol]
+        last_start_time = ohlc.last_timestamp
+        
+        # Tick atrasado: a vela dele já foi encerrada e entregue aos alertas
+        # (ou é anterior à vela aberta); só a vela do próprio bucket muda
+        closed_until = self.closed_until.get(symbol)
+        if closed_until is not None and candle_start_time < closed_until:
+            self.late_candle_ticks += 1
+            return
+        
+        # Se é uma nova vela ou primeira vela
+        if last_start_time is None or candle_start_time > last_start_time:
+            ohlc.fill_gap(candle_start_time, self.candle_interval_ns)
+            ohlc.open_candle(candle_start_time, price, volume)
+        elif candle_start_time == last_start_time:
+            ohlc.update_candle(price, volume)
+        else:
+            self.late_candle_ticks += 1
+    
+    def close_candles(self, now=None):
+        """Encerra as velas cujo bucket terminou, para todos os símbolos.
+        
+        Cada símbolo tem um timer na roda de temporização no fim da vela
+        aberta: o custo é O(1) amortizado por vela encerrada, sem varrer os
+        símbolos. Intervalos sem ticks ganham velas planas. Retorna os
+        eventos `CandleClosed`, também entregues aos alertas e a
+        `candle_listeners`.
+        """
+        now = self.clock() if now is None else now
+        interval = self.candle_interval_ns
+        boundary = now - now % interval  # buckets anteriores já terminaram
+        events = []
+        for deadline, symbol in self.candle_clock.advance(now):
+            ohlc = self.ohlc_data.get(symbol)
+            if ohlc is None:
+                continue  # visão descartada: o timer volta com a série
+            self.candle_clock.schedule(symbol, boundary + interval)
+            self.closed_until[symbol] = boundary
+            if not len(ohlc):
+                continue
+            ohlc.fill_gap(boundary, interval)
+            timestamps = ohlc['timestamps']
+            first = int(np.searchsorted(timestamps, deadline - interval))
+            last = int(np.searchsorted(timestamps, boundary))
+            for row in range(first, last):
+                start = int(timestamps[row])
+                events.append(CandleClosed(
+                    symbol, start, start + interval,
+                    float(ohlc['open'][row]), float(ohlc['high'][row]), float(ohlc['low'][row]),
+                    float(ohlc['close'][row]), float(ohlc['volume'][row])
+                ))
+        
+        for event in events:
+            self.alerts.on_candle_closed(event)
+            for listener in self.candle_listeners:
+                listener(event)
+        return events
+    
+    def start_trade_stream(self, symbols):
+        """Assina os trades da corretora `trade_exchange` para volume real por vela"""
+        if self.trade_stream is not None and self.trade_stream.adapter.name != self.trade_exchange:
+            self.stop_trade_stream()
+        if self.trade_stream is None:
+            adapter = EXCHANGES[self.trade_exchange]()
+            self.trade_stream = TradeStream(adapter, self.trade_batcher, self.ingest)
+        # Troca as assinaturas sem reabrir as conexões
+        self.trade_stream.set_symbols(symbols)
+        self.trade_symbols = set(self.trade_stream.symbols.values())
+    
+    def stop_trade_stream(self):
+        """Encerra o stream de trades"""
+        if self.trade_stream:
+            self.trade_stream.stop_stream()
+        self.trade_stream = None
+        self.trade_symbols = set()
+        self.trade_batcher.drain()
+    
+    def start_depth_stream(self, symbols):
+        """Assina o stream de profundidade da Binance (order book L2)"""
+        if self.depth_stream:
+            self.depth_stream.set_symbols(symbols)
+            return
+        self.depth_stream = BinanceDepthStream(ingest=self.ingest)
+        self.depth_stream.start_stream(symbols)
+    
+    def stop_depth_stream(self):
+        """Encerra o stream de profundidade"""
+        if self.depth_stream:
+            self.depth_stream.stop_stream()
+        self.depth_stream = None
+    
+    def apply_trades(self):
+        """Agrega os micro-lotes de trades pendentes em velas OHLCV; retorna se havia trades"""
+        ohlc_active = self.view_active('ohlc')
+        pending = self.trade_batcher.drain()
+        for symbol, columns in pending.items():
+            self.history(symbol).add_trades(*columns)
+            if not ohlc_active:
+                continue
+            candles = aggregate_trades(*columns, self.candle_interval_ns)
+            if candles is None:
+                continue
+            self.init_ohlc_data(symbol)
+            self.ohlc_data[symbol].merge_candles(*candles, interval_ns=self.candle_interval_ns)
+        return bool(pending)
+    
+    def update_renko_data(self, symbol, price, timestamp, fire_alerts=True):
+        """Atualiza dados Renko com novos preços"""
+        self.init_renko_data(symbol)
+        
+        brick_size = self.box_size(symbol, self.brick_size)
+        if brick_size is None or brick_size <= 0:
+            return
+        
+        renko = self.renko_data[symbol]
+        
+        # Primeira vela
+        if renko.last_brick_close is None:
+            renko.add_brick(timestamp, price, price, NEUTRAL)
+            return
+        
+        last_close = renko.last_brick_close
+        
+        # Calcula quantos bricks se moveram
+        num_bricks = int(abs(price - last_close) / brick_size)
+        
+        if num_bricks >= 1:
+            # Determina direção
+            if price > last_close:
+                direction = UP
+                step = brick_size
+            else:
+                direction = DOWN
+                step = -brick_size
+            
+            # Reversão: primeiro brick na direção oposta à do anterior
+            last_direction = renko['direction'][-1]
+            if fire_alerts and last_direction != NEUTRAL and last_direction != direction:
+                self.alerts.on_renko_reversal(symbol, direction, price, timestamp)
+            
+            # Cria novos bricks
+            for i in range(num_bricks):
+                brick_open = last_close + i * step
+                renko.add_brick(timestamp, brick_open, brick_open + step, direction)
+    
+    def update_point_data(self, symbol, price, timestamp, fire_alerts=True):
+        """Atualiza dados Point and Figure"""
+        self.init_point_data(symbol)
+        
+        point_size = self.box_size(symbol, self.point_size)
+        if point_size is None or point_size <= 0:
+            return
+        
+        pf = self.point_data[symbol]
+        
+        # Primeira vela
+        if pf.last_price is None:
+            pf.last_price = price
+            pf.last_marker = MARKER_X if price > 0 else MARKER_O
+            pf.add_point(price, pf.last_marker)
+            return
+        
+        last_price = pf.last_price
+        
+        # Calcula mudança em pontos
+        num_points = int(abs(price - last_price) / point_size)
+        
+        if num_points >= 1:
+            if price > last_price:
+                # Movimento para cima
+                new_marker = MARKER_X
+                step = point_size
+            else:
+                # Movimento para baixo
+                new_marker = MARKER_O
+                step = -point_size
+            
+            if pf.last_marker != new_marker:
+                # Muda de coluna
+                pf.column += 1
+                pf.last_marker = new_marker
+                if fire_alerts:
+                    self.alerts.on_pf_new_column(symbol, new_marker, price, timestamp)
+            
+            # Adiciona pontos
+            for i in range(num_points):
+                pf.add_point(last_price + (i + 1) * step, new_marker)
+            
+            pf.last_price = price
+    
+    def cached_get(self, key, url, params=None, timeout=15):
+        """GET com cache de respostas; retorna o JSON ou None se o status não for 200"""
+        def request():
+            response = requests.get(url, params=params, timeout=timeout)
+            self.scheduler.observe_response(key[0], response)
+            response.raise_for_status()
+            return response.json()
+        
+        try:
+            return self.response_cache.get(key, request)
+        except requests.HTTPError as e:
+            print(f"API Error {e.response.status_code}: {url}")
+            return None
+    
+    def apply_batch(self, batch, fire_alerts=True):
+        """Aplica um lote de cotações a todos os agregadores em uma passada.
+        
+        O bucket das velas é calculado de forma vetorizada para o lote
+        inteiro. O pré-filtro de Renko e P&F (andou uma caixa?) compara com
+        o estado de antes do lote, então só vale para o primeiro tick de
+        cada símbolo: os seguintes passam pela atualização tick a tick,
+        contra o estado já avançado pelos anteriores.
+        Visões sem observadores não são mantidas: os ticks ficam no log e
+        são reaplicados quando alguém voltar a assisti-las. Os ticks dos
+        pares cruzados entram no lote logo após os das pernas.
+        `fire_alerts=False` aplica sem alertas (reconstrução de histórico).
+        """
+        if batch is None or not len(batch):
+            return False
+        batch = self.cross_rates.extend(batch)
+        
+        symbols = batch.symbols
+        timestamps = batch.timestamps
+        prices = batch.prices
+        
+        # Variação ausente: calcula em relação ao preço mais antigo do histórico
+        changes = batch.changes
+        missing = np.isnan(changes)
+        if np.any(missing):
+            oldest = np.array([
+                self.historical_data[s]['prices'][0]
+                if s in self.historical_data and len(self.historical_data[s]) else p
+                for s, p in zip(symbols, prices.tolist())
+            ])
+            changes = np.where(missing, (prices - oldest) / oldest * 100, changes)
+        
+        ohlc_active = self.view_active('ohlc')
+        renko_active = self.view_active('renko')
+        point_active = self.view_active('point')
+        # Só as transformações assistidas; sem nenhuma, o laço não tem custo extra
+        transforms = [name for name in TRANSFORMS if self.view_active(name)]
+        
+        buckets = timestamps - timestamps % self.candle_interval_ns
+        renko_moved = self._moved(self.renko_data, symbols, prices,
+                                  self._box_sizes(symbols, self.brick_size) if renko_active else None,
+                                  lambda renko: renko.last_brick_close)
+        point_moved = self._moved(self.point_data, symbols, prices,
+                                  self._box_sizes(symbols, self.point_size) if point_active else None,
+                                  lambda pf: pf.last_price)
+        
+        rows = zip(symbols, timestamps.tolist(), prices.tolist(), changes.tolist(),
+                   batch.volumes.tolist(), buckets.tolist(), renko_moved, point_moved)
+        for symbol, timestamp, price, change, volume, bucket, renko, point in rows:
+            self.update_quote(symbol, price, change, volume, timestamp, fire_alerts)
+            self.record_tick(symbol, price, timestamp)
+            if ohlc_active:
+                # Volume de 24h não é volume da vela
+                self._update_candle(symbol, price, 0, bucket)
+            if renko_active:
+                self.init_renko_data(symbol)
+                if renko:
+                    self.update_renko_data(symbol, price, timestamp, fire_alerts)
+            if point_active:
+                self.init_point_data(symbol)
+                if point:
+                    self.update_point_data(symbol, price, timestamp, fire_alerts)
+            for name in transforms:
+                self.transform_operator(name, symbol).update(timestamp, price)
+            self.update_line_history(symbol, price, timestamp)
+        
+        return True
+    
+    @staticmethod
+    def _moved(store, symbols, prices, box_size, last_value):
+        """Máscara das linhas que precisam da atualização tick a tick.
+        
+        São as que andaram ao menos uma caixa desde o estado anterior ao
+        lote (ou sem estado) e todas as repetições de um símbolo no lote,
+        cujo estado depende dos ticks anteriores. `box_size` é escalar ou
+        um array por linha; None desativa a visão.
+        """
+        if box_size is None:
+            return [False] * len(symbols)
+        last = np.array([
+            np.nan if symbol not in store or last_value(store[symbol]) is None
+            else last_value(store[symbol])
+            for symbol in symbols
+        ], dtype=np.float64)
+        with np.errstate(invalid='ignore'):
+            moved = np.abs(prices - last) >= box_size
+        repeated = np.ones(len(symbols), dtype=bool)
+        repeated[np.unique(symbols, return_index=True)[1]] = False
+        return (moved | np.isnan(last) | repeated).tolist()
+    
+    def fetch_from(self, provider, symbols):
+        """Busca um lote no provedor e aplica aos agregadores; indica se o provedor respondeu"""
+        try:
+            batch = provider.fetch(symbols, self.cached_get)
+        except Exception as e:
+            print(f"Erro {provider.label}: {str(e)}")
+            return False
+        if batch is None or not len(batch):
+            return False
+        # Carga inicial: aplica na hora, sem esperar a janela de reordenação
+        self.sequencer.push(batch)
+        self.apply_batch(self.sequencer.release(flush=True))
+        return True
+    
+    def backfill_klines(self, symbols):
+        """Carrega velas históricas de 1 min (klines) dos símbolos ainda sem histórico.
+        
+        Cobre a janela do gráfico OHLC (capacidade × intervalo das velas).
+        As páginas de todos os símbolos são buscadas em paralelo no loop de
+        ingestão, sob o rate limit do provedor, e entram direto nas camadas
+        de 1 min e 1 h, de onde as velas OHLC são reconstruídas. Retorna os
+        símbolos carregados.
+        """
+        symbols = [s for s in symbols if not len(self.history(s).minutes)]
+        if not symbols:
+            return []
+        minutes = min(-(-self.retention.capacity('ohlc') * self.candle_interval_ns // MINUTE_NS),
+                      self.retention.capacity('minute'))
+        now = self.clock()
+        start = now - now % MINUTE_NS - (minutes - 1) * MINUTE_NS
+        candles = self.klines.fetch(symbols, start, now, self.cached_get,
+                                    self.scheduler.rate_limit(self.klines.name),
+                                    self.ingest.run_blocking)
+        
+        # Visão OHLC ativa: recebe as velas já no intervalo configurado
+        ohlc_active = self.view_active('ohlc') and self.candle_interval_ns % MINUTE_NS == 0
+        for symbol, columns in candles.items():
+            history = self.history(symbol)
+            history.minutes.merge_candles(*columns)
+            history.hours.merge_candles(*resample_candles(history.minutes, HOUR_NS))
+            if ohlc_active:
+                self.init_ohlc_data(symbol)
+                self.ohlc_data[symbol].merge_candles(
+                    *resample_candles(history.minutes, self.candle_interval_ns),
+                    interval_ns=self.candle_interval_ns
+                )
+        return list(candles)
+    
+    def start_fetching(self, symbols, candle_interval=60, brick_size=None, point_size=None,
+                       trade_volume=False, order_book=False, cross_pairs=(), backfill=False):
+        """Inicia busca de dados com fallbacks"""
+        self.symbols = symbols
+        self.candle_interval = candle_interval
+        self.candle_interval_ns = seconds_to_ns(candle_interval)
+        self.brick_size = brick_size
+        self.point_size = point_size
+        self.running = True
+        self.retention.fit(len(symbols), self.tiers, self.historical_data)
+        # O intervalo pode ter mudado: os timers voltam para o novo fim de bucket
+        self.candle_clock.clear()
+        for symbol in self.ohlc_data:
+            self._schedule_close(symbol)
+        if self.poll is not None:
+            # Poll em andamento com os símbolos anteriores é descartado
+            self.poll.cancel()
+            self.poll = None
+        
+        if trade_volume:
+            self.start_trade_stream(symbols)
+        else:
+            self.stop_trade_stream()
+        if order_book:
+            self.start_depth_stream(symbols)
+        else:
+            self.stop_depth_stream()
+        if backfill:
+            self.backfill_klines(symbols)
+        
+        # Tenta múltiplas APIs em ordem de preferência
+        success = False
+        previous = None
+        for provider in self.providers():
+            if previous is not None:
+                self.notify(f"{previous.label} indisponível, tentando {provider.label}...")
+            success = self.fetch_from(provider, symbols)
+            if success:
+                break
+            previous = provider
+        
+        if success:
+            self.scheduler.mark_polled(symbols)
+            self.update_correlation(now_ns())
+        self.set_cross_pairs(cross_pairs)
+        
+        return success
+    
+    def start_replay(self, source, candle_interval=60, brick_size=None, point_size=None):
+        """Inicia a reprodução de um arquivo de ticks (ReplaySource) no lugar das APIs.
+        
+        Os ticks passam pelo mesmo `apply_batch` dos dados ao vivo; o
+        fechamento das velas segue o relógio do replay.
+        """
+        self.stop_fetching()
+        self.symbols = list(source.symbols)
+        self.candle_interval = candle_interval
+        self.candle_interval_ns = seconds_to_ns(candle_interval)
+        self.brick_size = brick_size
+        self.point_size = point_size
+        self.retention.fit(len(self.symbols), self.tiers, self.historical_data)
+        self.replay = source
+        self.clock = source.now
+        self.candle_clock = TimingWheel(start_ns=source.now())
+        self.running = True
+        return True
+    
+    def seek_replay(self, timestamp, warmup_seconds=3600):
+        """Salta o replay para `timestamp`, reconstruindo as visões com a última hora antes dele"""
+        if self.replay is None:
+            return
+        self._clear_data()
+        # Os pares cruzados voltam a esperar as duas pernas
+        self.cross_rates.last.clear()
+        self.cross_rates.changes.clear()
+        self.replay.seek(timestamp, seconds_to_ns(warmup_seconds))
+        self.candle_clock = TimingWheel(start_ns=self.clock())
+    
+    def _clear_data(self):
+        self.sequencer.reset()
+        self.closed_until.clear()
+        self.late_candle_ticks = 0
+        self.price_data.clear()
+        self.tiers.clear()
+        self.candle_clock.clear()
+        self.historical_data.clear()
+        self.ohlc_data.clear()
+        self.renko_data.clear()
+        self.point_data.clear()
+        self.transform_data.clear()
+        self.correlation.reset([])
+    
+    def stop_fetching(self):
+        """Para a busca de dados (ou o replay)"""
+        self.running = False
+        if self.poll is not None:
+            self.poll.cancel()
+            self.poll = None
+        self.stop_trade_stream()
+        self.stop_depth_stream()
+        self.replay = None
+        self.clock = now_ns
+        self.candle_clock = TimingWheel(start_ns=now_ns())
+        self.cross_rates = CrossRateEngine()
+        self._clear_data()
+    
+    def providers(self):
+        """Provedores em ordem de preferência"""
+        return self.provider_chain
+    
+    def update_data(self):
+        """Aplica o poll concluído e agenda, no loop de ingestão, o dos símbolos vencidos.
+        
+        A chamada não bloqueia em rede: as respostas REST chegam em segundo
+        plano e são aplicadas aos agregadores na chamada seguinte, no
+        thread de quem consome os dados, depois de passarem pelo
+        sequenciador. Durante um replay os ticks vêm do arquivo. Retorna
+        se algo novo chegou às visões.
+        """
+        if self.running and self.replay is not None:
+            return self._update_replay()
+        if self.running and self.symbols:
+            self.evict_idle_views()
+            # Velas de símbolos com stream de trades mudam só por aqui
+            updated = self.apply_trades()
+            
+            for symbol in self.symbols:
+                if symbol in self.historical_data:
+                    self.scheduler.update_volatility(symbol, self.historical_data[symbol]['prices'])
+            
+            if self.poll is not None and self.poll.done():
+                poll, self.poll = self.poll, None
+                self.apply_poll(poll.result())
+            if self.apply_batch(self.sequencer.release()):
+                self.update_correlation(now_ns())
+                updated = True
+            if self.close_candles():
+                updated = True
+            if self.poll is None:
+                self.poll = self.ingest.run_blocking(self.fetch_due, list(self.symbols))
+            return updated
+        return False
+    
+    def _update_replay(self):
+        """Aplica os ticks do arquivo até o instante atual do replay"""
+        self.evict_idle_views()
+        updated = self.apply_batch(self.replay.next_batch())
+        if updated:
+            self.update_correlation(self.clock())
+        if self.close_candles():
+            updated = True
+        return updated
+    
+    def fetch_due(self, symbols):
+        """Busca (só I/O) os símbolos vencidos no primeiro provedor disponível.
+        
+        Tenta os provedores na ordem, pulando os em Retry-After. Retorna
+        (símbolos, lote), (símbolos, None) se nada venceu, ou None se todos
+        falharam; nesse caso os símbolos vencidos são adiados com backoff
+        (ou até o fim do Retry-After), sem repetir a consulta a cada rerun.
+        """
+        failed = set()
+        for provider in self.providers():
+            if self.scheduler.is_blocked(provider.name):
+                continue
+            due_symbols = self.scheduler.due_symbols(provider.name, symbols)
+            if not due_symbols:
+                return due_symbols, None
+            failed.update(due_symbols)
+            try:
+                batch = provider.fetch(due_symbols, self.cached_get)
+            except Exception as e:
+                print(f"Erro {provider.label}: {str(e)}")
+                continue
+            if batch is not None and len(batch):
+                return due_symbols, batch
+        # Todos bloqueados: nenhum provedor chegou a ser consultado
+        failed = failed or set(symbols)
+        self.scheduler.mark_failed(failed, self.scheduler.retry_after(p.name for p in self.providers()))
+        return None
+    
+    def apply_poll(self, result):
+        """Entrega o resultado de `fetch_due` ao sequenciador de cotações.
+        
+        Cotações repetidas (instante da fonte sem avançar) são descartadas
+        lá; as novas chegam aos agregadores ao saírem da janela de
+        reordenação. Retorna se o provedor respondeu.
+        """
+        if result is None or not self.running:
+            return False
+        due_symbols, batch = result
+        if batch is None:
+            return False
+        self.sequencer.push(batch)
+        self.scheduler.mark_polled(due_symbols)
+        return True
+    
+    def update_correlation(self, timestamp):
+        """Amostra os preços atuais na correlação móvel entre os símbolos"""
+        symbols = [s for s in self.symbols if s in self.price_data]
+        if symbols != self.correlation.symbols:
+            self.correlation.backfill(self.historical_data, symbols)
+        self.correlation.sample(timestamp, {s: self.price_data[s].price for s in symbols})
+    
+    def next_update_delay(self):
+        """Segundos até o próximo símbolo precisar de atualização"""
+        if self.replay is not None:
+            return 0.0 if self.replay.speed is None else 1.0
+        return self.scheduler.seconds_until_next(self.symbols)
+    
+    def get_data(self):
+        """Retorna dados atuais"""
+        return self.price_data, self.historical_data
+    
+    def get_ohlc_data(self):
+        """Retorna dados OHLC (mantendo a visão ativa)"""
+        self.watch('ohlc')
+        return self.ohlc_data
+    
+    def get_renko_data(self):
+        """Retorna dados Renko (mantendo a visão ativa)"""
+        self.watch('renko')
+        return self.renko_data
+    
+    def get_point_data(self):
+        """Retorna dados Point and Figure (mantendo a visão ativa)"""
+        self.watch('point')
+        return self.point_data
+    
+    def get_transform_data(self, name, **params):
+        """Retorna as séries da transformação `name` (mantendo a visão ativa).
+        
+        Parâmetros diferentes dos atuais descartam os operadores, e a visão
+        é reconstruída a partir dos ticks com os novos.
+        """
+        if params != self.transform_params.get(name):
+            self.transform_params[name] = params
+            self.transform_data.pop(name, None)
+            self.view_access.pop(name, None)
+        self.watch(name)
+        return {symbol: operator.series for symbol, operator in self.transform_data.get(name, {}).items()}
+    
+    def sequencer_stats(self):
+        """Contadores do sequenciador (cotações recebidas, repetidas, atrasadas...).
+        
+        `late_candles` conta os ticks que passaram pelo sequenciador mas
+        chegaram depois de a vela do bucket deles ter sido encerrada.
+        """
+        stats = self.sequencer.stats()
+        stats['late_candles'] = self.late_candle_ticks
+        return stats
+    
+    def get_order_books(self):
+        """Retorna os order books do stream de profundidade"""
+        return self.depth_stream.order_books if self.depth_stream else {}
+    
+    def is_running(self):
+        """Verifica se está ativo"""
+        return self.running
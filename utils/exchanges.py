@@ -0,0 +1,178 @@
+"""Adaptadores de formato dos feeds WebSocket das corretoras.
+
+Cada adaptador sabe o nome dos streams de um símbolo, as mensagens de
+assinatura e como rotear e interpretar as mensagens recebidas; a conexão
+em si fica com `utils.ingest.ExchangeFeed`. A URL é configurável para
+testes contra servidores locais.
+"""
+from typing import List, Optional
+
+from utils.providers import SYMBOL_BASES
+from utils.timebase import NS_PER_MS, parse_iso_ns
+
+TRADES = 'trades'
+DEPTH = 'depth'
+
+
+class ExchangeAdapter:
+    name = ''
+    label = ''
+    url = ''
+    max_streams = 100             # streams por conexão
+    streams_per_message = 100     # streams por mensagem de controle
+    control_interval = 0.0        # segundos mínimos entre mensagens de controle
+
+    def __init__(self, url: str = None):
+        if url:
+            self.url = url
+
+    def stream(self, symbol: str, channel: str) -> Optional[str]:
+        """Nome do stream do símbolo no canal, ou None se não suportado"""
+        raise NotImplementedError
+
+    def subscribe(self, streams: List[str]) -> List[dict]:
+        raise NotImplementedError
+
+    def unsubscribe(self, streams: List[str]) -> List[dict]:
+        raise NotImplementedError
+
+    def route(self, message) -> List[tuple]:
+        """Pares (stream, dados) de uma mensagem recebida"""
+        raise NotImplementedError
+
+    def trades(self, data) -> List[tuple]:
+        """Trades de um evento: (timestamp ns, preço, quantidade, buyer_maker)"""
+        raise NotImplementedError
+
+    def _chunks(self, streams):
+        for i in range(0, len(streams), self.streams_per_message):
+            yield streams[i:i + self.streams_per_message]
+
+
+class BinanceAdapter(ExchangeAdapter):
+    """Streams combinados da Binance (`/stream`), assinados com SUBSCRIBE"""
+    name = 'binance'
+    label = 'Binance'
+    url = "wss://stream.binance.com:9443/stream"
+    max_streams = 1024
+    streams_per_message = 200
+    control_interval = 0.2  # limite de 5 mensagens por segundo
+
+    def __init__(self, url: str = None):
+        super().__init__(url)
+        self._ids = 0
+
+    def stream(self, symbol, channel):
+        suffix = {TRADES: 'aggTrade', DEPTH: 'depth@100ms'}.get(channel)
+        return f"{symbol.lower()}@{suffix}" if suffix else None
+
+    def _control(self, method, streams):
+        messages = []
+        for chunk in self._chunks(streams):
+            self._ids += 1
+            messages.append({'method': method, 'params': chunk, 'id': self._ids})
+        return messages
+
+    def subscribe(self, streams):
+        return self._control('SUBSCRIBE', streams)
+
+    def unsubscribe(self, streams):
+        return self._control('UNSUBSCRIBE', streams)
+
+    def route(self, message):
+        if 'stream' in message:
+            return [(message['stream'], message['data'])]
+        if message.get('error'):
+            print(f"Erro de assinatura Binance: {message['error']}")
+        return []
+
+    def trades(self, data):
+        return [(data['T'] * NS_PER_MS, float(data['p']), float(data['q']), data['m'])]
+
+
+class CoinbaseAdapter(ExchangeAdapter):
+    """Feed público da Coinbase Exchange, canal `matches` dos pares em USD"""
+    name = 'coinbase'
+    label = 'Coinbase'
+    url = "wss://ws-feed.exchange.coinbase.com"
+
+    def stream(self, symbol, channel):
+        base = SYMBOL_BASES.get(symbol)
+        if channel != TRADES or base is None:
+            return None
+        return f"matches:{base}-USD"
+
+    def _control(self, kind, streams):
+        return [{'type': kind, 'product_ids': [s.split(':', 1)[1] for s in chunk],
+                 'channels': ['matches']}
+                for chunk in self._chunks(streams)]
+
+    def subscribe(self, streams):
+        return self._control('subscribe', streams)
+
+    def unsubscribe(self, streams):
+        return self._control('unsubscribe', streams)
+
+    def route(self, message):
+        kind = message.get('type')
+        # `last_match` repete o último trade a cada assinatura: é ignorado
+        if kind == 'match':
+            return [(f"matches:{message['product_id']}", message)]
+        if kind == 'error':
+            print(f"Erro de assinatura Coinbase: {message.get('message')} {message.get('reason', '')}")
+        return []
+
+    def trades(self, data):
+        # `side` é o lado da ordem maker
+        return [(parse_iso_ns(data['time']), float(data['price']), float(data['size']),
+                 data['side'] == 'buy')]
+
+
+class KrakenAdapter(ExchangeAdapter):
+    """API WebSocket v2 da Kraken, canal `trade` dos pares em USD"""
+    name = 'kraken'
+    label = 'Kraken'
+    url = "wss://ws.kraken.com/v2"
+
+    def __init__(self, url: str = None):
+        super().__init__(url)
+        self._ids = 0
+
+    def stream(self, symbol, channel):
+        base = SYMBOL_BASES.get(symbol)
+        if channel != TRADES or base is None:
+            return None
+        return f"trade:{base}/USD"
+
+    def _control(self, method, streams):
+        messages = []
+        for chunk in self._chunks(streams):
+            self._ids += 1
+            messages.append({
+                'method': method,
+                'params': {'channel': 'trade', 'symbol': [s.split(':', 1)[1] for s in chunk],
+                           'snapshot': False},
+                'req_id': self._ids,
+            })
+        return messages
+
+    def subscribe(self, streams):
+        return self._control('subscribe', streams)
+
+    def unsubscribe(self, streams):
+        return self._control('unsubscribe', streams)
+
+    def route(self, message):
+        if message.get('channel') == 'trade' and message.get('type') == 'update':
+            return [(f"trade:{item['symbol']}", item) for item in message['data']]
+        if message.get('success') is False:
+            print(f"Erro de assinatura Kraken: {message.get('error')}")
+        return []
+
+    def trades(self, data):
+        # `side` é o lado do taker
+        return [(parse_iso_ns(data['timestamp']), float(data['price']), float(data['qty']),
+                 data['side'] == 'sell')]
+
+
+EXCHANGES = {cls.name: cls for cls in (BinanceAdapter, CoinbaseAdapter, KrakenAdapter)}
@@ -0,0 +1,44 @@
+import threading
+from collections import OrderedDict
+
+
+class FigureCache:
+    """Cache LRU de figuras prontas.
+
+    A chave inclui a versão da série (`ColumnBuffer.version`), então uma
+    figura só é reconstruída quando os dados do símbolo mudam; séries
+    paradas reaproveitam a figura entre reruns e entre sessões.
+    """
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._figures = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, key):
+        """Figura da chave, ou None se ausente"""
+        with self._lock:
+            figure = self._figures.get(key)
+            if figure is None:
+                self.misses += 1
+                return None
+            self._figures.move_to_end(key)
+            self.hits += 1
+            return figure
+
+    def put(self, key, figure):
+        with self._lock:
+            self._figures[key] = figure
+            self._figures.move_to_end(key)
+            while len(self._figures) > self.maxsize:
+                self._figures.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._figures.clear()
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._figures)}
@@ -0,0 +1,326 @@
+import asyncio
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List
+
+import websockets
+
+from utils.exchanges import TRADES
+from utils.timebase import now_ns
+
+
+class IngestLoop:
+    """Loop asyncio único, em um thread de fundo, para todo o I/O de mercado.
+
+    Os feeds WebSocket de todas as corretoras são tarefas deste loop. As
+    chamadas REST (bloqueantes, via `requests`) são agendadas pelo loop e
+    executadas em um executor pequeno e limitado, sem bloquear os streams.
+    """
+
+    def __init__(self, max_blocking: int = 4):
+        self.max_blocking = max_blocking
+        self.loop = None
+        self._thread = None
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._executor = ThreadPoolExecutor(self.max_blocking, thread_name_prefix='ingest-rest')
+            self.loop = asyncio.new_event_loop()
+            self.loop.set_default_executor(self._executor)
+            ready = threading.Event()
+            self._thread = threading.Thread(target=self._run, args=(ready,), name='ingest-loop', daemon=True)
+            self._thread.start()
+            ready.wait()
+
+    def _run(self, ready):
+        asyncio.set_event_loop(self.loop)
+        self.loop.call_soon(ready.set)
+        try:
+            self.loop.run_forever()
+        finally:
+            tasks = asyncio.all_tasks(self.loop)
+            for task in tasks:
+                task.cancel()
+            self.loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            self.loop.close()
+
+    def submit(self, coro):
+        """Agenda uma corrotina no loop a partir de outro thread (concurrent.futures.Future)"""
+        self.start()
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def call(self, coro, timeout: float = None):
+        """Executa uma corrotina no loop e aguarda o resultado"""
+        return self.submit(coro).result(timeout)
+
+    def run_blocking(self, fn, *args):
+        """Executa uma função bloqueante no executor do loop (Future)"""
+        async def run():
+            return await self.loop.run_in_executor(None, fn, *args)
+        return self.submit(run())
+
+    def feed(self, adapter, handler: Callable, on_open: Callable = None, **options):
+        """Cria um feed do adaptador neste loop"""
+        self.start()
+        return ExchangeFeed(self, adapter, handler, on_open=on_open, **options)
+
+    def stop(self):
+        """Para o loop, cancelando as tarefas, e aguarda o thread"""
+        with self._lock:
+            if self._thread is None:
+                return
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join()
+            self._executor.shutdown(wait=True)
+            self._thread = None
+            self.loop = None
+
+
+class FeedConnection:
+    """Uma conexão WebSocket de um feed, como tarefa do loop.
+
+    Reconecta com backoff exponencial com jitter e reassina seus streams;
+    se nenhuma mensagem chega em `stale_after` segundos envia um ping e,
+    sem pong, derruba a conexão.
+    """
+
+    def __init__(self, feed, index):
+        self.feed = feed
+        self.index = index
+        self.streams = set()
+        self.ws = None
+        self.task = None
+        self.closing = False
+        self.last_activity_ns = 0
+        self.reconnects = 0
+        self.messages = 0
+        self._send_lock = asyncio.Lock()
+        self._last_send = 0.0
+
+    @property
+    def connected(self):
+        return self.ws is not None
+
+    async def run(self):
+        feed = self.feed
+        attempt = 0
+        while not self.closing:
+            opened_at = time.monotonic()
+            try:
+                async with websockets.connect(feed.adapter.url, ping_interval=feed.ping_interval,
+                                              ping_timeout=feed.ping_timeout, max_size=None) as ws:
+                    self.ws = ws
+                    self.last_activity_ns = now_ns()
+                    streams = sorted(self.streams)
+                    await self.send(feed.adapter.subscribe(streams))
+                    if feed.on_open:
+                        feed.on_open(streams)
+                    await self._read(ws)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if not self.closing:
+                    print(f"Erro {feed.adapter.label} [{self.index}]: {e}")
+            finally:
+                self.ws = None
+            if self.closing:
+                break
+
+            if time.monotonic() - opened_at > feed.stable_after:
+                attempt = 0
+            else:
+                attempt += 1
+            self.reconnects += 1
+            await asyncio.sleep(random.uniform(0, min(feed.max_backoff, feed.base_backoff * 2 ** attempt)))
+
+    async def _read(self, ws):
+        feed = self.feed
+        while True:
+            try:
+                message = await asyncio.wait_for(ws.recv(), feed.stale_after)
+            except asyncio.TimeoutError:
+                # Silêncio: confirma que o socket está vivo antes de derrubá-lo
+                pong = await ws.ping()
+                try:
+                    await asyncio.wait_for(pong, feed.ping_timeout)
+                except asyncio.TimeoutError:
+                    # Sem handshake de fechamento: o outro lado também não responderia
+                    ws.transport.abort()
+                    raise ConnectionError(f"sem pong em {feed.ping_timeout:g} s")
+                continue
+            self.last_activity_ns = now_ns()
+            self.messages += 1
+            try:
+                for stream, data in feed.adapter.route(json.loads(message)):
+                    feed.handler(stream, data)
+            except Exception as e:
+                print(f"Erro ao processar mensagem {feed.adapter.label}: {e}")
+
+    async def send(self, messages):
+        """Envia mensagens de controle respeitando o intervalo mínimo do adaptador"""
+        if not messages or self.ws is None:
+            return
+        async with self._send_lock:
+            for message in messages:
+                wait = self._last_send + self.feed.adapter.control_interval - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                try:
+                    await self.ws.send(json.dumps(message))
+                except Exception as e:
+                    # Conexão caiu: os streams são reassinados ao reconectar
+                    print(f"Erro ao enviar assinatura {self.feed.adapter.label} [{self.index}]: {e}")
+                    return
+                self._last_send = time.monotonic()
+
+    async def close(self):
+        self.closing = True
+        # Sem handshake de fechamento: ele esperaria as mensagens já enfileiradas
+        if self.ws is not None:
+            self.ws.transport.abort()
+        if self.task is not None:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+
+
+class ExchangeFeed:
+    """Streams de uma corretora distribuídos em conexões do loop de ingestão.
+
+    `handler(stream, dados)` é chamado no thread do loop e
+    `on_open(streams)` a cada (re)conexão.
+    Os métodos públicos podem ser chamados de qualquer thread.
+    """
+
+    def __init__(self, ingest: IngestLoop, adapter, handler: Callable, on_open: Callable = None,
+                 max_streams: int = None, ping_interval: float = 20, ping_timeout: float = 10,
+                 stale_after: float = 60, base_backoff: float = 1.0, max_backoff: float = 60.0,
+                 stable_after: float = 30.0, timeout: float = 30.0):
+        self.ingest = ingest
+        self.adapter = adapter
+        self.handler = handler
+        self.on_open = on_open
+        self.max_streams = max_streams or adapter.max_streams
+        self.ping_interval = ping_interval
+        self.ping_timeout = ping_timeout
+        self.stale_after = stale_after
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.stable_after = stable_after
+        self.timeout = timeout
+        self.connections: List[FeedConnection] = []
+        self._index = 0
+
+    def _call(self, coro):
+        return self.ingest.call(coro, self.timeout)
+
+    async def _subscribe(self, streams):
+        owned = set().union(*(c.streams for c in self.connections))
+        pending = [s for s in dict.fromkeys(streams) if s not in owned]
+        for connection in self.connections:
+            room = self.max_streams - len(connection.streams)
+            if pending and room > 0:
+                chunk, pending = pending[:room], pending[room:]
+                connection.streams.update(chunk)
+                await connection.send(self.adapter.subscribe(chunk))
+        while pending:
+            connection = FeedConnection(self, self._index)
+            self._index += 1
+            connection.streams.update(pending[:self.max_streams])
+            pending = pending[self.max_streams:]
+            connection.task = asyncio.get_running_loop().create_task(connection.run())
+            self.connections.append(connection)
+
+    async def _unsubscribe(self, streams):
+        streams = set(streams)
+        for connection in list(self.connections):
+            owned = sorted(s for s in connection.streams if s in streams)
+            if not owned:
+                continue
+            connection.streams.difference_update(owned)
+            if connection.streams:
+                await connection.send(self.adapter.unsubscribe(owned))
+            else:
+                self.connections.remove(connection)
+                await connection.close()
+
+    async def _set_streams(self, streams):
+        wanted = set(streams)
+        current = set().union(*(c.streams for c in self.connections))
+        await self._unsubscribe(current - wanted)
+        await self._subscribe(sorted(wanted))
+
+    def subscribe(self, streams: Iterable[str]):
+        self._call(self._subscribe(list(streams)))
+
+    def unsubscribe(self, streams: Iterable[str]):
+        self._call(self._unsubscribe(list(streams)))
+
+    def set_streams(self, streams: Iterable[str]):
+        """Ajusta as assinaturas para exatamente `streams`"""
+        self._call(self._set_streams(list(streams)))
+
+    def streams(self):
+        return set().union(*(c.streams for c in list(self.connections)))
+
+    def stats(self):
+        connections = list(self.connections)
+        return {
+            'connections': len(connections),
+            'connected': sum(c.connected for c in connections),
+            'streams': sum(len(c.streams) for c in connections),
+            'reconnects': sum(c.reconnects for c in connections),
+            'messages': sum(c.messages for c in connections),
+        }
+
+    async def _close(self):
+        connections, self.connections = self.connections, []
+        await asyncio.gather(*(c.close() for c in connections))
+
+    def stop(self):
+        """Encerra as conexões do feed (o loop continua atendendo os demais)"""
+        if self.ingest.loop is not None:
+            self._call(self._close())
+
+
+class TradeStream:
+    """Trades de uma corretora no loop de ingestão, acumulados em um TradeBatcher.
+
+    Os trades entram no batcher com o símbolo do dashboard (ex.: BTC-USD
+    da Coinbase é gravado como BTCUSDT).
+    """
+
+    def __init__(self, adapter, batcher, ingest: IngestLoop, **options):
+        self.adapter = adapter
+        self.batcher = batcher
+        self.symbols: Dict[str, str] = {}  # stream -> símbolo
+        self.feed = ingest.feed(adapter, self.on_message, **options)
+
+    def on_message(self, stream, data):
+        symbol = self.symbols.get(stream)
+        if symbol is None:
+            return
+        for timestamp, price, quantity, buyer_maker in self.adapter.trades(data):
+            self.batcher.add(symbol, timestamp, price, quantity, buyer_maker)
+
+    def set_symbols(self, symbols):
+        """Troca os símbolos assinados ao vivo; símbolos sem par na corretora são ignorados"""
+        streams = {}
+        for symbol in symbols:
+            stream = self.adapter.stream(symbol, TRADES)
+            if stream is not None:
+                streams[stream] = symbol
+        self.symbols = streams
+        self.feed.set_streams(streams)
+
+    def stop_stream(self):
+        self.feed.stop()
+
+    def stats(self):
+        return self.feed.stats()
@@ -0,0 +1,120 @@
+"""Backfill de velas históricas (klines REST da Binance) ao iniciar.
+
+A janela pedida é dividida em páginas de até `limit` velas calculadas de
+antemão a partir dos instantes, então as páginas de todos os símbolos são
+independentes e buscadas em paralelo. Cada página reserva seu peso no
+rate limit do provedor antes de sair. A URL é configurável para testes
+contra servidores locais.
+"""
+import time
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from utils.timebase import NS_PER_MS, seconds_to_ns
+
+KLINES_URL = "https://api.binance.com/api/v3/klines"
+
+# Intervalos de kline suportados (ns -> nome na API)
+KLINE_INTERVALS = {
+    seconds_to_ns(1): '1s',
+    seconds_to_ns(60): '1m',
+    seconds_to_ns(3600): '1h',
+}
+
+
+def parse_klines(rows):
+    """Linhas de kline da Binance no formato de `OHLCSeries.merge_candles`, ou None.
+
+    Cada linha é [abertura ms, o, h, l, c, volume, fechamento ms, volume
+    em cotação, trades, volume comprador (taker buy), ...]; o volume de
+    venda é o restante.
+    """
+    if not rows:
+        return None
+    table = np.array([row[:10] for row in rows], dtype=object)
+    volumes = table[:, 5].astype(np.float64)
+    buy_volumes = table[:, 9].astype(np.float64)
+    return (
+        table[:, 0].astype(np.int64) * NS_PER_MS,
+        table[:, 1].astype(np.float64),
+        table[:, 2].astype(np.float64),
+        table[:, 3].astype(np.float64),
+        table[:, 4].astype(np.float64),
+        volumes,
+        buy_volumes,
+        volumes - buy_volumes,
+    )
+
+
+class KlineBackfill:
+    """Busca paginada e paralela de klines para vários símbolos"""
+    name = 'binance'
+    label = 'Binance'
+
+    def __init__(self, url: str = KLINES_URL, limit: int = 1000, weight: float = 2,
+                 timeout: float = 10, retries: int = 3):
+        self.url = url
+        self.limit = limit    # velas por página (máximo da API: 1000)
+        self.weight = weight  # peso de cada requisição no limite da Binance
+        self.timeout = timeout
+        self.retries = retries  # novas tentativas de uma página recusada pelo rate limit
+
+    def pages(self, start_ns: int, end_ns: int, interval_ns: int) -> List[Tuple[int, int]]:
+        """Janelas [início, fim] em ms de até `limit` velas cobrindo [start_ns, end_ns]"""
+        start = start_ns - start_ns % interval_ns
+        span = self.limit * interval_ns
+        return [(page // NS_PER_MS, (min(page + span, end_ns + 1) - 1) // NS_PER_MS)
+                for page in range(start, end_ns + 1, span)]
+
+    def fetch_page(self, symbol, interval, start_ms, end_ms, http_get, rate_limit, deadline=None):
+        """Uma página de klines (bloqueante); espera a vez no rate limit antes de pedir.
+
+        Uma resposta recusada com o provedor bloqueado (429/418 com
+        Retry-After) é pedida de novo quando o bloqueio acaba, até `retries`
+        vezes. Desiste (None) se a vez só chegaria depois de `deadline`
+        (monotônico), ex.: Retry-After mais longo que o prazo.
+        """
+        params = {'symbol': symbol, 'interval': interval, 'startTime': start_ms,
+                  'endTime': end_ms, 'limit': self.limit}
+        key = (self.name, 'klines', symbol, interval, start_ms)
+        for _ in range(self.retries + 1):
+            wait = rate_limit.reserve(self.weight)
+            if deadline is not None and time.monotonic() + wait > deadline:
+                return None
+            time.sleep(wait)
+            data = http_get(key, self.url, params, timeout=self.timeout)
+            if data is not None or not rate_limit.blocked_for():
+                return parse_klines(data)
+        return None
+
+    def fetch(self, symbols, start_ns, end_ns, http_get, rate_limit, run_blocking,
+              interval_ns=seconds_to_ns(60), timeout=10.0) -> Dict[str, tuple]:
+        """Velas de `interval_ns` dos símbolos entre `start_ns` e `end_ns`.
+
+        Todas as páginas são agendadas de uma vez com `run_blocking`
+        (executor do loop de ingestão). Retorna {símbolo: colunas} só dos
+        símbolos com dados; páginas que falham ou passam de `timeout`
+        segundos ficam de fora.
+        """
+        interval = KLINE_INTERVALS[interval_ns]
+        deadline = time.monotonic() + timeout
+        jobs = [(symbol, run_blocking(self.fetch_page, symbol, interval, start, end,
+                                      http_get, rate_limit, deadline))
+                for symbol in symbols for start, end in self.pages(start_ns, end_ns, interval_ns)]
+        parts: Dict[str, list] = {}
+        for symbol, future in jobs:
+            try:
+                candles = future.result(max(0.0, deadline - time.monotonic()))
+            except FutureTimeout:
+                future.cancel()
+                continue
+            except Exception as e:
+                print(f"Erro {self.label} klines {symbol}: {str(e)}")
+                continue
+            if candles is not None:
+                parts.setdefault(symbol, []).append(candles)
+        # Páginas em ordem de tempo: basta concatenar as colunas
+        return {symbol: tuple(np.concatenate(column) for column in zip(*pages))
+                for symbol, pages in parts.items()}
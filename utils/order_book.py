@@ -0,0 +1,157 @@
+import threading
+
+import numpy as np
+
+
+def _as_levels(levels):
+    """Converte [[preço, quantidade], ...] (strings da Binance) em arrays ordenados"""
+    if not levels:
+        return np.empty(0), np.empty(0)
+    array = np.asarray(levels, dtype=np.float64).reshape(-1, 2)
+    order = np.argsort(array[:, 0], kind='stable')
+    return array[order, 0], array[order, 1]
+
+
+def _apply_side(prices, quantities, update_prices, update_quantities):
+    """Aplica atualizações (quantidade 0 remove o nível) a um lado do book.
+
+    Os dois lados são mantidos em ordem crescente de preço; a busca,
+    atualização, inserção e remoção são vetorizadas.
+    """
+    if len(update_prices) == 0:
+        return prices, quantities
+
+    index = np.searchsorted(prices, update_prices)
+    exists = index < len(prices)
+    exists[exists] = prices[index[exists]] == update_prices[exists]
+
+    quantities = quantities.copy()
+    quantities[index[exists]] = update_quantities[exists]
+
+    new = ~exists & (update_quantities > 0)
+    if np.any(new):
+        prices = np.insert(prices, index[new], update_prices[new])
+        quantities = np.insert(quantities, index[new], update_quantities[new])
+
+    keep = quantities > 0
+    if not np.all(keep):
+        prices, quantities = prices[keep], quantities[keep]
+    return prices, quantities
+
+
+class OrderBook:
+    """Livro de ofertas L2 em arrays NumPy ordenados por preço.
+
+    Segue o procedimento de sincronização da Binance: eventos de diferença
+    recebidos antes do snapshot ficam em buffer; eventos com `u` <=
+    lastUpdateId são descartados; cada evento seguinte deve começar em
+    `U` == `u` anterior + 1, caso contrário o book precisa de novo snapshot.
+    """
+
+    def __init__(self, symbol, max_levels=5000):
+        self.symbol = symbol
+        self.max_levels = max_levels
+        self.bid_prices = np.empty(0)
+        self.bid_quantities = np.empty(0)
+        self.ask_prices = np.empty(0)
+        self.ask_quantities = np.empty(0)
+        self.last_update_id = None
+        self.synced = False
+        self._buffer = []
+        self.lock = threading.Lock()
+        self.updates_applied = 0
+
+    def load_snapshot(self, last_update_id, bids, asks):
+        """Carrega o snapshot REST e reaplica os eventos em buffer.
+
+        Retorna False se o snapshot é anterior aos eventos em buffer (há
+        lacuna entre eles): os eventos continuam guardados e é preciso
+        buscar outro snapshot.
+        """
+        with self.lock:
+            self.bid_prices, self.bid_quantities = _as_levels(bids)
+            self.ask_prices, self.ask_quantities = _as_levels(asks)
+            self.last_update_id = last_update_id
+            self.synced = True
+            buffered, self._buffer = self._buffer, []
+            for i, event in enumerate(buffered):
+                if not self._apply_event(*event):
+                    self._buffer.extend(buffered[i + 1:])
+                    break
+            return self.synced
+
+    def reset(self):
+        """Volta a acumular eventos até o próximo snapshot (ex.: após reconexão)"""
+        with self.lock:
+            self.synced = False
+            self._buffer = []
+
+    def on_diff(self, first_update_id, final_update_id, bids, asks):
+        """Recebe um evento de diferença do stream @depth.
+
+        Retorna False se houve perda de sequência e é preciso novo snapshot.
+        """
+        with self.lock:
+            if not self.synced:
+                self._buffer.append((first_update_id, final_update_id, bids, asks))
+                return True
+            return self._apply_event(first_update_id, final_update_id, bids, asks)
+
+    def _apply_event(self, first_update_id, final_update_id, bids, asks):
+        if final_update_id <= self.last_update_id:
+            return True
+        if first_update_id > self.last_update_id + 1:
+            # Lacuna na sequência: aguarda novo snapshot
+            self.synced = False
+            self._buffer = [(first_update_id, final_update_id, bids, asks)]
+            return False
+
+        bid_prices, bid_quantities = _as_levels(bids)
+        ask_prices, ask_quantities = _as_levels(asks)
+        self.bid_prices, self.bid_quantities = _apply_side(
+            self.bid_prices, self.bid_quantities, bid_prices, bid_quantities)
+        self.ask_prices, self.ask_quantities = _apply_side(
+            self.ask_prices, self.ask_quantities, ask_prices, ask_quantities)
+
+        # Mantém apenas os níveis mais próximos do topo
+        if len(self.bid_prices) > self.max_levels:
+            self.bid_prices = self.bid_prices[-self.max_levels:]
+            self.bid_quantities = self.bid_quantities[-self.max_levels:]
+        if len(self.ask_prices) > self.max_levels:
+            self.ask_prices = self.ask_prices[:self.max_levels]
+            self.ask_quantities = self.ask_quantities[:self.max_levels]
+
+        self.last_update_id = final_update_id
+        self.updates_applied += 1
+        return True
+
+    def best_bid(self):
+        return self.bid_prices[-1] if len(self.bid_prices) else None
+
+    def best_ask(self):
+        return self.ask_prices[0] if len(self.ask_prices) else None
+
+    def cumulative_depth(self, range_pct=2.0):
+        """Profundidade acumulada dentro de ±range_pct% do preço médio.
+
+        Retorna (preços dos bids decrescentes, volume acumulado dos bids,
+        preços dos asks crescentes, volume acumulado dos asks).
+        """
+        with self.lock:
+            bid_prices, bid_quantities = self.bid_prices, self.bid_quantities
+            ask_prices, ask_quantities = self.ask_prices, self.ask_quantities
+
+        if len(bid_prices) == 0 or len(ask_prices) == 0:
+            return None
+        mid = (bid_prices[-1] + ask_prices[0]) / 2
+        low = mid * (1 - range_pct / 100)
+        high = mid * (1 + range_pct / 100)
+
+        start = np.searchsorted(bid_prices, low)
+        bids = bid_prices[start:][::-1]
+        bid_depth = np.cumsum(bid_quantities[start:][::-1])
+
+        end = np.searchsorted(ask_prices, high, side='right')
+        asks = ask_prices[:end]
+        ask_depth = np.cumsum(ask_quantities[:end])
+        return bids, bid_depth, asks, ask_depth
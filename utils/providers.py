@@ -0,0 +1,206 @@
+import time
+from typing import List
+
+import numpy as np
+
+from utils.timebase import now_ns, parse_iso_ns, seconds_to_ns
+
+# Símbolo base de cada par USDT
+SYMBOL_BASES = {
+    'BTCUSDT': 'BTC',
+    'ETHUSDT': 'ETH',
+    'BNBUSDT': 'BNB',
+    'ADAUSDT': 'ADA',
+    'XRPUSDT': 'XRP',
+    'SOLUSDT': 'SOL',
+    'DOTUSDT': 'DOT',
+    'DOGEUSDT': 'DOGE',
+    'AVAXUSDT': 'AVAX',
+    'LINKUSDT': 'LINK',
+    'MATICUSDT': 'MATIC',
+    'LTCUSDT': 'LTC',
+    'UNIUSDT': 'UNI',
+    'ATOMUSDT': 'ATOM',
+    'FILUSDT': 'FIL'
+}
+
+# IDs do CoinGecko
+COINGECKO_IDS = {
+    'BTCUSDT': 'bitcoin',
+    'ETHUSDT': 'ethereum',
+    'BNBUSDT': 'binancecoin',
+    'ADAUSDT': 'cardano',
+    'XRPUSDT': 'ripple',
+    'SOLUSDT': 'solana',
+    'DOTUSDT': 'polkadot',
+    'DOGEUSDT': 'dogecoin',
+    'AVAXUSDT': 'avalanche-2',
+    'LINKUSDT': 'chainlink',
+    'MATICUSDT': 'matic-network',
+    'LTCUSDT': 'litecoin',
+    'UNIUSDT': 'uniswap',
+    'ATOMUSDT': 'cosmos',
+    'FILUSDT': 'filecoin'
+}
+
+
+class TickBatch:
+    """Lote colunar de cotações normalizadas.
+
+    `timestamps` é o instante da cotação na fonte (não o da recepção);
+    `changes` é a variação % em 24h (NaN quando o provedor não informa) e
+    `volumes` o volume de 24h exibido na cotação, não o volume da vela.
+    """
+    __slots__ = ('symbols', 'timestamps', 'prices', 'changes', 'volumes')
+
+    def __init__(self, symbols, timestamps, prices, changes, volumes):
+        self.symbols = list(symbols)
+        self.timestamps = np.asarray(timestamps, dtype=np.int64)
+        self.prices = np.asarray(prices, dtype=np.float64)
+        self.changes = np.asarray(changes, dtype=np.float64)
+        self.volumes = np.asarray(volumes, dtype=np.float64)
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Cria o lote a partir de tuplas (símbolo, ts, preço, variação, volume)"""
+        if not rows:
+            return cls([], [], [], [], [])
+        return cls(*zip(*rows))
+
+    def __len__(self):
+        return len(self.symbols)
+
+
+class Provider:
+    """Adaptador de uma API de cotações.
+
+    Só faz I/O e normalização: `fetch` recebe a função de GET com cache
+    (`CryptoDataFetcher.cached_get`) e devolve um `TickBatch`, ou None se
+    o provedor não respondeu. A aplicação nos agregadores é feita pelo
+    fetcher em uma única passada.
+    """
+    name = None   # chave do rate limit e do cache
+    label = None  # nome exibido nos avisos
+    symbol_map = SYMBOL_BASES
+
+    def supported(self, symbols) -> List[str]:
+        return sorted(s for s in symbols if s in self.symbol_map)
+
+    @staticmethod
+    def source_time(timestamp_ns, received_ns):
+        """Instante da cotação na fonte, limitado ao da recepção (relógios adiantados).
+
+        Sem timestamp da fonte usa o instante da recepção.
+        """
+        if not timestamp_ns:
+            return received_ns
+        return min(timestamp_ns, received_ns)
+
+    def fetch(self, symbols, http_get):
+        raise NotImplementedError
+
+
+class CoinGeckoProvider(Provider):
+    """CoinGecko (API gratuita e global)"""
+    name = 'coingecko'
+    label = 'CoinGecko'
+    symbol_map = COINGECKO_IDS
+
+    def fetch(self, symbols, http_get):
+        available_symbols = self.supported(symbols)
+        if not available_symbols:
+            return None
+
+        ids = ','.join(self.symbol_map[s] for s in available_symbols)
+        url = "https://api.coingecko.com/api/v3/simple/price"
+        params = {
+            'ids': ids,
+            'vs_currencies': 'usd',
+            'include_24hr_change': 'true',
+            'include_24hr_vol': 'true',
+            'include_last_updated_at': 'true'
+        }
+
+        data = http_get((self.name, ids), url, params, timeout=15)
+        if data is None:
+            return None
+
+        current_time = now_ns()
+        rows = []
+        for symbol in available_symbols:
+            coin_data = data.get(self.symbol_map[symbol])
+            if coin_data:
+                # `last_updated_at`: segundos desde a época da última atualização do preço
+                timestamp = self.source_time(seconds_to_ns(coin_data.get('last_updated_at') or 0),
+                                             current_time)
+                rows.append((symbol, timestamp, float(coin_data['usd']),
+                             float(coin_data.get('usd_24h_change', 0)),
+                             float(coin_data.get('usd_24h_vol', 0))))
+        return TickBatch.from_rows(rows)
+
+
+class CryptoCompareProvider(Provider):
+    """CryptoCompare (backup)"""
+    name = 'cryptocompare'
+    label = 'CryptoCompare'
+
+    def fetch(self, symbols, http_get):
+        available_symbols = self.supported(symbols)
+        if not available_symbols:
+            return None
+
+        fsyms = ','.join(self.symbol_map[s] for s in available_symbols)
+        url = "https://min-api.cryptocompare.com/data/pricemultifull"
+        params = {
+            'fsyms': fsyms,
+            'tsyms': 'USD'
+        }
+
+        data = http_get((self.name, fsyms), url, params, timeout=15)
+        if data is None:
+            return None
+
+        current_time = now_ns()
+        raw = data.get('RAW', {})
+        rows = []
+        for symbol in available_symbols:
+            coin_data = raw.get(self.symbol_map[symbol], {}).get('USD')
+            if coin_data:
+                # `LASTUPDATE`: segundos desde a época do último trade agregado
+                timestamp = self.source_time(seconds_to_ns(coin_data.get('LASTUPDATE') or 0),
+                                             current_time)
+                rows.append((symbol, timestamp, float(coin_data['PRICE']),
+                             float(coin_data.get('CHANGEPCT24HOUR', 0)),
+                             float(coin_data.get('VOLUME24HOUR', 0))))
+        return TickBatch.from_rows(rows)
+
+
+class CoinAPIProvider(Provider):
+    """CoinAPI (outro backup, uma requisição por símbolo)"""
+    name = 'coinapi'
+    label = 'CoinAPI'
+
+    def fetch(self, symbols, http_get):
+        rows = []
+        for symbol in self.supported(symbols):
+            base = self.symbol_map[symbol]
+            # URL da API pública do CoinAPI (rate limit baixo mas funciona)
+            url = f"https://rest.coinapi.io/v1/exchangerate/{base}/USD"
+            try:
+                data = http_get((self.name, base), url, timeout=10)
+            except Exception as e:
+                print(f"Erro para {symbol}: {e}")
+                continue
+            if data is not None:
+                # `time`: instante ISO 8601 da taxa; sem variação de 24h, o
+                # fetcher calcula a partir do histórico
+                timestamp = self.source_time(parse_iso_ns(data['time']) if data.get('time') else 0,
+                                             now_ns())
+                rows.append((symbol, timestamp, float(data['rate']), np.nan, 0.0))
+                time.sleep(0.1)  # Rate limiting
+
+        return TickBatch.from_rows(rows) if rows else None
+
+
+# Ordem de preferência (fallback)
+DEFAULT_PROVIDERS = (CoinGeckoProvider, CryptoCompareProvider, CoinAPIProvider)
@@ -0,0 +1,439 @@
+import itertools
+
+import numpy as np
+
+# Direção dos bricks Renko
+NEUTRAL = 0
+UP = 1
+DOWN = -1
+
+# Marcadores Point and Figure
+MARKER_X = 1
+MARKER_O = -1
+
+# Gráficos de reversão (backtest) e seus rótulos na interface
+RENKO = 'renko'
+POINT = 'point'
+CHART_LABELS = {RENKO: 'Renko', POINT: 'Point & Figure'}
+
+# Versões únicas no processo: uma série recriada nunca repete a versão de outra
+_versions = itertools.count(1)
+
+
+class Quote:
+    """Cotação atual de um símbolo, atualizada no lugar a cada tick"""
+    __slots__ = ('price', 'change', 'volume', 'timestamp')
+
+    def __init__(self, price=0.0, change=0.0, volume=0.0, timestamp=0):
+        self.price = price
+        self.change = change
+        self.volume = volume
+        self.timestamp = timestamp
+
+    def update(self, price, change, volume, timestamp):
+        """Atualiza os campos sem alocar um novo registro"""
+        self.price = price
+        self.change = change
+        self.volume = volume
+        self.timestamp = timestamp
+
+
+class CandleClosed:
+    """Evento de vela encerrada no fim do seu bucket"""
+    __slots__ = ('symbol', 'start', 'end', 'open', 'high', 'low', 'close', 'volume')
+
+    def __init__(self, symbol, start, end, open, high, low, close, volume):
+        self.symbol = symbol
+        self.start = start
+        self.end = end
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+
+
+class ColumnBuffer:
+    """Colunas NumPy de capacidade fixa com as últimas linhas sempre contíguas.
+
+    Os arrays têm o dobro da capacidade: novas linhas são gravadas no fim e,
+    quando o espaço acaba, a janela mais recente é copiada para o início.
+    O custo de inserção é O(1) amortizado e `series['coluna']` é uma view
+    sem cópia. `version` muda a cada alteração e serve de chave de cache.
+    """
+    __slots__ = ('capacity', '_columns', '_start', '_end', 'total_rows', 'version')
+
+    fields = ()  # pares (nome, dtype) definidos pelas subclasses
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._columns = {
+            name: np.zeros(2 * capacity, dtype=dtype) for name, dtype in self.fields
+        }
+        self._start = 0
+        self._end = 0
+        self.total_rows = 0  # linhas já inseridas, incluindo as descartadas
+        self.version = next(_versions)
+
+    def __len__(self):
+        return self._end - self._start
+
+    def __getitem__(self, name):
+        return self._columns[name][self._start:self._end]
+
+    def __contains__(self, name):
+        return name in self._columns
+
+    def _next_row(self):
+        """Reserva uma nova linha descartando a mais antiga se necessário"""
+        if self._end == len(next(iter(self._columns.values()))):
+            keep = self.capacity - 1
+            for column in self._columns.values():
+                column[:keep] = column[self._end - keep:self._end]
+            self._start, self._end = 0, keep
+
+        row = self._end
+        self._end += 1
+        self.total_rows += 1
+        self.version = next(_versions)
+        if self._end - self._start > self.capacity:
+            self._start += 1
+        return row
+
+    def _reserve(self, n):
+        """Reserva `n` linhas contíguas no fim (n <= capacity) e retorna a primeira"""
+        size = len(next(iter(self._columns.values())))
+        if self._end + n > size:
+            keep = min(self.capacity - n, self._end - self._start)
+            for column in self._columns.values():
+                column[:keep] = column[self._end - keep:self._end]
+            self._start, self._end = 0, keep
+
+        row = self._end
+        self._end += n
+        self.total_rows += n
+        self.version = next(_versions)
+        self._start = max(self._start, self._end - self.capacity)
+        return row
+
+    def clear(self):
+        """Remove todas as linhas mantendo os arrays alocados"""
+        self._start = 0
+        self._end = 0
+        self.version = next(_versions)
+
+    def resize(self, capacity):
+        """Muda a capacidade mantendo as linhas mais recentes que couberem"""
+        if capacity == self.capacity:
+            return
+        keep = min(len(self), capacity)
+        columns = {}
+        for name, dtype in self.fields:
+            column = np.zeros(2 * capacity, dtype=dtype)
+            column[:keep] = self._columns[name][self._end - keep:self._end]
+            columns[name] = column
+        self._columns = columns
+        self.capacity = capacity
+        self._start, self._end = 0, keep
+        self.version = next(_versions)
+        self._bind()
+
+    def _bind(self):
+        """Atalhos das subclasses para os arrays de suporte (refeitos ao redimensionar)"""
+
+    @property
+    def nbytes(self):
+        """Memória ocupada pelos arrays de suporte"""
+        return sum(column.nbytes for column in self._columns.values())
+
+
+class OHLCSeries(ColumnBuffer):
+    """Velas OHLC; a última linha é a vela aberta (única fonte de verdade).
+
+    O volume é o volume negociado dentro da vela (trades), separado em
+    volume de compra e de venda pelo lado agressor.
+    """
+    __slots__ = ('_timestamps', '_high', '_low', '_close', '_volume', '_open',
+                 '_buy_volume', '_sell_volume')
+
+    fields = (
+        ('timestamps', np.int64),
+        ('open', np.float64),
+        ('high', np.float64),
+        ('low', np.float64),
+        ('close', np.float64),
+        ('volume', np.float64),
+        ('buy_volume', np.float64),
+        ('sell_volume', np.float64),
+    )
+
+    def __init__(self, capacity=50):
+        super().__init__(capacity)
+        self._bind()
+
+    def _bind(self):
+        self._timestamps = self._columns['timestamps']
+        self._open = self._columns['open']
+        self._high = self._columns['high']
+        self._low = self._columns['low']
+        self._close = self._columns['close']
+        self._volume = self._columns['volume']
+        self._buy_volume = self._columns['buy_volume']
+        self._sell_volume = self._columns['sell_volume']
+
+    @property
+    def last_timestamp(self):
+        """Início da vela aberta, ou None se vazio"""
+        if self._end == self._start:
+            return None
+        return int(self._timestamps[self._end - 1])
+
+    def open_candle(self, start_time, price, volume=0.0):
+        """Abre uma nova vela"""
+        row = self._next_row()
+        self._timestamps[row] = start_time
+        self._open[row] = price
+        self._high[row] = price
+        self._low[row] = price
+        self._close[row] = price
+        self._volume[row] = volume
+        self._buy_volume[row] = 0.0
+        self._sell_volume[row] = 0.0
+
+    def update_candle(self, price, volume=0.0):
+        """Atualiza a vela aberta com um novo preço"""
+        row = self._end - 1
+        self.version = next(_versions)
+        if price > self._high[row]:
+            self._high[row] = price
+        elif price < self._low[row]:
+            self._low[row] = price
+        self._close[row] = price
+        self._volume[row] += volume
+
+    def replace_candle(self, open, high, low, close):
+        """Regrava os preços da vela aberta (transformações derivadas, ex.: Heikin-Ashi)"""
+        row = self._end - 1
+        self.version = next(_versions)
+        self._open[row] = open
+        self._high[row] = high
+        self._low[row] = low
+        self._close[row] = close
+
+    def fill_gap(self, until, interval_ns):
+        """Preenche com velas planas (preço do último fechamento, volume 0)
+        os buckets de `interval_ns` entre a vela aberta e `until` (exclusivo).
+
+        Retorna o número de velas criadas; lacunas maiores que a
+        capacidade só têm os últimos `capacity` buckets preenchidos.
+        """
+        last = self.last_timestamp
+        if last is None:
+            return 0
+        missing = (until - last - 1) // interval_ns
+        if missing <= 0:
+            return 0
+        count = min(missing, self.capacity)
+        price = self._close[self._end - 1]
+        first = last + (missing - count + 1) * interval_ns
+        row = self._reserve(count)
+        end = row + count
+        self._timestamps[row:end] = first + np.arange(count, dtype=np.int64) * interval_ns
+        for column in (self._open, self._high, self._low, self._close):
+            column[row:end] = price
+        for column in (self._volume, self._buy_volume, self._sell_volume):
+            column[row:end] = 0.0
+        return count
+
+    def merge_candles(self, starts, opens, highs, lows, closes, volumes,
+                      buy_volumes, sell_volumes, interval_ns=None):
+        """Incorpora velas já agregadas (ex.: de trades) em ordem de tempo.
+
+        Um bucket igual ao da vela aberta é mesclado a ela; buckets
+        anteriores à vela aberta são descartados. Com `interval_ns`, os
+        buckets vazios entre as velas são preenchidos com velas planas.
+        """
+        for i in range(len(starts)):
+            start = int(starts[i])
+            last = self.last_timestamp
+            if last is not None and start < last:
+                continue
+            if last is not None and start == last:
+                row = self._end - 1
+                self.version = next(_versions)
+                self._high[row] = max(self._high[row], highs[i])
+                self._low[row] = min(self._low[row], lows[i])
+                self._close[row] = closes[i]
+                self._volume[row] += volumes[i]
+                self._buy_volume[row] += buy_volumes[i]
+                self._sell_volume[row] += sell_volumes[i]
+            else:
+                if interval_ns:
+                    self.fill_gap(start, interval_ns)
+                row = self._next_row()
+                self._timestamps[row] = start
+                self._open[row] = opens[i]
+                self._high[row] = highs[i]
+                self._low[row] = lows[i]
+                self._close[row] = closes[i]
+                self._volume[row] = volumes[i]
+                self._buy_volume[row] = buy_volumes[i]
+                self._sell_volume[row] = sell_volumes[i]
+
+
+class RenkoSeries(ColumnBuffer):
+    """Bricks Renko e o fechamento do último brick"""
+    __slots__ = ('last_brick_close',)
+
+    fields = (
+        ('timestamps', np.int64),
+        ('open', np.float64),
+        ('close', np.float64),
+        ('high', np.float64),
+        ('low', np.float64),
+        ('direction', np.int8),  # UP, DOWN ou NEUTRAL
+    )
+
+    def __init__(self, capacity=50):
+        super().__init__(capacity)
+        self.last_brick_close = None
+
+    def add_brick(self, timestamp, brick_open, brick_close, direction):
+        """Adiciona um brick"""
+        row = self._next_row()
+        columns = self._columns
+        columns['timestamps'][row] = timestamp
+        columns['open'][row] = brick_open
+        columns['close'][row] = brick_close
+        columns['high'][row] = max(brick_open, brick_close)
+        columns['low'][row] = min(brick_open, brick_close)
+        columns['direction'][row] = direction
+        self.last_brick_close = brick_close
+
+
+class PointSeries(ColumnBuffer):
+    """Pontos Point and Figure e o estado da coluna atual"""
+    __slots__ = ('last_price', 'last_marker', 'column')
+
+    fields = (
+        ('x', np.int64),
+        ('y', np.float64),
+        ('marker', np.int8),  # MARKER_X ou MARKER_O
+    )
+
+    def __init__(self, capacity=100):
+        super().__init__(capacity)
+        self.last_price = None
+        self.last_marker = None
+        self.column = 0
+
+    def add_point(self, value, marker):
+        """Adiciona um ponto na coluna atual"""
+        row = self._next_row()
+        columns = self._columns
+        columns['x'][row] = self.column
+        columns['y'][row] = value
+        columns['marker'][row] = marker
+
+
+class KagiSeries(ColumnBuffer):
+    """Vértices de um gráfico Kagi; o último é o extremo da linha atual"""
+    __slots__ = ()
+
+    fields = (
+        ('timestamps', np.int64),
+        ('price', np.float64),
+        ('direction', np.int8),  # UP, DOWN ou NEUTRAL (vértice inicial)
+        ('yang', np.bool_),      # linha grossa (yang) ou fina (yin) ao chegar ao vértice
+    )
+
+    def __init__(self, capacity=100):
+        super().__init__(capacity)
+
+    def add_vertex(self, timestamp, price, direction, yang):
+        """Adiciona um vértice (reversão da linha)"""
+        row = self._next_row()
+        columns = self._columns
+        columns['timestamps'][row] = timestamp
+        columns['price'][row] = price
+        columns['direction'][row] = direction
+        columns['yang'][row] = yang
+
+    def extend(self, timestamp, price, yang):
+        """Prolonga a linha atual até um novo extremo"""
+        row = self._end - 1
+        self.version = next(_versions)
+        columns = self._columns
+        columns['timestamps'][row] = timestamp
+        columns['price'][row] = price
+        columns['yang'][row] = yang
+
+
+class LineSeries(ColumnBuffer):
+    """Histórico de preços em linha (usado na comparação)"""
+    __slots__ = ('_timestamps', '_prices')
+
+    fields = (
+        ('timestamps', np.int64),
+        ('prices', np.float64),
+    )
+
+    def __init__(self, capacity=100):
+        super().__init__(capacity)
+        self._bind()
+
+    def _bind(self):
+        self._timestamps = self._columns['timestamps']
+        self._prices = self._columns['prices']
+
+    def append(self, timestamp, price):
+        """Adiciona um ponto ao histórico"""
+        row = self._next_row()
+        self._timestamps[row] = timestamp
+        self._prices[row] = price
+
+
+class TickSeries(ColumnBuffer):
+    """Ticks brutos de um símbolo (cotações de polling e trades).
+
+    É a fonte de verdade a partir da qual as visões derivadas (OHLC,
+    Renko, P&F) são materializadas sob demanda.
+    """
+    __slots__ = ()
+
+    fields = (
+        ('timestamps', np.int64),
+        ('prices', np.float64),
+        ('volumes', np.float64),      # quantidade negociada (0 para cotações)
+        ('buy_volumes', np.float64),  # parte com agressor comprador
+        ('trade', np.bool_),          # True para trades, False para cotações
+    )
+
+    def __init__(self, capacity=10000):
+        super().__init__(capacity)
+
+    def append(self, timestamp, price):
+        """Adiciona uma cotação de polling"""
+        row = self._next_row()
+        columns = self._columns
+        columns['timestamps'][row] = timestamp
+        columns['prices'][row] = price
+        columns['volumes'][row] = 0.0
+        columns['buy_volumes'][row] = 0.0
+        columns['trade'][row] = False
+
+    def extend_trades(self, timestamps, prices, quantities, buyer_maker):
+        """Adiciona um lote de trades de uma vez (mantém só os mais recentes)"""
+        n = len(timestamps)
+        if n > self.capacity:
+            self.total_rows += n - self.capacity
+            timestamps, prices = timestamps[-self.capacity:], prices[-self.capacity:]
+            quantities, buyer_maker = quantities[-self.capacity:], buyer_maker[-self.capacity:]
+            n = self.capacity
+        row = self._reserve(n)
+        columns = self._columns
+        columns['timestamps'][row:row + n] = timestamps
+        columns['prices'][row:row + n] = prices
+        columns['volumes'][row:row + n] = quantities
+        columns['buy_volumes'][row:row + n] = np.where(buyer_maker, 0.0, quantities)
+        columns['trade'][row:row + n] = True
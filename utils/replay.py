@@ -0,0 +1,276 @@
+"""Replay de arquivos de ticks gravados (CSV ou Parquet).
+
+Formato: uma linha por cotação, em ordem de tempo, com as colunas
+`timestamp` (ns desde a época ou ISO 8601 em UTC), `symbol` e `price`;
+`change` (variação % em 24h) e `volume` (volume de 24h) são opcionais.
+
+O arquivo é lido em blocos. Ao abrir, um índice guarda o primeiro
+instante de cada bloco (offset em bytes no CSV, row group no Parquet):
+buscar um instante é uma busca binária no índice seguida da leitura a
+partir daquele bloco, sem reler o arquivo desde o início.
+"""
+import os
+import time
+from typing import Iterator, List
+
+import numpy as np
+import pandas as pd
+
+from utils.providers import TickBatch
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet é opcional; sem pyarrow apenas CSV é lido
+    pq = None
+
+REQUIRED_COLUMNS = ('timestamp', 'symbol', 'price')
+PARQUET_EXTENSIONS = ('.parquet', '.pq')
+
+
+def parse_times(values) -> np.ndarray:
+    """Instantes em ns (int64) a partir de inteiros em ns ou de texto ISO 8601"""
+    values = pd.Series(values)
+    if pd.api.types.is_integer_dtype(values):
+        return values.to_numpy(np.int64)
+    if pd.api.types.is_string_dtype(values) or values.dtype == object:
+        # Texto com inteiros (amostras do índice lidas direto das linhas do CSV)
+        numbers = pd.to_numeric(values, errors='coerce')
+        if not numbers.isna().any():
+            return numbers.to_numpy(np.int64)
+    if not pd.api.types.is_datetime64_any_dtype(values):
+        values = pd.to_datetime(values, utc=True, format='mixed')
+    if values.dt.tz is not None:
+        values = values.dt.tz_convert('UTC').dt.tz_localize(None)
+    return values.dt.as_unit('ns').astype('int64').to_numpy()
+
+
+def _line_starts(path, header_end, buffer_size=1 << 23):
+    """Offsets do início de cada linha de dados, achados por varredura vetorizada"""
+    starts = [np.array([header_end], dtype=np.int64)]
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        f.seek(header_end)
+        position = header_end
+        while True:
+            chunk = f.read(buffer_size)
+            if not chunk:
+                break
+            newlines = np.flatnonzero(np.frombuffer(chunk, dtype=np.uint8) == 10)
+            starts.append(newlines.astype(np.int64) + position + 1)
+            position += len(chunk)
+    starts = np.concatenate(starts)
+    return starts[starts < size]
+
+
+class TickFile:
+    """Arquivo de ticks com índice de tempo por bloco"""
+
+    def __init__(self, path: str, block_rows: int = 50_000):
+        self.path = path
+        self.block_rows = block_rows
+        self.parquet = path.lower().endswith(PARQUET_EXTENSIONS)
+        if self.parquet:
+            if pq is None:
+                raise ImportError("pyarrow é necessário para ler arquivos Parquet")
+            self._index_parquet()
+        else:
+            self._index_csv()
+        if not len(self.block_times):
+            raise ValueError(f"Arquivo de ticks vazio: {path}")
+
+    def _index_csv(self):
+        with open(self.path, 'rb') as f:
+            header = f.readline()
+            self.columns = header.decode().strip().split(',')
+        missing = [c for c in REQUIRED_COLUMNS if c not in self.columns]
+        if missing:
+            raise ValueError(f"Colunas ausentes em {self.path}: {', '.join(missing)}")
+
+        starts = _line_starts(self.path, len(header))
+        self.rows = len(starts)
+        self.blocks: List[int] = starts[::self.block_rows].tolist()
+        # Instante da primeira linha de cada bloco e da última linha
+        column = self.columns.index('timestamp')
+        with open(self.path, 'rb') as f:
+            def time_at(offset):
+                f.seek(offset)
+                return f.readline().decode().split(',')[column]
+            first_times = [time_at(offset) for offset in self.blocks]
+            last_time = time_at(int(starts[-1])) if len(starts) else None
+        self.block_times = parse_times(first_times) if first_times else np.empty(0, np.int64)
+        self.end = int(parse_times([last_time])[0]) if last_time else None
+        self.symbols = sorted(pd.read_csv(self.path, usecols=['symbol'], dtype=str)['symbol'].unique())
+
+    def _index_parquet(self):
+        parquet = pq.ParquetFile(self.path)
+        self.columns = parquet.schema_arrow.names
+        missing = [c for c in REQUIRED_COLUMNS if c not in self.columns]
+        if missing:
+            raise ValueError(f"Colunas ausentes em {self.path}: {', '.join(missing)}")
+
+        self.rows = parquet.metadata.num_rows
+        self.blocks = [g for g in range(parquet.num_row_groups) if parquet.metadata.row_group(g).num_rows]
+        column = self.columns.index('timestamp')
+        first_times, last_times = [], []
+        for group in self.blocks:
+            statistics = parquet.metadata.row_group(group).column(column).statistics
+            if statistics is not None and statistics.has_min_max and isinstance(statistics.min, int):
+                first_times.append(statistics.min)
+                last_times.append(statistics.max)
+            else:
+                times = parse_times(parquet.read_row_group(group, columns=['timestamp'])
+                                    .column(0).to_pandas())
+                first_times.append(int(times[0]))
+                last_times.append(int(times[-1]))
+        self.block_times = np.array(first_times, dtype=np.int64)
+        self.end = int(last_times[-1]) if last_times else None
+        symbols = pq.read_table(self.path, columns=['symbol']).column(0).unique()
+        self.symbols = sorted(str(s) for s in symbols.to_pylist())
+
+    @property
+    def start(self) -> int:
+        return int(self.block_times[0])
+
+    def _read_block(self, block):
+        if self.parquet:
+            frame = pq.ParquetFile(self.path).read_row_group(block).to_pandas()
+        else:
+            with open(self.path, 'rb') as f:
+                f.seek(block)
+                frame = pd.read_csv(f, header=None, names=self.columns, nrows=self.block_rows,
+                                    dtype={'symbol': str})
+        return (
+            frame['symbol'].to_numpy(object),
+            parse_times(frame['timestamp']),
+            frame['price'].to_numpy(np.float64),
+            frame['change'].to_numpy(np.float64) if 'change' in frame else np.full(len(frame), np.nan),
+            frame['volume'].to_numpy(np.float64) if 'volume' in frame else np.zeros(len(frame)),
+        )
+
+    def read_from(self, timestamp: int) -> Iterator[tuple]:
+        """Blocos (símbolos, ts, preços, variações, volumes) a partir do primeiro tick >= `timestamp`"""
+        first = max(int(np.searchsorted(self.block_times, timestamp, side='right')) - 1, 0)
+        for i, block in enumerate(self.blocks[first:]):
+            columns = self._read_block(block)
+            if i == 0:
+                skip = int(np.searchsorted(columns[1], timestamp))
+                columns = tuple(column[skip:] for column in columns)
+            yield columns
+
+    @staticmethod
+    def write(path, symbols, timestamps, prices, changes=None, volumes=None, block_rows=50_000):
+        """Grava ticks no formato de replay (CSV ou Parquet pela extensão), em ordem de tempo"""
+        frame = pd.DataFrame({'timestamp': np.asarray(timestamps, dtype=np.int64),
+                              'symbol': list(symbols), 'price': prices})
+        if changes is not None:
+            frame['change'] = changes
+        if volumes is not None:
+            frame['volume'] = volumes
+        frame = frame.sort_values('timestamp', kind='stable')
+        if path.lower().endswith(PARQUET_EXTENSIONS):
+            if pq is None:
+                raise ImportError("pyarrow é necessário para gravar arquivos Parquet")
+            frame.to_parquet(path, index=False, row_group_size=block_rows)
+        else:
+            frame.to_csv(path, index=False)
+
+
+class ReplaySource:
+    """Reproduz um TickFile em tempo acelerado, com pausa e busca.
+
+    O relógio do replay avança `speed` vezes mais rápido que o relógio
+    monotônico; `speed=None` entrega os ticks o mais rápido possível, em
+    lotes de até `max_rows`. `symbols` restringe os símbolos reproduzidos.
+    """
+
+    def __init__(self, tick_file: TickFile, speed: float = 1.0, symbols=None, max_rows: int = 20_000):
+        self.file = tick_file
+        self.symbols = list(symbols) if symbols else list(tick_file.symbols)
+        self._filter = np.array(self.symbols, dtype=object) if symbols else None
+        self.speed = speed
+        self.max_rows = max_rows
+        self.paused = False
+        self._position = tick_file.start
+        self._anchor = time.monotonic_ns()
+        self._blocks = None
+        self._chunk = None
+        self._cursor = 0
+        self.seek(tick_file.start)
+
+    def now(self) -> int:
+        """Instante atual do replay (ns desde a época)"""
+        if self.paused or self.speed is None:
+            return self._position
+        elapsed = time.monotonic_ns() - self._anchor
+        return min(self._position + int(elapsed * self.speed), self.file.end)
+
+    def _rebase(self):
+        self._position = self.now()
+        self._anchor = time.monotonic_ns()
+
+    def set_speed(self, speed):
+        self._rebase()
+        self.speed = speed
+
+    def pause(self):
+        self._rebase()
+        self.paused = True
+
+    def resume(self):
+        self._anchor = time.monotonic_ns()
+        self.paused = False
+
+    @property
+    def finished(self):
+        return self._blocks is None and self._chunk is None
+
+    def seek(self, timestamp: int, warmup_ns: int = 0):
+        """Posiciona o replay em `timestamp`; o próximo lote traz também os `warmup_ns` anteriores"""
+        timestamp = min(max(timestamp, self.file.start), self.file.end)
+        self._blocks = self.file.read_from(timestamp - warmup_ns)
+        self._chunk = None
+        self._cursor = 0
+        self._position = timestamp
+        self._anchor = time.monotonic_ns()
+
+    def _next_chunk(self):
+        if self._blocks is not None:
+            for chunk in self._blocks:
+                if len(chunk[1]):
+                    self._chunk, self._cursor = chunk, 0
+                    return True
+            self._blocks = None
+        self._chunk = None
+        return False
+
+    def next_batch(self):
+        """Ticks até o instante atual do replay (ou os próximos `max_rows`, na velocidade máxima)"""
+        limit = self.now()
+        parts = []
+        taken = 0
+        while taken < self.max_rows:
+            if self._chunk is None and not self._next_chunk():
+                break
+            timestamps = self._chunk[1]
+            stop = len(timestamps)
+            if self.speed is not None:
+                stop = int(np.searchsorted(timestamps, limit, side='right'))
+            stop = min(stop, self._cursor + self.max_rows - taken)
+            if stop > self._cursor:
+                parts.append(tuple(column[self._cursor:stop] for column in self._chunk))
+                taken += stop - self._cursor
+                self._cursor = stop
+            if self._cursor < len(timestamps):
+                break
+            self._chunk = None
+        if not parts:
+            return None
+
+        symbols, timestamps, prices, changes, volumes = (np.concatenate(c) for c in zip(*parts))
+        if self.speed is None:
+            self._position = int(timestamps[-1])
+        if self._filter is not None:
+            keep = np.isin(symbols, self._filter)
+            symbols, timestamps, prices, changes, volumes = (
+                symbols[keep], timestamps[keep], prices[keep], changes[keep], volumes[keep])
+        return TickBatch(symbols, timestamps, prices, changes, volumes)
@@ -0,0 +1,128 @@
+import threading
+import time
+from typing import Callable, Dict, Hashable
+
+
+class _Entry:
+    """Resposta armazenada e o instante (monotônico) em que foi obtida"""
+    __slots__ = ('value', 'fetched_at')
+
+    def __init__(self, value, fetched_at):
+        self.value = value
+        self.fetched_at = fetched_at
+
+
+class _Flight:
+    """Requisição em andamento compartilhada pelas chamadas concorrentes"""
+    __slots__ = ('done', 'value', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class ResponseCache:
+    """Cache TTL de respostas REST compartilhado entre sessões.
+
+    - Entradas com idade menor que `ttl` são servidas diretamente.
+    - Entradas com idade até `ttl + max_stale` são servidas (stale) enquanto
+      uma única revalidação roda em segundo plano.
+    - Misses concorrentes para a mesma chave esperam uma única chamada
+      upstream (single-flight).
+
+    Erros levantados pela função de busca não são armazenados.
+    """
+
+    def __init__(self, ttl: float = 1.0, max_stale: float = 15.0):
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self._entries: Dict[Hashable, _Entry] = {}
+        self._inflight: Dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.revalidations = 0
+        self.errors = 0
+
+    def get(self, key: Hashable, fetch: Callable[[], object]):
+        """Retorna a resposta para `key`, chamando `fetch` apenas se necessário"""
+        now = time.monotonic()
+        leader = False
+        revalidate = None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            age = now - entry.fetched_at if entry else None
+
+            if entry is not None and age < self.ttl:
+                self.hits += 1
+                return entry.value
+
+            if entry is not None and age < self.ttl + self.max_stale:
+                self.stale_hits += 1
+                if key in self._inflight:
+                    return entry.value  # revalidação já em andamento
+                revalidate = self._inflight[key] = _Flight()
+                self.revalidations += 1
+                value = entry.value
+            else:
+                self.misses += 1
+                flight = self._inflight.get(key)
+                if flight is None:
+                    flight = self._inflight[key] = _Flight()
+                    leader = True
+                else:
+                    self.coalesced += 1
+
+        if revalidate is not None:
+            threading.Thread(
+                target=self._run, args=(key, fetch, revalidate), daemon=True
+            ).start()
+            return value
+
+        if leader:
+            self._run(key, fetch, flight)
+        else:
+            flight.done.wait()
+
+        if flight.error is not None:
+            raise flight.error
+        return flight.value
+
+    def _run(self, key, fetch, flight):
+        """Executa a chamada upstream e publica o resultado"""
+        try:
+            flight.value = fetch()
+        except Exception as e:
+            flight.error = e
+        with self._lock:
+            if flight.error is None:
+                self._entries[key] = _Entry(flight.value, time.monotonic())
+            else:
+                self.errors += 1
+            del self._inflight[key]
+        flight.done.set()
+
+    def invalidate(self, key: Hashable = None):
+        """Remove uma entrada (ou todas, se `key` for None)"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self) -> Dict[str, int]:
+        """Contadores de hits e misses"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'stale_hits': self.stale_hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'revalidations': self.revalidations,
+                'errors': self.errors,
+                'entries': len(self._entries),
+            }
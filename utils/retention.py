@@ -0,0 +1,201 @@
+import numpy as np
+
+from utils.records import LineSeries, OHLCSeries, PointSeries, RenkoSeries, TickSeries
+from utils.timebase import seconds_to_ns
+from utils.trades import aggregate_trades
+
+MINUTE_NS = seconds_to_ns(60)
+HOUR_NS = seconds_to_ns(3600)
+
+# Classe de registro de cada camada e visão (para o custo por linha)
+STORE_CLASSES = {
+    'raw': TickSeries,
+    'minute': OHLCSeries,
+    'hour': OHLCSeries,
+    'ohlc': OHLCSeries,
+    'renko': RenkoSeries,
+    'point': PointSeries,
+    'line': LineSeries,
+}
+
+# Rótulos exibidos no diagnóstico de memória
+STORE_LABELS = {
+    'raw': 'Ticks',
+    'minute': '1 min',
+    'hour': '1 h',
+    'ohlc': 'OHLC',
+    'renko': 'Renko',
+    'point': 'P&F',
+    'transforms': 'Transformações',
+    'line': 'Linha',
+}
+
+TIERS = ('raw', 'minute', 'hour')
+
+# Séries reduzidas quando o orçamento não comporta a política
+SCALED_STORES = TIERS + ('line_history',)
+
+# Estimativa por ponto do histórico de linha comprimido (utils/compressed.py)
+COMPRESSED_ROW_BYTES = 8
+
+
+def row_bytes(store):
+    """Bytes por linha de um registro (os arrays têm o dobro da capacidade)"""
+    if store == 'line_history':
+        return COMPRESSED_ROW_BYTES
+    return 2 * sum(np.dtype(dtype).itemsize for _, dtype in STORE_CLASSES[store].fields)
+
+
+class RetentionPolicy:
+    """Capacidade por símbolo de cada camada do histórico e das visões.
+
+    Padrão: 10 mil ticks brutos, 2 dias em velas de 1 min e 90 dias em
+    velas de 1 h. `line` é a janela exibida do histórico de linha e
+    `line_history` o total retido em blocos comprimidos.
+    """
+
+    def __init__(self, raw=10000, minute=2 * 1440, hour=90 * 24,
+                 ohlc=50, renko=50, point=100, line=100, line_history=200000):
+        self.capacities = {
+            'raw': raw, 'minute': minute, 'hour': hour,
+            'ohlc': ohlc, 'renko': renko, 'point': point, 'line': line,
+            'line_history': line_history,
+        }
+
+
+class TieredHistory:
+    """Histórico de um símbolo em três resoluções.
+
+    Os ticks recentes ficam brutos; cada tick também atualiza a vela
+    aberta de 1 min e de 1 h, então quando os ticks antigos saem do buffer
+    o período continua coberto pelas camadas agregadas.
+    """
+    __slots__ = ('ticks', 'minutes', 'hours')
+
+    def __init__(self, raw_capacity, minute_capacity, hour_capacity):
+        self.ticks = TickSeries(raw_capacity)
+        self.minutes = OHLCSeries(minute_capacity)
+        self.hours = OHLCSeries(hour_capacity)
+
+    def add_quote(self, timestamp, price, aggregate=True):
+        """Grava uma cotação; `aggregate=False` a mantém só na camada bruta"""
+        self.ticks.append(timestamp, price)
+        if aggregate:
+            for series, interval in ((self.minutes, MINUTE_NS), (self.hours, HOUR_NS)):
+                start = timestamp - timestamp % interval
+                last = series.last_timestamp
+                if last is None or start > last:
+                    series.open_candle(start, price)
+                elif start == last:
+                    series.update_candle(price)
+
+    def add_trades(self, timestamps, prices, quantities, buyer_maker):
+        """Grava um lote de trades e o agrega nas camadas de 1 min e 1 h"""
+        self.ticks.extend_trades(timestamps, prices, quantities, buyer_maker)
+        for series, interval in ((self.minutes, MINUTE_NS), (self.hours, HOUR_NS)):
+            candles = aggregate_trades(timestamps, prices, quantities, buyer_maker, interval)
+            if candles is not None:
+                series.merge_candles(*candles)
+
+    def resize(self, raw_capacity, minute_capacity, hour_capacity):
+        """Aplica novas capacidades às camadas, descartando as linhas mais antigas que sobrarem"""
+        self.ticks.resize(raw_capacity)
+        self.minutes.resize(minute_capacity)
+        self.hours.resize(hour_capacity)
+
+    def nbytes(self):
+        return {'raw': self.ticks.nbytes, 'minute': self.minutes.nbytes, 'hour': self.hours.nbytes}
+
+
+def resample_candles(series, interval_ns, before=None):
+    """Agrega velas de uma camada em velas de `interval_ns` (múltiplo do intervalo da camada).
+
+    Só considera velas com início anterior a `before`, se informado.
+    Retorna os arrays no formato de `OHLCSeries.merge_candles`, ou None.
+    """
+    timestamps = series['timestamps']
+    count = len(timestamps) if before is None else int(np.searchsorted(timestamps, before))
+    if count == 0:
+        return None
+
+    timestamps = timestamps[:count]
+    buckets = timestamps - timestamps % interval_ns
+    starts = np.concatenate(([0], np.flatnonzero(buckets[1:] != buckets[:-1]) + 1))
+    ends = np.concatenate((starts[1:], [count])) - 1
+    return (
+        buckets[starts],
+        series['open'][:count][starts],
+        np.maximum.reduceat(series['high'][:count], starts),
+        np.minimum.reduceat(series['low'][:count], starts),
+        series['close'][:count][ends],
+        np.add.reduceat(series['volume'][:count], starts),
+        np.add.reduceat(series['buy_volume'][:count], starts),
+        np.add.reduceat(series['sell_volume'][:count], starts),
+    )
+
+
+class RetentionManager:
+    """Define as capacidades das séries dentro de um orçamento global de memória.
+
+    As visões (OHLC, Renko, P&F, linha) mantêm a capacidade da política;
+    se o orçamento não comporta o histórico para todos os símbolos, as
+    três camadas e o histórico de linha comprimido são reduzidos na mesma
+    proporção.
+    """
+
+    def __init__(self, policy=None, memory_budget=None):
+        self.policy = policy or RetentionPolicy()
+        self.memory_budget = memory_budget  # bytes; None = sem limite
+        self.capacities = dict(self.policy.capacities)
+
+    def fit(self, n_symbols, tiers=None, line_histories=None):
+        """Recalcula as capacidades para `n_symbols` símbolos.
+
+        Os históricos já existentes (`tiers`: símbolo -> TieredHistory,
+        `line_histories`: símbolo -> CompressedLineSeries) passam a ter as
+        novas capacidades; com orçamento menor as linhas mais antigas saem.
+        """
+        self.capacities = dict(self.policy.capacities)
+        if self.memory_budget and n_symbols > 0:
+            per_symbol = self.memory_budget / n_symbols
+            fixed = sum(self.capacities[s] * row_bytes(s) for s in STORE_CLASSES if s not in TIERS)
+            scaled = sum(self.capacities[s] * row_bytes(s) for s in SCALED_STORES)
+            scale = max(per_symbol - fixed, 0) / scaled
+            if scale < 1:
+                for store in SCALED_STORES:
+                    self.capacities[store] = max(int(self.capacities[store] * scale), 16)
+
+        for history in (tiers or {}).values():
+            history.resize(self.capacity('raw'), self.capacity('minute'), self.capacity('hour'))
+        for line in (line_histories or {}).values():
+            line.trim(self.capacity('line_history'))
+        return self.capacities
+
+    def capacity(self, store):
+        return self.capacities[store]
+
+    def new_history(self):
+        return TieredHistory(self.capacity('raw'), self.capacity('minute'), self.capacity('hour'))
+
+    def view_capacities(self):
+        """Capacidades das visões publicadas (formato de SharedMarketWriter)"""
+        return {store: self.capacities[store] for store in ('ohlc', 'renko', 'point', 'line')}
+
+
+def memory_usage(source):
+    """Memória por símbolo e por série de um fetcher (ou leitor de memória compartilhada).
+
+    Retorna {símbolo: {série: bytes}} com as chaves de STORE_LABELS.
+    """
+    usage = {}
+    for store, attribute in (('ohlc', 'ohlc_data'), ('renko', 'renko_data'),
+                             ('point', 'point_data'), ('line', 'historical_data')):
+        for symbol, series in getattr(source, attribute, {}).items():
+            usage.setdefault(symbol, {})[store] = series.nbytes
+    for operators in getattr(source, 'transform_data', {}).values():
+        for symbol, operator in operators.items():
+            stores = usage.setdefault(symbol, {})
+            stores['transforms'] = stores.get('transforms', 0) + operator.series.nbytes
+    for symbol, history in getattr(source, 'tiers', {}).items():
+        usage.setdefault(symbol, {}).update(history.nbytes())
+    return usage
@@ -0,0 +1,311 @@
+import math
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+# Limites padrão (requisições, janela em segundos) usados até que os
+# cabeçalhos de rate limit do provedor informem valores reais
+DEFAULT_LIMITS = {
+    'coingecko': (30, 60),
+    'cryptocompare': (50, 60),
+    'coinapi': (100, 86400),
+    'binance': (1200, 60),
+}
+
+# Quantos símbolos cabem em uma requisição de cada provedor
+SYMBOLS_PER_REQUEST = {
+    'coingecko': 250,
+    'cryptocompare': 60,
+    'coinapi': 1,
+    'binance': 1,
+}
+
+
+def _header_number(headers, *names):
+    """Lê o primeiro cabeçalho numérico disponível"""
+    for name in names:
+        value = headers.get(name)
+        if value is not None:
+            try:
+                return float(value)
+            except ValueError:
+                continue
+    return None
+
+
+def parse_retry_after(value, now=None):
+    """Converte Retry-After (segundos ou data HTTP) em segundos de espera"""
+    if value is None:
+        return None
+    now = time.time() if now is None else now
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - now)
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimitState:
+    """Orçamento de requisições de um provedor, ajustado pelos cabeçalhos"""
+
+    def __init__(self, limit: float, window: float, safety: float = 0.8):
+        self.limit = limit
+        self.window = window
+        self.safety = safety
+        self.remaining = None
+        self.reset_at = None
+        self.blocked_until = 0.0
+        # Balde de tokens das rajadas (backfill): começa cheio e repõe à taxa do limite
+        self._tokens = None
+        self._refilled = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, status_code: int, headers, now=None):
+        """Atualiza o estado com os cabeçalhos de uma resposta"""
+        now = time.monotonic() if now is None else now
+
+        limit = _header_number(headers, 'X-RateLimit-Limit', 'x-ratelimit-limit')
+        if limit:
+            self.limit = limit
+
+        remaining = _header_number(
+            headers, 'X-RateLimit-Remaining', 'x-ratelimit-remaining'
+        )
+        if remaining is not None:
+            self.remaining = remaining
+
+        reset = _header_number(headers, 'X-RateLimit-Reset', 'x-ratelimit-reset')
+        if reset is not None:
+            # Alguns provedores enviam epoch, outros segundos restantes
+            if reset > 1e9:
+                reset = max(0.0, reset - time.time())
+            self.reset_at = now + reset
+
+        # Binance informa o peso consumido no último minuto
+        used_weight = _header_number(headers, 'X-MBX-USED-WEIGHT-1M')
+        if used_weight is not None:
+            self.window = 60
+            self.remaining = max(0.0, self.limit - used_weight)
+            self.reset_at = now + (60 - time.time() % 60)
+            if self._tokens is not None:
+                # Outros clientes no mesmo IP também consomem o peso
+                self._tokens = min(self._tokens, self.remaining * self.safety)
+
+        retry_after = parse_retry_after(headers.get('Retry-After'))
+        if retry_after is not None and status_code in (418, 429, 503):
+            self.blocked_until = now + retry_after
+        elif status_code == 429:
+            # Sem Retry-After: espera uma fração da janela
+            self.blocked_until = now + self.window / 10
+
+    def is_blocked(self, now=None) -> bool:
+        now = time.monotonic() if now is None else now
+        return now < self.blocked_until
+
+    def blocked_for(self, now=None) -> float:
+        """Segundos restantes do bloqueio por Retry-After (0 se liberado)"""
+        now = time.monotonic() if now is None else now
+        return max(0.0, self.blocked_until - now)
+
+    def requests_per_second(self, now=None) -> float:
+        """Taxa sustentável de requisições dentro do limite atual"""
+        now = time.monotonic() if now is None else now
+        if self.is_blocked(now):
+            return 0.0
+        rate = self.limit / self.window
+        if self.remaining is not None and self.reset_at is not None and self.reset_at > now:
+            rate = min(rate, self.remaining / (self.reset_at - now))
+        return max(rate * self.safety, 1e-6)
+
+    def reserve(self, weight: float = 1.0, now=None) -> float:
+        """Reserva uma requisição de peso `weight`; retorna os segundos a esperar antes de enviá-la.
+
+        Permite uma rajada de até `limit * safety` e depois espaça as
+        requisições na taxa sustentável; respeita o bloqueio de Retry-After.
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            rate = self.limit / self.window * self.safety
+            capacity = self.limit * self.safety
+            if self._tokens is None:
+                self._tokens = capacity
+            else:
+                self._tokens = min(capacity, self._tokens + (now - self._refilled) * rate)
+            self._refilled = now
+            self._tokens -= weight
+            return max(0.0, self.blocked_until - now, -self._tokens / rate)
+
+
+class ViewerRegistry:
+    """Quantas sessões estão olhando cada símbolo (compartilhado entre sessões)"""
+
+    def __init__(self, expiry: float = 60.0):
+        self.expiry = expiry
+        self._sessions: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def heartbeat(self, session_id: str, symbols: Iterable[str]):
+        with self._lock:
+            self._sessions[session_id] = (frozenset(symbols), time.monotonic())
+
+    def leave(self, session_id: str):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def counts(self) -> Dict[str, int]:
+        now = time.monotonic()
+        counts: Dict[str, int] = {}
+        with self._lock:
+            expired = [sid for sid, (_, seen) in self._sessions.items()
+                       if now - seen > self.expiry]
+            for sid in expired:
+                del self._sessions[sid]
+            for symbols, _ in self._sessions.values():
+                for symbol in symbols:
+                    counts[symbol] = counts.get(symbol, 0) + 1
+        return counts
+
+
+class PollScheduler:
+    """Define a cadência de polling por símbolo.
+
+    A prioridade de cada símbolo combina a volatilidade realizada recente
+    (relativa à média dos símbolos) e o número de sessões que o observam.
+    Os intervalos são proporcionais ao inverso da prioridade: o símbolo mais
+    prioritário é consultado a cada `min_interval` e os demais mais devagar,
+    sempre respeitando o orçamento de requisições do provedor. Símbolos
+    cuja consulta falhou em todos os provedores esperam um backoff
+    exponencial (ou o Retry-After) antes da próxima tentativa.
+    Com um registro de sessões, símbolos que ninguém observa são
+    consultados no máximo a cada `idle_interval`; sem registro (daemon)
+    todos os símbolos contam como observados.
+    """
+
+    def __init__(self, rate_limits: Dict[str, RateLimitState] = None,
+                 viewers: ViewerRegistry = None, min_interval: float = 5.0,
+                 volatility_window: int = 30, max_backoff: float = 60.0,
+                 idle_interval: float = 60.0):
+        self.rate_limits = rate_limits if rate_limits is not None else {}
+        self.viewers = viewers
+        self.min_interval = min_interval
+        self.volatility_window = volatility_window
+        self.max_backoff = max_backoff
+        self.idle_interval = idle_interval
+        self._volatility: Dict[str, float] = {}
+        self._next_due: Dict[str, float] = {}
+        self._intervals: Dict[str, float] = {}
+        self._failures: Dict[str, int] = {}  # falhas seguidas de cada símbolo
+
+    def rate_limit(self, provider: str) -> RateLimitState:
+        state = self.rate_limits.get(provider)
+        if state is None:
+            limit, window = DEFAULT_LIMITS.get(provider, (60, 60))
+            state = self.rate_limits.setdefault(provider, RateLimitState(limit, window))
+        return state
+
+    def observe_response(self, provider: str, response):
+        """Registra cabeçalhos de rate limit e Retry-After de uma resposta"""
+        self.rate_limit(provider).observe(response.status_code, response.headers)
+
+    def is_blocked(self, provider: str) -> bool:
+        return self.rate_limit(provider).is_blocked()
+
+    def retry_after(self, providers: Iterable[str]) -> float:
+        """Segundos até o primeiro dos provedores sair do bloqueio (0 se algum está liberado)"""
+        return min((self.rate_limit(p).blocked_for() for p in providers), default=0.0)
+
+    def update_volatility(self, symbol: str, prices):
+        """Volatilidade realizada (desvio padrão dos log-retornos recentes)"""
+        prices = np.asarray(prices[-(self.volatility_window + 1):], dtype=np.float64)
+        if len(prices) < 3 or np.any(prices <= 0):
+            return
+        self._volatility[symbol] = float(np.std(np.diff(np.log(prices))))
+
+    def weights(self, symbols: List[str], counts: Dict[str, int] = None) -> np.ndarray:
+        """Prioridade relativa de cada símbolo"""
+        vols = np.array([self._volatility.get(s, np.nan) for s in symbols])
+        known = vols[~np.isnan(vols)]
+        mean_vol = known.mean() if len(known) and known.mean() > 0 else None
+        if mean_vol is None:
+            vol_weight = np.ones(len(symbols))
+        else:
+            vol_weight = np.clip(np.nan_to_num(vols / mean_vol, nan=1.0), 0.25, 4.0)
+
+        if counts is None:
+            counts = self.viewer_counts(symbols)
+        viewer_weight = np.array([1 + math.log1p(counts[s]) for s in symbols])
+        return vol_weight * viewer_weight
+
+    def viewer_counts(self, symbols: List[str]) -> Dict[str, int]:
+        """Sessões observando cada símbolo (0 se nenhuma; 1 para todos sem registro)"""
+        if self.viewers is None:
+            return {s: 1 for s in symbols}
+        counts = self.viewers.counts()
+        return {s: counts.get(s, 0) for s in symbols}
+
+    def plan(self, provider: str, symbols: List[str]) -> Dict[str, float]:
+        """Calcula o intervalo de polling (segundos) de cada símbolo"""
+        if not symbols:
+            return {}
+        counts = self.viewer_counts(symbols)
+        weights = self.weights(symbols, counts)
+        budget = self.rate_limit(provider).requests_per_second()
+        batch = SYMBOLS_PER_REQUEST.get(provider, 1)
+
+        # Taxa por símbolo = k * peso; o provedor recebe max(taxa do mais
+        # rápido, soma das taxas / símbolos por requisição) requisições/s
+        demand = max(weights.max(), weights.sum() / batch)
+        k_budget = budget / demand
+        k_desired = 1.0 / (self.min_interval * weights.max())
+        k = min(k_budget, k_desired)
+
+        intervals = 1.0 / (k * weights)
+        # Sem ninguém olhando, o símbolo só é mantido atualizado de fundo
+        idle = np.array([counts[s] == 0 for s in symbols])
+        intervals = np.where(idle, np.maximum(intervals, self.idle_interval), intervals)
+        self._intervals = dict(zip(symbols, intervals.tolist()))
+        return self._intervals
+
+    def due_symbols(self, provider: str, symbols: List[str], now=None) -> List[str]:
+        """Símbolos cuja próxima consulta já venceu"""
+        now = time.monotonic() if now is None else now
+        if self.is_blocked(provider):
+            return []
+        self.plan(provider, symbols)
+        return [s for s in symbols if self._next_due.get(s, 0.0) <= now]
+
+    def mark_polled(self, symbols: Iterable[str], now=None):
+        """Agenda a próxima consulta dos símbolos atendidos"""
+        now = time.monotonic() if now is None else now
+        for symbol in symbols:
+            self._next_due[symbol] = now + self._intervals.get(symbol, self.min_interval)
+            self._failures.pop(symbol, None)
+
+    def mark_failed(self, symbols: Iterable[str], retry_after: float = 0.0, now=None):
+        """Adia os símbolos que nenhum provedor atendeu.
+
+        A espera dobra a cada falha seguida, de `min_interval` até
+        `max_backoff`, e nunca é menor que `retry_after`.
+        """
+        now = time.monotonic() if now is None else now
+        for symbol in symbols:
+            failures = self._failures[symbol] = self._failures.get(symbol, 0) + 1
+            delay = min(self.max_backoff, self.min_interval * 2 ** (failures - 1))
+            self._next_due[symbol] = now + max(delay, retry_after)
+
+    def seconds_until_next(self, symbols: List[str], now=None) -> float:
+        """Tempo até o próximo símbolo vencer"""
+        now = time.monotonic() if now is None else now
+        pending = [self._next_due.get(s, now) for s in symbols]
+        if not pending:
+            return self.min_interval
+        return max(0.0, min(pending) - now)
+
+    def intervals(self) -> Dict[str, float]:
+        return dict(self._intervals)
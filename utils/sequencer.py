@@ -0,0 +1,83 @@
+import heapq
+from collections import Counter
+from typing import Dict, Set
+
+from utils.providers import TickBatch
+from utils.timebase import now_ns, seconds_to_ns
+
+
+class QuoteSequencer:
+    """Deduplica e ordena as cotações pelo instante da fonte antes dos agregadores.
+
+    Uma cotação cujo instante na fonte não avançou para o símbolo (poll
+    mais rápido que a atualização do provedor, resposta em cache) é
+    descartada como repetida. As demais esperam em um buffer até ficarem
+    `window_seconds` mais velhas que o relógio local, e são liberadas em
+    ordem de instante: uma fonte atrasada que chega nessa janela ainda
+    entra na ordem certa. Cotações mais antigas que a última liberada do
+    símbolo são descartadas como atrasadas.
+    """
+
+    def __init__(self, window_seconds: float = 2.0):
+        self.window_ns = seconds_to_ns(window_seconds)
+        self._heap = []  # (instante, ordem de chegada, linha)
+        self._arrivals = 0
+        self._pending: Dict[str, Set[int]] = {}  # símbolo -> instantes no buffer
+        self._newest: Dict[str, int] = {}        # símbolo -> maior instante aceito
+        self.released: Dict[str, int] = {}       # símbolo -> último instante liberado
+        self.counters = Counter()                # totais: recebidas, repetidas, atrasadas...
+        self.duplicates = Counter()              # símbolo -> cotações repetidas descartadas
+
+    def push(self, batch: TickBatch):
+        """Aceita as cotações novas do lote no buffer"""
+        if batch is None:
+            return
+        rows = zip(batch.symbols, batch.timestamps.tolist(), batch.prices.tolist(),
+                   batch.changes.tolist(), batch.volumes.tolist())
+        for row in rows:
+            symbol, timestamp = row[0], row[1]
+            self.counters['received'] += 1
+            pending = self._pending.setdefault(symbol, set())
+            released = self.released.get(symbol)
+            if timestamp in pending or timestamp == released:
+                self.counters['duplicates'] += 1
+                self.duplicates[symbol] += 1
+                continue
+            if released is not None and timestamp < released:
+                self.counters['late'] += 1
+                continue
+            newest = self._newest.get(symbol)
+            if newest is not None and timestamp < newest:
+                self.counters['reordered'] += 1
+            else:
+                self._newest[symbol] = timestamp
+            pending.add(timestamp)
+            heapq.heappush(self._heap, (timestamp, self._arrivals, row))
+            self._arrivals += 1
+
+    def release(self, now: int = None, flush: bool = False):
+        """Lote, em ordem de instante, das cotações que saíram da janela (ou todas, com `flush`)"""
+        cutoff = (now_ns() if now is None else now) - self.window_ns
+        rows = []
+        heap = self._heap
+        while heap and (flush or heap[0][0] <= cutoff):
+            timestamp, _, row = heapq.heappop(heap)
+            self._pending[row[0]].discard(timestamp)
+            self.released[row[0]] = timestamp
+            rows.append(row)
+        self.counters['applied'] += len(rows)
+        return TickBatch.from_rows(rows) if rows else None
+
+    def stats(self):
+        """Contadores totais e cotações aguardando no buffer"""
+        stats = {key: self.counters[key] for key in ('received', 'applied', 'duplicates', 'late', 'reordered')}
+        stats['pending'] = len(self._heap)
+        return stats
+
+    def reset(self):
+        self._heap.clear()
+        self._pending.clear()
+        self._newest.clear()
+        self.released.clear()
+        self.counters.clear()
+        self.duplicates.clear()
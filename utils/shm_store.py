@@ -0,0 +1,398 @@
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from utils.alerts import PF_NEW_COLUMN, RENKO_REVERSAL, AlertEngine
+from utils.correlation import RollingCorrelation
+from utils.records import (NEUTRAL, CandleClosed, LineSeries, OHLCSeries, PointSeries, Quote,
+                           RenkoSeries)
+from utils.transforms import TRANSFORMS
+
+MAGIC = 0x43525950544F5348  # "CRYPTOSH"
+HEADER_FIELDS = ('magic', 'seq', 'n_symbols', 'ohlc_cap', 'renko_cap',
+                 'point_cap', 'line_cap', 'published_ns')
+HEADER_SIZE = 8 * len(HEADER_FIELDS)
+
+# Prefixo no bloco compartilhado, classe do registro e atributo do fetcher
+STORES = (
+    ('ohlc', OHLCSeries, 'ohlc_data'),
+    ('renko', RenkoSeries, 'renko_data'),
+    ('point', PointSeries, 'point_data'),
+    ('line', LineSeries, 'historical_data'),
+)
+
+QUOTE_FIELDS = (
+    ('quote_price', np.float64),
+    ('quote_change', np.float64),
+    ('quote_volume', np.float64),
+    ('quote_timestamp', np.int64),
+)
+
+
+def block_dtype(capacities):
+    """Layout colunar de um símbolo: cotação + colunas de cada série"""
+    # `closed_until`: início do primeiro bucket ainda aberto (as velas anteriores estão encerradas)
+    fields = [('symbol', 'S16')] + list(QUOTE_FIELDS) + [('closed_until', np.int64)]
+    for prefix, series_cls, _ in STORES:
+        capacity = capacities[prefix]
+        fields.append((f'{prefix}_len', np.int64))
+        fields.append((f'{prefix}_version', np.uint64))
+        for name, dtype in series_cls.fields:
+            fields.append((f'{prefix}_{name}', dtype, (capacity,)))
+    return np.dtype(fields)
+
+
+def _attach(name):
+    """Abre um segmento existente sem registrá-lo no resource tracker"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13: o resource tracker removeria o segmento ao sair
+        from multiprocessing import resource_tracker
+        shm = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(shm._name, 'shared_memory')
+        return shm
+
+
+class SharedMarketWriter:
+    """Publica as séries de um CryptoDataFetcher em memória compartilhada.
+
+    O cabeçalho contém um contador seqlock: ímpar durante a escrita, par
+    quando o conteúdo está consistente. Há um único escritor (o daemon).
+    """
+
+    def __init__(self, name, symbols, capacities=None):
+        capacities = capacities or {'ohlc': 50, 'renko': 50, 'point': 100, 'line': 100}
+        self.symbols = list(symbols)
+        self.dtype = block_dtype(capacities)
+        size = HEADER_SIZE + self.dtype.itemsize * len(self.symbols)
+
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # Segmento órfão de uma execução anterior
+            stale = _attach(name)
+            stale.close()
+            stale.unlink()
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+
+        self.header = np.ndarray((len(HEADER_FIELDS),), dtype=np.uint64, buffer=self.shm.buf)
+        self.blocks = np.ndarray((len(self.symbols),), dtype=self.dtype,
+                                 buffer=self.shm.buf, offset=HEADER_SIZE)
+        self.blocks[:] = np.zeros(len(self.symbols), dtype=self.dtype)
+        self.blocks['symbol'] = [s.encode() for s in self.symbols]
+
+        self.header[:] = 0
+        self.header[HEADER_FIELDS.index('n_symbols')] = len(self.symbols)
+        for prefix in ('ohlc', 'renko', 'point', 'line'):
+            self.header[HEADER_FIELDS.index(f'{prefix}_cap')] = capacities[prefix]
+        self.header[HEADER_FIELDS.index('magic')] = MAGIC
+
+    def publish(self, fetcher, published_ns):
+        """Copia o estado atual do fetcher para o segmento"""
+        seq_index = HEADER_FIELDS.index('seq')
+        self.header[seq_index] += 1  # ímpar: escrita em andamento
+
+        blocks = self.blocks
+        for i, symbol in enumerate(self.symbols):
+            quote = fetcher.price_data.get(symbol)
+            if quote is not None:
+                blocks['quote_price'][i] = quote.price
+                blocks['quote_change'][i] = quote.change
+                blocks['quote_volume'][i] = quote.volume
+                blocks['quote_timestamp'][i] = quote.timestamp
+            blocks['closed_until'][i] = fetcher.closed_until.get(symbol, 0)
+
+            for prefix, series_cls, attribute in STORES:
+                series = getattr(fetcher, attribute).get(symbol)
+                length = len(series) if series is not None else 0
+                blocks[f'{prefix}_len'][i] = length
+                blocks[f'{prefix}_version'][i] = series.version if series is not None else 0
+                if length:
+                    for name, _ in series_cls.fields:
+                        blocks[f'{prefix}_{name}'][i, :length] = series[name]
+
+        self.header[HEADER_FIELDS.index('published_ns')] = published_ns
+        self.header[seq_index] += 1  # par: conteúdo consistente
+
+    def close(self):
+        del self.header, self.blocks
+        self.shm.close()
+        self.shm.unlink()
+
+
+class SeriesSnapshot:
+    """Colunas de uma série lidas do segmento (mesma interface de leitura dos registros)"""
+    __slots__ = ('_columns', '_length', 'version')
+
+    def __init__(self, columns, length, version=0):
+        self._columns = columns
+        self._length = length
+        self.version = version  # versão da série no daemon
+
+    @property
+    def nbytes(self):
+        return sum(column.nbytes for column in self._columns.values())
+
+    @property
+    def fields(self):
+        return tuple((name, column.dtype) for name, column in self._columns.items())
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, name):
+        return self._columns[name]
+
+    def __contains__(self, name):
+        return name in self._columns
+
+
+class SharedMarketReader:
+    """Lê os dados publicados pelo daemon de ingestão, somente leitura.
+
+    Expõe a mesma interface usada pelo dashboard em CryptoDataFetcher,
+    de modo que várias instâncias do Streamlit compartilham uma única
+    ingestão sem tráfego upstream adicional.
+
+    Cada série é copiada do segmento só quando sua versão muda; entre
+    versões o dashboard recebe a mesma cópia, marcada como somente
+    leitura. Os alertas de evento (reversão Renko, nova coluna P&F,
+    fechamento de vela) e as transformações são avaliados aqui, sobre as
+    linhas novas de cada snapshot.
+    """
+
+    def __init__(self, name, max_retries=100):
+        self.name = name
+        self.max_retries = max_retries
+        self.shm = _attach(name)
+        self.header = np.ndarray((len(HEADER_FIELDS),), dtype=np.uint64, buffer=self.shm.buf)
+        self.header.flags.writeable = False
+        if int(self.header[HEADER_FIELDS.index('magic')]) != MAGIC:
+            raise ValueError(f"Segmento '{name}' não foi criado pelo daemon de ingestão")
+
+        self.capacities = {
+            prefix: int(self.header[HEADER_FIELDS.index(f'{prefix}_cap')])
+            for prefix in ('ohlc', 'renko', 'point', 'line')
+        }
+        n_symbols = int(self.header[HEADER_FIELDS.index('n_symbols')])
+        self.blocks = np.ndarray((n_symbols,), dtype=block_dtype(self.capacities),
+                                 buffer=self.shm.buf, offset=HEADER_SIZE)
+        self.blocks.flags.writeable = False
+        self.available_symbols = [s.decode() for s in self.blocks['symbol']]
+
+        self.symbols = []
+        self.pairs = []
+        self.running = False
+        self.scheduler = None
+        self.alerts = AlertEngine()
+        self.correlation = RollingCorrelation(window=60)
+        self.published_ns = 0
+        self.price_data = {}
+        self.historical_data = {}
+        self.ohlc_data = {}
+        self.renko_data = {}
+        self.point_data = {}
+        self.transform_data = {}    # nome -> {símbolo: operador}
+        self.transform_params = {}  # nome -> parâmetros dos operadores
+        self._series = {}   # (símbolo, prefixo) -> SeriesSnapshot aplicado
+        self._seen = {}     # (símbolo, visão) -> última linha já avaliada (instante ou coluna)
+        self._applied = None  # (seq, índices) do último snapshot aplicado
+
+    def refresh(self):
+        """Lê um snapshot consistente (protocolo seqlock) dos símbolos selecionados"""
+        seq_index = HEADER_FIELDS.index('seq')
+        selected = set(self.symbols) | set(self.pairs)
+        wanted = [i for i, s in enumerate(self.available_symbols) if s in selected]
+        if self._applied == (int(self.header[seq_index]), wanted):
+            return True  # nada publicado desde o último snapshot
+
+        for _ in range(self.max_retries):
+            seq_before = int(self.header[seq_index])
+            if seq_before % 2:
+                time.sleep(0.0005)
+                continue
+
+            # Copia apenas as linhas ativas das séries cuja versão mudou
+            snapshot = {}
+            blocks = self.blocks
+            for i in wanted:
+                symbol = self.available_symbols[i]
+                stores = {}
+                for prefix, series_cls, _ in STORES:
+                    version = int(blocks[f'{prefix}_version'][i])
+                    cached = self._series.get((symbol, prefix))
+                    if cached is not None and cached.version == version:
+                        stores[prefix] = cached
+                        continue
+                    length = int(blocks[f'{prefix}_len'][i])
+                    columns = {name: blocks[f'{prefix}_{name}'][i, :length].copy()
+                               for name, _ in series_cls.fields}
+                    for column in columns.values():
+                        column.flags.writeable = False
+                    stores[prefix] = SeriesSnapshot(columns, length, version)
+                quote = Quote(float(blocks['quote_price'][i]), float(blocks['quote_change'][i]),
+                              float(blocks['quote_volume'][i]), int(blocks['quote_timestamp'][i]))
+                snapshot[symbol] = (quote, int(blocks['closed_until'][i]), stores)
+            published_ns = int(self.header[HEADER_FIELDS.index('published_ns')])
+
+            if int(self.header[seq_index]) == seq_before:
+                self._apply(snapshot)
+                self.published_ns = published_ns
+                self._applied = (seq_before, wanted)
+                return True
+        return False
+
+    def _apply(self, snapshot):
+        previous, self._series = self._series, {}
+        for store in (self.price_data, self.historical_data, self.ohlc_data,
+                      self.renko_data, self.point_data):
+            store.clear()
+        for symbol, (quote, closed_until, stores) in snapshot.items():
+            if quote.timestamp == 0:
+                continue
+            self.price_data[symbol] = quote
+            self.alerts.on_price(symbol, quote.price, quote.timestamp)
+            for prefix, _, attribute in STORES:
+                series = stores[prefix]
+                getattr(self, attribute)[symbol] = series
+                self._series[(symbol, prefix)] = series
+                if previous.get((symbol, prefix)) is not series:
+                    self._series_changed(symbol, prefix, series, quote.timestamp)
+            # O fechamento pode avançar sem a série mudar (bucket sem ticks)
+            self._close_candles(symbol, stores['ohlc'], closed_until)
+
+        # Sem estado incremental entre snapshots: recalcula a janela inteira
+        self.correlation.backfill(self.historical_data, self.symbols)
+
+    def _new_rows(self, key, marks):
+        """Primeira linha com marca (instante ou coluna) posterior à já avaliada; None na primeira leitura"""
+        seen = self._seen.get(key)
+        if len(marks):
+            self._seen[key] = int(marks[-1])
+        if seen is None:
+            return None
+        return int(np.searchsorted(marks, seen, side='right'))
+
+    def _series_changed(self, symbol, prefix, series, timestamp):
+        """Alertas de evento e transformações com as linhas novas de uma série"""
+        if prefix == 'renko':
+            first = self._new_rows((symbol, 'renko'), series['timestamps'])
+            if first is None or not self.alerts.has_event_alerts(RENKO_REVERSAL):
+                return
+            # Reversão: brick na direção oposta à do anterior (como no daemon)
+            directions = series['direction']
+            for row in range(max(first, 1), len(series)):
+                if directions[row - 1] != NEUTRAL and directions[row] != directions[row - 1]:
+                    self.alerts.on_renko_reversal(symbol, int(directions[row]),
+                                                  float(series['close'][row]),
+                                                  int(series['timestamps'][row]))
+        elif prefix == 'point':
+            first = self._new_rows((symbol, 'point'), series['x'])
+            if first is None or not self.alerts.has_event_alerts(PF_NEW_COLUMN):
+                return
+            columns = series['x']
+            for row in range(max(first, 1), len(series)):
+                if columns[row] != columns[row - 1]:
+                    self.alerts.on_pf_new_column(symbol, int(series['marker'][row]),
+                                                 float(series['y'][row]), timestamp)
+        elif prefix == 'line':
+            for name, operators in self.transform_data.items():
+                self._feed(name, symbol, operators, series)
+
+    def _close_candles(self, symbol, ohlc, closed_until):
+        """Entrega aos alertas as velas encerradas desde o snapshot anterior"""
+        key = (symbol, 'closed')
+        seen = self._seen.get(key)
+        self._seen[key] = closed_until
+        if seen is None or closed_until <= seen or not len(ohlc):
+            return
+        timestamps = ohlc['timestamps']
+        first = int(np.searchsorted(timestamps, seen))
+        last = int(np.searchsorted(timestamps, closed_until))
+        for row in range(first, last):
+            end = int(timestamps[row + 1]) if row + 1 < len(ohlc) else closed_until
+            self.alerts.on_candle_closed(CandleClosed(
+                symbol, int(timestamps[row]), end,
+                float(ohlc['open'][row]), float(ohlc['high'][row]), float(ohlc['low'][row]),
+                float(ohlc['close'][row]), float(ohlc['volume'][row])
+            ))
+
+    def _feed(self, name, symbol, operators, line):
+        """Passa ao operador da transformação os ticks publicados ainda não vistos por ele"""
+        operator = operators.get(symbol)
+        if operator is None:
+            # Kagi guarda vértices, mais numerosos que velas: usa a capacidade do P&F
+            capacity = self.capacities['point' if name == 'kagi' else 'ohlc']
+            operator = operators[symbol] = TRANSFORMS[name](capacity=capacity,
+                                                            **self.transform_params[name])
+        key = (symbol, name)
+        first = self._new_rows(key, line['timestamps'])
+        if first is None:
+            first = 0
+        operator.batch(line['timestamps'][first:], line['prices'][first:])
+
+    def get_transform_data(self, name, **params):
+        """Retorna as séries da transformação `name`, calculadas a partir dos ticks publicados.
+
+        Parâmetros diferentes dos atuais recomeçam os operadores com os
+        ticks ainda na janela publicada (capacidade da série de linha).
+        """
+        if params != self.transform_params.get(name):
+            self.transform_params[name] = params
+            operators = self.transform_data[name] = {}
+            for symbol, line in self.historical_data.items():
+                self._seen.pop((symbol, name), None)
+                self._feed(name, symbol, operators, line)
+        return {symbol: operator.series for symbol, operator in self.transform_data[name].items()}
+
+    # Interface compatível com CryptoDataFetcher
+
+    def start_fetching(self, symbols, **kwargs):
+        """Seleciona os símbolos publicados pelo daemon (parâmetros são do daemon)"""
+        self.symbols = [s for s in symbols if s in self.available_symbols]
+        self.set_cross_pairs(kwargs.get('cross_pairs', ()))
+        self.running = bool(self.symbols)
+        return self.running and self.refresh()
+
+    def set_cross_pairs(self, pairs):
+        """Seleciona os pares cruzados entre os publicados (o daemon os deriva com --cross-pairs)"""
+        self.pairs = [p for p in pairs if p in self.available_symbols]
+
+    def stop_fetching(self):
+        self.running = False
+        self._apply({})
+        self._seen.clear()
+        self._applied = None
+        self.transform_data.clear()
+        self.transform_params.clear()
+
+    def update_data(self):
+        return self.running and self.refresh()
+
+    def next_update_delay(self):
+        return 1.0
+
+    def get_data(self):
+        return self.price_data, self.historical_data
+
+    def get_ohlc_data(self):
+        return self.ohlc_data
+
+    def get_renko_data(self):
+        return self.renko_data
+
+    def get_point_data(self):
+        return self.point_data
+
+    def get_order_books(self):
+        # Order books não são publicados pelo daemon
+        return {}
+
+    def is_running(self):
+        return self.running
+
+    def close(self):
+        del self.header, self.blocks
+        self.shm.close()
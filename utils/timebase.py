@@ -0,0 +1,46 @@
+import time
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+NS_PER_SECOND = 1_000_000_000
+NS_PER_MS = 1_000_000
+
+# Relógio de parede lido uma única vez e avançado pelo relógio monotônico:
+# o resultado é epoch em nanossegundos que nunca volta no tempo (ajustes de NTP)
+_EPOCH_ANCHOR_NS = time.time_ns()
+_MONOTONIC_ANCHOR_NS = time.monotonic_ns()
+
+
+def now_ns() -> int:
+    """Retorna o instante atual em nanossegundos desde a época (int64 monotônico)"""
+    return _EPOCH_ANCHOR_NS + (time.monotonic_ns() - _MONOTONIC_ANCHOR_NS)
+
+
+def seconds_to_ns(seconds) -> int:
+    """Converte segundos para nanossegundos inteiros"""
+    return int(round(seconds * NS_PER_SECOND))
+
+
+def bucket_start_ns(timestamp_ns: int, interval_ns: int) -> int:
+    """Retorna o início do intervalo (bucket) que contém o timestamp"""
+    return timestamp_ns - timestamp_ns % interval_ns
+
+
+def _local_offset_ns() -> int:
+    """Deslocamento do fuso horário local em nanossegundos"""
+    offset = datetime.now().astimezone().utcoffset()
+    return int(offset.total_seconds()) * NS_PER_SECOND if offset else 0
+
+
+def to_datetime(values):
+    """Converte timestamps em nanossegundos para datetime local (usado só na renderização)"""
+    offset = _local_offset_ns()
+    if np.isscalar(values):
+        return pd.Timestamp(int(values) + offset, unit='ns')
+    return pd.to_datetime(np.asarray(values, dtype=np.int64) + offset, unit='ns')
+
+
+def parse_iso_ns(text: str) -> int:
+    """Converte um instante ISO 8601 em UTC ('2024-01-01T00:00:00.123456Z') para nanossegundos"""
+    return int(np.datetime64(text.rstrip('Z'), 'ns').astype(np.int64))
@@ -0,0 +1,117 @@
+from typing import Dict, Hashable, List, Tuple
+
+from utils.timebase import NS_PER_SECOND
+
+
+class TimingWheel:
+    """Roda de temporização hierárquica para prazos em nanossegundos.
+
+    O nível 0 tem um slot por tick (`tick_ns`); cada nível seguinte cobre
+    uma volta inteira do anterior em cada slot. Agendar e cancelar são
+    O(1); ao avançar, cada timer desce de nível no máximo uma vez por
+    nível (cascata), então a expiração é O(1) amortizada por timer. Voltas
+    do nível 0 sem nenhum timer são saltadas de uma vez.
+
+    Há no máximo um timer por chave: agendar de novo substitui o anterior.
+    """
+
+    def __init__(self, tick_ns: int = NS_PER_SECOND, sizes=(256, 64, 64, 64), start_ns: int = 0):
+        self.tick_ns = tick_ns
+        self.sizes = sizes
+        # Ticks cobertos por um slot de cada nível
+        self._spans = [1]
+        for size in sizes[:-1]:
+            self._spans.append(self._spans[-1] * size)
+        self._slots = [[{} for _ in range(size)] for size in sizes]
+        self._counts = [0] * len(sizes)
+        self._timers: Dict[Hashable, Tuple[int, int, int]] = {}  # chave -> (prazo, nível, slot)
+        self._due: List[Tuple[int, Hashable]] = []
+        self.tick = start_ns // tick_ns
+
+    def __len__(self):
+        return len(self._timers)
+
+    def __contains__(self, key):
+        return key in self._timers
+
+    def schedule(self, key, deadline_ns: int):
+        """Agenda `key` para expirar em `deadline_ns`"""
+        self.cancel(key)
+        self._insert(key, deadline_ns)
+
+    def _insert(self, key, deadline_ns):
+        # Arredonda para cima: um timer nunca expira antes do prazo
+        deadline_tick = -(-deadline_ns // self.tick_ns)
+        delta = deadline_tick - self.tick
+        if delta <= 0:
+            self._timers[key] = (deadline_ns, -1, -1)
+            self._due.append((deadline_ns, key))
+            return
+        level = 0
+        while level < len(self.sizes) - 1 and delta >= self._spans[level] * self.sizes[level]:
+            level += 1
+        slot = (deadline_tick // self._spans[level]) % self.sizes[level]
+        self._slots[level][slot][key] = deadline_ns
+        self._counts[level] += 1
+        self._timers[key] = (deadline_ns, level, slot)
+
+    def cancel(self, key):
+        timer = self._timers.pop(key, None)
+        if timer is None:
+            return
+        deadline_ns, level, slot = timer
+        if level < 0:
+            self._due.remove((deadline_ns, key))
+        else:
+            del self._slots[level][slot][key]
+            self._counts[level] -= 1
+
+    def clear(self):
+        for level, slots in enumerate(self._slots):
+            for slot in slots:
+                slot.clear()
+            self._counts[level] = 0
+        self._timers.clear()
+        self._due.clear()
+
+    def _take(self, level, slot):
+        timers = self._slots[level][slot]
+        self._slots[level][slot] = {}
+        self._counts[level] -= len(timers)
+        for key in timers:
+            del self._timers[key]
+        return timers
+
+    def advance(self, now_ns: int):
+        """Avança até `now_ns` e retorna os timers vencidos [(prazo, chave)] em ordem de prazo"""
+        target = now_ns // self.tick_ns
+        size0 = self.sizes[0]
+        while self.tick < target:
+            if not self._timers:
+                self.tick = target
+                break
+            if self._counts[0] == 0:
+                # Nível 0 vazio: salta direto para a próxima volta
+                wrap = (self.tick // size0 + 1) * size0
+                if wrap > target:
+                    self.tick = target
+                    break
+                self.tick = wrap - 1
+            self.tick += 1
+
+            # Cascata: o slot corrente de cada nível superior desce ao virar a volta
+            for level in range(1, len(self.sizes)):
+                if self.tick % self._spans[level]:
+                    break
+                slot = (self.tick // self._spans[level]) % self.sizes[level]
+                for key, deadline in self._take(level, slot).items():
+                    self._insert(key, deadline)
+
+            for key, deadline in self._take(0, self.tick % size0).items():
+                self._insert(key, deadline)
+
+        due, self._due = self._due, []
+        for _, key in due:
+            del self._timers[key]
+        due.sort()
+        return due
@@ -0,0 +1,110 @@
+import threading
+from typing import Dict
+
+import numpy as np
+
+
+class TradeBuffer:
+    """Trades de um símbolo acumulados em arrays NumPy pré-alocados"""
+    __slots__ = ('timestamps', 'prices', 'quantities', 'buyer_maker', 'size')
+
+    def __init__(self, capacity):
+        self.timestamps = np.empty(capacity, dtype=np.int64)
+        self.prices = np.empty(capacity, dtype=np.float64)
+        self.quantities = np.empty(capacity, dtype=np.float64)
+        self.buyer_maker = np.empty(capacity, dtype=np.bool_)
+        self.size = 0
+
+    def is_full(self):
+        return self.size == len(self.timestamps)
+
+    def columns(self):
+        n = self.size
+        return (self.timestamps[:n], self.prices[:n],
+                self.quantities[:n], self.buyer_maker[:n])
+
+
+class TradeBatcher:
+    """Micro-lotes de trades por símbolo.
+
+    O thread do WebSocket chama `add` para cada trade (O(1), sem alocação);
+    o consumidor chama `drain` periodicamente e agrega cada lote de forma
+    vetorizada com `aggregate_trades`.
+    """
+
+    def __init__(self, capacity: int = 65536):
+        self.capacity = capacity
+        self._active: Dict[str, TradeBuffer] = {}
+        self._ready: Dict[str, list] = {}
+        self._lock = threading.Lock()
+        self.total_trades = 0
+
+    def add(self, symbol, timestamp_ns, price, quantity, buyer_maker):
+        with self._lock:
+            buffer = self._active.get(symbol)
+            if buffer is None:
+                buffer = self._active[symbol] = TradeBuffer(self.capacity)
+            i = buffer.size
+            buffer.timestamps[i] = timestamp_ns
+            buffer.prices[i] = price
+            buffer.quantities[i] = quantity
+            buffer.buyer_maker[i] = buyer_maker
+            buffer.size = i + 1
+            self.total_trades += 1
+            if buffer.is_full():
+                # Lote cheio: separa para o consumidor e começa outro
+                self._ready.setdefault(symbol, []).append(buffer)
+                self._active[symbol] = TradeBuffer(self.capacity)
+
+    def drain(self):
+        """Retorna {símbolo: (timestamps, preços, quantidades, buyer_maker)} acumulados"""
+        with self._lock:
+            ready, self._ready = self._ready, {}
+            active, self._active = self._active, {}
+
+        batches = {}
+        for symbol in set(ready) | set(active):
+            buffers = ready.get(symbol, [])
+            if symbol in active and active[symbol].size:
+                buffers.append(active[symbol])
+            if not buffers:
+                continue
+            columns = list(zip(*(b.columns() for b in buffers)))
+            batches[symbol] = tuple(np.concatenate(c) for c in columns)
+        return batches
+
+
+def aggregate_trades(timestamps, prices, quantities, buyer_maker, interval_ns):
+    """Agrega trades em velas OHLCV com volume de compra e venda.
+
+    Retorna arrays por bucket: início, open, high, low, close, volume,
+    volume comprador (agressor comprador) e volume vendedor.
+    """
+    if len(timestamps) == 0:
+        return None
+
+    # Trades do aggTrade chegam em ordem; ordena só se necessário
+    if np.any(timestamps[1:] < timestamps[:-1]):
+        order = np.argsort(timestamps, kind='stable')
+        timestamps, prices = timestamps[order], prices[order]
+        quantities, buyer_maker = quantities[order], buyer_maker[order]
+
+    buckets = timestamps - timestamps % interval_ns
+    starts = np.concatenate(([0], np.flatnonzero(buckets[1:] != buckets[:-1]) + 1))
+    ends = np.concatenate((starts[1:], [len(timestamps)])) - 1
+
+    # m = True: o comprador é o maker, portanto o agressor vendeu
+    buy_quantities = np.where(buyer_maker, 0.0, quantities)
+
+    volume = np.add.reduceat(quantities, starts)
+    buy_volume = np.add.reduceat(buy_quantities, starts)
+    return (
+        buckets[starts],
+        prices[starts],
+        np.maximum.reduceat(prices, starts),
+        np.minimum.reduceat(prices, starts),
+        prices[ends],
+        volume,
+        buy_volume,
+        volume - buy_volume,
+    )
@@ -0,0 +1,335 @@
+"""Transformações de gráfico em fluxo (Heikin-Ashi, Line Break, Kagi, Range bars).
+
+Cada transformação é um operador com estado próprio: `update` consome um
+tick em O(1) e `batch` consome arrays inteiros, usado ao materializar a
+visão a partir do log de ticks. No modo em lote o laço Python é sobre as
+linhas produzidas (velas, linhas, vértices); a busca do tick que fecha
+cada linha é vetorizada. As duas rotas produzem a mesma série.
+"""
+import numpy as np
+
+from utils.records import DOWN, NEUTRAL, UP, KagiSeries, OHLCSeries, RenkoSeries
+
+
+def _blocks(start, n, size=16):
+    """Intervalos [início, fim) crescentes: a busca só lê os ticks até o evento"""
+    while start < n:
+        end = min(start + size, n)
+        yield start, end
+        start = end
+        size *= 2
+
+
+class Transform:
+    """Operador de transformação de um símbolo; a saída fica em `series`"""
+    name = ''
+    label = ''
+    series_class = None
+
+    def __init__(self, capacity=50):
+        self.series = self.series_class(capacity)
+
+    def update(self, timestamp, price):
+        raise NotImplementedError
+
+    def batch(self, timestamps, prices):
+        """Processa ticks em ordem; as subclasses vetorizam a busca dos eventos"""
+        for timestamp, price in zip(timestamps.tolist(), prices.tolist()):
+            self.update(timestamp, price)
+
+
+class HeikinAshi(Transform):
+    """Velas Heikin-Ashi de `interval_ns` calculadas a partir dos ticks.
+
+    fechamento = (o + h + l + c) / 4 da vela real; abertura = média da
+    abertura e do fechamento HA anteriores; máxima/mínima incluem ambos.
+    """
+    name = 'heikin_ashi'
+    label = 'Heikin-Ashi'
+    series_class = OHLCSeries
+
+    def __init__(self, capacity=50, interval_ns=60_000_000_000):
+        super().__init__(capacity)
+        self.interval_ns = interval_ns
+        self.bucket = None
+        self.candle = None          # [o, h, l, c] da vela real aberta
+        self.previous = None        # (abertura, fechamento) HA da vela anterior
+
+    def _write(self, bucket, is_new):
+        o, h, l, c = self.candle
+        ha_close = (o + h + l + c) / 4
+        ha_open = (o + c) / 2 if self.previous is None else sum(self.previous) / 2
+        values = (ha_open, max(h, ha_open, ha_close), min(l, ha_open, ha_close), ha_close)
+        if is_new:
+            self.series.open_candle(bucket, ha_open)
+        self.series.replace_candle(*values)
+
+    def _roll(self, bucket, o, h, l, c):
+        """Fecha a vela aberta (se houver) e abre a do novo bucket"""
+        if self.bucket is not None:
+            self.previous = (float(self.series['open'][-1]), float(self.series['close'][-1]))
+        self.bucket = bucket
+        self.candle = [o, h, l, c]
+        self._write(bucket, True)
+
+    def update(self, timestamp, price):
+        bucket = timestamp - timestamp % self.interval_ns
+        if self.bucket is None or bucket > self.bucket:
+            self._roll(bucket, price, price, price, price)
+            return
+        # Ticks atrasados entram na vela aberta, como nas velas OHLC
+        candle = self.candle
+        candle[1] = max(candle[1], price)
+        candle[2] = min(candle[2], price)
+        candle[3] = price
+        self._write(self.bucket, False)
+
+    def batch(self, timestamps, prices):
+        if len(timestamps) == 0:
+            return
+        buckets = timestamps - timestamps % self.interval_ns
+        if self.bucket is not None:
+            buckets = np.maximum(buckets, self.bucket)
+        buckets = np.maximum.accumulate(buckets)
+        starts = np.concatenate(([0], np.flatnonzero(buckets[1:] != buckets[:-1]) + 1))
+        ends = np.concatenate((starts[1:], [len(prices)])) - 1
+        opens = prices[starts].tolist()
+        highs = np.maximum.reduceat(prices, starts).tolist()
+        lows = np.minimum.reduceat(prices, starts).tolist()
+        closes = prices[ends].tolist()
+        for i, bucket in enumerate(buckets[starts].tolist()):
+            if bucket == self.bucket:
+                candle = self.candle
+                candle[1] = max(candle[1], highs[i])
+                candle[2] = min(candle[2], lows[i])
+                candle[3] = closes[i]
+                self._write(bucket, False)
+            else:
+                self._roll(bucket, opens[i], highs[i], lows[i], closes[i])
+
+
+class LineBreak(Transform):
+    """Gráfico de rompimento de N linhas (three-line break).
+
+    Uma nova linha na mesma direção surge quando o preço supera o
+    fechamento da última; a reversão exige romper o extremo das últimas
+    `lines` linhas e começa na abertura da última linha.
+    """
+    name = 'line_break'
+    label = 'Line Break'
+    series_class = RenkoSeries
+
+    def __init__(self, capacity=50, lines=3):
+        super().__init__(capacity)
+        self.lines = lines
+        self.reference = None  # primeiro preço, antes da primeira linha
+
+    def _limits(self):
+        """(direção, fechamento, limite de reversão) da última linha"""
+        series = self.series
+        direction = int(series['direction'][-1])
+        close = series.last_brick_close
+        if direction == UP:
+            return direction, close, float(series['low'][-self.lines:].min())
+        return direction, close, float(series['high'][-self.lines:].max())
+
+    def _add(self, timestamp, price, direction, reversal):
+        if reversal:
+            brick_open = float(self.series['open'][-1])
+        else:
+            brick_open = self.series.last_brick_close if len(self.series) else self.reference
+        self.series.add_brick(timestamp, brick_open, price, direction)
+
+    def update(self, timestamp, price):
+        if not len(self.series):
+            if self.reference is None:
+                self.reference = price
+            elif price != self.reference:
+                self._add(timestamp, price, UP if price > self.reference else DOWN, False)
+            return
+        direction, close, limit = self._limits()
+        if direction == UP:
+            if price > close:
+                self._add(timestamp, price, UP, False)
+            elif price < limit:
+                self._add(timestamp, price, DOWN, True)
+        elif price < close:
+            self._add(timestamp, price, DOWN, False)
+        elif price > limit:
+            self._add(timestamp, price, UP, True)
+
+    def batch(self, timestamps, prices):
+        n = len(prices)
+        i = 0
+        while i < n and not len(self.series):
+            self.update(int(timestamps[i]), float(prices[i]))
+            i += 1
+        while i < n:
+            direction, close, limit = self._limits()
+            hit = None
+            for start, end in _blocks(i, n):
+                block = prices[start:end]
+                if direction == UP:
+                    mask = (block > close) | (block < limit)
+                else:
+                    mask = (block < close) | (block > limit)
+                if mask.any():
+                    hit = start + int(np.argmax(mask))
+                    break
+            if hit is None:
+                return
+            self.update(int(timestamps[hit]), float(prices[hit]))
+            i = hit + 1
+
+
+class Kagi(Transform):
+    """Gráfico Kagi com reversão de `reversal` USD.
+
+    A linha segue o preço enquanto ele avança e só muda de lado após um
+    retorno de ao menos `reversal`. Fica grossa (yang) ao superar o ombro
+    anterior e fina (yin) ao perder a cintura anterior.
+    """
+    name = 'kagi'
+    label = 'Kagi'
+    series_class = KagiSeries
+
+    def __init__(self, capacity=100, reversal=None):
+        super().__init__(capacity)
+        self.reversal = reversal
+        self.direction = NEUTRAL
+        self.extreme = None
+        self.yang = False
+        self.shoulder = None  # último topo de linha de alta
+        self.waist = None     # último fundo de linha de baixa
+
+    def _extend(self, timestamp, price):
+        self.extreme = price
+        if self.direction == UP and self.shoulder is not None and price > self.shoulder:
+            self.yang = True
+        elif self.direction == DOWN and self.waist is not None and price < self.waist:
+            self.yang = False
+        self.series.extend(timestamp, price, self.yang)
+
+    def _reverse(self, timestamp, price):
+        if self.direction == UP:
+            self.shoulder = self.extreme
+        elif self.direction == DOWN:
+            self.waist = self.extreme
+        self.direction = UP if price > self.extreme else DOWN
+        if self.shoulder is None and self.waist is None:
+            self.yang = self.direction == UP
+        self.series.add_vertex(timestamp, price, self.direction, self.yang)
+        self._extend(timestamp, price)
+
+    def update(self, timestamp, price):
+        if not self.reversal or self.reversal <= 0:
+            return
+        if self.extreme is None:
+            self.extreme = price
+            self.series.add_vertex(timestamp, price, NEUTRAL, False)
+            return
+        if self.direction == NEUTRAL:
+            if abs(price - self.extreme) >= self.reversal:
+                self._reverse(timestamp, price)
+        elif self.direction == UP:
+            if price > self.extreme:
+                self._extend(timestamp, price)
+            elif self.extreme - price >= self.reversal:
+                self._reverse(timestamp, price)
+        elif price < self.extreme:
+            self._extend(timestamp, price)
+        elif price - self.extreme >= self.reversal:
+            self._reverse(timestamp, price)
+
+    def batch(self, timestamps, prices):
+        if not self.reversal or self.reversal <= 0:
+            return
+        n = len(prices)
+        i = 0
+        while i < n and self.direction == NEUTRAL:
+            self.update(int(timestamps[i]), float(prices[i]))
+            i += 1
+        while i < n:
+            up = self.direction == UP
+            hit = None
+            for start, end in _blocks(i, n):
+                block = prices[start:end]
+                if up:
+                    run = np.maximum(np.maximum.accumulate(block), self.extreme)
+                    mask = run - block >= self.reversal
+                else:
+                    run = np.minimum(np.minimum.accumulate(block), self.extreme)
+                    mask = block - run >= self.reversal
+                stop = start + int(np.argmax(mask)) if mask.any() else end
+                # Novo extremo (primeira ocorrência) antes da reversão
+                if stop > start:
+                    segment = prices[start:stop]
+                    k = int(np.argmax(segment) if up else np.argmin(segment))
+                    if (segment[k] > self.extreme) if up else (segment[k] < self.extreme):
+                        self._extend(int(timestamps[start + k]), float(segment[k]))
+                if stop < end:
+                    hit = stop
+                    break
+            if hit is None:
+                return
+            self._reverse(int(timestamps[hit]), float(prices[hit]))
+            i = hit + 1
+
+
+class RangeBars(Transform):
+    """Barras de amplitude fixa: a barra fecha quando máxima - mínima atinge `range_size`"""
+    name = 'range'
+    label = 'Range Bars'
+    series_class = OHLCSeries
+
+    def __init__(self, capacity=50, range_size=None):
+        super().__init__(capacity)
+        self.range_size = range_size
+        self.closed = True  # o próximo tick abre uma barra
+
+    def update(self, timestamp, price):
+        if not self.range_size or self.range_size <= 0:
+            return
+        if self.closed:
+            self.series.open_candle(timestamp, price)
+            self.closed = False
+        else:
+            self.series.update_candle(price)
+        if self.series['high'][-1] - self.series['low'][-1] >= self.range_size:
+            self.closed = True
+
+    def batch(self, timestamps, prices):
+        if not self.range_size or self.range_size <= 0:
+            return
+        n = len(prices)
+        i = 0
+        while i < n:
+            if self.closed:
+                self.update(int(timestamps[i]), float(prices[i]))
+                i += 1
+                continue
+            high = float(self.series['high'][-1])
+            low = float(self.series['low'][-1])
+            stop = n
+            for start, end in _blocks(i, n):
+                block = prices[start:end]
+                highs = np.maximum(np.maximum.accumulate(block), high)
+                lows = np.minimum(np.minimum.accumulate(block), low)
+                mask = highs - lows >= self.range_size
+                if mask.any():
+                    stop = start + int(np.argmax(mask)) + 1
+                    break
+                high, low = float(highs[-1]), float(lows[-1])
+            # Ticks da barra até o que a completa, em uma única atualização
+            segment = prices[i:stop]
+            self.series.replace_candle(
+                float(self.series['open'][-1]),
+                max(float(self.series['high'][-1]), float(segment.max())),
+                min(float(self.series['low'][-1]), float(segment.min())),
+                float(segment[-1])
+            )
+            self.closed = stop < n or (self.series['high'][-1] - self.series['low'][-1] >= self.range_size)
+            i = stop
+
+
+TRANSFORMS = {cls.name: cls for cls in (HeikinAshi, LineBreak, Kagi, RangeBars)}